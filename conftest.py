@@ -0,0 +1,20 @@
+"""
+Root pytest configuration
+
+Keeping a conftest at the repository root puts it on ``sys.path`` so the
+``voice_civic`` reference package is importable from every test directory.
+The Hypothesis profiles are registered here once for every suite: the
+property tests run ``max_examples`` examples, and the benchmarks scale their
+sample counts from it.
+"""
+
+import os
+
+from hypothesis import settings, Verbosity
+
+settings.register_profile("default", max_examples=25, verbosity=Verbosity.normal)
+settings.register_profile("ci", max_examples=1000, verbosity=Verbosity.verbose)
+settings.register_profile("dev", max_examples=10, verbosity=Verbosity.quiet)
+
+# Load profile based on environment
+settings.load_profile(os.getenv("HYPOTHESIS_PROFILE", "default"))
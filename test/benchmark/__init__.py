@@ -0,0 +1 @@
+# Performance benchmark module for Voice Civic Assistant
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Per-stage latency benchmarks for the speech request path
+Feature: voice-civic-assistant
+
+These benchmarks time every stage of a voice request many times, write the
+percentile report to JSON and fail when a stage is slower than the stored
+baseline allows after adjusting for machine speed.
+
+Refresh the baseline after an intentional change with:
+    python -m voice_civic.stage_bench --samples 250 --output test/benchmark/baseline.json
+
+**Validates: Requirements 1.4, 10.1**
+"""
+
+import json
+import os
+
+import pytest
+from hypothesis import settings
+
+from voice_civic.stage_bench import (
+    DEFAULT_TOLERANCE,
+    compare_to_baseline,
+    run_benchmark,
+    samples_for_profile,
+    write_report,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+REPORT_PATH = os.getenv("VOICE_CIVIC_BENCH_OUTPUT", os.path.join(".benchmarks", "stage_latency.json"))
+TOLERANCE = float(os.getenv("VOICE_CIVIC_BENCH_TOLERANCE", DEFAULT_TOLERANCE))
+
+STAGES = ["validation", "decode", "quality", "transcription", "confidence", "context"]
+
+
+@pytest.fixture(scope="module")
+def report():
+    """Run every stage once per module at the active profile's sample volume"""
+    profile = os.getenv("HYPOTHESIS_PROFILE", "default")
+    result = run_benchmark(samples_for_profile(profile), profile=profile)
+    write_report(result, REPORT_PATH)
+    return result
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    if not os.path.exists(BASELINE_PATH):
+        pytest.skip("No stored baseline; run python -m voice_civic.stage_bench --samples 250 --output test/benchmark/baseline.json")
+    with open(BASELINE_PATH) as stored:
+        return json.load(stored)
+
+
+class TestStageLatencyBenchmarks:
+    """
+    Benchmarks for per-stage percentiles and regressions against the baseline
+    """
+
+    @pytest.mark.parametrize("stage", STAGES)
+    def test_stage_reported(self, report, stage: str):
+        """Every stage reports ordered percentiles, throughput and allocations"""
+        row = report["stages"][stage]
+
+        assert row["samples"] == settings().max_examples * 10
+        assert 0 < row["p50Us"] <= row["p95Us"] <= row["p99Us"]
+        assert row["opsPerSecond"] > 0
+        assert row["allocBytes"] >= 0
+
+    def test_request_path_within_budget(self, report):
+        """The CPU cost of all stages at p99 leaves the 5-second budget to the speech service"""
+        total_p99_seconds = sum(row["p99Us"] for row in report["stages"].values()) / 1e6
+
+        assert total_p99_seconds < 0.5, f"Stages take {total_p99_seconds:.3f}s of CPU at p99"
+
+    @pytest.mark.parametrize("stage", STAGES)
+    def test_no_regression_against_baseline(self, report, baseline, stage: str):
+        """No stage's p50 or p95 is slower than the calibrated baseline plus tolerance"""
+        single_stage = {**report, "stages": {stage: report["stages"][stage]}}
+
+        regressions = compare_to_baseline(single_stage, baseline, TOLERANCE)
+
+        assert not regressions, "; ".join(regressions)
+
+    def test_report_written(self, report):
+        """Test the JSON report lands where CI collects it"""
+        with open(REPORT_PATH) as written:
+            assert json.load(written)["stages"].keys() == report["stages"].keys()
+
+
+class TestStageLatencyExamples:
+    """
+    Example-based tests for the regression gate itself
+    """
+
+    def test_slower_stage_flagged(self):
+        """Test a stage twice as slow on the same machine is reported"""
+        stage = {"p50Us": 100.0, "p95Us": 200.0}
+        baseline = {"calibrationNs": 1e6, "stages": {"decode": stage}}
+        current = {"calibrationNs": 1e6, "stages": {"decode": {"p50Us": 200.0, "p95Us": 400.0}}}
+
+        regressions = compare_to_baseline(current, baseline, tolerance=0.5)
+
+        assert len(regressions) == 2
+        assert regressions[0].startswith("decode p50")
+
+    def test_slower_machine_not_flagged(self):
+        """Test uniformly slower timings on a slower machine pass after calibration"""
+        baseline = {"calibrationNs": 1e6, "stages": {"decode": {"p50Us": 100.0, "p95Us": 200.0}}}
+        current = {"calibrationNs": 3e6, "stages": {"decode": {"p50Us": 300.0, "p95Us": 600.0}}}
+
+        assert compare_to_baseline(current, baseline, tolerance=0.1) == []
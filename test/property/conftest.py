@@ -1,19 +1,11 @@
 """
-Property-based testing configuration and fixtures
+Property-based testing fixtures
+
+Hypothesis profiles are registered in the root ``conftest.py``.
 """
 
 import pytest
-from hypothesis import settings, Verbosity
-
-# Configure Hypothesis for comprehensive testing
-settings.register_profile("default", max_examples=25, verbosity=Verbosity.normal)
-settings.register_profile("ci", max_examples=1000, verbosity=Verbosity.verbose)
-settings.register_profile("dev", max_examples=10, verbosity=Verbosity.quiet)
 
-# Load profile based on environment
-import os
-profile = os.getenv("HYPOTHESIS_PROFILE", "default")
-settings.load_profile(profile)
 
 @pytest.fixture
 def aws_config():
@@ -24,4 +16,4 @@ def aws_config():
         "temp_storage_bucket": "test-temp-storage",
         "kms_key_id": "test-key-id",
         "bedrock_model_id": "test-model-id",
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,293 @@
+"""
+Property-based tests for the ASGI reference backend
+Feature: voice-civic-assistant
+
+These tests validate that multipart bodies parse the same however they are
+split across reads, that uploads never hold more memory than the shared
+budget, that bad or oversized uploads are refused before the rest of the
+body is read, and that full queues answer 503 instead of buffering more.
+
+**Validates: Requirements 1.1, 1.4, 10.1**
+"""
+
+import asyncio
+import json
+
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.asgi_backend import (
+    READ_CHUNK_BYTES,
+    BackendApp,
+    HttpServer,
+    MemoryBudget,
+    MultipartParser,
+    UploadBuffer,
+    header_params,
+)
+from voice_civic.loadgen import ConnectionPool, EndpointStats, LoadGenerator, encode_multipart, generate_conversations, parse_multipart
+from voice_civic.pipeline import SimulatedSpeechProcessor
+from voice_civic.synthetic_audio import ClipSpec, render_wav
+from voice_civic.timing import SpeechLatencyModel, VirtualClock, run_with_clock
+
+names = st.text(alphabet="abcdefghijklmnopqrstuvwxyz_", min_size=1, max_size=10)
+
+
+async def asgi_request(app, method, path, body=b"", headers=None, chunk_size=READ_CHUNK_BYTES, content_length=True):
+    """Send one request through the ASGI interface, ``chunk_size`` bytes per receive"""
+    pieces = [body[offset:offset + chunk_size] for offset in range(0, len(body), chunk_size)] or [b""]
+    headers = dict(headers or {})
+    if content_length:
+        headers["content-length"] = str(len(body))
+    elif body:
+        headers["transfer-encoding"] = "chunked"
+    reads, messages = [], []
+
+    async def receive():
+        # Yield like a socket read would, so concurrent uploads interleave
+        await asyncio.sleep(0.001)
+        reads.append(pieces[len(reads)])
+        return {"type": "http.request", "body": reads[-1], "more_body": len(reads) < len(pieces)}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "method": method, "path": path,
+        "headers": [(name.encode(), value.encode()) for name, value in headers.items()],
+    }
+    await app(scope, receive, send)
+    start, response = messages
+    response_headers = {name.decode(): value.decode() for name, value in start["headers"]}
+    return start["status"], response_headers, json.loads(response["body"] or b"null"), len(reads)
+
+
+def voice_form(audio: bytes, language: str = "en"):
+    content_type, body = encode_multipart({"language": language}, {"audio": ("clip.wav", "audio/wav", audio)})
+    return body, {"content-type": content_type}
+
+
+def on_virtual_clock(app: BackendApp, scenario):
+    """Run ``scenario`` on virtual time, stopping the app's workers afterwards"""
+    async def run():
+        try:
+            return await scenario
+        finally:
+            await app.close()
+
+    return run_with_clock(run(), VirtualClock())
+
+
+def fast_app(**kwargs) -> BackendApp:
+    latency = SpeechLatencyModel(bounds_ms=(5.0, 10.0))
+    kwargs.setdefault("response_seconds", 0.01)
+    kwargs.setdefault("ocr_seconds", 0.01)
+    return BackendApp(SimulatedSpeechProcessor(latency), **kwargs)
+
+
+class TestAsgiBackendProperties:
+    """
+    Property-based tests for streaming parsing and spooling
+    """
+
+    @given(
+        st.dictionaries(names, st.text(alphabet=st.characters(blacklist_categories=("Cs",), blacklist_characters="\r"), max_size=30), max_size=3),
+        st.dictionaries(names, st.binary(max_size=300) | st.just(b"\r\n--\r\n\r\n--"), max_size=3),
+        st.lists(st.integers(min_value=1, max_value=64), min_size=1, max_size=20),
+    )
+    @settings(max_examples=100, deadline=None)
+    def test_incremental_parse_matches_whole_body(self, fields, files, chunk_sizes):
+        """Feeding a form in chunks of any size yields the fields and files of parsing it whole"""
+        files = {name: data for name, data in files.items() if name not in fields}
+        content_type, body = encode_multipart(fields, {name: (f"{name}.bin", "application/octet-stream", data) for name, data in files.items()})
+
+        parser = MultipartParser(header_params(content_type)["boundary"])
+        parts, offset, index = [], 0, 0
+        while offset < len(body):
+            for event, value in parser.feed(body[offset:offset + chunk_sizes[index % len(chunk_sizes)]]):
+                if event == "part":
+                    parts.append([header_params(value["content-disposition"]), b""])
+                elif event == "data":
+                    parts[-1][1] += value
+            offset, index = offset + chunk_sizes[index % len(chunk_sizes)], index + 1
+        parser.close()
+
+        parsed_fields = {params["name"]: data.decode() for params, data in parts if "filename" not in params}
+        parsed_files = {params["name"]: (params["filename"], data) for params, data in parts if "filename" in params}
+        assert (parsed_fields, parsed_files) == parse_multipart(content_type, body)
+
+    @given(
+        st.lists(st.integers(min_value=0, max_value=50_000), min_size=1, max_size=8),
+        st.integers(min_value=0, max_value=60_000),
+        st.integers(min_value=1, max_value=9_000),
+    )
+    @settings(max_examples=50, deadline=None)
+    def test_uploads_stay_within_budget(self, sizes, limit, chunk_size):
+        """Uploads written side by side never hold more than the budget and read back intact"""
+        budget = MemoryBudget(limit)
+        uploads = [UploadBuffer(budget, spool_bytes=20_000) for _ in sizes]
+        contents = [bytes([index]) * size for index, size in enumerate(sizes)]
+
+        for offset in range(0, max(sizes), chunk_size):
+            for upload, data in zip(uploads, contents):
+                if offset < len(data):
+                    upload.write(data[offset:offset + chunk_size])
+                assert budget.used <= limit
+
+        for upload, data in zip(uploads, contents):
+            view = upload.view()
+            assert (upload.size, bytes(view)) == (len(data), data)
+            assert upload.spilled or len(data) <= 20_000
+            view.release()
+            upload.close()
+        assert budget.used == 0 and budget.peak <= limit
+
+
+class TestAsgiBackendExamples:
+    """
+    Example-based tests for the routes, early refusal and backpressure
+    """
+
+    def test_voice_text_session_and_documents(self):
+        """Test a voice upload opens a session that a grievance follow-up extends with a document"""
+        app = fast_app()
+        body, headers = voice_form(render_wav(ClipSpec("speech", 16000, 1, 2.0)))
+
+        async def scenario():
+            status, _, voice, _ = await asgi_request(app, "POST", "/api/voice/process", body, headers)
+            assert status == 200, voice
+            text = json.dumps({"text": "The hospital overcharged me", "sessionId": voice["sessionId"], "language": "en"}).encode()
+            _, _, reply, _ = await asgi_request(app, "POST", "/api/text/process", text, {"content-type": "application/json"})
+            _, _, session, _ = await asgi_request(app, "GET", f"/api/session/{voice['sessionId']}")
+            _, _, documents, _ = await asgi_request(app, "GET", "/api/documents")
+            return voice, reply, session, documents
+
+        voice, reply, session, documents = on_virtual_clock(app, scenario())
+
+        assert voice["transcription"] and voice["intent"] in ("eligibility", "grievance", "inquiry")
+        assert reply["sessionId"] == voice["sessionId"] and reply["intent"] == "grievance"
+        assert [turn["intent"] for turn in session["conversationHistory"]] == [voice["intent"], "grievance"]
+        assert reply["document"] in documents and all(document["status"] == "draft" for document in documents)
+
+    def test_browser_recordings_accepted(self):
+        """Test the frontend's WebM recording, Ogg and an ID3-tagged MP3 are transcribed rather than refused"""
+        app = fast_app()
+        uploads = [
+            ("recording.webm", "audio/webm", b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\xf7\x81" + bytes(40_000)),
+            ("recording.ogg", "audio/ogg", b"OggS\x00\x02" + bytes(40_000)),
+            ("song.mp3", "audio/mpeg", b"ID3\x04\x00\x00\x00\x00\x00\x10" + bytes(16) + b"\xff\xfb\x90\xc0" + bytes(40_000)),
+        ]
+
+        async def scenario():
+            responses = []
+            for filename, content_type, audio in uploads:
+                form_type, body = encode_multipart({"language": "en"}, {"audio": (filename, content_type, audio)})
+                responses.append(await asgi_request(app, "POST", "/api/voice/process", body, {"content-type": form_type}))
+            return responses
+
+        for status, _, voice, _ in on_virtual_clock(app, scenario()):
+            assert status == 200, voice
+            assert voice["transcription"]
+
+    def test_document_status_update_and_not_found(self):
+        """Test documents can be confirmed through PATCH, and unknown ids and routes are 404s"""
+        app = fast_app()
+
+        async def scenario():
+            text = json.dumps({"text": "मुझे अस्पताल की शिकायत करनी है", "language": "hi"}).encode()
+            await asgi_request(app, "POST", "/api/text/process", text, {"content-type": "application/json"})
+            [document_id] = list(app.documents)
+            patched = await asgi_request(app, "PATCH", f"/api/documents/{document_id}", b'{"status": "confirmed"}')
+            fetched = await asgi_request(app, "GET", f"/api/documents/{document_id}")
+            missing = await asgi_request(app, "GET", "/api/documents/nope")
+            unknown = await asgi_request(app, "GET", "/api/unknown")
+            return patched, fetched, missing, unknown
+
+        patched, fetched, missing, unknown = on_virtual_clock(app, scenario())
+
+        assert patched[2]["status"] == fetched[2]["status"] == "confirmed"
+        assert fetched[2]["title"] == "स्वास्थ्य शिकायत - मसौदा"
+        assert missing[:1] + (missing[2],) == (404, {"error": "Document not found"})
+        assert unknown[2] == {"error": "Endpoint not found", "path": "/api/unknown", "method": "GET"}
+
+    def test_bad_uploads_refused_early(self):
+        """Test a wrong format is refused on its first chunk and an oversized body before or while it streams"""
+        app = fast_app(max_upload_bytes=256 * 1024)
+        junk, junk_headers = voice_form(b"not audio at all" * 12_000)
+        image_form = encode_multipart({}, {"image": ("bill.gif", "image/gif", b"GIF89a" + bytes(100_000))})
+        large, large_headers = voice_form(render_wav(ClipSpec("speech", 16000, 1, 20.0)))
+
+        async def scenario():
+            return (
+                await asgi_request(app, "POST", "/api/voice/process", junk, junk_headers),
+                await asgi_request(app, "POST", "/api/image/process", image_form[1], {"content-type": image_form[0]}),
+                await asgi_request(app, "POST", "/api/voice/process", large, large_headers),
+                await asgi_request(app, "POST", "/api/voice/process", large[:300_000], large_headers, content_length=False),
+            )
+
+        bad_audio, bad_image, declared, streamed = on_virtual_clock(app, scenario())
+
+        assert bad_audio[0] == 400 and bad_audio[2] == {"error": "Invalid or unsupported audio format"}
+        assert bad_audio[3] == 1 and bad_audio[1]["connection"] == "close"
+        assert bad_image[0] == 400 and bad_image[2]["error"] == "Invalid or unsupported image format"
+        assert declared[0] == 413 and declared[3] == 0
+        assert streamed[0] == 413 and streamed[3] == 256 * 1024 // READ_CHUNK_BYTES + 1
+        assert app.budget.used == 0
+
+    def test_full_queue_answers_503(self):
+        """Test requests beyond the workers and queue wait out the admission timeout and get Retry-After"""
+        app = fast_app(workers=1, queue_size=1, admission_timeout=0.5, response_seconds=1.0)
+        text = json.dumps({"text": "Help me please"}).encode()
+
+        async def scenario():
+            return await asyncio.gather(*(
+                asgi_request(app, "POST", "/api/text/process", text, {"content-type": "application/json"}) for _ in range(4)))
+
+        results = on_virtual_clock(app, scenario())
+
+        assert sorted(status for status, _, _, _ in results) == [200, 200, 503, 503]
+        assert all(headers["retry-after"] == "1" for status, headers, _, _ in results if status == 503)
+        assert app.queues["respond"].stats()["rejected"] == 2
+
+    def test_hundreds_of_uploads_in_a_fixed_budget(self):
+        """Test 200 concurrent uploads all complete while upload memory never passes the budget"""
+        app = fast_app(workers=8, queue_size=200, memory_budget=1024 * 1024, admission_timeout=60)
+        body, headers = voice_form(render_wav(ClipSpec("speech", 16000, 1, 8.0)))
+
+        async def scenario():
+            return await asyncio.gather(*(
+                asgi_request(app, "POST", "/api/voice/process", body, headers, chunk_size=16 * 1024) for _ in range(200)))
+
+        results = on_virtual_clock(app, scenario())
+
+        assert [status for status, _, _, _ in results] == [200] * 200
+        assert app.budget.peak <= app.budget.limit and app.budget.used == 0
+        assert app.budget.spills > 0
+        assert app.queues["speech"].stats()["maxInSystem"] == 200
+
+    def test_served_over_http(self):
+        """Test the built-in server carries load-generator conversations and refuses bad files cleanly"""
+        conversations = generate_conversations(4, seed=3)
+        content_type, junk = encode_multipart({}, {"image": ("bill.bmp", "image/bmp", b"BM" + bytes(2_000_000))})
+
+        async def scenario():
+            app = fast_app()
+            server = HttpServer(app)
+            pool = ConnectionPool(await server.start(), size=2)
+            try:
+                endpoints = {}
+                completed = [await LoadGenerator(pool, conversations).play(conversation, endpoints) for conversation in conversations]
+                refused = await pool.request("POST", "/api/image/process", junk, {"Content-Type": content_type})
+                health = await pool.request("GET", "/api/health")
+                return completed, endpoints, refused, health.json(), app
+            finally:
+                await pool.close()
+                await server.close()
+                await app.close()
+
+        completed, endpoints, refused, health, app = asyncio.run(scenario())
+
+        assert all(completed)
+        assert all(isinstance(stats, EndpointStats) and stats.error_count == 0 for stats in endpoints.values())
+        assert len(app.sessions) == 4
+        assert refused.status == 400 and refused.json()["error"] == "Invalid or unsupported image format"
+        assert health["status"] == "healthy" and health["uploadMemory"]["used"] == 0
@@ -0,0 +1,213 @@
+"""
+Property-based tests for the audio container inspector
+Feature: voice-civic-assistant
+
+These tests validate that durations come from the real stream parameters in
+the container header rather than a fixed 32KB/s assumption.
+
+**Validates: Requirements 1.4**
+"""
+
+import struct
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.audio_inspector import (
+    WAV_HEADER_SIZE,
+    AudioFormatError,
+    inspect_audio,
+    inspect_file,
+    wav_header,
+)
+from voice_civic.audio_payload import AudioPayload
+
+
+def _mp3_frame_header(bitrate_index: int = 9, rate_index: int = 0, mono: bool = True) -> bytes:
+    """MPEG-1 Layer III frame header (bitrate index 9 = 128kbps, rate index 0 = 44.1kHz)"""
+    channel_mode = 0b11 if mono else 0b00
+    return bytes([0xFF, 0xFB, (bitrate_index << 4) | (rate_index << 2), channel_mode << 6])
+
+
+def _id3v2_tag(body_size: int, footer: bool = False) -> bytes:
+    """ID3v2.4 tag with a zeroed body, its size written as a syncsafe integer"""
+    syncsafe = bytes((body_size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    tag = b"ID3\x04\x00" + bytes([0x10 if footer else 0x00]) + syncsafe + bytes(body_size)
+    return tag + (b"3DI\x04\x00\x10" + syncsafe if footer else b"")
+
+
+def _mp4_box(box_type: bytes, body: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+
+def _m4a_file(timescale: int, duration_units: int, sample_rate: int, channels: int, mdat_size: int) -> bytes:
+    """Minimal M4A: ftyp, moov/mvhd + trak/.../stsd/mp4a, then mdat"""
+    mvhd = _mp4_box(b"mvhd", b"\x00" * 12 + struct.pack(">II", timescale, duration_units) + b"\x00" * 80)
+    mp4a = _mp4_box(
+        b"mp4a",
+        b"\x00" * 6 + struct.pack(">H", 1) + b"\x00" * 8
+        + struct.pack(">HHHHI", channels, 16, 0, 0, sample_rate << 16),
+    )
+    stsd = _mp4_box(b"stsd", struct.pack(">II", 0, 1) + mp4a)
+    trak = _mp4_box(b"trak", _mp4_box(b"mdia", _mp4_box(b"minf", _mp4_box(b"stbl", stsd))))
+    moov = _mp4_box(b"moov", mvhd + trak)
+    ftyp = _mp4_box(b"ftyp", b"M4A \x00\x00\x00\x00")
+    return ftyp + moov + _mp4_box(b"mdat", b"\x00" * mdat_size)
+
+
+wav_params = st.tuples(
+    st.sampled_from([8000, 16000, 22050, 44100, 48000]),
+    st.sampled_from([1, 2]),
+    st.sampled_from([8, 16, 24, 32]),
+    st.integers(min_value=0, max_value=20000),
+)
+
+
+class TestAudioInspectorProperties:
+    """
+    Property-based tests for WAV, MP3 and M4A header parsing
+    """
+
+    @given(wav_params)
+    @settings(max_examples=100)
+    def test_wav_duration_uses_real_stream_parameters(self, params):
+        """WAV duration equals whole frames divided by the declared sample rate"""
+        sample_rate, channels, bits, frames = params
+        block_align = channels * bits // 8
+        data = wav_header(sample_rate, channels, bits, frames * block_align) + b"\x00" * (frames * block_align)
+
+        info = inspect_audio(data)
+
+        assert (info.sample_rate, info.channels, info.bits_per_sample) == (sample_rate, channels, bits)
+        assert info.data_offset == WAV_HEADER_SIZE
+        assert info.duration == pytest.approx(frames / sample_rate)
+
+    @given(wav_params, st.binary(min_size=0, max_size=64))
+    @settings(max_examples=50)
+    def test_wav_skips_unknown_chunks(self, params, extra: bytes):
+        """Chunks between fmt and data (LIST, fact, ...) do not affect parsing"""
+        sample_rate, channels, bits, frames = params
+        data_size = frames * channels * bits // 8
+        header = wav_header(sample_rate, channels, bits, data_size)
+        list_chunk = struct.pack("<4sI", b"LIST", len(extra)) + extra + b"\x00" * (len(extra) & 1)
+        data = header[:36] + list_chunk + header[36:] + b"\x00" * data_size
+
+        info = inspect_audio(data)
+
+        assert info.data_offset == WAV_HEADER_SIZE + len(list_chunk)
+        assert info.data_size == data_size
+
+    @given(wav_params, st.floats(min_value=0.0, max_value=5.0))
+    @settings(max_examples=100)
+    def test_truncation_limit_is_exact_and_frame_aligned(self, params, max_seconds: float):
+        """Truncating to a duration never exceeds it and never splits a frame"""
+        sample_rate, channels, bits, frames = params
+        block_align = channels * bits // 8
+        payload = AudioPayload(wav_header(sample_rate, channels, bits, frames * block_align) + b"\x00" * (frames * block_align))
+
+        truncated = payload.truncated_to_duration(max_seconds)
+
+        assert truncated.info is not None, "Truncated WAV should still parse"
+        assert truncated.estimated_duration <= max_seconds or truncated is payload
+        assert (truncated.size - WAV_HEADER_SIZE) % block_align == 0
+
+    @given(st.sampled_from([(1, 32), (5, 64), (9, 128), (14, 320)]), st.integers(min_value=12, max_value=50000))
+    @settings(max_examples=50)
+    def test_mp3_cbr_duration_from_bitrate(self, bitrate, size: int):
+        """Constant-bitrate MP3 duration is the byte count over the frame bitrate"""
+        index, kbps = bitrate
+        data = _mp3_frame_header(bitrate_index=index) + b"\x00" * (size - 4)
+
+        info = inspect_audio(data)
+
+        assert info.format == "mp3"
+        assert (info.sample_rate, info.channels) == (44100, 1)
+        assert info.duration == pytest.approx(size * 8 / (kbps * 1000))
+
+    @given(
+        st.sampled_from([(1, 32), (9, 128), (14, 320)]),
+        st.integers(min_value=12, max_value=50000),
+        st.integers(min_value=0, max_value=300000),
+        st.booleans(),
+    )
+    @settings(max_examples=50)
+    def test_mp3_after_id3v2_tag(self, bitrate, size: int, tag_size: int, footer: bool):
+        """An ID3v2 tag is skipped: the first frame sets the stream parameters and only the audio counts"""
+        index, kbps = bitrate
+        tag = _id3v2_tag(tag_size, footer)
+        payload = AudioPayload(tag + _mp3_frame_header(bitrate_index=index, mono=False) + b"\x00" * (size - 4))
+
+        info = payload.info
+
+        assert payload.format == "mp3"
+        assert (info.sample_rate, info.channels) == (44100, 2)
+        assert (info.data_offset, info.data_size) == (len(tag), size)
+        assert info.duration == pytest.approx(size * 8 / (kbps * 1000))
+
+    @given(
+        st.integers(min_value=100, max_value=96000),
+        st.integers(min_value=0, max_value=10**7),
+        st.sampled_from([(44100, 2), (48000, 1), (16000, 1)]),
+    )
+    @settings(max_examples=50)
+    def test_m4a_duration_from_movie_header(self, timescale: int, units: int, layout):
+        """M4A duration and layout come from mvhd and the mp4a sample entry"""
+        sample_rate, channels = layout
+        info = inspect_audio(_m4a_file(timescale, units, sample_rate, channels, 128))
+
+        assert info.format == "m4a"
+        assert info.duration == pytest.approx(units / timescale)
+        assert (info.sample_rate, info.channels) == (sample_rate, channels)
+        assert info.data_size == 128
+
+
+class TestAudioInspectorExamples:
+    """
+    Example-based tests for misjudged layouts and malformed headers
+    """
+
+    def test_48khz_stereo_not_misjudged(self):
+        """Test one second of 48kHz stereo is one second, not six"""
+        data_size = 48000 * 2 * 2
+        payload = AudioPayload(wav_header(48000, 2, 16, data_size) + b"\x00" * data_size)
+
+        assert payload.estimated_duration == pytest.approx(1.0)
+        assert payload.size / 32000 == pytest.approx(6.0, rel=0.01), "The old heuristic was 6x off"
+
+    def test_mp3_xing_frame_count(self):
+        """Test VBR MP3 uses the Xing frame count instead of the bitrate"""
+        header = _mp3_frame_header(mono=False)
+        xing = b"Xing" + struct.pack(">II", 0x1, 100)
+        data = header + b"\x00" * 32 + xing + b"\x00" * 1000
+
+        assert inspect_audio(data).duration == pytest.approx(100 * 1152 / 44100)
+
+    def test_inspect_file_through_mmap(self, tmp_path):
+        """Test files are inspected through a memory map"""
+        data_size = 16000 * 2 * 3
+        path = tmp_path / "clip.wav"
+        path.write_bytes(wav_header(16000, 1, 16, data_size) + b"\x00" * data_size)
+
+        assert inspect_file(str(path)).duration == pytest.approx(3.0)
+        assert AudioPayload.from_file(str(path)).estimated_duration == pytest.approx(3.0)
+
+    def test_truncated_data_chunk_is_clamped(self):
+        """Test a data chunk that overstates its size is clamped to what is present"""
+        data = wav_header(16000, 1, 16, 32000 * 10) + b"\x00" * 32000
+
+        assert inspect_audio(data).duration == pytest.approx(1.0)
+
+    @pytest.mark.parametrize("data", [
+        b"",
+        b"RIFF\x00\x00\x00\x00WAVE" + b"\x00" * 100,
+        b"RIFF\x00\x00\x00\x00WAVEdata\x04\x00\x00\x00abcd",
+        b"\xff\xff\xff\xff" + b"\x00" * 12,
+        b"\x00\x00\x00\x10ftypM4A \x00\x00\x00\x00",
+        b"ID3\x04\x00\x00\x00\x00\x80\x00" + _mp3_frame_header(),
+        _id3v2_tag(16) + b"not a frame",
+        b"not audio at all",
+    ])
+    def test_malformed_headers_rejected(self, data: bytes):
+        """Test malformed headers raise AudioFormatError instead of guessing"""
+        with pytest.raises(AudioFormatError):
+            inspect_audio(data)
@@ -0,0 +1,210 @@
+"""
+Property-based tests for the decode-once audio payload
+Feature: voice-civic-assistant
+
+These tests check that ``AudioPayload`` is a faithful, zero-copy stand-in for
+repeatedly decoding the ``audioData`` base64 string, and that the header-peek
+validator reports what a full decode would.
+"""
+
+import base64
+import tracemalloc
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.audio_inspector import wav_header
+from voice_civic.audio_payload import LENIENT_WINDOW, AudioPayload, decoded_size, detect_audio_format, peek_base64
+from voice_civic.validation import validate_audio_input, validate_audio_quality
+
+
+_NODE_ALPHABET = {char: value for value, char in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")}
+_NODE_ALPHABET.update({"-": 62, "_": 63})
+
+
+def _buffer_from_base64(text: str) -> bytes:
+    """``Buffer.from(text, "base64")``, reading the low byte of each UTF-16 code unit as Node's decoder does"""
+    decoded = bytearray()
+    bits = count = 0
+    for low in text.encode("utf-16-le", "surrogatepass")[::2]:
+        char = chr(low)
+        if char == "=":
+            break
+        if char in _NODE_ALPHABET:
+            bits = (bits << 6 | _NODE_ALPHABET[char]) & 0xFFF
+            count += 6
+            if count >= 8:
+                count -= 8
+                decoded.append(bits >> count & 0xFF)
+    return bytes(decoded)
+
+
+def _decode_everything(request):
+    """``validateAudioInput``: decode the whole string the way Node does, then check the buffer"""
+    encoded = request["audioData"]
+    if not encoded:
+        return False, ["audioData is required"]
+    errors = validate_audio_quality(_buffer_from_base64(encoded))
+    return not errors, errors
+
+
+@st.composite
+def audio_requests(draw):
+    """Requests whose audioData is valid base64 or broken within the characters validation filters"""
+    header = draw(st.sampled_from([wav_header(16000, 1, 16, 2000), b"\xff\xfb\x90\x00", b"\x00\x00\x00\x20ftypM4A ", b""]))
+    raw = header + draw(st.binary(max_size=64)) + bytes(draw(st.sampled_from([0, 100, 1000, 5000])))
+    encoded = base64.b64encode(raw).decode("ascii")
+    damage = draw(st.sampled_from(["none", "truncate", "extend", "non_ascii", "bad_tail", "url_safe", "inside_the_ends"]))
+    if damage == "truncate":
+        encoded = encoded[:draw(st.integers(min_value=0, max_value=len(encoded)))]
+    elif damage == "extend":
+        encoded += draw(st.sampled_from(["=", "==", "A", "A=", "AB=C", "A==="]))
+    elif damage == "non_ascii":
+        encoded = "\u0905" + encoded[1:] if encoded else "\u0905"
+    elif damage == "bad_tail" and encoded:
+        encoded = encoded[:-1] + draw(st.sampled_from(["!", " ", "-"]))
+    elif damage == "url_safe":
+        encoded = encoded.translate(str.maketrans("+/", "-_"))
+    elif damage == "inside_the_ends":
+        at = draw(st.one_of(st.integers(min_value=0, max_value=min(len(encoded), LENIENT_WINDOW - 1)),
+                            st.integers(min_value=max(0, len(encoded) - LENIENT_WINDOW + 1), max_value=len(encoded))))
+        encoded = encoded[:at] + draw(st.sampled_from(["=", "\n", "\r\n", "!"])) + encoded[at:]
+    return {"audioData": encoded}
+
+
+class TestAudioPayloadProperties:
+    """
+    Property-based tests for decoding and metadata caching
+    """
+
+    @given(st.binary(min_size=0, max_size=4096))
+    @settings(max_examples=50)
+    def test_decode_once_matches_b64decode(self, raw: bytes):
+        """Decoding through the payload yields exactly what b64decode yields"""
+        encoded = base64.b64encode(raw).decode("utf-8")
+        payload = AudioPayload.from_base64(encoded)
+
+        assert bytes(payload.data) == base64.b64decode(encoded)
+        assert payload.size == len(raw)
+        assert payload.encoded == encoded
+        if payload.info is None:
+            assert payload.estimated_duration == len(raw) / 32000
+
+    @given(st.binary(min_size=0, max_size=4096))
+    @settings(max_examples=50)
+    def test_lazy_encoding_round_trips(self, raw: bytes):
+        """Payloads built from raw bytes re-encode to the standard base64 form"""
+        payload = AudioPayload(raw)
+
+        assert AudioPayload.from_base64(payload.encoded).data == payload.data
+        assert AudioPayload.coerce(payload) is payload
+
+    @given(st.integers(min_value=0, max_value=8192), st.integers(min_value=0, max_value=8192))
+    @settings(max_examples=50)
+    def test_truncation_is_zero_copy(self, size: int, limit: int):
+        """Truncation never exceeds the limit and shares the original buffer"""
+        buffer = bytearray(size)
+        payload = AudioPayload(buffer)
+        truncated = payload.truncated(limit)
+
+        assert truncated.size == min(size, limit)
+        if size > 0 and limit > 0:
+            buffer[0] = 0x7F
+            assert truncated.data[0] == 0x7F, "Truncated payload should view the same memory"
+
+    @given(st.binary(max_size=4096), st.integers(min_value=0, max_value=64))
+    @settings(max_examples=100)
+    def test_size_and_peek_match_full_decode(self, raw: bytes, size: int):
+        """Length arithmetic and a partial decode agree with decoding everything"""
+        encoded = base64.b64encode(raw).decode("ascii")
+        assert decoded_size(encoded) == len(raw)
+        assert peek_base64(encoded, size) == raw[:size]
+
+    @given(audio_requests())
+    @settings(max_examples=200)
+    def test_header_peek_validation_matches_full_decode(self, request):
+        """The header-peek validator gives the same verdict and messages as Node decoding everything"""
+        assert validate_audio_input(request) == _decode_everything(request)
+
+    @given(st.binary(min_size=12, max_size=64))
+    @settings(max_examples=50)
+    def test_format_cached_from_header(self, raw: bytes):
+        """The cached format only depends on the first 12 bytes"""
+        payload = AudioPayload(raw)
+        assert payload.format == detect_audio_format(raw[:12])
+
+
+class TestAudioPayloadExamples:
+    """
+    Example-based tests for header sniffing and invalid input
+    """
+
+    @pytest.mark.parametrize("header,expected", [
+        (b"RIFF\x00\x00\x00\x00WAVEfmt ", "wav"),
+        (b"\xff\xfb\x90\x00" + b"\x00" * 8, "mp3"),
+        (b"\x00\x00\x00\x20ftypM4A ", "m4a"),
+        (b"\x00" * 12, None),
+        (b"RIFF", None),
+    ])
+    def test_detect_audio_format(self, header: bytes, expected):
+        """Test the magic bytes accepted by validateAudioFormat"""
+        assert AudioPayload(header).format == expected
+
+    def test_invalid_base64_rejected(self):
+        """Test invalid base64 raises ValueError instead of decoding garbage"""
+        with pytest.raises(ValueError):
+            AudioPayload.from_base64("invalid_base64")
+
+    def test_validation_reads_only_the_ends(self):
+        """Test a bad character mid-payload is not looked at by validation and fails the strict decode"""
+        encoded = base64.b64encode(wav_header(16000, 1, 16, 32000) + bytes(32000)).decode("ascii")
+        damaged = encoded[:4000] + "!" + encoded[4001:]
+
+        assert validate_audio_input({"audioData": damaged}) == (True, [])
+        with pytest.raises(ValueError):
+            AudioPayload.from_base64(damaged)
+
+    @pytest.mark.parametrize("raw,errors", [
+        (b"ID3\x04" + bytes(2000), []),
+        (b"ID3", ["Audio file too small - may be corrupted or empty"]),
+        (b"\xff\xfb", ["Audio file too small - may be corrupted or empty"]),
+        (b"\x00\x00\x00\x20ftyp", ["Audio file too small - may be corrupted or empty"]),
+        (b"RIFF\x00\x00\x00\x00WA", ["Audio file too small - may be corrupted or empty",
+                                   "Unsupported audio format - please use WAV, MP3, or M4A"]),
+        (b"\xff", ["Audio file too small - may be corrupted or empty",
+                   "Unsupported audio format - please use WAV, MP3, or M4A"]),
+    ])
+    def test_quality_checks_of_validation_ts(self, raw: bytes, errors):
+        """Test ID3-tagged MP3 and short buffers get the verdicts of validateAudioQuality"""
+        assert validate_audio_quality(raw) == errors
+        assert validate_audio_input({"audioData": base64.b64encode(raw).decode("ascii")}) == (not errors, errors)
+
+    @pytest.mark.parametrize("encoded,size", [
+        ("invalid_base64", 10),
+        ("SUQz\nBAAA", 6),
+        ("SUQzBA==AAAA", 4),
+        ("\u0905SUQz", 3),
+    ])
+    def test_malformed_base64_decoded_as_node_does(self, encoded: str, size: int):
+        """Test audioData that is not strict base64 is filtered like Buffer.from, never reported as invalid"""
+        assert validate_audio_input({"audioData": encoded}) == _decode_everything({"audioData": encoded})
+        assert len(_buffer_from_base64(encoded)) == size
+
+    def test_malformed_payload_checked_in_constant_memory(self):
+        """Test a 40 MB line-wrapped payload is validated without copying it, and reported too large"""
+        line = base64.b64encode(bytes(57)).decode("ascii") + "\n"
+        encoded = base64.b64encode(b"ID3\x04\x00\x00").decode("ascii") + "\n" + line * (40 * 1024 * 1024 // len(line))
+
+        tracemalloc.start()
+        valid, errors = validate_audio_input({"audioData": encoded})
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert (valid, errors) == (False, ["Audio file too large - maximum size is 10MB"])
+        assert peak < 16 * 1024
+
+    def test_oversized_payload_reported_from_length(self):
+        """Test a 12 MB payload is reported too large from its length and header alone"""
+        # 45 bytes encode without padding, which would end the payload for Buffer.from
+        encoded = base64.b64encode(wav_header(16000, 1, 16, 12 * 1024 * 1024) + bytes(1)).decode("ascii") + "A" * (16 * 1024 * 1024)
+        assert validate_audio_input({"audioData": encoded}) == (False, ["Audio file too large - maximum size is 10MB"])
@@ -0,0 +1,137 @@
+"""
+Property-based tests for the signal-based audio quality analyzer
+Feature: voice-civic-assistant
+
+These tests validate that silent, clipped and noisy recordings are caught from
+their samples before a transcription job is paid for, while clean speech-like
+audio is accepted.
+
+**Validates: Requirements 1.1, 1.2**
+"""
+
+import time
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.audio_inspector import wav_header
+from voice_civic.audio_payload import AudioPayload
+from voice_civic.audio_quality import analyze_signal, assess_audio_quality, calculate_confidence
+from voice_civic.pcm import iter_pcm_chunks
+from voice_civic.synthetic_audio import voiced_payload, wav_payload
+from voice_civic.types import AudioQuality
+
+
+class TestAudioQualityProperties:
+    """
+    Property-based tests for signal features and quality mapping
+    """
+
+    @given(
+        st.floats(min_value=1.5, max_value=10.0),
+        st.floats(min_value=0.1, max_value=0.6),
+        st.sampled_from([1, 2]),
+        st.integers(min_value=0, max_value=1000),
+    )
+    @settings(max_examples=30, deadline=None)
+    def test_clean_speech_is_accepted(self, seconds: float, amplitude: float, channels: int, seed: int):
+        """Speech-like audio with a low noise floor is rated good or better"""
+        assessment = assess_audio_quality(voiced_payload(seconds, channels=channels, amplitude=amplitude, noise=0.001, seed=seed))
+
+        assert assessment.acceptable
+        assert assessment.quality in (AudioQuality.EXCELLENT, AudioQuality.GOOD)
+        assert assessment.features.clipping_ratio == 0.0
+
+    @given(st.floats(min_value=1.0, max_value=10.0), st.sampled_from([0.0, 1e-5]))
+    @settings(max_examples=20, deadline=None)
+    def test_silence_is_rejected(self, seconds: float, noise: float):
+        """Silent recordings are rejected instead of being transcribed"""
+        signal = np.random.default_rng(0).normal(0, noise, int(seconds * 16000))
+        assessment = assess_audio_quality(wav_payload(signal, 16000))
+
+        assert not assessment.acceptable
+        assert "Audio is mostly silent" in assessment.issues
+
+    @given(st.floats(min_value=1.5, max_value=4.0), st.integers(min_value=0, max_value=1000))
+    @settings(max_examples=20, deadline=None)
+    def test_heavy_clipping_is_rejected(self, gain: float, seed: int):
+        """Recordings driven far past full scale are rejected as distorted"""
+        assessment = assess_audio_quality(voiced_payload(3.0, amplitude=gain, noise=0.001, seed=seed))
+
+        assert not assessment.acceptable
+        assert assessment.features.clipping_ratio >= 0.05
+
+    @given(st.floats(min_value=0.0005, max_value=0.2))
+    @settings(max_examples=30, deadline=None)
+    def test_snr_estimate_tracks_noise_level(self, noise: float):
+        """More background noise never raises the SNR estimate"""
+        quiet = analyze_signal(voiced_payload(3.0, noise=noise))
+        loud = analyze_signal(voiced_payload(3.0, noise=noise * 4))
+
+        assert loud.snr_db <= quiet.snr_db + 0.5
+
+    @given(
+        st.sampled_from([8, 16, 24, 32]),
+        st.sampled_from([1, 2]),
+        st.lists(st.floats(min_value=-0.99, max_value=0.99), min_size=1, max_size=200),
+        st.integers(min_value=1, max_value=64),
+    )
+    @settings(max_examples=50)
+    def test_pcm_decoding_is_chunk_invariant(self, bits: int, channels: int, values, chunk_frames: int):
+        """Decoded samples do not depend on chunk size and round-trip every bit depth"""
+        scale = float(2 ** (bits - 1))
+        ints = np.round(np.repeat(np.array(values), channels) * (scale - 1)).astype(np.int64)
+        if bits == 8:
+            raw = (ints + 128).astype(np.uint8).tobytes()
+        elif bits == 24:
+            raw = b"".join(int(v).to_bytes(3, "little", signed=True) for v in ints)
+        else:
+            raw = ints.astype(f"<i{bits // 8}").tobytes()
+        payload = AudioPayload(wav_header(16000, channels, bits, len(raw)) + raw)
+
+        whole = np.concatenate(list(iter_pcm_chunks(payload, len(values))))
+        chunked = np.concatenate(list(iter_pcm_chunks(payload, chunk_frames)))
+
+        assert whole.shape == (len(values), channels)
+        np.testing.assert_array_equal(whole, chunked)
+        np.testing.assert_allclose(whole[:, 0], ints[::channels] / scale, atol=1e-6)
+
+
+class TestAudioQualityExamples:
+    """
+    Example-based tests for the lambda-compatible fallbacks and performance
+    """
+
+    def test_empty_audio(self):
+        """Test empty audio mirrors validateAudioQuality"""
+        assessment = assess_audio_quality(AudioPayload(b""))
+
+        assert assessment.quality == AudioQuality.POOR
+        assert assessment.issues == ["Audio data is empty"]
+
+    def test_compressed_audio_uses_size_rules(self):
+        """Test MP3 input falls back to the byte-length checks"""
+        assessment = assess_audio_quality(AudioPayload(b"\xff\xfb\x90\xc0" + b"\x00" * 64000))
+
+        assert assessment.features is None
+        assert assessment.quality == AudioQuality.EXCELLENT
+
+    def test_confidence_follows_quality(self):
+        """Test confidence mapping matches calculateConfidence"""
+        good = assess_audio_quality(voiced_payload(3.0, noise=0.001))
+        silent = assess_audio_quality(wav_payload(np.zeros(48000), 16000))
+
+        assert calculate_confidence(good, "I need to file a complaint") == pytest.approx(0.95)
+        assert calculate_confidence(silent, "I need to file a complaint") < 0.5
+        assert calculate_confidence(good, "") == 0.1
+
+    def test_two_minute_clip_in_milliseconds(self):
+        """Test a 2-minute 48kHz stereo clip is analysed well under a second"""
+        payload = voiced_payload(120.0, 48000, 2, noise=0.001)
+
+        start = time.perf_counter()
+        assess_audio_quality(payload)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5, f"Analysis took {elapsed * 1000:.0f}ms"
@@ -0,0 +1,162 @@
+"""
+Property-based tests for the discrete-event capacity model
+Feature: voice-civic-assistant
+
+These tests validate that simulated runs respect every limit they model
+(account and reserved concurrency, concurrent transcription jobs), that warm
+environments are reused and only new ones pay a cold start, that runs are
+reproducible from their seed, and that the throughput ceiling lands where the
+tightest quota puts it.
+
+**Validates: Requirements 1.4, 9.1, 9.2**
+"""
+
+import dataclasses
+import random
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.capacity import (
+    STACK_FUNCTIONS,
+    ArrivalCurve,
+    CapacityModel,
+    RetryPolicy,
+    TranscribeQuotas,
+    find_ceiling,
+    read_stack_functions,
+    simulate,
+)
+
+rates = st.floats(min_value=1.0, max_value=40.0)
+
+
+def _run_dict(report) -> dict:
+    summary = report.as_dict()
+    summary.pop("wallSeconds")
+    return summary
+
+
+class TestCapacityProperties:
+    """
+    Property-based tests for limits, cold starts and reproducibility
+    """
+
+    @given(rates, st.integers(min_value=110, max_value=200), st.integers(min_value=0, max_value=10_000))
+    @settings(max_examples=20, deadline=None)
+    def test_concurrency_never_exceeds_limits(self, rate: float, account: int, seed: int):
+        """No function runs more environments than the unreserved pool or its own reservation allows"""
+        functions = dict(STACK_FUNCTIONS)
+        functions["intent-classifier"] = dataclasses.replace(functions["intent-classifier"], reserved=3)
+        model = CapacityModel(functions=functions, account_concurrency=account, transcription="mock")
+        report = simulate(ArrivalCurve.constant(rate * 4, 30.0), model, seed)
+
+        assert report.arrivals == report.finished
+        unreserved = account - 3
+        for name, stats in report.functions.items():
+            assert stats["peakConcurrency"] <= (3 if name == "intent-classifier" else unreserved), name
+
+    @given(rates, st.integers(min_value=1, max_value=40), st.booleans(), st.integers(min_value=0, max_value=10_000))
+    @settings(max_examples=20, deadline=None)
+    def test_transcription_jobs_within_quota(self, rate: float, jobs: int, deferred: bool, seed: int):
+        """Concurrent jobs stay within the quota; deferred jobs wait for a slot instead of failing"""
+        model = CapacityModel(quotas=TranscribeQuotas(start_tps=1000.0, get_tps=1000.0, concurrent_jobs=jobs, deferred=deferred))
+        report = simulate(ArrivalCurve.constant(rate, 120.0), model, seed)
+
+        assert report.transcribe["peakJobs"] <= jobs
+        if deferred:
+            assert report.outcomes["transcribe_jobs"] == 0
+        else:
+            assert report.transcribe["deferredJobs"] == 0
+
+    @given(rates, st.integers(min_value=0, max_value=10_000))
+    @settings(max_examples=20, deadline=None)
+    def test_warm_environments_reused(self, rate: float, seed: int):
+        """With environments kept warm, each function cold-starts exactly as many as it ever ran at once"""
+        model = CapacityModel(keep_warm_seconds=float("inf"), transcription="mock")
+        report = simulate(ArrivalCurve([(0.0, rate), (60.0, rate * 3), (120.0, 0.5), (180.0, rate)]), model, seed)
+        for name, stats in report.functions.items():
+            assert stats["coldStarts"] == stats["peakConcurrency"], name
+
+    @given(rates, st.integers(min_value=0, max_value=10_000))
+    @settings(max_examples=10, deadline=None)
+    def test_cold_start_every_time_without_keep_warm(self, rate: float, seed: int):
+        """Environments reclaimed the moment they go idle make every invocation a cold start"""
+        model = CapacityModel(keep_warm_seconds=-1.0, transcription="mock")
+        report = simulate(ArrivalCurve.constant(rate, 60.0), model, seed)
+        for name, stats in report.functions.items():
+            assert stats["coldStarts"] == stats["invocations"], name
+
+    @given(st.sampled_from(["batch", "mock"]), rates, st.integers(min_value=0, max_value=10_000))
+    @settings(max_examples=10, deadline=None)
+    def test_runs_reproducible_from_seed(self, transcription: str, rate: float, seed: int):
+        """The same curve, model and seed give the same report"""
+        curve = ArrivalCurve.constant(rate, 90.0)
+        first = simulate(curve, CapacityModel(transcription=transcription), seed)
+        second = simulate(curve, CapacityModel(transcription=transcription), seed)
+        assert _run_dict(first) == _run_dict(second)
+
+    @given(st.lists(st.tuples(st.floats(0.0, 3600.0), st.floats(0.0, 50.0)), min_size=1, max_size=6),
+           st.integers(min_value=0, max_value=10_000))
+    @settings(max_examples=50, deadline=None)
+    def test_arrivals_follow_the_curve(self, points, seed: int):
+        """Arrivals are increasing, inside the curve, and as many as its integral within Poisson noise"""
+        curve = ArrivalCurve(points)
+        arrivals = list(curve.arrivals(random.Random(seed)))
+        assert arrivals == sorted(arrivals)
+        assert all(0.0 <= at < curve.duration for at in arrivals)
+
+        # Before its first point the curve holds that point's rate
+        first_at, first_rate = curve.points[0]
+        expected = first_at * first_rate + sum((right - left) * (low + high) / 2 for (left, low), (right, high) in zip(curve.points, curve.points[1:]))
+        assert abs(len(arrivals) - expected) <= 6 * expected ** 0.5 + 6
+
+    @given(st.integers(min_value=1, max_value=8), st.floats(0.01, 2.0), st.floats(1.0, 30.0), st.integers(0, 10_000))
+    @settings(max_examples=100, deadline=None)
+    def test_retry_backoff_capped(self, attempt: int, base: float, cap: float, seed: int):
+        """Backoff is full jitter under the exponential curve and the cap"""
+        policy = RetryPolicy(max_attempts=attempt + 1, base_seconds=base, max_seconds=cap)
+        delay = policy.delay(attempt, random.Random(seed))
+        assert 0.0 <= delay <= min(cap, base * 2 ** attempt)
+
+
+class TestCapacityExamples:
+    """
+    Example-based tests for the stack limits and the ceilings they imply
+    """
+
+    def test_stack_table_matches_cdk(self):
+        """Test the function limits in the module are the ones the CDK stack sets"""
+        assert read_stack_functions() == STACK_FUNCTIONS
+
+    def test_start_rate_sets_throughput_ceiling(self):
+        """Test the StartTranscriptionJob rate caps voice turns at that rate over the voice share"""
+        model = CapacityModel(quotas=TranscribeQuotas(start_tps=4.0, get_tps=1000.0), transcription="mock", voice_share=0.5)
+        rate, report = find_ceiling(model, max_p99=None, duration=300.0, high=20.0, resolution=0.25)
+        # Poisson bursts over the one-second bucket fail 1% of turns a little below 4 / 0.5
+        assert 5.0 <= rate <= 8.5
+        assert report is not None and report.error_rate < 0.01
+
+    def test_mock_speech_meets_target_and_batch_does_not(self):
+        """Test the mocked speech processor answers within 5 s and batch Transcribe misses it even unloaded"""
+        curve = ArrivalCurve.constant(5.0, 600.0)
+        assert simulate(curve, CapacityModel(transcription="mock")).meets_target
+        batch = simulate(curve, CapacityModel())
+        assert batch.error_rate == 0.0
+        assert batch.percentile(99) > 5.0
+
+    def test_account_throttles_reach_the_client(self):
+        """Test a saturated account answers 429s that the client retries and then reports"""
+        model = CapacityModel(account_concurrency=20, transcription="mock", client_retry=RetryPolicy(2, 0.5, 1.0))
+        report = simulate(ArrivalCurve.constant(60.0, 120.0), model, seed=1)
+        assert report.outcomes["throttled"] > 0
+        assert report.functions["orchestrator"]["throttles"] > report.outcomes["throttled"]
+        assert not report.meets_target
+
+    def test_invalid_models_refused(self):
+        """Test unknown transcription models and over-reserved accounts are refused"""
+        with pytest.raises(ValueError):
+            CapacityModel(transcription="streaming")
+        functions = {name: dataclasses.replace(spec, reserved=200) for name, spec in STACK_FUNCTIONS.items()}
+        with pytest.raises(ValueError):
+            simulate(ArrivalCurve.constant(1.0, 10.0), CapacityModel(functions=functions))
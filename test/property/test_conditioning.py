@@ -0,0 +1,141 @@
+"""
+Property-based tests for streaming audio conditioning before upload
+Feature: voice-civic-assistant
+
+These tests validate that conditioned audio is a well-formed 16 kHz (or
+lower) mono 16-bit WAV whose header matches its data, that the duration
+limit holds to the frame, that chunk size never changes the output, and that
+the resampling filter keeps speech-band tones and removes aliases.
+
+**Validates: Requirements 1.4, 9.1**
+"""
+
+import tracemalloc
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.audio_inspector import WAV_HEADER_SIZE, inspect_audio
+from voice_civic.audio_payload import AudioPayload
+from voice_civic.conditioning import (
+    Resampler,
+    condition_audio,
+    iter_conditioned,
+    plan_conditioning,
+    tone_fidelity,
+)
+from voice_civic.synthetic_audio import SAMPLE_RATES, ClipSpec, render_wav, wav_payload
+
+
+def _tone(frequency: float, sample_rate: int, seconds: float, channels: int = 1) -> AudioPayload:
+    return wav_payload(0.5 * np.sin(2 * np.pi * frequency * np.arange(int(seconds * sample_rate)) / sample_rate), sample_rate, channels)
+
+
+class TestConditioningProperties:
+    """
+    Property-based tests for the output format, duration limit and filter
+    """
+
+    @given(st.sampled_from(SAMPLE_RATES), st.integers(min_value=1, max_value=2),
+           st.floats(min_value=0.0, max_value=6.0), st.floats(min_value=0.5, max_value=6.0))
+    @settings(max_examples=50, deadline=None)
+    def test_output_is_valid_wav_within_limit(self, sample_rate: int, channels: int, seconds: float, limit: float):
+        """The header describes exactly the data that follows, at most 16 kHz mono and never over the limit"""
+        payload = AudioPayload(render_wav(ClipSpec("speech", sample_rate, channels, seconds, seed=3)))
+        conditioned = condition_audio(payload, max_seconds=limit)
+        info = inspect_audio(conditioned.payload.data)
+
+        rate = min(sample_rate, 16000)
+        frames = min(int(seconds * sample_rate) * rate // sample_rate, int(limit * rate))
+        assert (info.sample_rate, info.channels, info.codec, info.bits_per_sample) == (rate, 1, "pcm", 16)
+        assert conditioned.payload.size == WAV_HEADER_SIZE + info.data_size
+        if not conditioned.passthrough:
+            assert info.data_size == frames * 2
+            assert conditioned.truncated == (int(seconds * sample_rate) * rate // sample_rate > int(limit * rate))
+        assert info.duration <= limit
+        assert conditioned.payload.size <= payload.size
+
+    @given(st.sampled_from([22050, 44100, 48000]), st.integers(min_value=1, max_value=2),
+           st.integers(min_value=100, max_value=20000), st.integers(min_value=0, max_value=10_000))
+    @settings(max_examples=40, deadline=None)
+    def test_chunk_size_does_not_change_output(self, sample_rate: int, channels: int, chunk_frames: int, seed: int):
+        """Conditioning a chunk at a time gives the same samples as one pass over the whole clip"""
+        payload = AudioPayload(render_wav(ClipSpec("noisy", sample_rate, channels, 1.5, seed=seed)))
+        whole = b"".join(iter_conditioned(payload, max_seconds=1.0, chunk_frames=1 << 20))
+        chunked = b"".join(iter_conditioned(payload, max_seconds=1.0, chunk_frames=chunk_frames))
+        assert len(whole) == len(chunked)
+        difference = np.abs(np.frombuffer(whole[WAV_HEADER_SIZE:], "<i2").astype(int) - np.frombuffer(chunked[WAV_HEADER_SIZE:], "<i2"))
+        # Float sums grouped differently may round to the neighbouring integer
+        assert difference.max(initial=0) <= 1
+
+    @given(st.sampled_from([22050, 32000, 44100, 48000]), st.floats(min_value=100.0, max_value=6000.0))
+    @settings(max_examples=30, deadline=None)
+    def test_speech_band_tones_preserved(self, sample_rate: int, frequency: float):
+        """Tones up to 6 kHz come through at their level and phase"""
+        level, snr = tone_fidelity(condition_audio(_tone(frequency, sample_rate, 1.0, channels=2)).payload, frequency)
+        assert abs(level) < 0.1
+        assert snr > 60.0
+
+    @given(st.sampled_from([32000, 44100, 48000]), st.floats(min_value=8500.0, max_value=15900.0))
+    @settings(max_examples=30, deadline=None)
+    def test_aliases_removed(self, sample_rate: int, frequency: float):
+        """Tones that would fold back into the speech band are at least 75 dB down"""
+        conditioned = condition_audio(_tone(frequency, sample_rate, 1.0)).payload
+        info = conditioned.info
+        samples = np.frombuffer(conditioned.data[info.data_offset:], "<i2")[2000:-2000] / 32768
+        assert 20 * np.log10(np.sqrt(2 * np.mean(samples ** 2)) / 0.5 + 1e-12) < -75.0
+
+    @given(st.integers(min_value=1, max_value=500), st.integers(min_value=1, max_value=500),
+           st.integers(min_value=0, max_value=3000))
+    @settings(max_examples=100, deadline=None)
+    def test_resampler_output_count(self, up: int, down: int, frames: int):
+        """A stream of ``frames`` inputs gives ``frames * up // down`` outputs, however it is split"""
+        resampler = Resampler(down * 100, up * 100)
+        samples = np.zeros(frames, dtype=np.float32)
+        produced = sum(len(resampler.process(part)) for part in np.array_split(samples, 3)) + len(resampler.flush())
+        assert produced == resampler.output_frames(frames)
+
+
+class TestConditioningExamples:
+    """
+    Example-based tests for upload size, pass-through and memory
+    """
+
+    @pytest.mark.parametrize("sample_rate,channels,ratio", [(48000, 2, 6.0), (44100, 2, 5.5125), (16000, 2, 2.0)])
+    def test_upload_shrinks(self, sample_rate, channels, ratio):
+        """Test browser recordings shrink by the ratio of their sample and channel rates to 16 kHz mono"""
+        conditioned = condition_audio(AudioPayload(render_wav(ClipSpec("speech", sample_rate, channels, 10.0, seed=1))))
+        assert conditioned.ratio == pytest.approx(ratio, rel=1e-3)
+        assert conditioned.duration == 10.0 and not conditioned.truncated
+
+    def test_long_recording_cut_at_exactly_two_minutes(self):
+        """Test a 150 s 48 kHz stereo recording becomes exactly 120 s at 16 kHz"""
+        payload = AudioPayload(render_wav(ClipSpec("speech", 48000, 2, 150.0, seed=1)))
+        conditioned = condition_audio(payload)
+        assert conditioned.truncated and conditioned.original_duration == 150.0
+        assert conditioned.payload.info.duration == 120.0
+        assert conditioned.payload.size == WAV_HEADER_SIZE + 120 * 16000 * 2
+        assert conditioned.ratio == pytest.approx(7.5, rel=1e-3)
+
+    def test_memory_bounded_by_chunk(self):
+        """Test memory held while streaming does not grow with the recording's length"""
+        peaks = []
+        for seconds in (20.0, 120.0):
+            payload = AudioPayload(render_wav(ClipSpec("speech", 44100, 2, seconds, seed=1)))
+            tracemalloc.start()
+            for _ in iter_conditioned(payload):
+                pass
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        assert peaks[1] < 4 * 1024 * 1024
+        assert peaks[1] < peaks[0] * 1.5
+
+    def test_small_and_compressed_audio_pass_through(self):
+        """Test 16 kHz mono 16-bit WAV and MP3 uploads are left as they are"""
+        ready = AudioPayload(render_wav(ClipSpec("speech", 16000, 1, 3.0, seed=1)))
+        mp3 = AudioPayload(b"\xff\xfb\x90\x64" + bytes(4000))
+        for payload in (ready, mp3):
+            assert plan_conditioning(payload).passthrough
+            conditioned = condition_audio(payload)
+            assert conditioned.passthrough and bytes(conditioned.payload.data) == bytes(payload.data)
@@ -0,0 +1,129 @@
+"""
+Property-based tests for the incremental conversation context
+Feature: voice-civic-assistant
+
+These tests validate that rolling aggregates always equal a full recomputation
+over the history and that the context payload stays bounded however long a
+session runs.
+
+**Validates: Requirements 1.5**
+"""
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.conversation import ConversationContext, ConversationStore, ExtractedEntity
+from voice_civic.types import Intent, Language
+
+turn_strategy = st.fixed_dictionaries({
+    "user_input": st.text(max_size=20),
+    "system_response": st.text(max_size=20),
+    "intent": st.sampled_from(list(Intent)),
+    "language": st.sampled_from(list(Language)),
+    "confidence": st.floats(min_value=0.0, max_value=1.0),
+    "processing_time": st.floats(min_value=50.0, max_value=2500.0),
+    "entities": st.lists(
+        st.builds(
+            ExtractedEntity,
+            type=st.sampled_from(["age", "income", "state", "category"]),
+            value=st.text(min_size=1, max_size=8),
+            confidence=st.floats(min_value=0.0, max_value=1.0),
+        ),
+        max_size=3,
+    ),
+})
+
+
+class TestConversationContextProperties:
+    """
+    Property-based tests for aggregate correctness and bounded payloads
+    """
+
+    @given(st.lists(turn_strategy, min_size=1, max_size=60), st.integers(min_value=1, max_value=12))
+    @settings(max_examples=100)
+    def test_aggregates_match_full_recomputation(self, turns, window: int):
+        """Running averages, counts and entity tallies equal a pass over the whole history"""
+        context = ConversationContext("session", Language.HINDI, window)
+        for turn in turns:
+            context.add_turn(**turn)
+
+        assert context.turn_count == len(turns)
+        assert context.average_confidence == pytest.approx(sum(t["confidence"] for t in turns) / len(turns))
+        assert context.average_processing_time == pytest.approx(sum(t["processing_time"] for t in turns) / len(turns))
+        assert context.language_consistency == pytest.approx(
+            sum(t["language"] == Language.HINDI for t in turns) / len(turns)
+        )
+        assert context.intents == {intent: sum(t["intent"] == intent for t in turns) for intent in Intent}
+        assert context.current_intent == turns[-1]["intent"]
+
+        entities = context.accumulated_info()["entities"]
+        all_entities = [entity for t in turns for entity in t["entities"]]
+        for entity_type, info in entities.items():
+            sightings = [entity for entity in all_entities if entity.type == entity_type]
+            assert info["count"] == len(sightings)
+            assert info["value"] == sightings[-1].value
+        assert set(entities) == {entity.type for entity in all_entities}
+
+    @given(st.integers(min_value=1, max_value=300), st.integers(min_value=1, max_value=12))
+    @settings(max_examples=50)
+    def test_payload_window_is_bounded(self, turn_count: int, window: int):
+        """The payload references at most ``window - 1`` previous turns, newest last"""
+        context = ConversationContext("session", window=window)
+        for _ in range(turn_count):
+            context.add_turn("input", "response", confidence=0.9)
+
+        payload = context.payload()
+        previous = payload["previousInteractions"]
+
+        assert payload["currentTurn"]["turnNumber"] == turn_count
+        assert len(previous) == min(turn_count, window) - 1
+        assert [interaction["turnNumber"] for interaction in previous] == list(
+            range(turn_count - len(previous), turn_count)
+        )
+        assert payload["accumulatedInfo"]["totalInteractions"] == turn_count
+
+
+class TestConversationContextExamples:
+    """
+    Example-based tests for empty sessions and the session store
+    """
+
+    def test_empty_context(self):
+        """Test an empty session has neutral aggregates and no current turn"""
+        context = ConversationContext("empty")
+
+        assert context.payload()["currentTurn"] is None
+        assert context.payload()["previousInteractions"] == []
+        assert context.average_confidence == 0.0
+        assert context.language_consistency == 1.0
+
+    def test_payload_changes_do_not_leak(self):
+        """Test editing one payload leaves the turns in every later payload untouched"""
+        context = ConversationContext("session")
+        context.add_turn("first", "response")
+        context.payload()["currentTurn"]["turnNumber"] = 99
+        context.add_turn("second", "response")
+
+        payload = context.payload()
+        payload["previousInteractions"][0]["userInput"] = "edited"
+
+        assert [turn["turnNumber"] for turn in payload["previousInteractions"]] == [1]
+        assert context.payload()["previousInteractions"][0]["userInput"] == "first"
+
+    def test_store_start_replaces_conversation(self):
+        """Test starting a session again discards its earlier turns"""
+        store = ConversationStore(window=4)
+        store.context_for("a").add_turn("hello", "hi")
+        assert store.get("a").turn_count == 1
+
+        store.start("a", Language.HINDI).add_turn("नमस्ते", "नमस्ते")
+
+        assert store.get("a").turn_count == 1
+        assert store.get("a").language == Language.HINDI
+        store.end("a")
+        assert "a" not in store
+
+    def test_invalid_window(self):
+        """Test a window smaller than one turn is rejected"""
+        with pytest.raises(ValueError):
+            ConversationContext("session", window=0)
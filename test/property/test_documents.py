@@ -0,0 +1,147 @@
+"""
+Property-based tests for precompiled grievance and eligibility documents
+Feature: voice-civic-assistant
+
+These tests validate that documents rendered from compiled templates are
+identical to documents built field by field, keep every value intact
+whatever characters it holds, and that batch rendering writes exactly the
+documents single rendering produces.
+
+**Validates: Requirements 4.2, 5.1, 5.3**
+"""
+
+import io
+import json
+from datetime import date
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.documents import (
+    CATEGORY_TEXT,
+    PAGE_BREAK,
+    REASON_TRANSLATIONS,
+    CompiledTemplate,
+    DocumentEngine,
+    build_grievance,
+    sample_grievances,
+)
+from voice_civic.eligibility import EligibilityVerdict, assess_household, generate_households
+from voice_civic.types import ComplaintCategory, Language, OutputFormat
+
+FILED = date(2024, 3, 9)
+
+field_text = st.text(alphabet=st.characters(blacklist_categories=("Cs",)), min_size=1, max_size=40)
+
+
+@st.composite
+def grievance_records(draw):
+    """Intake records with any characters in their fields and some fields left out"""
+    record = {
+        "grievanceId": draw(st.from_regex(r"GRV-[0-9]{4}", fullmatch=True)),
+        "language": draw(st.sampled_from(["hi", "en"])),
+        "category": draw(st.sampled_from([category.value for category in ComplaintCategory])),
+    }
+    for key in ("complainantName", "contactNumber", "location", "description", "district", "state"):
+        if draw(st.booleans()):
+            record[key] = draw(field_text)
+    if draw(st.booleans()):
+        record["incidentDate"] = draw(st.dates(min_value=date(2000, 1, 1), max_value=date(2030, 12, 31))).isoformat()
+    return record
+
+
+class TestDocumentProperties:
+    """
+    Property-based tests for compiled rendering against the build-from-scratch path
+    """
+
+    @given(grievance_records())
+    @settings(max_examples=200, deadline=None)
+    def test_json_matches_built_document(self, record):
+        """A compiled JSON grievance parses to exactly the document built field by field"""
+        engine = DocumentEngine()
+        rendered = engine.render_grievance(record, OutputFormat.JSON, FILED)
+        assert json.loads(rendered) == build_grievance(record, FILED)
+
+    @given(grievance_records())
+    @settings(max_examples=200, deadline=None)
+    def test_text_keeps_values_and_fixed_sections(self, record):
+        """Plain-text drafts carry every supplied value verbatim and the category's fixed text"""
+        engine = DocumentEngine()
+        text = engine.render_grievance(record, OutputFormat.PLAIN_TEXT, FILED)
+        subject, action, references = CATEGORY_TEXT[ComplaintCategory(record["category"])][Language(record["language"])]
+
+        for key in ("grievanceId", "complainantName", "contactNumber", "location", "description", "district", "state"):
+            if key in record:
+                assert record[key] in text
+        assert subject in text and action in text
+        assert all(reference in text for reference in references)
+
+    @given(st.lists(grievance_records(), max_size=30), st.sampled_from([OutputFormat.JSON, OutputFormat.PLAIN_TEXT]))
+    @settings(max_examples=50, deadline=None)
+    def test_batch_writes_single_renders(self, records, output: OutputFormat):
+        """A batch stream holds the single renders in order, one per line or per page"""
+        engine = DocumentEngine()
+        stream = io.StringIO()
+        assert engine.write_grievances(records, stream, output, FILED) == len(records)
+
+        singles = [engine.render_grievance(record, output, FILED) for record in records]
+        expected = "".join(single + "\n" for single in singles) if output is OutputFormat.JSON else PAGE_BREAK.join(singles)
+        assert stream.getvalue() == expected
+
+    @given(st.integers(min_value=0, max_value=10_000), st.sampled_from(list(Language)))
+    @settings(max_examples=30, deadline=None)
+    def test_eligibility_letters_translate_every_reason(self, seed: int, language: Language):
+        """Eligibility letters give each verdict's reasons, translated wherever a translation exists"""
+        verdicts = [assess_household(household, household_id) for household_id, household in generate_households(20, seed)]
+        stream = io.StringIO()
+        DocumentEngine().write_eligibility(verdicts, stream, language, OutputFormat.JSON, FILED)
+
+        letters = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert len(letters) == len(verdicts)
+        translate = REASON_TRANSLATIONS[language]
+        for verdict, letter in zip(verdicts, letters):
+            assert letter["id"] == verdict.household_id
+            assert letter["result"]["eligible"] == verdict.eligible
+            assert letter["result"]["reasoning"] == [translate.get(reason, reason) for reason in verdict.reasons]
+
+
+class TestDocumentExamples:
+    """
+    Example-based tests for templates and edge cases
+    """
+
+    def test_hindi_draft_uses_server_placeholders(self):
+        """Test a Hindi record with only an ID gets the server.js placeholders and D/M/YYYY dates"""
+        text = DocumentEngine().render_grievance({"grievanceId": "GRV-1", "language": "hi"}, filed=FILED)
+        assert "शिकायतकर्ता का नाम: आपका नाम" in text
+        assert "घटना की तारीख: 9/3/2024" in text
+        assert "दिनांक: 9/3/2024" in text
+
+    def test_every_qualifying_reason_has_hindi(self):
+        """Test every reason the screening produces for a valid household is translated"""
+        verdicts = [assess_household(household) for _, household in generate_households(500)]
+        reasons = {reason for verdict in verdicts if not verdict.missing for reason in verdict.reasons}
+        assert reasons <= set(REASON_TRANSLATIONS[Language.HINDI])
+
+    def test_template_literals_survive(self):
+        """Test percent signs and doubled braces are literal text, not slots"""
+        template = CompiledTemplate.from_text("100% {{fixed}} {name}")
+        assert template.fields == ("name",)
+        assert template.render({"name": "%s"}) == "100% {fixed} %s"
+        with pytest.raises(ValueError):
+            template.render({})
+        with pytest.raises(ValueError):
+            CompiledTemplate.from_text("{name.attr}")
+
+    def test_unsupported_format_rejected(self):
+        """Test formats the engine cannot render are refused rather than rendered as text"""
+        with pytest.raises(ValueError):
+            DocumentEngine().render_grievance(sample_grievances(1)[0], OutputFormat.PDF, FILED)
+
+    def test_incomplete_verdict_lists_missing_information(self):
+        """Test an incomplete household's letter says more information is needed and what is missing"""
+        verdict = EligibilityVerdict("HH1", False, ("Household information is incomplete",), ("members: Required",))
+        text = DocumentEngine(Language.ENGLISH).render_eligibility(verdict, filed=FILED)
+        assert "Result: More information needed" in text
+        assert "- members: Required" in text
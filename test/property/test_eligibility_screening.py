@@ -0,0 +1,221 @@
+"""
+Property-based tests for columnar PM-JAY eligibility screening
+Feature: voice-civic-assistant
+
+These tests validate that screening households in columnar batches gives
+exactly the verdict, reasons and validator errors of the single-record path
+for clean and malformed records alike, and that the error messages match
+validatePMJAYEligibility.
+
+**Validates: Requirements 3.1, 3.2, 3.3**
+"""
+
+import copy
+import io
+import json
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.eligibility import (
+    EXCLUDED_REASON,
+    INCOMPLETE,
+    HouseholdColumns,
+    assess_household,
+    generate_household,
+    household_from_csv_rows,
+    households_from_csv,
+    iter_verdicts,
+    read_households,
+    screen_households,
+    write_households_csv,
+)
+from voice_civic.validation import validate_pmjay_eligibility
+
+_DELETE = object()
+
+# (path, bad value) edits covering every way a record can fail the schema or the completeness checks
+MUTATIONS = [
+    ((), None), ((), []),
+    (("headOfHousehold", "age"), -1), (("headOfHousehold", "age"), 151), (("headOfHousehold", "age"), 12.5),
+    (("headOfHousehold", "age"), "40"), (("headOfHousehold", "age"), True), (("headOfHousehold", "age"), float("nan")),
+    (("headOfHousehold", "age"), 40.0), (("headOfHousehold", "age"), _DELETE),
+    (("headOfHousehold", "name"), ""), (("headOfHousehold", "name"), "x" * 101), (("headOfHousehold", "name"), "😀" * 51),
+    (("headOfHousehold", "relation"), "spouse"), (("headOfHousehold", "relation"), None),
+    (("headOfHousehold", "gender"), "M"), (("headOfHousehold", "gender"), 3),
+    (("headOfHousehold", "disabilities"), [{}]), (("headOfHousehold", "disabilities"), []),
+    (("headOfHousehold", "disabilities"), None), (("headOfHousehold", "occupation"), "farmer"),
+    (("headOfHousehold", "occupation"), None),
+    (("members",), []), (("members",), None), (("members",), "none"), (("members",), [None]),
+    (("address", "pincode"), "12345"), (("address", "pincode"), "12345\n"), (("address", "pincode"), 123456),
+    (("address", "district"), ""), (("address", "state"), None), (("address",), _DELETE),
+    (("economicStatus", "incomeCategory"), _DELETE), (("economicStatus", "incomeCategory"), "poor"),
+    (("economicStatus", "rationCardType"), None), (("economicStatus", "housingType"), "hut"),
+    (("economicStatus", "assets"), [{"type": "cow", "description": "dairy", "value": -5}]),
+    (("economicStatus", "assets"), [{"type": "cow", "description": "dairy", "value": 5}]),
+    (("economicStatus", "landOwnership"), {"hasLand": True, "acreage": 1.5}),
+    (("economicStatus", "landOwnership"), {"hasLand": "yes"}),
+    (("existingSchemes",), [1]), (("existingSchemes",), "PM-JAY"), (("existingSchemes",), ["ESIC", "pm jay"]),
+]
+
+
+def _mutate(household, path, value):
+    if not path:
+        return value
+    target = household
+    for key in path[:-1]:
+        target = target[key]
+    if value is _DELETE:
+        target.pop(path[-1], None)
+    else:
+        target[path[-1]] = value
+    return household
+
+
+@st.composite
+def households(draw):
+    household = generate_household(np.random.default_rng(draw(st.integers(0, 2**32))))
+    for index in draw(st.lists(st.integers(0, len(MUTATIONS) - 1), max_size=3)):
+        path, value = MUTATIONS[index]
+        try:
+            household = _mutate(household, path, copy.deepcopy(value))
+        except (KeyError, IndexError, TypeError):
+            pass
+    return household
+
+
+class TestEligibilityScreeningProperties:
+    """
+    Property-based tests for agreement between the columnar and single-record paths
+    """
+
+    @given(st.lists(households(), max_size=30))
+    @settings(max_examples=200, deadline=None)
+    def test_columnar_matches_single_record(self, batch):
+        """Every verdict, reason and error equals the single-record path's"""
+        records = [(f"H{index}", household) for index, household in enumerate(batch)]
+
+        verdicts = list(iter_verdicts(HouseholdColumns.from_records(records)))
+
+        assert verdicts == [assess_household(household, household_id) for household_id, household in records]
+        for verdict, (_, household) in zip(verdicts, records):
+            assert list(verdict.missing) == validate_pmjay_eligibility(household)
+
+    @given(st.lists(households(), min_size=1, max_size=40), st.integers(min_value=1, max_value=7))
+    @settings(max_examples=50, deadline=None)
+    def test_chunking_preserves_order(self, batch, chunk_size: int):
+        """Chunked streaming yields the same verdicts in the same order as one batch"""
+        records = [(f"H{index}", household) for index, household in enumerate(batch)]
+
+        streamed = list(screen_households(records, chunk_size=chunk_size))
+
+        assert streamed == list(iter_verdicts(HouseholdColumns.from_records(records)))
+
+    @given(st.lists(st.integers(0, 2**32), min_size=1, max_size=20))
+    @settings(max_examples=30, deadline=None)
+    def test_csv_round_trip(self, seeds):
+        """Households written to CSV and read back get the verdicts of the original records"""
+        records = [(f"H{index}", generate_household(np.random.default_rng(seed))) for index, seed in enumerate(seeds)]
+        for _, household in records:
+            for person in [household["headOfHousehold"], *household["members"]]:
+                # The CSV layout carries a disability flag, not its details
+                if person.get("disabilities"):
+                    person["disabilities"] = [{"type": "unspecified", "severity": "unspecified", "certified": False}]
+        buffer = io.StringIO()
+        write_households_csv(records, buffer)
+
+        read_back = list(households_from_csv(io.StringIO(buffer.getvalue())))
+
+        assert [household_id for household_id, _ in read_back] == [household_id for household_id, _ in records]
+        assert list(screen_households(read_back)) == [assess_household(h, i) for i, h in records]
+
+
+class TestEligibilityScreeningExamples:
+    """
+    Example-based tests for validator messages, criteria and file input
+    """
+
+    def _household(self, **economic):
+        return {
+            "headOfHousehold": {"name": "Sunita", "age": 45, "gender": "female", "relation": "head"},
+            "members": [{"name": "Asha", "age": 70, "gender": "female", "relation": "parent"}],
+            "address": {"district": "Sitapur", "state": "Uttar Pradesh", "pincode": "261001"},
+            "economicStatus": {"incomeCategory": "below_poverty_line", "housingType": "pucca", "assets": [], **economic},
+            "existingSchemes": [],
+        }
+
+    def test_zod_messages(self):
+        """Test schema failures are reported with zod's paths and messages"""
+        household = self._household()
+        household["headOfHousehold"]["age"] = 12.5
+        household["members"][0]["gender"] = "F"
+        household["address"]["pincode"] = "2610"
+        del household["economicStatus"]["incomeCategory"]
+
+        assert validate_pmjay_eligibility(household) == [
+            "headOfHousehold.age: Expected integer, received float",
+            "members.0.gender: Invalid enum value. Expected 'male' | 'female' | 'other', received 'F'",
+            "address.pincode: Pincode must be 6 digits",
+            "economicStatus.incomeCategory: Required",
+        ]
+
+    def test_completeness_messages(self):
+        """Test the validator's own checks run once the schema passes"""
+        household = self._household()
+        household["members"] = []
+        household["headOfHousehold"]["relation"] = "spouse"
+
+        verdict = assess_household(household)
+
+        assert verdict.reasons == (INCOMPLETE,)
+        assert verdict.missing == ("At least one family member must be specified", "Head of household must be specified")
+
+    def test_female_headed_bpl_household_qualifies(self):
+        """Test a BPL household headed by a woman with no adult man qualifies, with both reasons"""
+        verdict = assess_household(self._household())
+
+        assert verdict.eligible
+        assert verdict.reasons == (
+            "Income category is below poverty line",
+            "Female-headed household with no adult male aged 16 to 59",
+        )
+
+    def test_esic_coverage_excludes(self):
+        """Test existing ESIC coverage excludes an otherwise qualifying household"""
+        household = self._household()
+        household["existingSchemes"] = ["ESIC"]
+
+        assert assess_household(household).reasons == (EXCLUDED_REASON,)
+
+    def test_json_lines_and_workers(self, tmp_path):
+        """Test a JSON Lines file screened in two processes matches the single-record path"""
+        records = [generate_household(np.random.default_rng(seed)) for seed in range(50)]
+        path = tmp_path / "district.jsonl"
+        path.write_text("\n".join(json.dumps({**record, "householdId": f"HH{i}"}) for i, record in enumerate(records)))
+
+        verdicts = list(screen_households(read_households(str(path)), chunk_size=8, workers=2))
+
+        assert [verdict.household_id for verdict in verdicts] == [f"HH{i}" for i in range(50)]
+        assert verdicts == [assess_household(record, f"HH{i}") for i, record in enumerate(records)]
+
+    def test_csv_rows_keep_bad_values(self):
+        """Test CSV values that are not numbers reach the validator as strings"""
+        row = {
+            "household_id": "1", "name": "Ramesh", "age": "forty", "gender": "male", "relation": "head", "disabled": "",
+            "district": "Sitapur", "state": "UP", "pincode": "261001", "income_category": "",
+            "ration_card_type": "", "housing_type": "kutcha", "existing_schemes": "",
+        }
+
+        assert validate_pmjay_eligibility(household_from_csv_rows([row])) == [
+            "headOfHousehold.age: Expected number, received string",
+            "economicStatus.incomeCategory: Required",
+        ]
+
+    @pytest.mark.parametrize("value", [None, [], "household"])
+    def test_non_object_records(self, value):
+        """Test records that are not objects fall back and report zod's root error"""
+        verdict = next(iter_verdicts(HouseholdColumns.from_records([("x", value)])))
+
+        assert not verdict.eligible
+        assert len(verdict.missing) == 1 and verdict.missing[0].startswith(": Expected object")
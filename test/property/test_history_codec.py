@@ -0,0 +1,150 @@
+"""
+Property-based tests for the binary conversation history codec
+Feature: voice-civic-assistant
+
+These tests validate that every turn survives encoding exactly, that
+appending a turn leaves earlier bytes untouched and equals encoding the
+whole history, that damaged input only ever raises ``HistoryFormatError``,
+and that the encoding is smaller than the JSON it replaces.
+
+**Validates: Requirements 1.5, 8.1**
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.conversation import ConversationTurn, ExtractedEntity
+from voice_civic.history_codec import (
+    DYNAMODB_ITEM_BYTES,
+    ENTITY_TYPES,
+    FORMAT_VERSION,
+    HistoryFormatError,
+    append_turn,
+    decode_history,
+    encode_history,
+    json_history,
+    last_turns,
+    new_history,
+    sample_session,
+    turn_count,
+)
+from voice_civic.types import Intent, Language
+
+numbers = st.one_of(
+    st.floats(min_value=0.0, max_value=1.0),
+    st.integers(min_value=0, max_value=100_000).map(lambda value: value / 100),
+    st.floats(allow_nan=False),
+)
+
+entities = st.builds(
+    ExtractedEntity,
+    type=st.one_of(st.sampled_from(ENTITY_TYPES), st.text(max_size=12)),
+    value=st.text(max_size=20),
+    confidence=numbers,
+)
+
+timestamps = st.datetimes(min_value=datetime(2000, 1, 1), max_value=datetime(2100, 1, 1), timezones=st.just(timezone.utc))
+
+turns = st.builds(
+    ConversationTurn,
+    turn_number=st.integers(min_value=0, max_value=2 ** 40),
+    user_input=st.text(max_size=200),
+    system_response=st.one_of(st.text(max_size=400), st.sampled_from(["", "Please tell me more. " * 30])),
+    intent=st.sampled_from(list(Intent)),
+    entities=st.lists(entities, max_size=4).map(tuple),
+    language=st.sampled_from(list(Language)),
+    confidence=numbers,
+    processing_time=numbers,
+    timestamp=timestamps,
+)
+
+
+class TestHistoryCodecProperties:
+    """
+    Property-based tests for round trips, appends and damaged input
+    """
+
+    @given(st.lists(turns, max_size=8), st.booleans())
+    @settings(max_examples=200, deadline=None)
+    def test_round_trip_exact(self, history, compress: bool):
+        """Decoding gives back every field of every turn, timestamps to the microsecond"""
+        encoded = encode_history(history, compress=compress)
+        assert decode_history(encoded) == history
+        assert turn_count(encoded) == len(history)
+
+    @given(st.lists(turns, min_size=1, max_size=8), timestamps)
+    @settings(max_examples=100, deadline=None)
+    def test_append_matches_whole_encoding(self, history, base: datetime):
+        """Appending turn by turn keeps earlier bytes and ends equal to encoding them all at once"""
+        encoded = new_history(base)
+        for turn in history:
+            longer = append_turn(encoded, turn)
+            assert longer.startswith(encoded)
+            encoded = longer
+        assert encoded == encode_history(history, base)
+        assert last_turns(encoded, 3) == history[-3:]
+
+    @given(st.lists(turns, min_size=1, max_size=3), st.data())
+    @settings(max_examples=200, deadline=None)
+    def test_damaged_input_only_raises_format_errors(self, history, data):
+        """Cut or corrupted encodings are refused with ``HistoryFormatError`` and never any other error"""
+        damaged = bytearray(encode_history(history))
+        damaged = damaged[:data.draw(st.integers(min_value=0, max_value=len(damaged)))]
+        for _ in range(data.draw(st.integers(min_value=0, max_value=3))):
+            if damaged:
+                damaged[data.draw(st.integers(min_value=0, max_value=len(damaged) - 1))] = data.draw(st.integers(0, 255))
+        try:
+            decoded = decode_history(bytes(damaged))
+        except HistoryFormatError:
+            return
+        assert all(isinstance(turn, ConversationTurn) for turn in decoded)
+
+    @given(st.lists(turns, min_size=1, max_size=8))
+    @settings(max_examples=100, deadline=None)
+    def test_smaller_than_json(self, history):
+        """The binary history is never larger than the JSON list, whatever the text and numbers"""
+        assert len(encode_history(history)) < len(json_history(history))
+
+
+class TestHistoryCodecExamples:
+    """
+    Example-based tests for versioning, compression and realistic sessions
+    """
+
+    def test_unknown_version_refused(self):
+        """Test a history from another format version is refused rather than misread"""
+        encoded = bytearray(encode_history(sample_session(3)))
+        encoded[3] = FORMAT_VERSION + 1
+        with pytest.raises(HistoryFormatError, match="version"):
+            decode_history(bytes(encoded))
+        with pytest.raises(HistoryFormatError):
+            decode_history(b'[{"turnNumber": 1}]')
+
+    def test_naive_timestamps_refused(self):
+        """Test turns without a timezone cannot be encoded ambiguously"""
+        turn = ConversationTurn(1, "hello", "hi", timestamp=datetime(2024, 1, 1))
+        with pytest.raises(ValueError, match="timezone"):
+            encode_history([turn], base=datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+    def test_long_responses_compressed(self):
+        """Test the multi-line system responses are deflated and plain short turns are not"""
+        session = sample_session(20, seed=1)
+        assert len(encode_history(session)) * 1.3 < len(encode_history(session, compress=False))
+        short = [ConversationTurn(1, "hi", "hello", timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc))]
+        assert encode_history(short) == encode_history(short, compress=False)
+
+    def test_session_fits_twice_as_many_turns(self):
+        """Test a realistic session is over twice as small as JSON, doubling the turns an item holds"""
+        session = sample_session(200, seed=2)
+        encoded, as_json = encode_history(session), json_history(session)
+        assert decode_history(encoded) == session
+        assert DYNAMODB_ITEM_BYTES // (len(encoded) // 200) > 2 * (DYNAMODB_ITEM_BYTES // (len(as_json) // 200))
+
+    def test_millisecond_timestamps_cost_less(self):
+        """Test turns timed to the millisecond, as the lambdas record them, take the shorter form"""
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        exact = ConversationTurn(1, "a", "b", timestamp=base + timedelta(seconds=30))
+        precise = ConversationTurn(1, "a", "b", timestamp=base + timedelta(seconds=30, microseconds=1))
+        assert len(encode_history([exact], base)) < len(encode_history([precise], base))
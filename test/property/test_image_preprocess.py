@@ -0,0 +1,248 @@
+"""
+Property-based tests for header-first image pre-processing
+Feature: voice-civic-assistant
+
+These tests validate that dimensions read from container headers match what
+a full decode reports, that malformed headers are rejected without any other
+error, that processed images fit the analysis size upright and in grayscale,
+and that the working-set budget bounds the images in flight.
+
+**Validates: Requirements 6.1, 6.4**
+"""
+
+import asyncio
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st, settings
+from PIL import Image
+
+from voice_civic.asgi_backend import BackendApp
+from voice_civic.image_preprocess import (
+    EXIF_ORIENTATION,
+    ImagePreprocessor,
+    ImageRejected,
+    ImageSpec,
+    ProcessedImage,
+    WorkingSetBudget,
+    read_image_header,
+    render_image,
+)
+from voice_civic.loadgen import ENDPOINTS, encode_multipart
+
+
+def _encode(width: int, height: int, mode: str, fmt: str, progressive: bool = False, orientation: int = 1,
+            padding: int = 0) -> bytes:
+    """A noisy image of the given size, with ``padding`` bytes of EXIF ahead of a JPEG's frame header"""
+    noise = np.random.default_rng(width * 7919 + height).normal(128, 64, (height, width))
+    pixels = Image.fromarray(np.clip(noise, 0, 255).astype(np.uint8), "L").convert(mode)
+    out = io.BytesIO()
+    if fmt == "JPEG":
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = orientation
+        exif[0x010E] = "x" * padding
+        pixels.save(out, "JPEG", quality=90, progressive=progressive, exif=exif.tobytes())
+    else:
+        pixels.save(out, "PNG")
+    return out.getvalue()
+
+
+@st.composite
+def encoded_images(draw, max_side: int = 700):
+    fmt = draw(st.sampled_from(["JPEG", "PNG"]))
+    mode = draw(st.sampled_from(["L", "RGB"] if fmt == "JPEG" else ["L", "RGB", "RGBA", "P", "LA"]))
+    # Noise keeps even the smallest of these above validateImageBuffer's 1 KB floor
+    width = draw(st.integers(min_value=32, max_value=max_side))
+    height = draw(st.integers(min_value=32, max_value=max_side))
+    progressive = draw(st.booleans())
+    padding = draw(st.sampled_from([0, 100, 5000]))
+    return _encode(width, height, mode, fmt, progressive, padding=padding), fmt, (width, height)
+
+
+class TestImagePreprocessProperties:
+    """
+    Property-based tests for header parsing, shrinking and the working-set budget
+    """
+
+    @given(encoded_images())
+    @settings(max_examples=100, deadline=None)
+    def test_header_matches_decoder(self, image):
+        """Format and dimensions read from the headers are the ones Pillow decodes"""
+        data, fmt, size = image
+        header = read_image_header(data)
+        assert header.format == fmt.lower()
+        assert (header.width, header.height) == size
+        with Image.open(io.BytesIO(data)) as decoded:
+            assert decoded.size == size
+
+    @given(encoded_images(max_side=64), st.data())
+    @settings(max_examples=100, deadline=None)
+    def test_damaged_headers_only_raise_rejections(self, image, data):
+        """Cut or corrupted headers are refused with ``ImageRejected`` and never any other error"""
+        original = bytearray(image[0][:200])
+        damaged = original[:data.draw(st.integers(min_value=0, max_value=len(original)))]
+        for _ in range(data.draw(st.integers(min_value=0, max_value=3))):
+            if damaged:
+                damaged[data.draw(st.integers(min_value=0, max_value=len(damaged) - 1))] = data.draw(st.integers(0, 255))
+        try:
+            header = read_image_header(bytes(damaged))
+        except ImageRejected as error:
+            assert error.code in ("corrupt_header", "unsupported_format")
+        else:
+            assert header.format in ("jpeg", "png", "pdf")
+
+    @given(encoded_images(max_side=1200), st.sampled_from([1, 3, 6, 8]))
+    @settings(max_examples=30, deadline=None)
+    def test_output_fits_analysis_size_upright(self, image, orientation: int):
+        """Processed images are grayscale JPEGs within the long side, turned upright by the EXIF orientation"""
+        _, fmt, (width, height) = image
+        data = _encode(width, height, "RGB", fmt, orientation=orientation)
+        preprocessor = ImagePreprocessor(long_side=400, min_side=1, passthrough_bytes=0, workers=1)
+        try:
+            processed = preprocessor.process(data)
+        except ImageRejected as error:
+            pytest.fail(f"valid image rejected: {error}")
+
+        if processed.passthrough:
+            assert processed.data == data
+            return
+        with Image.open(io.BytesIO(processed.data)) as result:
+            assert result.format == "JPEG" and result.mode == "L"
+            assert result.size == (processed.width, processed.height)
+        assert max(processed.width, processed.height) <= 400
+        turned = fmt == "JPEG" and orientation in (6, 8)
+        longer_is_width = (height > width) if turned else (width > height)
+        # Near-square images may round to a square
+        if abs(width - height) > max(width, height) // 50:
+            assert (processed.width >= processed.height) == longer_is_width
+
+    @given(st.lists(st.integers(min_value=1, max_value=12), min_size=1, max_size=30), st.integers(1, 4))
+    @settings(max_examples=30, deadline=None)
+    def test_budget_bounds_working_set(self, megabytes, workers: int):
+        """Reservations held at once never exceed the budget, unless one alone is larger"""
+        budget = WorkingSetBudget(16 * 1024 * 1024)
+        held, peak, lock = [0], [0], threading.Lock()
+
+        def work(size: int) -> None:
+            with lock:
+                held[0] += size
+                peak[0] = max(peak[0], held[0])
+            time.sleep(0.001)
+            with lock:
+                held[0] -= size
+            budget.release(size)
+
+        with ThreadPoolExecutor(workers) as pool:
+            for size in (megabyte * 1024 * 1024 for megabyte in megabytes):
+                budget.acquire(size)
+                pool.submit(work, size)
+        assert peak[0] <= max(budget.limit, max(megabytes) * 1024 * 1024)
+        assert budget.used == 0 and budget.peak >= peak[0]
+
+    @given(st.lists(st.sampled_from(["photo", "gif", "thumbnail", "bomb", "truncated"]), min_size=1, max_size=8))
+    @settings(max_examples=10, deadline=None)
+    def test_pool_results_in_input_order(self, kinds):
+        """The pool yields one result per input, in order, with rejections in place of bad files"""
+        sizes = {"photo": (1600, 1200), "gif": (0, 0), "thumbnail": (120, 90), "bomb": (40000, 40000), "truncated": (1600, 1200)}
+        corpus = [render_image(ImageSpec(kind, *sizes[kind], seed=index)) for index, kind in enumerate(kinds)]
+        with ImagePreprocessor(long_side=800, workers=3, working_set_budget=8 * 1024 * 1024, passthrough_bytes=0) as preprocessor:
+            results = list(preprocessor.run(corpus))
+            stats = preprocessor.stats()
+
+        assert len(results) == len(kinds)
+        for kind, result in zip(kinds, results):
+            assert isinstance(result, ProcessedImage) == (kind == "photo"), kind
+        assert stats["processed"] == kinds.count("photo")
+        assert sum(stats["rejected"].values()) == len(kinds) - kinds.count("photo")
+        assert stats["workingSet"]["used"] == 0
+
+
+class TestImagePreprocessExamples:
+    """
+    Example-based tests for rejections, pass-through and the backend route
+    """
+
+    @pytest.mark.parametrize("spec,code", [
+        (ImageSpec("bomb", 30000, 30000, 0), "too_many_pixels"),
+        (ImageSpec("gif", 0, 0, 0), "unsupported_format"),
+        (ImageSpec("thumbnail", 240, 180, 0), "resolution_too_low"),
+    ])
+    def test_rejected_from_headers(self, spec, code):
+        """Test bad files are refused by ``inspect`` alone"""
+        preprocessor = ImagePreprocessor()
+        with pytest.raises(ImageRejected) as raised:
+            preprocessor.inspect(render_image(spec))
+        assert raised.value.code == code
+        assert preprocessor.rejected == {code: 1}
+
+    def test_size_limits_match_validate_image_buffer(self):
+        """Test the 1 KB and 10 MB limits of validateImageBuffer"""
+        preprocessor = ImagePreprocessor()
+        with pytest.raises(ImageRejected, match="too small"):
+            preprocessor.inspect(b"\xff\xd8\xff" + bytes(1000))
+        with pytest.raises(ImageRejected, match="maximum size is 10MB"):
+            preprocessor.inspect(b"\xff\xd8\xff" + bytes(10 * 1024 * 1024))
+
+    def test_truncated_upload_rejected_at_decode(self):
+        """Test a photo cut short after intact headers passes inspection and fails decoding"""
+        data = render_image(ImageSpec("truncated", 1600, 1200, 0))
+        preprocessor = ImagePreprocessor(long_side=800, passthrough_bytes=0)
+        assert preprocessor.inspect(data).width == 1600
+        with pytest.raises(ImageRejected) as raised:
+            preprocessor.process(data)
+        assert raised.value.code == "undecodable"
+        assert preprocessor.budget.used == 0
+
+    def test_small_and_pdf_uploads_pass_through(self):
+        """Test small files and PDFs reach the analyzer untouched and undecoded"""
+        pdf = b"%PDF-1.7\n" + bytes(4096)
+        small = _encode(400, 300, "L", "PNG")
+        preprocessor = ImagePreprocessor(min_side=100)
+        for data in (pdf, small):
+            processed = preprocessor.process(data)
+            assert processed.passthrough and processed.data == data
+        assert preprocessor.passed_through == 2
+
+    def test_photo_shrinks_to_analysis_size(self):
+        """Test a 12 megapixel phone photo taken sideways becomes a small upright grayscale JPEG"""
+        data = render_image(ImageSpec("photo", 4032, 3024, 0, orientation=6))
+        processed = ImagePreprocessor().process(data)
+        assert (processed.width, processed.height) == (1200, 1600)
+        assert len(processed.data) * 5 < len(data)
+
+    def test_backend_rejects_and_shrinks_images(self):
+        """Test the image route refuses a header bomb with 400 and reports pre-processing for a photo"""
+        app = BackendApp(ocr_seconds=0.0, images=ImagePreprocessor(long_side=800))
+        photo = render_image(ImageSpec("photo", 1600, 1200, 1))
+        bomb = render_image(ImageSpec("bomb", 30000, 30000, 1))
+
+        async def post(data):
+            content_type, body = encode_multipart({"language": "en"}, {"image": ("bill.jpg", "image/jpeg", data)})
+            sent = []
+
+            async def receive():
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            async def send(message):
+                sent.append(message)
+
+            headers = [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())]
+            scope = {"type": "http", "method": "POST", "path": ENDPOINTS["image"], "headers": headers, "query_string": b""}
+            await app(scope, receive, send)
+            return sent[0]["status"], json.loads(sent[1]["body"])
+
+        async def scenario():
+            try:
+                return await post(photo), await post(bomb)
+            finally:
+                await app.close()
+
+        (ok, result), (refused, error) = asyncio.run(scenario())
+        assert ok == 200 and result["preprocessing"]["width"] == 800
+        assert result["preprocessing"]["originalBytes"] == len(photo)
+        assert refused == 400 and error["error"].startswith("Image dimensions too large")
@@ -0,0 +1,146 @@
+"""
+Property-based tests for the keyword intent classifier
+Feature: voice-civic-assistant
+
+These tests validate that the compiled automaton finds exactly the keywords a
+substring scan finds, that it reproduces the mock backend's intent chain, and
+that Devanagari spelling variants classify the same way.
+
+**Validates: Requirements 2.1, 2.2, 7.2**
+"""
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.intent import (
+    DEFAULT_RULES,
+    MOCK_BACKEND_RULES,
+    IntentClassifier,
+    KeywordAutomaton,
+    naive_classify,
+    normalize_text,
+)
+from voice_civic.types import Intent
+
+RULE_KEYWORDS = [keyword if isinstance(keyword, str) else keyword[0]
+                 for rules in (MOCK_BACKEND_RULES, DEFAULT_RULES) for _, keywords in rules for keyword in keywords]
+
+# Fragments of real keywords and filler, so generated text hits, straddles and misses keywords
+text_pieces = st.sampled_from(RULE_KEYWORDS + ["my ", "the ", " ", "मेरा ", "है", "sch", "शिका", "xyz"])
+texts = st.lists(text_pieces, max_size=12).map("".join)
+
+
+class TestIntentClassifierProperties:
+    """
+    Property-based tests for automaton correctness and agreement with the substring scan
+    """
+
+    @given(st.lists(st.text(alphabet="abc", min_size=1, max_size=4), min_size=1, max_size=8), st.text(alphabet="abc", max_size=40))
+    @settings(max_examples=200)
+    def test_automaton_finds_every_occurrence(self, patterns, text: str):
+        """Every (end, pattern) the automaton reports is an occurrence, and none is missed"""
+        automaton = KeywordAutomaton(patterns)
+
+        expected = sorted(
+            (end, index)
+            for index, pattern in enumerate(patterns)
+            for end in range(len(pattern), len(text) + 1)
+            if text[end - len(pattern):end] == pattern
+        )
+
+        assert sorted(automaton.iter_matches(text)) == expected
+        assert automaton.matched(text) == {index for _, index in expected}
+
+    @given(texts)
+    @settings(max_examples=200)
+    def test_first_match_reproduces_mock_backend(self, text: str):
+        """With first_match the classifier picks what generateMockResponse's if chain picks"""
+        classifier = IntentClassifier(MOCK_BACKEND_RULES, first_match=True)
+
+        assert classifier.classify(text).intent == naive_classify(text)
+
+    @given(texts)
+    @settings(max_examples=200)
+    def test_weighted_scores_match_full_scan(self, text: str):
+        """Weighted scoring agrees with searching every keyword one by one"""
+        classifier = IntentClassifier(DEFAULT_RULES)
+
+        assert classifier.classify(text).intent == naive_classify(text, DEFAULT_RULES, first_match=False)
+
+    @given(st.lists(texts, max_size=20))
+    @settings(max_examples=50)
+    def test_classify_many_matches_classify(self, batch):
+        """The batch API returns what classifying each text alone returns"""
+        classifier = IntentClassifier()
+
+        assert classifier.classify_many(batch) == [classifier.classify(text) for text in batch]
+
+    @given(texts, st.sampled_from(["़", "‌", "‍"]), st.integers(min_value=0, max_value=200))
+    @settings(max_examples=100)
+    def test_spelling_variants_classify_alike(self, text: str, mark: str, position: int):
+        """Inserting a nukta or zero-width joiner after a Devanagari letter does not change the intent"""
+        classifier = IntentClassifier()
+        letters = [i for i, char in enumerate(text) if "क" <= char <= "ह"]
+        if letters:
+            cut = letters[position % len(letters)] + 1
+            variant = text[:cut] + mark + text[cut:]
+        else:
+            variant = text
+
+        assert classifier.classify(variant) == classifier.classify(text)
+
+
+    @given(st.text(alphabet=st.characters(min_codepoint=0x900, max_codepoint=0x97F) | st.sampled_from("aZ ‌‍"), max_size=20))
+    @settings(max_examples=300)
+    def test_plain_text_shortcut_is_exact(self, text: str):
+        """Text lowered without NFD and NFC normalises exactly as if it had gone through them"""
+        # A trailing zero-width joiner forces the full path and is folded away there
+        assert normalize_text(text) == normalize_text(text + "\u200d")
+
+    @given(texts, st.booleans(), st.sampled_from([MOCK_BACKEND_RULES, DEFAULT_RULES]))
+    @settings(max_examples=200)
+    def test_substring_search_agrees_with_automaton(self, text: str, first_match: bool, rules):
+        """Searching each keyword and scanning with the automaton choose the same intent"""
+        searched = IntentClassifier(rules, first_match=first_match, automaton=False)
+        scanned = IntentClassifier(rules, first_match=first_match, automaton=True)
+
+        assert searched.classify(text) == scanned.classify(text)
+        assert searched.intent_of(text) == scanned.intent_of(text) == scanned.classify(text).intent
+
+
+class TestIntentClassifierExamples:
+    """
+    Example-based tests for the mock backend's phrases and the weighted rules
+    """
+
+    @pytest.mark.parametrize("text,intent", [
+        ("Am I eligible for PMJAY?", Intent.ELIGIBILITY_CHECK),
+        ("मुझे योजना की जांच करनी है", Intent.ELIGIBILITY_CHECK),
+        ("I want to file a complaint", Intent.GRIEVANCE_FILING),
+        ("अस्पताल ने ज़्यादा पैसे लिए, शिकायत दर्ज करें", Intent.GRIEVANCE_FILING),
+        ("What documents do I need?", Intent.GENERAL_INQUIRY),
+    ])
+    def test_mock_backend_phrases(self, text: str, intent: Intent):
+        """Test the phrases the local backend demo uses"""
+        assert IntentClassifier(MOCK_BACKEND_RULES, first_match=True).classify(text).intent == intent
+
+    def test_weights_override_chain_order(self):
+        """Test a grievance mentioning the scheme in passing is a grievance when weighted"""
+        text = "The hospital refused treatment under the scheme, I want to file a complaint"
+
+        assert naive_classify(text) == Intent.ELIGIBILITY_CHECK
+        match = IntentClassifier().classify(text)
+        assert match.intent == Intent.GRIEVANCE_FILING
+        assert match.keywords == ("complaint", "hospital", "refused")
+        assert match.scores[Intent.ELIGIBILITY_CHECK] == 1.0
+
+    def test_normalization_folds_variants(self):
+        """Test nukta letters, chandrabindu and case fold to one spelling"""
+        assert normalize_text("ज़रूरत") == normalize_text("जरूरत")
+        assert normalize_text("हूँ") == normalize_text("हूं")
+        assert normalize_text("PM-JAY") == "pm-jay"
+
+    def test_empty_keyword_rejected(self):
+        """Test an empty keyword is refused rather than matching everywhere"""
+        with pytest.raises(ValueError):
+            IntentClassifier([("x", [""])])
@@ -0,0 +1,125 @@
+"""
+Property-based tests for single-pass language identification
+Feature: voice-civic-assistant
+
+These tests validate that deciding from one streamed en-IN partial gives the
+same language as transcribing the whole clip twice and applying the
+detectLanguage rule, while spending less than half the recogniser work.
+
+**Validates: Requirements 7.1, 10.1**
+"""
+
+import random
+
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.language_id import (
+    LanguageIdentifier,
+    SimulatedRecognizer,
+    SinglePassDetector,
+    SpokenClip,
+    TwoPassDetector,
+    code_mixed_clip,
+    english_clip,
+    generate_clips,
+    hindi_clip,
+    two_pass_decision,
+)
+from voice_civic.types import Language
+
+CLIP_MAKERS = {"hindi": hindi_clip, "english": english_clip, "code-mixed": code_mixed_clip}
+
+
+@st.composite
+def spoken_clips(draw):
+    maker = CLIP_MAKERS[draw(st.sampled_from(sorted(CLIP_MAKERS)))]
+    clip = maker(draw(st.integers(min_value=1, max_value=60)), random.Random(draw(st.integers(0, 2**32))))
+    return SpokenClip(clip.words, acceptable=draw(st.booleans()) or draw(st.booleans()))
+
+
+class TestLanguageIdentificationProperties:
+    """
+    Property-based tests for agreement with two-pass detection and its cost
+    """
+
+    @given(spoken_clips(), st.sampled_from([0.5, 1.0, 2.0]))
+    @settings(max_examples=200)
+    def test_matches_two_pass_decision(self, clip: SpokenClip, window: float):
+        """Single-pass picks the language detectLanguage would have picked"""
+        two_pass = TwoPassDetector(SimulatedRecognizer()).detect(clip)
+        single = SinglePassDetector(SimulatedRecognizer(), window_seconds=window).detect(clip)
+
+        assert single.language == two_pass.language
+        assert single.jobs <= 2
+        assert single.audio_seconds <= two_pass.audio_seconds
+
+    @given(st.integers(min_value=0, max_value=2**16))
+    @settings(max_examples=10, deadline=None)
+    def test_halves_detection_cost(self, seed: int):
+        """Over a traffic mix, single-pass needs under half the audio and latency of two passes"""
+        clips = generate_clips(300, seed)
+        two_pass = [TwoPassDetector(SimulatedRecognizer(), rng=random.Random(seed)).detect(c) for c in clips]
+        single = [SinglePassDetector(SimulatedRecognizer(), rng=random.Random(seed)).detect(c) for c in clips]
+
+        assert sum(c.audio_seconds for c in two_pass) >= 2 * sum(c.audio_seconds for c in single)
+        assert sum(c.latency for c in two_pass) >= 2 * sum(c.latency for c in single)
+
+    @given(st.lists(st.sampled_from(["mujhe", "yojana", "hai", "hospital", "card", "scheme", "please", "the", "a", "mila", "form"]), max_size=40))
+    @settings(max_examples=100)
+    def test_decision_final_and_words_scored_once(self, words):
+        """Once decided the language never changes, and no word is scored twice"""
+        identifier = LanguageIdentifier()
+        decisions = []
+        for end in range(len(words) + 1):
+            decisions.append(identifier.observe(" ".join(words[:end]) + " "))
+
+        decided = [decision for decision in decisions if decision is not None]
+        assert len(set(decided)) <= 1
+        assert decisions[len(decisions) - len(decided):] == decided
+        assert identifier.words_scored <= len(words)
+
+
+class TestLanguageIdentificationExamples:
+    """
+    Example-based tests for the decision rules
+    """
+
+    def test_devanagari_decides_hindi(self):
+        """Test Devanagari anywhere in the partial decides Hindi at once"""
+        assert LanguageIdentifier().observe("card मेरा") == Language.HINDI
+
+    def test_romanised_hindi_decides_hindi(self):
+        """Test romanised Hindi from an en-IN recogniser decides Hindi"""
+        assert LanguageIdentifier().observe("mujhe yojana ki jaanch karni hai", 0.6) == Language.HINDI
+
+    def test_english_needs_several_words_and_confidence(self):
+        """Test English is only decided after enough confident English words"""
+        identifier = LanguageIdentifier()
+        assert identifier.observe("i want to check", 0.9) is None
+        assert identifier.observe("i want to check my eligibility for the scheme", 0.5) is None
+        assert identifier.observe("i want to check my eligibility for the scheme please", 0.9) == Language.ENGLISH
+
+    def test_two_pass_rule(self):
+        """Test the detectLanguage rule including failed passes"""
+        assert two_pass_decision(("hospital card", 0.8), ("hospital card", 0.65)) == Language.HINDI
+        assert two_pass_decision(("hospital card", 0.7), ("hospital card", 0.65)) == Language.ENGLISH
+        assert two_pass_decision(("मेरा", 0.5), None) == Language.HINDI
+        assert two_pass_decision(None, ("mera", 0.9)) == Language.ENGLISH
+
+    def test_poor_audio_defaults_to_english(self):
+        """Test audio failing the quality gate is English without any transcription"""
+        clip = SpokenClip(hindi_clip(10, random.Random(0)).words, acceptable=False)
+
+        cost = SinglePassDetector(SimulatedRecognizer()).detect(clip)
+
+        assert cost.language == Language.ENGLISH
+        assert cost.jobs == 0
+
+    def test_short_english_falls_back_to_second_pass(self):
+        """Test a clip too short to decide gets the hi-IN pass and the original rule"""
+        clip = SpokenClip(english_clip(2, random.Random(1)).words)
+
+        cost = SinglePassDetector(SimulatedRecognizer()).detect(clip)
+
+        assert cost.fell_back and cost.jobs == 2
+        assert cost.language == TwoPassDetector(SimulatedRecognizer()).detect(clip).language
@@ -0,0 +1,162 @@
+"""
+Property-based tests for the asyncio load generator
+Feature: voice-civic-assistant
+
+These tests validate that the load generator frames HTTP messages and
+multipart uploads correctly, that conversations keep their sessionId across
+turns over pooled connections, and that a sweep finds the rate a backend of
+limited capacity can no longer sustain.
+
+**Validates: Requirements 1.4, 1.5, 10.1**
+"""
+
+import asyncio
+import json
+
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.loadgen import (
+    ConnectionPool,
+    Conversation,
+    LoadGenerator,
+    StandInBackend,
+    Step,
+    encode_multipart,
+    generate_conversations,
+    load_conversations,
+    parse_multipart,
+    read_body,
+    sweep,
+)
+from voice_civic.synthetic_audio import ClipSpec, render_wav
+
+names = st.text(alphabet="abcdefghijklmnopqrstuvwxyz_", min_size=1, max_size=10)
+
+
+def _against_stand_in(scenario, delay_scale: float = 0.001, capacity=None, pool_size: int = 16):
+    """Run ``scenario(pool, backend)`` against a fresh stand-in backend"""
+    async def run():
+        backend = StandInBackend(delay_scale, capacity)
+        pool = ConnectionPool(await backend.start(), pool_size)
+        try:
+            return await scenario(pool, backend)
+        finally:
+            await pool.close()
+            await backend.close()
+
+    return asyncio.run(run())
+
+
+class TestLoadGeneratorProperties:
+    """
+    Property-based tests for message framing
+    """
+
+    @given(
+        st.dictionaries(names, st.text(alphabet=st.characters(blacklist_categories=("Cs",), blacklist_characters="\r"), max_size=30), max_size=3),
+        st.dictionaries(names, st.binary(max_size=300) | st.just(b"\r\n--\r\n\r\n--"), max_size=3),
+    )
+    @settings(max_examples=100)
+    def test_multipart_round_trip(self, fields, files):
+        """Any fields and file bytes, including CRLFs and dashes, come back out of the encoded form"""
+        files = {name: data for name, data in files.items() if name not in fields}
+        content_type, body = encode_multipart(fields, {name: (f"{name}.bin", "application/octet-stream", data) for name, data in files.items()})
+
+        parsed_fields, parsed_files = parse_multipart(content_type, body)
+
+        assert parsed_fields == fields
+        assert parsed_files == {name: (f"{name}.bin", data) for name, data in files.items()}
+
+    @given(st.binary(max_size=2000), st.lists(st.integers(min_value=1, max_value=500), min_size=1, max_size=20), st.booleans())
+    @settings(max_examples=100)
+    def test_body_framing(self, body: bytes, chunk_sizes, chunked: bool):
+        """Chunked and Content-Length bodies are read exactly, leaving the next message untouched"""
+        if chunked:
+            encoded, offset, index = b"", 0, 0
+            while offset < len(body):
+                piece = body[offset:offset + chunk_sizes[index % len(chunk_sizes)]]
+                encoded += f"{len(piece):x}\r\n".encode() + piece + b"\r\n"
+                offset, index = offset + len(piece), index + 1
+            encoded += b"0\r\n\r\n"
+            headers = {"transfer-encoding": "chunked"}
+        else:
+            encoded, headers = body, {"content-length": str(len(body))}
+
+        async def read():
+            reader = asyncio.StreamReader()
+            reader.feed_data(encoded + b"HTTP/1.1 200 OK\r\n")
+            reader.feed_eof()
+            return await read_body(reader, headers), await reader.readline()
+
+        assert asyncio.run(read()) == (body, b"HTTP/1.1 200 OK\r\n")
+
+
+class TestLoadGeneratorExamples:
+    """
+    Example-based tests against the in-process stand-in backend
+    """
+
+    def test_sessions_carried_across_turns(self):
+        """Test text follow-ups land on the session their voice upload opened, over reused connections"""
+        conversations = generate_conversations(12, seed=1)
+
+        async def scenario(pool, backend):
+            report = await LoadGenerator(pool, conversations).closed_loop(users=24, duration=0.2)
+            return report, backend, pool
+
+        report, backend, pool = _against_stand_in(scenario, pool_size=4)
+
+        assert report.error_rate == 0.0 and report.abandoned == 0
+        voice = report.endpoints["voice"].count
+        assert len(backend.sessions) == voice == report.conversations
+        assert sum(len(history) for history in backend.sessions.values()) == voice + report.endpoints["text"].count
+        assert pool.opened <= 4 < pool.requests
+        assert backend.max_in_flight <= 4
+
+    def test_sweep_finds_saturation(self):
+        """Test a sweep sustains a low rate and flags one far beyond a single worker's capacity"""
+        conversations = [Conversation([Step("text", "en", "Am I eligible for the scheme?")])]
+
+        async def scenario(pool, backend):
+            return await sweep(LoadGenerator(pool, conversations), [10, 400], duration=0.4)
+
+        result = _against_stand_in(scenario, delay_scale=0.01, capacity=1, pool_size=64)
+
+        assert [report.offered_rate for report in result.reports] == [10, 400]
+        assert result.max_sustained_rate == 10
+        assert result.saturation_rate == 400
+        assert result.reports[1].p99 > result.reports[0].p99
+
+    def test_failed_turn_abandons_conversation(self):
+        """Test a rejected request is counted as an error and the rest of the conversation is not sent"""
+        conversations = [Conversation([Step("voice", "hi"), Step("text", "hi", "सहायता चाहिए")])]
+
+        async def scenario(pool, backend):
+            return await LoadGenerator(pool, conversations).open_loop(rate=50, duration=0.1)
+
+        report = _against_stand_in(scenario)
+
+        assert report.abandoned == report.conversations > 0
+        assert report.endpoints["voice"].errors == {"HTTP 400": report.conversations}
+        assert "text" not in report.endpoints
+        assert json.loads(json.dumps(report.as_dict()))["errorRate"] == 1.0
+
+    def test_recorded_conversations(self, tmp_path):
+        """Test conversations replayed from JSON Lines upload the referenced audio file"""
+        (tmp_path / "clip.wav").write_bytes(render_wav(ClipSpec("speech", 16000, 1, 1.0)))
+        (tmp_path / "sessions.jsonl").write_text(json.dumps({
+            "language": "en",
+            "steps": [{"endpoint": "voice", "file": "clip.wav"}, {"endpoint": "text", "text": "I want to file a complaint"}],
+        }) + "\n", encoding="utf-8")
+
+        conversations = load_conversations(str(tmp_path / "sessions.jsonl"))
+
+        async def scenario(pool, backend):
+            await LoadGenerator(pool, conversations).play(conversations[0], {})
+            return backend
+
+        backend = _against_stand_in(scenario)
+
+        assert conversations[0].steps[0].data[:4] == b"RIFF"
+        [history] = backend.sessions.values()
+        assert [turn["intent"] for turn in history] == ["eligibility", "grievance"]
@@ -0,0 +1,169 @@
+"""
+Property-based tests for the memory-bounded session store
+Feature: voice-civic-assistant
+
+These tests validate that the store behaves like an LRU cache with TTL expiry,
+never exceeds its memory budget and keeps accurate counters.
+
+**Validates: Requirements 9.2, 9.5, 10.5**
+"""
+
+from collections import OrderedDict
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.session_store import DEFAULT_TTL_SECONDS, ENTRY_OVERHEAD_BYTES, SessionStore, estimate_size
+from voice_civic.timing import VirtualClock
+
+operation_strategy = st.one_of(
+    st.tuples(st.just("put"), st.integers(min_value=0, max_value=20), st.integers(min_value=1, max_value=5)),
+    st.tuples(st.just("get"), st.integers(min_value=0, max_value=20), st.just(0)),
+    st.tuples(st.just("delete"), st.integers(min_value=0, max_value=20), st.just(0)),
+    st.tuples(st.just("advance"), st.just(0), st.integers(min_value=1, max_value=40)),
+)
+
+
+# Entries cost their integer value in units, overhead included, so the budget is easy to model
+UNIT_BYTES = 1000
+
+
+class TestSessionStoreProperties:
+    """
+    Property-based tests against a reference LRU-with-TTL model
+    """
+
+    @given(st.lists(operation_strategy, max_size=200), st.integers(min_value=5, max_value=30))
+    @settings(max_examples=200)
+    def test_matches_reference_model(self, operations, budget_units: int):
+        """Every get agrees with a straightforward OrderedDict model that scans for expiry"""
+        clock = VirtualClock()
+        store = SessionStore(
+            max_bytes=budget_units * UNIT_BYTES, ttl_seconds=60, clock=clock,
+            sizeof=lambda value: value * UNIT_BYTES - ENTRY_OVERHEAD_BYTES,
+        )
+        model: "OrderedDict[int, tuple]" = OrderedDict()
+        evictions = expirations = 0
+
+        def expire_model():
+            nonlocal expirations
+            for key in [key for key, (_, expires_at) in model.items() if expires_at <= clock.now()]:
+                del model[key]
+                expirations += 1
+
+        for operation, key, amount in operations:
+            if operation == "put":
+                expire_model()
+                model.pop(key, None)
+                model[key] = (amount, clock.now() + 60)
+                while sum(value for value, _ in model.values()) > budget_units:
+                    model.popitem(last=False)
+                    evictions += 1
+                store.put(key, amount)
+            elif operation == "get":
+                expire_model()
+                expected = model.get(key, (None, 0))[0]
+                if key in model:
+                    model.move_to_end(key)
+                assert store.get(key) == expected
+            elif operation == "delete":
+                expire_model()
+                assert store.delete(key) == (model.pop(key, None) is not None)
+            else:
+                clock.advance(amount)
+
+            assert store.bytes_used <= store.max_bytes
+
+        expire_model()
+        stats = store.stats()
+        assert list(store) == list(model)
+        assert stats.entries == len(model)
+        assert stats.evictions == evictions
+        assert stats.expirations == expirations
+
+    @given(st.lists(st.integers(min_value=0, max_value=50), min_size=1, max_size=500))
+    @settings(max_examples=50)
+    def test_heap_stays_proportional(self, keys):
+        """Repeated overwrites do not let stale expiry items pile up"""
+        store = SessionStore(max_entries=10, clock=VirtualClock())
+        for key in keys:
+            store.put(key, {"sessionId": str(key)})
+
+        assert len(store) <= 10
+        assert len(store._expiry_heap) <= 2 * len(store._entries) + 65
+
+
+class TestSessionStoreExamples:
+    """
+    Example-based tests for counters, TTL defaults and limits
+    """
+
+    def test_counters(self):
+        """Test hits, misses and hit rate are tracked"""
+        store = SessionStore(clock=VirtualClock())
+        store.put("a", {"language": "hi"})
+
+        assert store.get("a") == {"language": "hi"}
+        assert store.get("b") is None
+        assert "a" in store
+
+        stats = store.stats()
+        assert (stats.hits, stats.misses) == (1, 1)
+        assert stats.as_dict()["hitRate"] == 0.5
+
+    def test_default_ttl_is_data_retention(self):
+        """Test sessions expire after the 24-hour data retention window"""
+        clock = VirtualClock()
+        store = SessionStore(clock=clock)
+        store.put("a", {})
+
+        clock.advance(DEFAULT_TTL_SECONDS - 1)
+        assert "a" in store
+        clock.advance(1)
+        assert store.purge_expired() == 1
+        assert store.get("a") is None
+
+    def test_overwrite_restarts_ttl(self):
+        """Test re-writing a session gives it a fresh TTL"""
+        clock = VirtualClock()
+        store = SessionStore(ttl_seconds=10, clock=clock)
+        store.put("a", 1)
+        clock.advance(8)
+        store.put("a", 2)
+        clock.advance(8)
+
+        assert store.get("a") == 2
+        assert store.stats().expirations == 0
+
+    def test_mutated_value_remeasured_on_put(self):
+        """Test a session that grew after get is charged its new size once put again"""
+        store = SessionStore(max_bytes=4000, clock=VirtualClock())
+        store.put("a", {"conversationHistory": []})
+        store.put("b", {"conversationHistory": []})
+        before = store.bytes_used
+
+        session = store.get("a")
+        session["conversationHistory"].extend({"user": f"turn {turn} " + "x" * 40} for turn in range(9))
+        assert store.bytes_used == before
+        store.put("a", session)
+
+        assert store.bytes_used == estimate_size(session) + ENTRY_OVERHEAD_BYTES
+        assert store.bytes_used <= store.max_bytes
+        assert "b" not in store and store.stats().evictions == 1
+
+    def test_oversized_entry_rejected(self):
+        """Test a value bigger than the whole budget is refused"""
+        store = SessionStore(max_bytes=1000, clock=VirtualClock())
+        with pytest.raises(ValueError, match="exceeds"):
+            store.put("big", "x" * 2000)
+
+    def test_churn_keeps_size_bounded(self):
+        """Test churning far more sessions than fit keeps the store at its budget"""
+        store = SessionStore(max_bytes=200_000, clock=VirtualClock())
+        for number in range(20_000):
+            store.put(f"session-{number}", {"sessionId": f"session-{number}", "conversationHistory": []})
+
+        stats = store.stats()
+        assert stats.bytes <= 200_000
+        assert stats.entries + stats.evictions == 20_000
+        assert store.get("session-19999") is not None
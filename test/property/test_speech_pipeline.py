@@ -0,0 +1,137 @@
+"""
+Property-based tests for the asyncio batch speech pipeline
+Feature: voice-civic-assistant
+
+These tests validate that concurrent sessions keep their turn order, never
+exceed the concurrency limit and scale throughput with the number of slots.
+
+**Validates: Requirements 1.4, 1.5**
+"""
+
+import asyncio
+import random
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.audio_inspector import wav_header
+from voice_civic.audio_payload import AudioPayload
+from voice_civic.pipeline import SimulatedSpeechProcessor, SpeechPipeline, SpeechTurn, throughput_curve
+from voice_civic.synthetic_audio import voiced_payload
+from voice_civic.timing import SpeechLatencyModel, VirtualClock
+from voice_civic.types import Language, TranscriptionResult
+
+
+SPEECH = voiced_payload(2.0, noise=0.001)
+SILENCE = AudioPayload(wav_header(16000, 1, 16, 64000) + b"\x00" * 64000)
+
+
+class FixedLatencyProcessor:
+    """Processor that always takes the same time, for exact scaling checks"""
+
+    def __init__(self, seconds: float = 1.0):
+        self.seconds = seconds
+
+    async def __call__(self, payload: AudioPayload, language: Language) -> TranscriptionResult:
+        await asyncio.sleep(self.seconds)
+        return TranscriptionResult(text="Help me please", confidence=0.9, language=language)
+
+
+@st.composite
+def session_batch(draw):
+    """Several sessions with a few turns each, interleaved as they would arrive"""
+    sizes = draw(st.lists(st.integers(min_value=1, max_value=6), min_size=1, max_size=12))
+    turns = [
+        SpeechTurn(session_id=f"session-{index}", audio=SPEECH, language=draw(st.sampled_from(list(Language))))
+        for index, size in enumerate(sizes)
+        for _ in range(size)
+    ]
+    return draw(st.permutations(turns)), sizes
+
+
+class TestSpeechPipelineProperties:
+    """
+    Property-based tests for ordering, limits and scaling
+    """
+
+    @given(session_batch(), st.integers(min_value=1, max_value=16), st.integers(min_value=0, max_value=2**16))
+    @settings(max_examples=50)
+    def test_turn_order_and_concurrency_limit(self, batch, concurrency: int, seed: int):
+        """Turns within a session never overlap and the slot limit is never exceeded"""
+        turns, sizes = batch
+        pipeline = SpeechPipeline(SimulatedSpeechProcessor(rng=random.Random(seed)), concurrency)
+
+        report = pipeline.run_sync(turns)
+
+        assert report.turns == sum(sizes)
+        assert report.max_in_flight <= concurrency
+        for outcomes in report.sessions.values():
+            assert [outcome.turn_number for outcome in outcomes] == list(range(1, len(outcomes) + 1))
+            for previous, current in zip(outcomes, outcomes[1:]):
+                assert previous.finished_at <= current.queued_at, "A session's turns must run one after another"
+            assert all(outcome.ok for outcome in outcomes)
+
+    @given(session_batch(), st.integers(min_value=1, max_value=16))
+    @settings(max_examples=50)
+    def test_makespan_bounds(self, batch, concurrency: int):
+        """Elapsed time is bounded below by the longest session and by total work over slots"""
+        turns, _ = batch
+        report = SpeechPipeline(SimulatedSpeechProcessor(rng=random.Random(0)), concurrency).run_sync(turns)
+
+        total_work = sum(outcome.latency for outcome in report.outcomes)
+        longest_session = max(sum(o.latency for o in outcomes) for outcomes in report.sessions.values())
+
+        assert report.elapsed >= longest_session - 1e-9
+        assert report.elapsed >= total_work / concurrency - 1e-9
+        for outcome in report.outcomes:
+            assert outcome.latency < 5.0, "Each turn should stay inside the 5-second budget"
+
+    @given(st.integers(min_value=1, max_value=40), st.integers(min_value=1, max_value=5))
+    @settings(max_examples=30)
+    def test_throughput_scales_with_concurrency(self, sessions: int, turns_per_session: int):
+        """With fixed latency, more slots never lower throughput and saturate at one slot per session"""
+        turns = [SpeechTurn(f"s{s}", SPEECH) for s in range(sessions) for _ in range(turns_per_session)]
+
+        reports = throughput_curve(turns, [1, 2, 4, 8, 16, 64], lambda: FixedLatencyProcessor(1.0))
+
+        throughputs = [report.throughput for report in reports]
+        assert throughputs == sorted(throughputs)
+        assert reports[0].elapsed == pytest.approx(sessions * turns_per_session)
+        assert reports[-1].elapsed == pytest.approx(turns_per_session)
+
+
+class TestSpeechPipelineExamples:
+    """
+    Example-based tests for failures and clocks
+    """
+
+    def test_rejected_audio_is_reported_per_turn(self):
+        """Test a silent turn fails alone without stopping its session"""
+        turns = [SpeechTurn("a", SPEECH), SpeechTurn("a", SILENCE), SpeechTurn("a", SPEECH)]
+
+        outcomes = SpeechPipeline().run_sync(turns).sessions["a"]
+
+        assert [outcome.ok for outcome in outcomes] == [True, False, True]
+        assert "Audio quality unacceptable" in outcomes[1].error
+
+    def test_base64_audio_accepted(self):
+        """Test turns may carry the raw audioData string"""
+        report = SpeechPipeline().run_sync([SpeechTurn("b", SPEECH.encoded, Language.HINDI)])
+
+        assert report.sessions["b"][0].result.language == Language.HINDI
+
+    def test_virtual_clock_tracks_simulated_time(self):
+        """Test a batch on a shared virtual clock advances it by the elapsed time"""
+        clock = VirtualClock()
+        model = SpeechLatencyModel(jitter=(0.0, 0.0))
+        turns = [SpeechTurn(f"s{i}", SPEECH) for i in range(10)]
+
+        report = SpeechPipeline(SimulatedSpeechProcessor(model), concurrency=5).run_sync(turns, clock)
+
+        assert clock.now() == pytest.approx(report.elapsed)
+        assert report.elapsed == pytest.approx(2 * model.sample_ms(SPEECH.size) / 1000)
+
+    def test_invalid_concurrency(self):
+        """Test a concurrency limit below one is rejected"""
+        with pytest.raises(ValueError):
+            SpeechPipeline(concurrency=0)
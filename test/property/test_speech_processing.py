@@ -11,7 +11,47 @@ from hypothesis import given, strategies as st, settings, example
 from hypothesis.strategies import composite
 import json
 import base64
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Union
+
+from voice_civic.audio_inspector import WAV_HEADER_SIZE
+from voice_civic.audio_payload import AudioPayload
+from voice_civic.audio_quality import calculate_confidence
+from voice_civic.conditioning import condition_audio
+from voice_civic.conversation import ConversationStore
+from voice_civic.synthetic_audio import SAMPLE_RATES, default_corpus
+from voice_civic.timing import SimulatedLatency, clock_from_env
+from voice_civic.tracing import Tracer
+from voice_civic.types import Language
+
+# Bilingual error catalog, built once rather than on every error
+ERROR_MESSAGES = {
+    "empty_audio": "Audio data is empty or corrupted",
+    "invalid_format": "Invalid audio format",
+    "unsupported_language": "Language not supported"
+}
+
+RECOVERY_OPTIONS = {
+    "empty_audio": [
+        "कृपया स्पष्ट आवाज़ में दोबारा बोलें। Please speak clearly and try again.",
+        "माइक्रोफोन के पास बोलें। Speak closer to the microphone."
+    ],
+    "invalid_format": [
+        "कृपया WAV या MP3 फॉर्मेट का उपयोग करें। Please use WAV or MP3 format.",
+        "ऑडियो फ़ाइल की जांच करें। Check your audio file."
+    ],
+    "unsupported_language": [
+        "कृपया हिंदी या अंग्रेजी में बोलें। Please speak in Hindi or English.",
+        "भाषा बदलने के लिए सेटिंग्स देखें। Check settings to change language."
+    ]
+}
+
+ERROR_RESPONSES = {
+    error_type: {
+        "error": {"code": error_type.upper(), "message": message},
+        "recoveryOptions": RECOVERY_OPTIONS[error_type]
+    }
+    for error_type, message in ERROR_MESSAGES.items()
+}
 
 # Test data strategies for generating valid inputs
 
@@ -20,15 +60,18 @@ def audio_data_strategy(draw):
     """Generate valid audio data for testing"""
     # Generate audio buffer of reasonable size (1KB to 1MB)
     size = draw(st.integers(min_value=1024, max_value=1024*1024))
+    # Browsers record at a range of rates and layouts, not just 16kHz mono
+    sample_rate = draw(st.sampled_from(SAMPLE_RATES))
+    channels = draw(st.sampled_from([1, 2]))
+    kind = draw(st.sampled_from(["speech", "speech", "noisy", "silence", "clipped"]))
     
-    # Create mock audio data with WAV header
-    audio_data = bytearray(size)
-    # WAV header
-    audio_data[0:4] = b'RIFF'
-    audio_data[8:12] = b'WAVE'
+    # A prefix of a synthesized clip, served straight from the memory-mapped corpus
+    corpus = default_corpus()
+    clip = corpus.find(kind, sample_rate, channels)[0]
     
     return {
-        "audioData": base64.b64encode(audio_data).decode('utf-8'),
+        # Raw bytes wrapped directly: no base64 round trip per example
+        "audioData": corpus.payload(clip, size),
         "language": draw(st.sampled_from(["hi", "en"])),
         "sessionId": draw(st.uuids()).hex
     }
@@ -55,6 +98,13 @@ class TestSpeechProcessingProperties:
     Property-based tests for Speech Processing accuracy and performance
     """
     
+    # Simulated time by default; VOICE_CIVIC_CLOCK=real restores wall-clock sleeps
+    clock = clock_from_env()
+    latency = SimulatedLatency(clock)
+    conversations = ConversationStore()
+    # Per-stage histograms, so a slow run can be pinned on one stage
+    tracer = Tracer(enabled=True, clock=clock)
+    
     @given(audio_data_strategy())
     @settings(max_examples=25, deadline=5000)
     def test_property_1_speech_processing_accuracy(self, audio_input: Dict[str, Any]):
@@ -123,27 +173,24 @@ class TestSpeechProcessingProperties:
         
         **Validates: Requirements 1.4, 1.5**
         """
-        import time
-        
         # Ensure audio is under 2 minutes (Requirement 1.4)
-        audio_data = base64.b64decode(audio_input["audioData"])
-        max_2_minute_size = 2 * 60 * 16000 * 2  # 2 minutes * 60 seconds * 16kHz * 2 bytes per sample
+        payload = self._audio_payload(audio_input)
         
-        # If audio is too large, truncate to simulate 2-minute limit
-        if len(audio_data) > max_2_minute_size:
-            truncated_audio = audio_data[:max_2_minute_size]
-            audio_input["audioData"] = base64.b64encode(truncated_audio).decode('utf-8')
+        # If audio is too long, truncate to the 2-minute limit using the real
+        # sample rate and channel layout from its header (zero-copy slice)
+        audio_input["audioData"] = payload.truncated_to_duration(120)
         
         # Test processing time constraint (Requirement 1.4)
-        start_time = time.time()
+        start_time = self.clock.now()
         result = self._mock_speech_processing_with_timing(audio_input)
-        processing_time = time.time() - start_time
+        processing_time = self.clock.now() - start_time
         
         # Performance assertions for Requirement 1.4
         assert processing_time < 5.0, f"Processing should complete within 5 seconds for audio under 2 minutes, took {processing_time:.2f}s"
         assert result is not None, "Should return result within time limit"
         assert "processingTime" in result, "Result should include processing time metadata"
         assert result["processingTime"] < 5000, "Reported processing time should be under 5000ms"
+        assert sum(result["stageTimings"].values()) <= processing_time * 1000 + 1, "Stage timings should account for no more than the measured time"
         
         # Context maintenance assertions (Requirement 1.5)
         if "sessionId" in audio_input:
@@ -162,7 +209,7 @@ class TestSpeechProcessingProperties:
         assert estimated_duration <= 120, f"Audio should be under 2 minutes, estimated {estimated_duration:.1f} seconds"
         
         # Performance scaling - larger files should still meet time constraints
-        audio_size_kb = len(base64.b64decode(audio_input["audioData"])) / 1024
+        audio_size_kb = self._audio_payload(audio_input).size / 1024
         if audio_size_kb > 500:  # Larger audio files
             assert processing_time < 4.5, "Larger audio files should still process efficiently"
         
@@ -196,16 +243,14 @@ class TestSpeechProcessingProperties:
         total_processing_time = 0
         
         for turn_number, audio_input in enumerate(audio_sequence, 1):
-            import time
-            
             # Add turn context to simulate real conversation flow
             audio_input["turnNumber"] = turn_number
             audio_input["previousContext"] = accumulated_context.copy()
             
             # Test individual processing time (Requirement 1.4)
-            start_time = time.time()
+            start_time = self.clock.now()
             result = self._mock_speech_processing_with_context(audio_input, accumulated_context)
-            processing_time = time.time() - start_time
+            processing_time = self.clock.now() - start_time
             total_processing_time += processing_time
             
             results.append(result)
@@ -261,17 +306,15 @@ class TestSpeechProcessingProperties:
         
         **Validates: Requirements 1.4**
         """
-        import time
-        
         # Generate audio data based on duration
         audio_input = self._generate_audio_by_duration(duration_seconds)
         
-        start_time = time.time()
+        start_time = self.clock.now()
         
         if duration_seconds <= 120:  # Under 2 minutes
             # Should process normally within 5 seconds
             result = self._mock_speech_processing_with_timing(audio_input)
-            processing_time = time.time() - start_time
+            processing_time = self.clock.now() - start_time
             
             assert processing_time < 5.0, f"Audio under 2 minutes ({duration_seconds}s) should process within 5 seconds, took {processing_time:.2f}s"
             assert result is not None, "Should successfully process audio under 2 minutes"
@@ -285,7 +328,7 @@ class TestSpeechProcessingProperties:
             # Should either truncate or reject gracefully
             try:
                 result = self._mock_speech_processing_with_timing(audio_input)
-                processing_time = time.time() - start_time
+                processing_time = self.clock.now() - start_time
                 
                 # If processed, should still meet time constraints (likely truncated)
                 assert processing_time < 6.0, "Even truncated long audio should process reasonably quickly"
@@ -302,17 +345,15 @@ class TestSpeechProcessingProperties:
     
     def _generate_audio_by_duration(self, duration_seconds: int) -> Dict[str, Any]:
         """Generate audio data for a specific duration"""
-        # Estimate size: 16kHz, 16-bit mono = ~32KB per second
-        estimated_size = int(duration_seconds * 32000)
+        # Size the samples for 16kHz, 16-bit mono = 32KB per second
+        data_size = int(duration_seconds * 32000)
         
-        # Create mock audio data
-        audio_data = bytearray(estimated_size)
-        # Add WAV header
-        audio_data[0:4] = b'RIFF'
-        audio_data[8:12] = b'WAVE'
+        # A prefix of the corpus's long speech clip: real samples, nothing allocated
+        corpus = default_corpus()
+        clip = max(corpus.find("speech", 16000, 1), key=lambda index: corpus.spec(index).seconds)
         
         return {
-            "audioData": base64.b64encode(audio_data).decode('utf-8'),
+            "audioData": corpus.payload(clip, WAV_HEADER_SIZE + data_size),
             "language": "en",
             "sessionId": f"test-session-{duration_seconds}",
             "estimatedDuration": duration_seconds
@@ -321,36 +362,39 @@ class TestSpeechProcessingProperties:
     def _mock_speech_processing_with_timing(self, audio_input: Dict[str, Any]) -> Dict[str, Any]:
         """Mock speech processing with realistic timing simulation for performance testing"""
         import random
-        import time
         
         # Simulate realistic processing time based on audio size
-        audio_size = len(base64.b64decode(audio_input["audioData"]))
-        estimated_duration = audio_input.get("estimatedDuration", self._estimate_audio_duration(audio_input["audioData"]))
-        
-        # Check for duration limits (Requirement 1.4)
-        warnings = []
-        if estimated_duration > 120:  # Over 2 minutes
-            warnings.append(f"Audio duration ({estimated_duration:.1f}s) exceeds 2-minute limit")
-            # Simulate truncation to 2 minutes
-            estimated_duration = 120
-            audio_size = int(audio_size * (120 / estimated_duration))
-        
-        # Base processing time: 0.05-0.2 seconds for small files, up to 2 seconds for large files
-        base_time = min(2.0, 0.05 + (audio_size / 1024 / 1024) * 1.0)  # Scale with MB
-        
-        # Add some realistic variation but ensure under 5 second limit
-        processing_time_ms = (base_time + random.uniform(-0.02, 0.1)) * 1000
-        processing_time_ms = max(50, min(2500, processing_time_ms))  # Keep within realistic bounds
-        
-        # Simulate actual processing delay
-        time.sleep(processing_time_ms / 1000)
+        stage_timings = {}
+        with self.tracer.span("speech.condition") as span:
+            payload = self._audio_payload(audio_input)
+            estimated_duration = audio_input.get("estimatedDuration", self._estimate_audio_duration(payload))
+            
+            # Check for duration limits (Requirement 1.4)
+            warnings = []
+            if estimated_duration > 120:  # Over 2 minutes
+                warnings.append(f"Audio duration ({estimated_duration:.1f}s) exceeds 2-minute limit; truncated to 120s")
+                estimated_duration = 120
+            # Cut at exactly 2 minutes and shrink to 16 kHz mono before the upload
+            conditioned = condition_audio(payload, max_seconds=120)
+            payload = conditioned.payload
+            audio_input["audioData"] = payload
+            audio_size = payload.size
+        stage_timings[span.name] = span.duration * 1000
+        
+        # Spend the modelled processing delay (0.05s up to 2.5s, scaling with MB) on the shared clock
+        with self.tracer.span("speech.transcribe") as span:
+            processing_time_ms = self.latency.process(audio_size)
+        stage_timings[span.name] = span.duration * 1000
         
         # Get base result
-        result = self._mock_speech_processing(audio_input)
+        with self.tracer.span("speech.confidence") as span:
+            result = self._mock_speech_processing(audio_input)
+        stage_timings[span.name] = span.duration * 1000
         
         # Add performance metadata
         result["processingTime"] = processing_time_ms
         result["audioSize"] = audio_size
+        result["originalAudioSize"] = conditioned.original_bytes
         result["estimatedDuration"] = estimated_duration
         
         # Add warnings if any
@@ -360,47 +404,40 @@ class TestSpeechProcessingProperties:
         # Add conversation context for Requirement 1.5
         session_id = audio_input.get("sessionId")
         if session_id:
-            # For context-aware processing, use actual turn history instead of random
-            turn_number = audio_input.get("turnNumber", 1)
-            previous_interactions = []
-            
-            # Build actual conversation history based on turn number
-            for i in range(turn_number - 1):
-                previous_interactions.append({
-                    "turnNumber": i + 1,
-                    "timestamp": f"2024-01-01T00:0{i}:00Z",
-                    "userInput": f"Previous interaction {i + 1}",
-                    "systemResponse": f"System response {i + 1}",
-                    "confidence": random.uniform(0.7, 0.95)
-                })
-            
-            result["conversationContext"] = {
-                "sessionId": session_id,
-                "previousInteractions": previous_interactions,
-                "currentTurn": {
-                    "turnNumber": turn_number,
-                    "timestamp": "2024-01-01T00:00:00Z",
-                    "language": audio_input.get("language", "en"),
-                    "processingTime": processing_time_ms
-                },
-                "accumulatedInfo": {
-                    "detectedLanguage": result["language"],
-                    "averageConfidence": result["confidence"],
-                    "totalInteractions": turn_number,
-                    "averageProcessingTime": processing_time_ms
-                }
-            }
-        
+            with self.tracer.span("speech.context") as span:
+                # Turn 1 opens a new conversation; later turns append in O(1)
+                turn_number = audio_input.get("turnNumber", 1)
+                if turn_number == 1:
+                    conversation = self.conversations.start(session_id, Language(audio_input.get("language", "en")))
+                else:
+                    conversation = self.conversations.context_for(session_id, Language(audio_input.get("language", "en")))
+                
+                conversation.add_turn(
+                    user_input=result["text"],
+                    system_response=f"System response {turn_number}",
+                    language=Language(result["language"]),
+                    confidence=result["confidence"],
+                    processing_time=processing_time_ms,
+                )
+                result["conversationContext"] = conversation.payload()
+            stage_timings[span.name] = span.duration * 1000
+        
+        result["stageTimings"] = stage_timings
         return result
     
-    def _estimate_audio_duration(self, audio_data_b64: str) -> float:
+    def _audio_payload(self, audio_input: Dict[str, Any]) -> AudioPayload:
+        """Decode ``audioData`` at most once, storing the payload back on the input"""
+        payload = AudioPayload.coerce(audio_input["audioData"])
+        audio_input["audioData"] = payload
+        return payload
+    
+    def _estimate_audio_duration(self, audio_data: Union[str, AudioPayload]) -> float:
         """Estimate audio duration in seconds based on file size"""
         try:
-            audio_data = base64.b64decode(audio_data_b64)
             # Rough estimation: 16kHz, 16-bit mono audio = ~32KB per second
-            estimated_seconds = len(audio_data) / (16000 * 2)  # 2 bytes per sample
+            estimated_seconds = AudioPayload.coerce(audio_data).estimated_duration
             return min(120, max(0.1, estimated_seconds))  # Cap at 2 minutes, minimum 0.1 seconds
-        except:
+        except Exception:
             return 1.0  # Default to 1 second if estimation fails
     
     def _get_mock_conversation_history(self, session_id: str) -> List[Dict[str, Any]]:
@@ -436,9 +473,6 @@ class TestSpeechProcessingProperties:
         if session_id and "conversationContext" in result:
             context = result["conversationContext"]
             
-            # Override the turn number with the correct one
-            context["currentTurn"]["turnNumber"] = turn_number
-            
             # Add context-aware confidence adjustment
             if accumulated_context and "averageConfidence" in accumulated_context:
                 # Context helps improve confidence over time
@@ -470,23 +504,23 @@ class TestSpeechProcessingProperties:
         import random
         
         # Simulate processing based on input with accent variation
-        audio_size = len(base64.b64decode(audio_input["audioData"]))
+        payload = self._audio_payload(audio_input)
         language = audio_input.get("language", "en")
         
-        # Simulate confidence with accent variation (slightly lower but still reasonable)
-        base_confidence = 0.85 if audio_size > 10000 else 0.55
-        accent_variation = random.uniform(-0.15, 0.05)  # Accents may slightly reduce confidence
-        confidence = base_confidence + accent_variation
-        confidence = max(0.0, min(1.0, confidence))
-        
         # Generate appropriate text based on language (same content, accent doesn't change words)
         if language == "hi":
             texts = ["मुझे योजना की जांच करनी है", "शिकायत दर्ज करना चाहता हूं", "सहायता चाहिए"]
         else:
             texts = ["I want to check scheme eligibility", "I need to file a complaint", "Help me please"]
+        text = random.choice(texts)
+        
+        # Simulate confidence from the signal quality, with accents slightly reducing it
+        accent_variation = random.uniform(-0.15, 0.0)
+        confidence = calculate_confidence(payload.quality, text) + accent_variation
+        confidence = max(0.0, min(1.0, confidence))
         
         return {
-            "text": random.choice(texts),
+            "text": text,
             "confidence": confidence,
             "language": language,  # Language detection should be consistent despite accent
             "timestamp": "2024-01-01T00:00:00Z",
@@ -499,22 +533,22 @@ class TestSpeechProcessingProperties:
         import random
         
         # Simulate processing based on input
-        audio_size = len(base64.b64decode(audio_input["audioData"]))
+        payload = self._audio_payload(audio_input)
         language = audio_input.get("language", "en")
         
-        # Simulate confidence based on audio quality
-        base_confidence = 0.9 if audio_size > 10000 else 0.6
-        confidence = base_confidence + random.uniform(-0.2, 0.1)
-        confidence = max(0.0, min(1.0, confidence))
-        
         # Generate appropriate text based on language
         if language == "hi":
             texts = ["मुझे योजना की जांच करनी है", "शिकायत दर्ज करना चाहता हूं", "सहायता चाहिए"]
         else:
             texts = ["I want to check scheme eligibility", "I need to file a complaint", "Help me please"]
+        text = random.choice(texts)
+        
+        # Simulate confidence from the measured signal quality
+        confidence = calculate_confidence(payload.quality, text) + random.uniform(0.0, 0.05)
+        confidence = max(0.0, min(1.0, confidence))
         
         return {
-            "text": random.choice(texts),
+            "text": text,
             "confidence": confidence,
             "language": language,  # Use the input language to maintain consistency
             "timestamp": "2024-01-01T00:00:00Z",
@@ -524,10 +558,9 @@ class TestSpeechProcessingProperties:
     def _is_audio_acceptable(self, audio_input: Dict[str, Any]) -> bool:
         """Determine if audio quality is acceptable"""
         try:
-            audio_data = base64.b64decode(audio_input["audioData"])
-            # Simple heuristic: larger files are generally better quality
-            return len(audio_data) > 5000  # 5KB minimum for acceptable quality
-        except:
+            # Level, clipping, silence and noise measured on the decoded samples
+            return self._audio_payload(audio_input).quality.acceptable
+        except Exception:
             return False
 
 class TestErrorHandlingProperties:
@@ -569,27 +602,6 @@ class TestErrorHandlingProperties:
     
     def _mock_error_handling(self, invalid_input: Dict[str, Any]) -> Dict[str, Any]:
         """Mock error handling for property testing"""
-        error_messages = {
-            "empty_audio": "Audio data is empty or corrupted",
-            "invalid_format": "Invalid audio format",
-            "unsupported_language": "Language not supported"
-        }
-        
-        recovery_options = {
-            "empty_audio": [
-                "कृपया स्पष्ट आवाज़ में दोबारा बोलें। Please speak clearly and try again.",
-                "माइक्रोफोन के पास बोलें। Speak closer to the microphone."
-            ],
-            "invalid_format": [
-                "कृपया WAV या MP3 फॉर्मेट का उपयोग करें। Please use WAV or MP3 format.",
-                "ऑडियो फ़ाइल की जांच करें। Check your audio file."
-            ],
-            "unsupported_language": [
-                "कृपया हिंदी या अंग्रेजी में बोलें। Please speak in Hindi or English.",
-                "भाषा बदलने के लिए सेटिंग्स देखें। Check settings to change language."
-            ]
-        }
-        
         # Determine error type
         if not invalid_input.get("audioData"):
             error_type = "empty_audio"
@@ -598,13 +610,9 @@ class TestErrorHandlingProperties:
         else:
             error_type = "invalid_format"
         
-        return {
-            "error": {
-                "code": error_type.upper(),
-                "message": error_messages[error_type]
-            },
-            "recoveryOptions": recovery_options[error_type]
-        }
+        # Prebuilt at import; copied so a caller changing its response cannot alter later ones
+        response = ERROR_RESPONSES[error_type]
+        return {"error": dict(response["error"]), "recoveryOptions": list(response["recoveryOptions"])}
 
 # Example-based tests for specific edge cases
 class TestSpeechProcessingExamples:
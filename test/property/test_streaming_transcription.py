@@ -0,0 +1,144 @@
+"""
+Property-based tests for streaming transcription with partial results
+Feature: voice-civic-assistant
+
+These tests validate that partial transcripts only ever extend their stable
+prefix, that the final transcript agrees with every partial, and that the
+first partial arrives within one window regardless of recording length.
+
+**Validates: Requirements 1.1, 1.4**
+"""
+
+import asyncio
+import random
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.audio_inspector import AudioFormatError
+from voice_civic.audio_payload import AudioPayload
+from voice_civic.pipeline import AudioRejectedError, SpeechPipeline, SpeechTurn
+from voice_civic.streaming import StreamingSpeechProcessor, iter_audio_windows
+from voice_civic.synthetic_audio import voiced_payload, wav_payload
+from voice_civic.timing import VirtualClock, run_with_clock
+from voice_civic.types import Language
+
+
+def _timeline(processor: StreamingSpeechProcessor, audio, language=Language.ENGLISH):
+    """Every partial with the loop time at which it was yielded"""
+    async def collect():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        return [(loop.time() - started, partial) async for partial in processor.stream(audio, language)]
+
+    return run_with_clock(collect(), VirtualClock())
+
+
+class TestStreamingTranscriptionProperties:
+    """
+    Property-based tests for prefix stability, consistency and first-response time
+    """
+
+    @given(
+        st.floats(min_value=0.5, max_value=30.0),
+        st.sampled_from([0.25, 0.5, 1.0, 2.0]),
+        st.sampled_from(list(Language)),
+        st.integers(min_value=0, max_value=2**16),
+    )
+    @settings(max_examples=50, deadline=None)
+    def test_stable_prefixes_and_final_consistency(self, seconds: float, window: float, language, seed: int):
+        """Stable text only grows, each partial extends it, and the final text equals the last stable text"""
+        processor = StreamingSpeechProcessor(window, revision_rate=0.5, rng=random.Random(seed))
+        partials = [partial for _, partial in _timeline(processor, voiced_payload(seconds), language)]
+        final = partials[-1]
+
+        assert final.is_final and not any(partial.is_final for partial in partials[:-1])
+        assert final.text == final.stable_text
+        assert final.text
+        for previous, current in zip(partials, partials[1:]):
+            assert current.stable_text.startswith(previous.stable_text)
+        for partial in partials:
+            assert partial.text.startswith(partial.stable_text)
+            assert final.text.startswith(partial.stable_text)
+            assert partial.language == language
+            assert 0.0 <= partial.confidence <= 1.0
+        assert [partial.window_index for partial in partials[:-1]] == list(range(len(partials) - 1))
+
+    @given(
+        st.floats(min_value=1.0, max_value=120.0),
+        st.sampled_from([0.5, 1.0, 2.0]),
+        st.booleans(),
+        st.integers(min_value=0, max_value=2**16),
+    )
+    @settings(max_examples=30, deadline=None)
+    def test_time_to_first_partial_independent_of_length(self, seconds: float, window: float, realtime: bool, seed: int):
+        """The first partial arrives within one window (plus its capture time when live), however long the clip"""
+        processor = StreamingSpeechProcessor(window, realtime=realtime, rng=random.Random(seed))
+
+        events = _timeline(processor, voiced_payload(seconds))
+        first_window = min(window, seconds)
+
+        bound = processor.max_window_latency(first_window) + (first_window if realtime else 0.0)
+        assert events[0][0] <= bound + 1e-9
+        assert events[0][0] < 5.0, "First response must come well inside the 5-second budget"
+        times = [time for time, _ in events]
+        assert times == sorted(times)
+
+    @given(st.sampled_from([8000, 22050, 48000]), st.sampled_from([1, 2]), st.floats(min_value=0.3, max_value=3.0))
+    @settings(max_examples=30)
+    def test_windows_cover_recording(self, sample_rate: int, channels: int, window: float):
+        """Windows are contiguous, mono and together span the whole recording"""
+        payload = voiced_payload(7.3, sample_rate, channels)
+
+        windows = list(iter_audio_windows(payload, window))
+
+        assert windows[0].start == 0.0
+        assert windows[-1].end == pytest.approx(payload.info.duration)
+        for previous, current in zip(windows, windows[1:]):
+            assert current.start == previous.end
+        assert all(w.samples.ndim == 1 for w in windows)
+
+
+class TestStreamingTranscriptionExamples:
+    """
+    Example-based tests for silence, live sources and pipeline integration
+    """
+
+    def test_silent_stream_rejected(self):
+        """Test a silent stream ends with the quality gate's error"""
+        with pytest.raises(AudioRejectedError, match="mostly silent"):
+            _timeline(StreamingSpeechProcessor(rng=random.Random(0)), wav_payload(np.zeros(48000), 16000))
+
+    @pytest.mark.parametrize("data", [b"\xff\xfb\x90\x64" + bytes(4000), b"ID3" + bytes(4000), b"not audio at all"])
+    def test_undecodable_payload_rejected(self, data):
+        """Test compressed or unrecognised audio is refused with a format error"""
+        with pytest.raises(AudioFormatError):
+            list(iter_audio_windows(AudioPayload(data)))
+
+    def test_window_generator_source(self):
+        """Test windows from a generator are consumed as they are produced"""
+        windows = iter_audio_windows(voiced_payload(4.0), 1.0)
+
+        events = _timeline(StreamingSpeechProcessor(rng=random.Random(0)), windows, Language.HINDI)
+
+        assert len(events) == 5
+        assert events[-1][1].audio_end == pytest.approx(4.0)
+
+    def test_first_partial_beats_batch_for_long_live_audio(self):
+        """Test a live 2-minute recording shows text within seconds instead of after it ends"""
+        processor = StreamingSpeechProcessor(1.0, realtime=True, rng=random.Random(0))
+
+        events = _timeline(processor, voiced_payload(120.0))
+
+        assert events[0][0] < 2.0
+        assert events[-1][0] >= 120.0
+
+    def test_streaming_processor_in_pipeline(self):
+        """Test awaiting the processor returns the final transcript so it works in SpeechPipeline"""
+        pipeline = SpeechPipeline(StreamingSpeechProcessor(rng=random.Random(0)), concurrency=2)
+
+        report = pipeline.run_sync([SpeechTurn("a", voiced_payload(3.0)), SpeechTurn("b", voiced_payload(3.0), Language.HINDI)])
+
+        assert all(outcome.ok for outcome in report.outcomes)
+        assert report.sessions["b"][0].result.is_final
@@ -0,0 +1,85 @@
+"""
+Property-based tests for the shared clock and latency model
+Feature: voice-civic-assistant
+
+These tests pin down the simulated-time contract the Requirement 1.4
+performance properties rely on.
+"""
+
+import random
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.timing import (
+    Clock,
+    RealClock,
+    SimulatedLatency,
+    SpeechLatencyModel,
+    VirtualClock,
+    clock_from_env,
+)
+
+
+class TestLatencyModelProperties:
+    """
+    Property-based tests for modelled speech processing latency
+    """
+
+    @given(st.integers(min_value=0, max_value=20 * 1024 * 1024), st.integers(min_value=0, max_value=2**32))
+    @settings(max_examples=100)
+    def test_latency_within_bounds(self, audio_size: int, seed: int):
+        """Modelled latency always stays within the 50ms-2.5s envelope"""
+        model = SpeechLatencyModel(rng=random.Random(seed))
+        assert 50.0 <= model.sample_ms(audio_size) <= 2500.0
+
+    @given(st.lists(st.integers(min_value=0, max_value=5 * 1024 * 1024), min_size=1, max_size=10))
+    @settings(max_examples=50)
+    def test_virtual_clock_advances_by_modelled_latency(self, sizes):
+        """Time measured on a virtual clock equals the latency that was reported"""
+        clock = VirtualClock()
+        latency = SimulatedLatency(clock, SpeechLatencyModel(rng=random.Random(0)))
+
+        reported_ms = sum(latency.process(size) for size in sizes)
+
+        assert clock.now() * 1000 == pytest.approx(reported_ms)
+
+    @given(st.integers(min_value=0, max_value=5 * 1024 * 1024))
+    @settings(max_examples=25)
+    def test_seeded_model_is_deterministic(self, audio_size: int):
+        """The same seed yields the same latency sequence"""
+        first = SpeechLatencyModel(rng=random.Random(42))
+        second = SpeechLatencyModel(rng=random.Random(42))
+        assert [first.sample_ms(audio_size) for _ in range(5)] == [second.sample_ms(audio_size) for _ in range(5)]
+
+
+class TestClockExamples:
+    """
+    Example-based tests for clock selection
+    """
+
+    def test_virtual_clock_rejects_negative_advance(self):
+        """Test a virtual clock cannot move backwards"""
+        with pytest.raises(ValueError):
+            VirtualClock().advance(-1.0)
+
+    @pytest.mark.parametrize("name,expected", [("virtual", VirtualClock), ("real", RealClock), (" REAL ", RealClock)])
+    def test_clock_from_env(self, monkeypatch, name, expected):
+        """Test VOICE_CIVIC_CLOCK selects the clock implementation"""
+        monkeypatch.setenv("VOICE_CIVIC_CLOCK", name)
+        assert isinstance(clock_from_env(), expected)
+
+    def test_unknown_clock_rejected(self, monkeypatch):
+        """Test an unknown clock name is reported clearly"""
+        monkeypatch.setenv("VOICE_CIVIC_CLOCK", "sundial")
+        with pytest.raises(ValueError, match="Unknown clock"):
+            clock_from_env()
+
+    def test_incomplete_clock_cannot_be_created(self):
+        """Test a clock that does not implement both methods fails when it is created"""
+        class Stopped(Clock):
+            def now(self) -> float:
+                return 0.0
+
+        with pytest.raises(TypeError):
+            Stopped()
@@ -0,0 +1,227 @@
+"""
+Property-based tests for span tracing and latency histograms
+Feature: voice-civic-assistant
+
+These tests validate that histogram percentiles stay within their stated
+relative error, that exports are well formed, that a disabled tracer records
+nothing, and that a slowdown in one stage of the transcription flow shows up
+in that stage's histogram alone.
+
+**Validates: Requirements 1.4**
+"""
+
+import asyncio
+import json
+import math
+import tracemalloc
+import urllib.request
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.asgi_backend import BackendApp
+from voice_civic.audio_inspector import wav_header
+from voice_civic.audio_payload import AudioPayload
+from voice_civic.loadgen import ENDPOINTS
+from voice_civic.polling import AdaptivePolling, benchmark_polling
+from voice_civic.timing import VirtualClock, run_with_clock
+from voice_civic.tracing import (
+    PROMETHEUS_BUCKETS,
+    LatencyHistogram,
+    MetricsServer,
+    Tracer,
+)
+
+CLIPS = [AudioPayload(wav_header(16000, 1, 16, seconds * 32000) + bytes(seconds * 32000)) for seconds in (2, 10, 30)]
+
+durations = st.lists(st.floats(min_value=0.0, max_value=600.0), min_size=1, max_size=300)
+
+
+def _stage_p50(tracer: Tracer) -> dict:
+    return {name: histogram.percentile(50) for name, histogram in tracer.histograms.items()}
+
+
+class TestTracingProperties:
+    """
+    Property-based tests for histogram accuracy and export invariants
+    """
+
+    @given(durations, st.floats(min_value=0.0, max_value=100.0))
+    @settings(max_examples=200, deadline=None)
+    def test_percentile_within_relative_error(self, values, percentile: float):
+        """A percentile is within one bucket (1/128 relative, or 1 microsecond) of the exact rank value"""
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        exact = sorted(values)[max(1, math.ceil(percentile / 100 * len(values))) - 1]
+        reported = histogram.percentile(percentile)
+        assert exact - 1e-6 <= reported + 1e-9
+        assert reported <= exact * (1 + 2 ** -7) + 2e-6
+        assert histogram.count == len(values)
+
+    @given(durations, durations)
+    @settings(max_examples=100, deadline=None)
+    def test_merge_matches_recording_everything(self, first, second):
+        """Merging two histograms gives the same buckets as recording both samples in one"""
+        left, right, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for value in first:
+            left.record(value)
+            combined.record(value)
+        for value in second:
+            right.record(value)
+            combined.record(value)
+        left.merge(right)
+
+        width = max(len(left.counts), len(combined.counts))
+        assert left.counts + [0] * (width - len(left.counts)) == combined.counts + [0] * (width - len(combined.counts))
+        assert left.count == combined.count and left.max == combined.max and left.min == combined.min
+
+    @given(durations)
+    @settings(max_examples=100, deadline=None)
+    def test_prometheus_buckets_cumulative(self, values):
+        """Exported buckets never decrease, end at the count and agree with the recorded values"""
+        tracer = Tracer(enabled=True)
+        for value in values:
+            tracer.record('stage "quoted"', value)
+
+        lines = tracer.prometheus_text().splitlines()
+        buckets = [line for line in lines if line.startswith("voice_civic_stage_duration_seconds_bucket")]
+        counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+        assert len(counts) == len(PROMETHEUS_BUCKETS) + 1
+        assert counts == sorted(counts)
+        assert counts[-1] == len(values)
+        assert 'stage="stage \\"quoted\\""' in buckets[0]
+        # Bucket bounds fall on whole microseconds, so only values within a bucket of a bound can move across it
+        for bound, count in zip(PROMETHEUS_BUCKETS, counts):
+            assert sum(value <= bound * (1 - 2 ** -7) for value in values) <= count
+            assert count <= sum(value <= bound + 1e-6 for value in values)
+
+    @given(st.lists(st.sampled_from(["upload", "poll", "fetch"]), max_size=50))
+    @settings(max_examples=50, deadline=None)
+    def test_disabled_tracer_records_nothing(self, stages):
+        """A disabled tracer hands out the shared no-op span and keeps no state"""
+        tracer = Tracer(enabled=False)
+        spans = set()
+        for stage in stages:
+            with tracer.span(stage) as span:
+                spans.add(id(span))
+            tracer.record(stage, 1.0)
+            tracer.count(stage)
+        assert len(spans) <= 1
+        assert tracer.histograms == {} and tracer.counters == {}
+
+    @given(st.integers(min_value=0, max_value=10_000))
+    @settings(max_examples=5, deadline=None)
+    def test_slow_upload_attributed_to_upload(self, seed: int):
+        """Cutting S3 bandwidth moves the upload stage and leaves the others where they were"""
+        audio = [CLIPS[index % len(CLIPS)] for index in range(20)]
+        baseline, degraded = Tracer(enabled=True), Tracer(enabled=True)
+        benchmark_polling([AdaptivePolling()], audio, seed, tracer=baseline)
+        benchmark_polling([AdaptivePolling()], audio, seed, s3_options={"bandwidth_bytes_per_second": 1e6}, tracer=degraded)
+
+        before, after = _stage_p50(baseline), _stage_p50(degraded)
+        assert after["transcribe.upload"] > 2 * before["transcribe.upload"]
+        grown = max(before, key=lambda stage: after[stage] - before[stage] if stage != "transcribe.total" else -math.inf)
+        assert grown == "transcribe.upload"
+        for stage in ("transcribe.start_job", "transcribe.wait", "transcribe.poll", "transcribe.fetch_transcript"):
+            assert after[stage] == pytest.approx(before[stage], rel=0.05), stage
+
+
+class TestTracingExamples:
+    """
+    Example-based tests for spans, decorators and the metrics endpoints
+    """
+
+    def test_decorator_times_sync_and_async(self):
+        """Test that traced functions and coroutines record one span per call and count errors"""
+        tracer = Tracer(enabled=True)
+
+        @tracer.traced("sync")
+        def add(a, b):
+            return a + b
+
+        @tracer.traced()
+        async def wait(seconds):
+            await asyncio.sleep(seconds)
+            if seconds > 1:
+                raise TimeoutError("too slow")
+            return seconds
+
+        assert add(1, 2) == 3
+        assert run_with_clock(wait(0.5), VirtualClock()) == 0.5
+        with pytest.raises(TimeoutError):
+            run_with_clock(wait(2.0), VirtualClock())
+
+        stage = wait.__wrapped__.__qualname__
+        assert tracer.histograms["sync"].count == 1
+        assert tracer.histograms[stage].count == 2
+        assert tracer.errors[stage] == 1
+        assert tracer.histograms[stage].max == pytest.approx(2.0)
+
+    def test_disabled_span_allocates_nothing(self):
+        """Test that spans on a disabled tracer leave no allocations behind"""
+        tracer = Tracer(enabled=False)
+        traced = tracer.traced("stage")(lambda: None)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            for _ in range(10_000):
+                with tracer.span("stage"):
+                    traced()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        grown = sum(stat.size_diff for stat in after.compare_to(before, "filename") if "tracing" in stat.traceback[0].filename)
+        assert grown < 1024
+
+    def test_metrics_server_serves_both_formats(self):
+        """Test that the local endpoint serves Prometheus text and JSON from a live tracer"""
+        tracer = Tracer(enabled=True)
+        tracer.record("transcribe.upload", 0.2)
+        tracer.count("transcribe.polls", 3)
+        server = MetricsServer(tracer, port=0)
+        url = server.start()
+        try:
+            with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+                text = response.read().decode()
+                assert response.headers["Content-Type"].startswith("text/plain")
+            with urllib.request.urlopen(f"{url}/metrics.json", timeout=5) as response:
+                summary = json.loads(response.read())
+        finally:
+            server.close()
+
+        assert 'voice_civic_stage_duration_seconds_count{stage="transcribe.upload"} 1' in text
+        assert 'voice_civic_events_total{event="transcribe.polls"} 3' in text
+        assert summary["stages"]["transcribe.upload"]["count"] == 1
+
+    def test_backend_exposes_stage_metrics(self):
+        """Test that the backend's /metrics reports queue and speech stages after a text request"""
+        app = BackendApp(response_seconds=0.0)
+
+        async def scenario():
+            async def request(path, body=b""):
+                sent = []
+
+                async def receive():
+                    return {"type": "http.request", "body": body, "more_body": False}
+
+                async def send(message):
+                    sent.append(message)
+
+                method = "POST" if body else "GET"
+                headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+                await app({"type": "http", "method": method, "path": path, "headers": headers, "query_string": b""}, receive, send)
+                return sent
+
+            await request(ENDPOINTS["text"], json.dumps({"text": "Am I eligible for PM-JAY?", "language": "en"}).encode())
+            messages = await request("/metrics")
+            await app.close()
+            return messages
+
+        start, body = run_with_clock(scenario(), VirtualClock())
+        text = body["body"].decode()
+        assert start["status"] == 200
+        assert (b"content-type", b"text/plain; version=0.0.4; charset=utf-8") in start["headers"]
+        assert 'stage="respond.process"' in text
+        assert 'stage="http.request"' in text
@@ -0,0 +1,158 @@
+"""
+Property-based tests for the content-addressed transcription cache
+Feature: voice-civic-assistant
+
+These tests validate that repeat submissions of the same audio and language
+are answered from the cache without a transcription, that different audio
+never shares a transcript, that the memory tier stays within its budget, and
+that cached transcripts expire with the data retention period.
+
+**Validates: Requirements 1.4, 9.2, 10.1**
+"""
+
+import asyncio
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.audio_payload import AudioPayload
+from voice_civic.session_store import DEFAULT_TTL_SECONDS
+from voice_civic.timing import VirtualClock, run_with_clock
+from voice_civic.transcription_cache import CachedSpeechProcessor, TranscriptionCache, cache_key
+from voice_civic.types import Language, TranscriptionResult
+
+
+class CountingProcessor:
+    """Speech processor stand-in that numbers its transcriptions"""
+
+    def __init__(self, delay: float = 1.0, fail: bool = False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self, payload, language):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ValueError("Audio quality unacceptable: Audio is mostly silent")
+        return TranscriptionResult(f"transcript {self.calls}", 0.9, Language(language))
+
+
+def _run(processor, requests, clock=None):
+    async def submit_all():
+        return [await processor(AudioPayload(audio), language) for audio, language in requests]
+
+    return run_with_clock(submit_all(), clock or VirtualClock())
+
+
+class TestTranscriptionCacheProperties:
+    """
+    Property-based tests for hits, isolation between clips and bounded memory
+    """
+
+    @given(
+        st.lists(st.binary(min_size=1, max_size=64), min_size=1, max_size=8, unique=True),
+        st.lists(st.tuples(st.integers(min_value=0, max_value=7), st.sampled_from(list(Language))), min_size=1, max_size=40),
+    )
+    @settings(max_examples=50, deadline=None)
+    def test_one_transcription_per_clip_and_language(self, clips, submissions):
+        """Each distinct (audio, language) is transcribed once and always gets its own transcript"""
+        requests = [(clips[index % len(clips)], language) for index, language in submissions]
+        processor = CachedSpeechProcessor(CountingProcessor())
+
+        results = _run(processor, requests)
+
+        first_seen = {}
+        for request, result in zip(requests, results):
+            first_seen.setdefault(request, result.text)
+            assert result.text == first_seen[request]
+        assert processor.transcriptions == len(first_seen)
+        assert len(set(first_seen.values())) == len(first_seen)
+        stats = processor.cache.stats()
+        assert stats.misses == len(first_seen)
+        assert stats.memory_hits == len(requests) - len(first_seen)
+
+    @given(st.integers(min_value=1, max_value=300), st.integers(min_value=2, max_value=50))
+    @settings(max_examples=30, deadline=None)
+    def test_memory_tier_within_budget(self, clips: int, budget_entries: int):
+        """The memory tier never holds more than its byte budget, evicting least recently used clips"""
+        cache = TranscriptionCache(max_bytes=budget_entries * 300)
+        for index in range(clips):
+            cache.put(AudioPayload(index.to_bytes(4, "big")), Language.ENGLISH, TranscriptionResult(f"t{index}", 0.9, Language.ENGLISH))
+            assert cache.memory.bytes_used <= budget_entries * 300
+
+        latest = AudioPayload((clips - 1).to_bytes(4, "big"))
+        assert cache.get(latest, Language.ENGLISH).text == f"t{clips - 1}"
+        assert cache.stats().evictions == clips - len(cache.memory)
+
+    @given(st.floats(min_value=0, max_value=3 * DEFAULT_TTL_SECONDS))
+    @settings(max_examples=30, deadline=None)
+    def test_entries_expire_with_retention_period(self, elapsed: float):
+        """Transcripts are served until dataRetentionHours pass and never after, from either tier"""
+        clock = VirtualClock()
+        cache = TranscriptionCache(path=":memory:", clock=clock)
+        payload = AudioPayload(b"citizen audio")
+        cache.put(payload, Language.HINDI, TranscriptionResult("सहायता चाहिए", 0.9, Language.HINDI))
+
+        clock.advance(elapsed)
+        if elapsed % 2 < 1:
+            # Lost from memory (evicted or restarted), so the disk tier answers
+            cache.memory.delete(cache_key(payload, Language.HINDI))
+
+        assert (cache.get(payload, Language.HINDI) is not None) == (elapsed < DEFAULT_TTL_SECONDS)
+
+
+class TestTranscriptionCacheExamples:
+    """
+    Example-based tests for persistence, coalescing and failure handling
+    """
+
+    def test_survives_restart_from_disk(self, tmp_path):
+        """Test a transcript written before a restart is served from the SQLite tier afterwards"""
+        path = str(tmp_path / "transcripts.sqlite")
+        payload = AudioPayload(b"\x00" * 4000)
+        first = TranscriptionCache(path=path)
+        first.put(payload, Language.ENGLISH, TranscriptionResult("Help me please", 0.85, Language.ENGLISH))
+        first.close()
+
+        restarted = TranscriptionCache(path=path)
+
+        result = restarted.get(payload, Language.ENGLISH)
+        assert result.text == "Help me please" and result.language == Language.ENGLISH
+        assert restarted.stats().disk_hits == 1
+        assert restarted.get(payload, Language.ENGLISH) is not None
+        assert restarted.stats().memory_hits == 1
+
+    def test_concurrent_retries_coalesced(self):
+        """Test retries arriving while the first request is still transcribing wait for it"""
+        processor = CachedSpeechProcessor(CountingProcessor(delay=3.0))
+
+        async def retries():
+            audio = b"\x01\x02" * 1000
+            return await asyncio.gather(*(processor(AudioPayload(audio), Language.ENGLISH) for _ in range(5)))
+
+        results = run_with_clock(retries(), VirtualClock())
+
+        assert processor.transcriptions == 1
+        assert {result.text for result in results} == {"transcript 1"}
+        assert processor.cache.stats().coalesced == 4
+
+    def test_failures_not_cached(self):
+        """Test rejected audio is sent to the processor again rather than cached"""
+        processor = CachedSpeechProcessor(CountingProcessor(fail=True))
+
+        for _ in range(2):
+            with pytest.raises(ValueError, match="mostly silent"):
+                _run(processor, [(b"\x00" * 10, Language.ENGLISH)])
+
+        assert processor.transcriptions == 2
+
+    def test_callers_cannot_alter_cached_result(self):
+        """Test changing a returned result does not change what the next caller receives"""
+        processor = CachedSpeechProcessor(CountingProcessor())
+
+        first, second = _run(processor, [(b"clip", Language.ENGLISH), (b"clip", Language.ENGLISH)])
+        first.text = "edited"
+
+        assert second.text == "transcript 1"
+        assert _run(processor, [(b"clip", Language.ENGLISH)])[0].text == "transcript 1"
@@ -0,0 +1,147 @@
+"""
+Property-based tests for the Transcribe/S3 fakes and polling strategies
+Feature: voice-civic-assistant
+
+These tests validate the fake transcription job lifecycle, the client's
+request flow and that smarter polling notices completed jobs sooner without
+multiplying API calls.
+
+**Validates: Requirements 1.4, 1.5**
+"""
+
+import random
+
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.audio_inspector import wav_header
+from voice_civic.audio_payload import AudioPayload
+from voice_civic.aws_fakes import Distribution, FakeS3, FakeTranscribe, Fixed, ServiceError
+from voice_civic.fixtures import SAMPLE_TRANSCRIPTS
+from voice_civic.polling import (
+    AdaptivePolling,
+    ExponentialBackoff,
+    FixedInterval,
+    PollingStrategy,
+    TranscriptionClient,
+    TranscriptionFailedError,
+    TranscriptionTimeoutError,
+    benchmark_polling,
+)
+from voice_civic.timing import VirtualClock, run_with_clock
+from voice_civic.types import Language
+
+CLIPS = [AudioPayload(wav_header(16000, 1, 16, seconds * 32000) + bytes(seconds * 32000)) for seconds in (2, 10, 30)]
+
+
+def _transcribe(audio, language=Language.ENGLISH, strategy=None, **transcribe_options):
+    s3 = FakeS3(rng=random.Random(0))
+    transcribe = FakeTranscribe(s3, rng=random.Random(1), job_rng=random.Random(2), **transcribe_options)
+    client = TranscriptionClient(s3, transcribe, strategy or FixedInterval(2.0))
+    return run_with_clock(client.transcribe_audio(audio, language), VirtualClock())
+
+
+class TestTranscriptionPollingProperties:
+    """
+    Property-based tests for client behaviour under each polling strategy
+    """
+
+    @given(
+        st.sampled_from(CLIPS),
+        st.sampled_from(list(Language)),
+        st.floats(min_value=0.1, max_value=20.0),
+        st.floats(min_value=0.1, max_value=3.0),
+    )
+    @settings(max_examples=50)
+    def test_fixed_interval_overshoot_bounded(self, audio, language, job_seconds: float, interval: float):
+        """A fixed-interval client notices completion within one interval plus one API call"""
+        text, stats = _transcribe(
+            audio, language, FixedInterval(interval), completion_time=Fixed(job_seconds), realtime_factor=0.0,
+            api_latency=Fixed(0.05),
+        )
+
+        assert text in SAMPLE_TRANSCRIPTS[language]
+        assert stats.error is None
+        assert 0.0 <= stats.overshoot <= interval + 0.05 + 1e-9
+        assert stats.api_calls == stats.polls + 5
+
+    @given(st.integers(min_value=0, max_value=2**16))
+    @settings(max_examples=10, deadline=None)
+    def test_adaptive_beats_fixed_polling(self, seed: int):
+        """Adaptive polling is faster than the lambda's 2s interval and cheaper than a 0.5s one"""
+        rng = random.Random(seed)
+        audio = [rng.choice(CLIPS) for _ in range(200)]
+
+        fixed_slow, fixed_fast, adaptive = benchmark_polling(
+            [FixedInterval(2.0), FixedInterval(0.5), AdaptivePolling()], audio, seed
+        )
+
+        assert adaptive.percentile(50) < fixed_slow.percentile(50)
+        assert adaptive.mean_overshoot < fixed_slow.mean_overshoot
+        assert adaptive.mean_api_calls < fixed_fast.mean_api_calls
+
+    @given(st.integers(min_value=0, max_value=2**16))
+    @settings(max_examples=10, deadline=None)
+    def test_strategies_see_identical_jobs(self, seed: int):
+        """Job durations do not depend on how often a strategy polls"""
+        audio = [CLIPS[0]] * 20
+        reports = benchmark_polling(
+            [FixedInterval(0.1), ExponentialBackoff(rng=random.Random(seed))], audio, seed,
+            {"api_latency": Fixed(0.0)}, {"request_latency": Fixed(0.0)},
+        )
+
+        # With free API calls every strategy notices a job at most one interval late
+        for fine, coarse in zip(reports[0].latencies, reports[1].latencies):
+            assert fine <= coarse + 0.1 + 1e-9
+
+
+class TestTranscriptionPollingExamples:
+    """
+    Example-based tests for failures and timeouts
+    """
+
+    def test_failed_job_raises(self):
+        """Test a FAILED job surfaces its failure reason"""
+        with pytest.raises(TranscriptionFailedError, match="Internal failure"):
+            _transcribe(CLIPS[0], job_failure_rate=1.0)
+
+    def test_slow_job_times_out(self):
+        """Test a job still running after 30 seconds raises the lambda's timeout error"""
+        with pytest.raises(TranscriptionTimeoutError, match="Transcription job timed out"):
+            _transcribe(CLIPS[0], completion_time=Fixed(45.0))
+
+    def test_api_failure_propagates(self):
+        """Test a throttled API call is raised as a service error"""
+        with pytest.raises(ServiceError, match="ThrottlingException"):
+            _transcribe(CLIPS[0], api_failure_rate=1.0)
+
+    def test_transcript_written_on_completion(self):
+        """Test the transcript JSON lands in the output bucket once the job completes"""
+        s3 = FakeS3(rng=random.Random(0))
+        transcribe = FakeTranscribe(s3, completion_time=Fixed(1.0), rng=random.Random(1))
+        client = TranscriptionClient(s3, transcribe, FixedInterval(0.5))
+
+        text, stats = run_with_clock(client.transcribe_audio(CLIPS[1], Language.HINDI), VirtualClock())
+
+        assert text in SAMPLE_TRANSCRIPTS[Language.HINDI]
+        assert s3.calls["GetObject"] == 1
+        assert transcribe.calls["GetTranscriptionJob"] == stats.polls
+        assert stats.latency < 5.0
+
+    def test_fixed_interval_polls_before_sleeping(self):
+        """Test the lambda's strategy looks once straight after starting the job, as waitForTranscriptionCompletion does"""
+        assert list(zip(range(3), FixedInterval(2.0).intervals(10.0))) == [(0, 0.0), (1, 2.0), (2, 2.0)]
+
+        _, stats = _transcribe(CLIPS[0], completion_time=Fixed(0.0), realtime_factor=0.0, api_latency=Fixed(0.05))
+
+        assert stats.polls == 1
+        assert stats.latency < 2.0
+
+    def test_abstract_bases_cannot_be_created(self):
+        """Test distributions and strategies without their core method fail when they are created"""
+        class Silent(PollingStrategy):
+            pass
+
+        for base in (Distribution, PollingStrategy, Silent):
+            with pytest.raises(TypeError):
+                base()
@@ -0,0 +1,149 @@
+"""
+Property-based tests for voice activity detection before transcription
+Feature: voice-civic-assistant
+
+These tests validate that trimming never clips audible speech in synthetic
+recordings, whatever their rate, level, noise or pause setting, that the
+silence before the first and after the last word is removed, that the
+trimmed WAV holds exactly the detected segments, and that recordings too
+noisy to judge are kept whole.
+
+**Validates: Requirements 1.1, 1.4**
+"""
+
+import time
+
+import numpy as np
+import pytest
+from hypothesis import given, strategies as st, settings
+
+from voice_civic.audio_inspector import inspect_audio
+from voice_civic.audio_payload import AudioPayload
+from voice_civic.synthetic_audio import SAMPLE_RATES, ClipSpec, render_wav, speech_like, wav_payload
+from voice_civic.vad import (
+    FRAME_SECONDS,
+    PAD_SECONDS,
+    detect_speech,
+    missed_speech,
+    sample_recording,
+    trim_silence,
+)
+
+levels = st.floats(min_value=np.log(0.01), max_value=np.log(0.9)).map(lambda value: float(np.exp(value)))
+pauses = st.one_of(st.none(), st.floats(min_value=0.3, max_value=2.0))
+
+
+class TestVadProperties:
+    """
+    Property-based tests for clipping, savings and the trimmed output
+    """
+
+    @given(st.sampled_from(SAMPLE_RATES), st.integers(min_value=0, max_value=10_000),
+           st.floats(min_value=13.0, max_value=40.0), levels, pauses)
+    @settings(max_examples=60, deadline=None)
+    def test_speech_never_clipped(self, sample_rate: int, seed: int, snr_db: float, level: float, max_pause):
+        """Every sample of audible speech lies inside a segment, and segments are ordered and disjoint"""
+        payload, speech = sample_recording(sample_rate, seed, snr_db, level)
+        activity = detect_speech(payload, max_pause=max_pause)
+        assert missed_speech(activity, speech) == 0
+        bounds = [(segment.start_frame, segment.end_frame) for segment in activity.segments]
+        assert all(0 <= start < end <= len(speech) for start, end in bounds)
+        assert all(end < start for (_, end), (start, _) in zip(bounds, bounds[1:]))
+
+    @given(st.sampled_from(SAMPLE_RATES), st.integers(min_value=0, max_value=10_000),
+           st.floats(min_value=15.0, max_value=40.0), levels, st.floats(min_value=0.3, max_value=2.0))
+    @settings(max_examples=40, deadline=None)
+    def test_leading_and_trailing_silence_removed(self, sample_rate: int, seed: int, snr_db: float, level: float, max_pause: float):
+        """Above the keep-whole contrast, all but the padding of the surrounding silence is saved, and cutting pauses only saves more"""
+        payload, speech = sample_recording(sample_rate, seed, snr_db, level)
+        audible = np.flatnonzero(speech)
+        edges = (audible[0] + len(speech) - 1 - audible[-1]) / sample_rate
+        trimmed = detect_speech(payload)
+        cut = detect_speech(payload, max_pause=max_pause)
+
+        assert len(trimmed.segments) == 1
+        assert trimmed.saved_seconds >= edges - 2 * (PAD_SECONDS + FRAME_SECONDS)
+        assert cut.saved_seconds >= trimmed.saved_seconds
+        assert cut.segments[0].start == trimmed.segments[0].start and cut.segments[-1].end == trimmed.segments[0].end
+
+    @given(st.sampled_from(SAMPLE_RATES), st.integers(min_value=1, max_value=2),
+           st.integers(min_value=0, max_value=10_000), pauses)
+    @settings(max_examples=30, deadline=None)
+    def test_trimmed_wav_holds_the_segments(self, sample_rate: int, channels: int, seed: int, max_pause):
+        """The trimmed WAV keeps the source format and holds exactly the segments' samples, in order"""
+        source = AudioPayload(render_wav(ClipSpec("speech", sample_rate, channels, 2.0, seed=seed)))
+        trimmed = trim_silence(source, max_pause=max_pause)
+        info, original = inspect_audio(trimmed.payload.data), source.info
+
+        block = original.block_align
+        expected = b"".join(bytes(source.data[original.data_offset + segment.start_frame * block:
+                                              original.data_offset + segment.end_frame * block])
+                            for segment in trimmed.activity.segments)
+        assert (info.sample_rate, info.channels, info.bits_per_sample) == (sample_rate, channels, 16)
+        assert bytes(trimmed.payload.data[info.data_offset:]) == expected
+        assert info.duration == pytest.approx(trimmed.activity.speech_duration)
+        assert trimmed.saved_seconds == pytest.approx(2.0 - info.duration)
+
+
+class TestVadExamples:
+    """
+    Example-based tests for silence, noise, fricatives and speed
+    """
+
+    def test_silent_recording_has_no_speech(self):
+        """Test a recording of room hiss has no segments and needs no transcription"""
+        trimmed = trim_silence(AudioPayload(render_wav(ClipSpec("silence", 16000, 1, 5.0, seed=1))))
+        assert not trimmed.has_speech and trimmed.activity.segments == []
+        assert trimmed.payload.info.data_size == 0
+        assert trimmed.saved_seconds == 5.0
+
+    def test_noisy_and_steady_recordings_kept_whole(self):
+        """Test recordings where speech cannot be told from the background are not trimmed at all"""
+        noisy, _ = sample_recording(16000, seed=3, snr_db=6.0)
+        t = np.arange(3 * 16000) / 16000
+        tone = wav_payload(0.3 * np.sin(2 * np.pi * 440 * t), 16000)
+        for payload in (noisy, tone):
+            activity = detect_speech(payload, max_pause=0.5)
+            assert [(segment.start_frame, segment.end_frame) for segment in activity.segments] == [(0, activity.frames)]
+
+    def test_fricative_kept_by_zero_crossings(self):
+        """Test a faint "s" over mains hum, too quiet to pass on energy, is kept for its zero crossings"""
+        rng = np.random.default_rng(0)
+        t = np.arange(4 * 16000) / 16000
+        signal = 0.004 * np.sin(2 * np.pi * 50 * t) + 0.002 * np.sin(2 * np.pi * 150 * t)
+        hiss = np.diff(rng.normal(0, 1, int(0.4 * 16000) + 1))
+        hiss *= np.sqrt(0.7 * np.mean(signal ** 2)) / np.std(hiss)
+        vowel = speech_like(int(0.6 * 16000), 16000, rng)
+        vowel = vowel[np.flatnonzero(vowel)[0]:]
+        start = int(1.5 * 16000)
+        signal[start:start + len(hiss)] += hiss
+        signal[start + len(hiss):start + len(hiss) + len(vowel)] += vowel
+        payload = wav_payload(signal, 16000)
+
+        assert detect_speech(payload).segments[0].start == pytest.approx(1.5 - PAD_SECONDS)
+        assert detect_speech(payload, zero_crossings=False).segments[0].start > 1.5 + 0.1
+
+    def test_recordings_save_a_fifth(self):
+        """Test typical recordings lose over a fifth of their seconds with pauses cut to 0.8 s"""
+        total = saved = 0.0
+        for seed in range(10):
+            activity = detect_speech(sample_recording(16000, seed)[0], max_pause=0.8)
+            total += activity.duration
+            saved += activity.saved_seconds
+        assert saved / total > 0.2
+
+    def test_two_minute_clip_in_milliseconds(self):
+        """Test a two-minute 16 kHz recording is analysed in a small fraction of a second"""
+        payload = AudioPayload(render_wav(ClipSpec("speech", 16000, 1, 120.0, seed=1)))
+        detect_speech(payload)
+        started = time.perf_counter()
+        detect_speech(payload, max_pause=0.8)
+        assert time.perf_counter() - started < 0.25
+
+    def test_compressed_audio_passes_through(self):
+        """Test MP3 uploads cannot be analysed and are left as they are"""
+        mp3 = AudioPayload(b"\xff\xfb\x90\x64" + bytes(4000))
+        trimmed = trim_silence(mp3)
+        assert trimmed.passthrough and trimmed.has_speech and trimmed.payload is mp3
+        with pytest.raises(ValueError):
+            detect_speech(mp3)
@@ -0,0 +1,7 @@
+"""
+Python reference components for the Voice Civic Assistant
+
+These modules mirror the behaviour of the TypeScript lambdas closely enough to
+drive the property-based test suite, offline tooling and benchmarks without
+any AWS access.
+"""
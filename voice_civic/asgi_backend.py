@@ -0,0 +1,1262 @@
+"""
+Non-blocking ASGI reference backend
+
+``local-backend/server.js`` reads every upload into memory with
+``multer.memoryStorage()`` (up to 10 MB each) before its handler runs, then
+parks the request in a fixed ``await delay(2000)``. Memory grows with the
+number of concurrent uploads, a wrong file type is only noticed once all of
+it has arrived, and the concurrency seen locally says nothing about
+production, where the work is bounded by Transcribe and Lambda quotas.
+
+``BackendApp`` serves the same routes (health, voice, text, image, session,
+documents) with the same response bodies as an ASGI application:
+
+- multipart bodies are parsed incrementally as they arrive. File parts go
+  into ``UploadBuffer``s that stay in memory only while a shared
+  ``MemoryBudget`` allows and spill to temporary files after that;
+- the format is checked on the first bytes of a file part and the size on
+  ``Content-Length`` and on every chunk, so bad uploads are refused before
+  the rest of the body is read;
+- work reaches the pipeline through bounded ``WorkQueue``s. A request is
+  admitted before its body is read; when the queue is full it waits up to
+  ``admission_timeout`` and then gets 503 with ``Retry-After``. Unadmitted
+  bodies are not read at all, so TCP flow control pushes back on clients.
+
+Upload memory is therefore the budget plus one read chunk per connection,
+however many uploads are in flight. Any ASGI server can run ``create_app``
+(``uvicorn --factory voice_civic.asgi_backend:create_app``); ``HttpServer``
+is a minimal HTTP/1.1 server on asyncio streams for machines without one.
+Every queue and speech stage is traced; ``GET /metrics`` serves the stage
+histograms in the Prometheus text format and ``/metrics.json`` as JSON.
+"""
+
+import asyncio
+import contextlib
+import http
+import json
+import mmap
+import tempfile
+import time
+import urllib.parse
+import uuid
+from datetime import date, datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .audio_inspector import FORMAT_HEADER_SIZE, detect_audio_format
+from .audio_payload import AudioPayload
+from .image_preprocess import ImageHeader, ImagePreprocessor, ImageRejected
+from .intent import MOCK_BACKEND_RULES, IntentClassifier
+from .loadgen import ENDPOINTS, read_head
+from .pipeline import AudioRejectedError, SimulatedSpeechProcessor, SpeechProcessorFn
+from .session_store import SessionStore
+from .tracing import DEFAULT_TRACER, Tracer
+from .types import Intent, Language
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+# body-parser's default JSON limit
+MAX_JSON_BYTES = 100 * 1024
+MAX_FIELD_BYTES = 64 * 1024
+MAX_PART_HEADER_BYTES = 8 * 1024
+# Multipart framing and text fields allowed on top of the file itself
+MAX_FORM_OVERHEAD_BYTES = 64 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+# Bytes read from a socket ahead of the application, per connection
+STREAM_LIMIT_BYTES = 16 * 1024
+# How long a refused upload may keep sending before its connection is dropped
+LINGER_SECONDS = 2.0
+# Bytes an upload may keep in memory before it spills to a temporary file
+SPOOL_BYTES = 256 * 1024
+# Upload bytes held in memory across all requests
+DEFAULT_MEMORY_BUDGET = 8 * 1024 * 1024
+
+DEFAULT_WORKERS = 8
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_ADMISSION_TIMEOUT = 2.0
+RETRY_AFTER_SECONDS = 1
+
+# server.js delay() calls for the stages that are still simulated, in seconds
+RESPONSE_SECONDS = 1.0
+OCR_SECONDS = 1.5
+
+CORS_ORIGINS = ("http://localhost:3000", "http://127.0.0.1:3000")
+
+IMAGE_MAGIC = {b"\xff\xd8\xff": "jpeg", b"\x89PNG\r\n\x1a\n": "png", b"%PDF-": "pdf"}
+
+SERVICE_NAME = "Voice Civic Assistant Python Backend"
+SERVICE_VERSION = "1.0.0"
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class HttpError(Exception):
+    """An error response: ``status`` with a JSON ``payload``"""
+
+    def __init__(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        super().__init__(payload.get("error", status))
+        self.status = status
+        self.payload = payload
+        self.headers = headers or {}
+
+
+class Overloaded(HttpError):
+    """Raised when a work queue stays full for longer than the admission timeout"""
+
+    def __init__(self, queue: str):
+        super().__init__(
+            503,
+            {"error": "Server busy, please retry", "queue": queue},
+            {"retry-after": str(RETRY_AFTER_SECONDS)},
+        )
+
+
+# ---------------------------------------------------------------------------
+# Streaming multipart
+# ---------------------------------------------------------------------------
+
+def header_params(value: str) -> Dict[str, str]:
+    """The ``key=value`` parameters of a header such as Content-Disposition"""
+    params = {}
+    for item in value.split(";")[1:]:
+        key, _, param = item.strip().partition("=")
+        params[key.lower()] = param.strip('"')
+    return params
+
+
+class MultipartParser:
+    """
+    Incremental ``multipart/form-data`` parser
+
+    ``feed`` accepts the body in chunks of any size and returns events:
+    ``("part", headers)`` when a part starts, ``("data", bytes)`` for its
+    content and ``("end", None)`` when it finishes. Content that might be
+    the start of a delimiter is held back until the next chunk decides, so
+    at most one delimiter's worth of bytes is buffered beyond the chunk.
+    """
+
+    def __init__(self, boundary: str):
+        # Prefixing CRLF lets the first delimiter match like every other one
+        self._delimiter = b"\r\n--" + boundary.encode("latin-1")
+        self._buffer = bytearray(b"\r\n")
+        self._state = "preamble"
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, Any]]:
+        self._buffer += chunk
+        buffer, events = self._buffer, []
+        while True:
+            if self._state in ("preamble", "body"):
+                index = buffer.find(self._delimiter)
+                if index < 0:
+                    keep = len(self._delimiter) - 1
+                    if len(buffer) > keep:
+                        if self._state == "body":
+                            events.append(("data", bytes(buffer[:-keep])))
+                        del buffer[:-keep]
+                    return events
+                if self._state == "body":
+                    if index:
+                        events.append(("data", bytes(buffer[:index])))
+                    events.append(("end", None))
+                del buffer[:index + len(self._delimiter)]
+                self._state = "delimiter"
+            elif self._state == "delimiter":
+                if len(buffer) < 2:
+                    return events
+                if buffer[:2] == b"--":
+                    self._state = "done"
+                    buffer.clear()
+                    return events
+                if buffer[:2] != b"\r\n":
+                    raise ValueError("Malformed multipart delimiter")
+                del buffer[:2]
+                self._state = "headers"
+            elif self._state == "headers":
+                index = buffer.find(b"\r\n\r\n")
+                if index < 0:
+                    if len(buffer) > MAX_PART_HEADER_BYTES:
+                        raise ValueError("Multipart part headers too large")
+                    return events
+                headers = {}
+                for line in buffer[:index].decode("utf-8").split("\r\n"):
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                del buffer[:index + 4]
+                events.append(("part", headers))
+                self._state = "body"
+            else:
+                # Epilogue after the closing delimiter is ignored
+                buffer.clear()
+                return events
+
+    def close(self) -> None:
+        if self._state != "done":
+            raise ValueError("Multipart body ended before the closing boundary")
+
+
+# ---------------------------------------------------------------------------
+# Spooled uploads
+# ---------------------------------------------------------------------------
+
+class MemoryBudget:
+    """Bytes of upload data all requests together may keep in memory"""
+
+    def __init__(self, limit: int = DEFAULT_MEMORY_BUDGET):
+        if limit < 0:
+            raise ValueError(f"Memory budget must not be negative, got {limit}")
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self.spills = 0
+
+    def try_reserve(self, size: int) -> bool:
+        if self.used + size > self.limit:
+            return False
+        self.used += size
+        self.peak = max(self.peak, self.used)
+        return True
+
+    def release(self, size: int) -> None:
+        self.used -= size
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"limit": self.limit, "used": self.used, "peak": self.peak, "spills": self.spills}
+
+
+class UploadBuffer:
+    """
+    One uploaded file, in memory while the budget allows and on disk after that
+
+    Small files never touch the disk. Once a file grows past ``spool_bytes``
+    or the shared budget runs out, what has arrived so far moves to an
+    anonymous temporary file and its memory goes back to the budget.
+    ``view`` maps the finished file rather than reading it back.
+    """
+
+    def __init__(self, budget: MemoryBudget, filename: str = "", spool_bytes: int = SPOOL_BYTES):
+        self.budget = budget
+        self.filename = filename
+        self.spool_bytes = spool_bytes
+        self.size = 0
+        self.head = b""
+        self._memory = bytearray()
+        self._reserved = 0
+        self._file: Optional[Any] = None
+        self._mapped: Optional[mmap.mmap] = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    def write(self, data: bytes) -> None:
+        if len(self.head) < FORMAT_HEADER_SIZE:
+            self.head += data[:FORMAT_HEADER_SIZE - len(self.head)]
+        self.size += len(data)
+        if self._file is None:
+            if self.size <= self.spool_bytes and self.budget.try_reserve(len(data)):
+                self._memory += data
+                self._reserved += len(data)
+                return
+            self._spill()
+        self._file.write(data)
+
+    def view(self) -> memoryview:
+        """The whole upload as a read-only view, without copying it"""
+        if self._file is None:
+            return memoryview(self._memory).toreadonly()
+        self._file.flush()
+        if self.size == 0:
+            return memoryview(b"")
+        if self._mapped is None:
+            self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mapped)
+
+    def close(self) -> None:
+        self.budget.release(self._reserved)
+        self._reserved = 0
+        self._memory = bytearray()
+        if self._mapped is not None:
+            try:
+                self._mapped.close()
+            except BufferError:
+                # A payload still holds a view; the map goes when it does
+                pass
+            self._mapped = None
+        if self._file is not None:
+            self._file.close()
+
+    def _spill(self) -> None:
+        self._file = tempfile.TemporaryFile(prefix="voice-civic-upload-")
+        self._file.write(self._memory)
+        self.budget.release(self._reserved)
+        self.budget.spills += 1
+        self._reserved = 0
+        self._memory = bytearray()
+
+
+def detect_image_format(header: bytes) -> Optional[str]:
+    """Identify a JPEG, PNG or PDF upload from its magic bytes"""
+    for magic, name in IMAGE_MAGIC.items():
+        if header.startswith(magic):
+            return name
+    return None
+
+
+def _check_audio(head: bytes) -> None:
+    if detect_audio_format(head) is None:
+        raise HttpError(400, {"error": "Invalid or unsupported audio format"})
+
+
+def _check_image(head: bytes) -> None:
+    if detect_image_format(head) is None:
+        raise HttpError(400, {"error": "Invalid or unsupported image format"})
+
+
+class _Form:
+    def __init__(self):
+        self.fields: Dict[str, str] = {}
+        self.files: Dict[str, UploadBuffer] = {}
+
+    def close(self) -> None:
+        for upload in self.files.values():
+            upload.close()
+
+
+# ---------------------------------------------------------------------------
+# Bounded work queues
+# ---------------------------------------------------------------------------
+
+class WorkQueue:
+    """
+    A fixed pool of workers in front of one pipeline stage
+
+    ``admit`` holds one of ``workers + maxsize`` slots for the whole request,
+    body upload included, so at most that many requests are buffered or
+    processed at once. ``run`` hands the work to the next free worker.
+    Admission waits, queueing and processing are recorded on ``tracer`` as
+    ``<name>.admission``, ``<name>.queue`` and ``<name>.process``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[..., Awaitable[Any]],
+        workers: int = DEFAULT_WORKERS,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        tracer: Optional[Tracer] = None,
+    ):
+        if workers < 1 or maxsize < 0:
+            raise ValueError(f"Queue {name!r} needs at least one worker and a non-negative size")
+        self.name = name
+        self.handler = handler
+        self.tracer = tracer or DEFAULT_TRACER
+        self.workers = workers
+        self.maxsize = maxsize
+        self.admitted = 0
+        self.rejected = 0
+        self.in_system = 0
+        self.max_in_system = 0
+        self.max_depth = 0
+        self._slots = asyncio.Semaphore(workers + maxsize)
+        self._queue: "asyncio.Queue[Tuple[tuple, asyncio.Future, float]]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    @contextlib.asynccontextmanager
+    async def admit(self, timeout: float):
+        # wait_for would time out even a free slot when the timeout is zero
+        if self._slots.locked():
+            waited = asyncio.get_running_loop().time()
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                self.tracer.record(f"{self.name}.admission", asyncio.get_running_loop().time() - waited, error=True)
+                raise Overloaded(self.name) from None
+            self.tracer.record(f"{self.name}.admission", asyncio.get_running_loop().time() - waited)
+        else:
+            await self._slots.acquire()
+            self.tracer.record(f"{self.name}.admission", 0.0)
+        self.admitted += 1
+        self.in_system += 1
+        self.max_in_system = max(self.max_in_system, self.in_system)
+        try:
+            yield self
+        finally:
+            self.in_system -= 1
+            self._slots.release()
+
+    async def run(self, *args: Any) -> Any:
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put_nowait((args, future, loop.time()))
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return await future
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        tracer = self.tracer
+        while True:
+            args, future, enqueued = await self._queue.get()
+            if future.done():
+                continue
+            tracer.record(f"{self.name}.queue", loop.time() - enqueued)
+            try:
+                with tracer.span(f"{self.name}.process"):
+                    result = await self.handler(*args)
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers, "queueSize": self.maxsize, "inSystem": self.in_system,
+            "admitted": self.admitted, "rejected": self.rejected,
+            "maxInSystem": self.max_in_system, "maxDepth": self.max_depth,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Mock responses, as generateMockResponse in server.js
+# ---------------------------------------------------------------------------
+
+ELIGIBILITY_RESPONSES = {
+    "hi": {
+        "response": """आपकी PM-JAY पात्रता की जांच के लिए मुझे निम्नलिखित जानकारी चाहिए:
+
+1. आपके परिवार में कितने सदस्य हैं?
+2. आपकी मासिक पारिवारिक आय कितनी है?
+3. क्या आपके पास BPL/APL राशन कार्ड है?
+4. आप किस राज्य और जिले में रहते हैं?
+5. क्या परिवार में कोई विकलांग व्यक्ति है?
+
+कृपया इन प्रश्नों के उत्तर दें ताकि मैं आपकी सटीक पात्रता निर्धारित कर सकूं।""",
+        "followUpQuestions": ["परिवार के सदस्यों की संख्या बताएं", "मासिक आय की जानकारी दें", "राशन कार्ड का प्रकार बताएं"],
+    },
+    "en": {
+        "response": """To check your PM-JAY eligibility, I need the following information:
+
+1. How many members are in your family?
+2. What is your monthly household income?
+3. Do you have a BPL/APL ration card?
+4. Which state and district do you live in?
+5. Are there any disabled members in your family?
+
+Please provide answers to these questions so I can accurately determine your eligibility.""",
+        "followUpQuestions": ["Tell me about family size", "Provide income details", "Share ration card type"],
+    },
+}
+
+GRIEVANCE_RESPONSES = {
+    "hi": """मैं आपकी शिकायत दर्ज करने में सहायता करूंगा। कृपया निम्नलिखित विवरण प्रदान करें:
+
+1. आपकी मुख्य समस्या क्या है?
+2. यह घटना कब हुई थी?
+3. कौन सा अस्पताल या स्वास्थ्य केंद्र शामिल था?
+4. क्या आपके पास कोई बिल, रसीद या अन्य प्रमाण है?
+5. आपको कितनी राशि का नुकसान हुआ है?
+
+मैंने आपके लिए एक शिकायत दस्तावेज़ का मसौदा तैयार किया है। आप इसे दस्तावेज़ टैब में देख सकते हैं।""",
+    "en": """I'll help you file your grievance. Please provide the following details:
+
+1. What is your main complaint?
+2. When did this incident occur?
+3. Which hospital or health center was involved?
+4. Do you have any bills, receipts, or other evidence?
+5. What is the financial loss you suffered?
+
+I've prepared a draft grievance document for you. You can view it in the Documents tab.""",
+}
+
+INQUIRY_RESPONSES = {
+    "hi": """नमस्ते! मैं आपकी सहायता के लिए यहां हूं। मैं निम्नलिखित सेवाएं प्रदान कर सकता हूं:
+
+🏥 **PM-JAY योजना सेवाएं:**
+• पात्रता की जांच करना
+• आवेदन फॉर्म भरने में सहायता
+• योजना की जानकारी प्रदान करना
+
+📋 **शिकायत सेवाएं:**
+• अस्पताल की अधिक फीस की शिकायत
+• इलाज से मना करने की शिकायत
+• सेवा की गुणवत्ता की शिकायत
+• भेदभाव की शिकायत
+
+📄 **दस्तावेज़ सहायता:**
+• बिल और रसीदों की समीक्षा
+• आवेदन पत्र तैयार करना
+• कानूनी दस्तावेज़ों की सहायता
+
+कृपया बताएं कि आप किस विषय में सहायता चाहते हैं?""",
+    "en": """Hello! I'm here to assist you. I can provide the following services:
+
+🏥 **PM-JAY Scheme Services:**
+• Check eligibility status
+• Help with application forms
+• Provide scheme information
+
+📋 **Grievance Services:**
+• Hospital overcharging complaints
+• Treatment denial complaints
+• Service quality complaints
+• Discrimination complaints
+
+📄 **Document Assistance:**
+• Review bills and receipts
+• Prepare application forms
+• Legal document support
+
+Please let me know what you need help with?""",
+}
+
+# Mock transcription of every voice upload in server.js
+MOCK_TRANSCRIPTIONS = {"hi": "मुझे PM-JAY योजना की पात्रता जांचनी है", "en": "I want to check my PM-JAY eligibility"}
+
+MOCK_OCR = {
+    "hi": {
+        "extractedText": "अस्पताल बिल\nरोगी का नाम: राम कुमार\nकुल राशि: ₹5,000\nतारीख: 15/12/2023",
+        "analysis": "यह एक अस्पताल का बिल है जिसमें ₹5,000 की राशि दिखाई गई है। बिल में रोगी का नाम और उपचार की तारीख शामिल है।",
+    },
+    "en": {
+        "extractedText": "Hospital Bill\nPatient Name: Ram Kumar\nTotal Amount: ₹5,000\nDate: 15/12/2023",
+        "analysis": "This appears to be a hospital bill showing an amount of ₹5,000. The bill includes patient name and treatment date.",
+    },
+}
+
+
+def iso_timestamp() -> str:
+    """The current UTC time as JavaScript's ``toISOString`` prints it"""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def grievance_document(language: str, today: Optional[date] = None) -> Dict[str, Any]:
+    """The draft grievance server.js files alongside a grievance response"""
+    today = today or date.today()
+    hi = language == "hi"
+    return {
+        "type": "health_grievance",
+        "title": "स्वास्थ्य शिकायत - मसौदा" if hi else "Health Grievance - Draft",
+        "content": {
+            "title": "स्वास्थ्य सेवा संबंधी शिकायत" if hi else "Health Service Related Complaint",
+            "description": "शिकायत का विस्तृत विवरण यहां होगा..." if hi else "Detailed complaint description will be here...",
+            "category": "सामान्य शिकायत" if hi else "General Complaint",
+            "incidentDate": datetime.now(timezone.utc).date().isoformat(),
+            "location": "अस्पताल/स्वास्थ्य केंद्र का नाम" if hi else "Hospital/Health Center Name",
+            "legalReferences": [
+                "PM-JAY दिशानिर्देश धारा 4.2" if hi else "PM-JAY Guidelines Section 4.2",
+                "राष्ट्रीय स्वास्थ्य नीति 2017" if hi else "National Health Policy 2017",
+                "उपभोक्ता संरक्षण अधिनियम 2019" if hi else "Consumer Protection Act 2019",
+            ],
+            "formFields": {
+                "शिकायतकर्ता का नाम" if hi else "Complainant Name": "आपका नाम" if hi else "Your Name",
+                "संपर्क नंबर" if hi else "Contact Number": "आपका मोबाइल नंबर" if hi else "Your Mobile Number",
+                # toLocaleDateString: D/M/YYYY for hi-IN, M/D/YYYY for en-US
+                "घटना की तारीख" if hi else "Incident Date":
+                    f"{today.day}/{today.month}/{today.year}" if hi else f"{today.month}/{today.day}/{today.year}",
+                "अस्पताल का नाम" if hi else "Hospital Name": "संबंधित अस्पताल" if hi else "Concerned Hospital",
+            },
+        },
+        "status": "draft",
+    }
+
+
+# ---------------------------------------------------------------------------
+# ASGI application
+# ---------------------------------------------------------------------------
+
+class _Request:
+    def __init__(self, scope: Scope, receive: Receive):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+        self.more_body = "transfer-encoding" in self.headers or int(self.headers.get("content-length") or 0) > 0
+        self.received = 0
+        self._receive = receive
+
+    async def next_chunk(self, limit: int) -> Optional[bytes]:
+        """The next piece of the body, or None at its end; refused once past ``limit`` bytes"""
+        declared = self.headers.get("content-length")
+        if declared and int(declared) > limit:
+            raise HttpError(413, {"error": "File too large", "limit": limit})
+        while self.more_body:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                raise ConnectionResetError("Client disconnected during the upload")
+            self.more_body = message.get("more_body", False)
+            body = message.get("body", b"")
+            self.received += len(body)
+            if self.received > limit:
+                raise HttpError(413, {"error": "File too large", "limit": limit})
+            if body:
+                return body
+        return None
+
+    async def json(self) -> Dict[str, Any]:
+        chunks = []
+        while True:
+            chunk = await self.next_chunk(MAX_JSON_BYTES)
+            if chunk is None:
+                break
+            chunks.append(chunk)
+        if not chunks:
+            return {}
+        try:
+            payload = json.loads(b"".join(chunks))
+        except ValueError:
+            raise HttpError(400, {"error": "Invalid JSON body"}) from None
+        return payload if isinstance(payload, dict) else {}
+
+
+class TextBody:
+    """A non-JSON response body"""
+
+    __slots__ = ("body", "content_type")
+
+    def __init__(self, body: str, content_type: str = "text/plain; charset=utf-8"):
+        self.body = body.encode("utf-8")
+        self.content_type = content_type
+
+
+class BackendApp:
+    """
+    The ``local-backend`` routes as an ASGI application
+
+    Speech goes through ``speech_processor`` (``SimulatedSpeechProcessor``
+    by default, so audio that fails the quality gate is refused as it would
+    be in production); response generation and OCR still sleep for the
+    server.js delays. Each stage has its own ``WorkQueue``. Sessions and
+    documents live in ``SessionStore``s with the 24 hour TTL. ``tracer`` is
+    always enabled here so that ``/metrics`` has something to report.
+
+    With an ``ImagePreprocessor`` as ``images``, uploaded images are checked
+    from their headers before they join the OCR queue and shrunk on its pool
+    before the simulated analysis; the response then also carries
+    ``preprocessing``. Without one, images reach OCR as uploaded.
+    """
+
+    def __init__(
+        self,
+        speech_processor: Optional[SpeechProcessorFn] = None,
+        response_seconds: float = RESPONSE_SECONDS,
+        ocr_seconds: float = OCR_SECONDS,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET,
+        admission_timeout: float = DEFAULT_ADMISSION_TIMEOUT,
+        max_upload_bytes: int = MAX_UPLOAD_BYTES,
+        tracer: Optional[Tracer] = None,
+        images: Optional[ImagePreprocessor] = None,
+    ):
+        self.tracer = tracer or Tracer(enabled=True)
+        self.images = images
+        self.speech_processor = speech_processor or SimulatedSpeechProcessor(tracer=self.tracer)
+        self.response_seconds = response_seconds
+        self.ocr_seconds = ocr_seconds
+        self.admission_timeout = admission_timeout
+        self.max_upload_bytes = max_upload_bytes
+        self.budget = MemoryBudget(memory_budget)
+        self.queues = {
+            "speech": WorkQueue("speech", self.speech_processor, workers, queue_size, self.tracer),
+            "respond": WorkQueue("respond", self._compose, workers, queue_size, self.tracer),
+            "ocr": WorkQueue("ocr", self._ocr, workers, queue_size, self.tracer),
+        }
+        self.sessions = SessionStore()
+        self.documents = SessionStore()
+        self._classifier = IntentClassifier(MOCK_BACKEND_RULES, first_match=True)
+        self._routes = {
+            ("GET", "/api/health"): self._health,
+            ("POST", ENDPOINTS["voice"]): self._voice,
+            ("POST", ENDPOINTS["text"]): self._text,
+            ("POST", ENDPOINTS["image"]): self._image,
+            ("GET", "/api/documents"): self._list_documents,
+            ("GET", "/metrics"): self._metrics,
+            ("GET", "/metrics.json"): self._metrics_json,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        request = _Request(scope, receive)
+        headers: Dict[str, str] = {}
+        origin = request.headers.get("origin")
+        if origin in CORS_ORIGINS:
+            headers.update({"access-control-allow-origin": origin, "access-control-allow-credentials": "true", "vary": "Origin"})
+        if request.method == "OPTIONS" and origin in CORS_ORIGINS:
+            headers.update({
+                "access-control-allow-methods": "GET,HEAD,PUT,PATCH,POST,DELETE",
+                "access-control-allow-headers": request.headers.get("access-control-request-headers", "content-type"),
+            })
+            await self._send(send, 204, None, headers)
+            return
+        started = asyncio.get_running_loop().time()
+        try:
+            status, payload = 200, await self._dispatch(request)
+        except HttpError as error:
+            status, payload = error.status, error.payload
+            headers.update(error.headers)
+        except ConnectionResetError:
+            return
+        except Exception as error:
+            status, payload = 500, {"error": "Internal server error", "details": str(error)}
+        if request.more_body:
+            # The rest of a refused body is never read, so the connection cannot be reused
+            headers["connection"] = "close"
+        self.tracer.record("http.request", asyncio.get_running_loop().time() - started, error=status >= 500)
+        await self._send(send, status, payload, headers)
+
+    async def close(self) -> None:
+        for queue in self.queues.values():
+            await queue.close()
+        if self.images is not None:
+            self.images.close()
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _send(self, send: Send, status: int, payload: Any, headers: Dict[str, str]) -> None:
+        if isinstance(payload, TextBody):
+            body, content_type = payload.body, payload.content_type
+        else:
+            body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        raw_headers = [(b"content-length", str(len(body)).encode())]
+        if payload is not None:
+            raw_headers.append((b"content-type", content_type.encode("latin-1")))
+        raw_headers += [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+        await send({"type": "http.response.start", "status": status, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _dispatch(self, request: _Request) -> Any:
+        handler = self._routes.get((request.method, request.path))
+        if handler is not None:
+            return await handler(request)
+        prefix, _, key = request.path.rpartition("/")
+        if key and request.method == "GET" and prefix == "/api/session":
+            return self._found(self.sessions, key, "Session not found")
+        if key and prefix == "/api/documents":
+            if request.method == "GET":
+                return self._found(self.documents, key, "Document not found")
+            if request.method == "PATCH":
+                body = await request.json()
+                document = self._found(self.documents, key, "Document not found")
+                document["status"] = body.get("status")
+                self.documents.put(key, document)
+                return document
+        raise HttpError(404, {"error": "Endpoint not found", "path": request.path, "method": request.method})
+
+    @staticmethod
+    def _found(store: SessionStore, key: str, message: str) -> Any:
+        value = store.get(key)
+        if value is None:
+            raise HttpError(404, {"error": message})
+        return value
+
+    async def _health(self, request: _Request) -> Dict[str, Any]:
+        return {
+            "status": "healthy",
+            "timestamp": iso_timestamp(),
+            "service": SERVICE_NAME,
+            "version": SERVICE_VERSION,
+            "queues": {name: queue.stats() for name, queue in self.queues.items()},
+            "uploadMemory": self.budget.as_dict(),
+        }
+
+    async def _metrics(self, request: _Request) -> TextBody:
+        return TextBody(self.tracer.prometheus_text(), "text/plain; version=0.0.4; charset=utf-8")
+
+    async def _metrics_json(self, request: _Request) -> Dict[str, Any]:
+        return self.tracer.as_dict()
+
+    async def _list_documents(self, request: _Request) -> List[Dict[str, Any]]:
+        return [self.documents.get(key) for key in list(self.documents)]
+
+    async def _voice(self, request: _Request) -> Dict[str, Any]:
+        async with self.queues["speech"].admit(self.admission_timeout) as speech:
+            form = await self._read_form(request, "audio", _check_audio)
+            try:
+                language = _language(form.fields)
+                upload = form.files.get("audio")
+                if upload is None or upload.size == 0:
+                    raise HttpError(400, {"error": "No audio file provided"})
+                try:
+                    transcription = await speech.run(AudioPayload(upload.view()), Language(language))
+                except AudioRejectedError as error:
+                    raise HttpError(400, {"error": "Failed to process voice input", "details": str(error)}) from None
+            finally:
+                form.close()
+        text = transcription.text
+        response = self._respond(text, language)
+        session_id = str(uuid.uuid4())
+        self._record_turn(session_id, language, text, response)
+        return {"sessionId": session_id, "transcription": text, **response}
+
+    async def _text(self, request: _Request) -> Dict[str, Any]:
+        async with self.queues["respond"].admit(self.admission_timeout) as respond:
+            body = await request.json()
+            text, language = body.get("text"), _language(body)
+            if not text or not isinstance(text, str):
+                raise HttpError(400, {"error": "No text provided"})
+            response = await respond.run(text, language)
+        session_id = body.get("sessionId") or str(uuid.uuid4())
+        self._record_turn(session_id, language, text, response)
+        return {"sessionId": session_id, **response}
+
+    async def _image(self, request: _Request) -> Dict[str, Any]:
+        async with self.queues["ocr"].admit(self.admission_timeout) as ocr:
+            form = await self._read_form(request, "image", _check_image)
+            try:
+                language = _language(form.fields)
+                upload = form.files.get("image")
+                if upload is None or upload.size == 0:
+                    raise HttpError(400, {"error": "No image file provided"})
+                header = None
+                if self.images is not None:
+                    try:
+                        header = self.images.inspect(upload.view())
+                    except ImageRejected as error:
+                        raise HttpError(400, {"error": error.message})
+                return await ocr.run(upload, language, header)
+            finally:
+                form.close()
+
+    async def _read_form(self, request: _Request, file_field: str, check: Callable[[bytes], None]) -> _Form:
+        """Stream a multipart body, spooling ``file_field`` and checking its first bytes"""
+        boundary = header_params(request.headers.get("content-type", "")).get("boundary")
+        if not request.headers.get("content-type", "").startswith("multipart/form-data") or not boundary:
+            raise HttpError(400, {"error": f"No {file_field} file provided"})
+        form, parser = _Form(), MultipartParser(boundary)
+        name, field, upload, checked = None, None, None, False
+        try:
+            while True:
+                chunk = await request.next_chunk(self.max_upload_bytes + MAX_FORM_OVERHEAD_BYTES)
+                if chunk is None:
+                    break
+                for event, value in parser.feed(chunk):
+                    if event == "part":
+                        params = header_params(value.get("content-disposition", ""))
+                        name, field, upload, checked = params.get("name"), None, None, False
+                        if "filename" not in params:
+                            field = bytearray()
+                        elif name == file_field:
+                            upload = form.files[name] = UploadBuffer(self.budget, params["filename"])
+                        # Any other file is dropped as it arrives
+                    elif event == "data" and upload is not None:
+                        upload.write(value)
+                        if upload.size > self.max_upload_bytes:
+                            raise HttpError(413, {"error": "File too large", "limit": self.max_upload_bytes})
+                        if not checked and len(upload.head) == FORMAT_HEADER_SIZE:
+                            check(upload.head)
+                            checked = True
+                    elif event == "data" and field is not None:
+                        field += value
+                        if len(field) > MAX_FIELD_BYTES:
+                            raise HttpError(413, {"error": "Form field too large", "limit": MAX_FIELD_BYTES})
+                    elif event == "end":
+                        if field is not None:
+                            form.fields[name] = field.decode("utf-8", errors="replace")
+                        elif upload is not None and upload.size and not checked:
+                            check(upload.head)
+                        field, upload = None, None
+            parser.close()
+        except ValueError as error:
+            form.close()
+            raise HttpError(400, {"error": "Malformed multipart body", "details": str(error)}) from None
+        except BaseException:
+            form.close()
+            raise
+        return form
+
+    def _respond(self, text: str, language: str) -> Dict[str, Any]:
+        intent = Intent(self._classifier.intent_of(text)).value
+        if intent == "eligibility":
+            return {**ELIGIBILITY_RESPONSES[language], "intent": intent, "confidence": 0.95}
+        if intent == "grievance":
+            document = grievance_document(language)
+            self.documents.put(str(uuid.uuid4()), document)
+            return {"response": GRIEVANCE_RESPONSES[language], "intent": intent, "confidence": 0.92, "document": document}
+        return {"response": INQUIRY_RESPONSES[language], "intent": intent, "confidence": 0.8}
+
+    async def _compose(self, text: str, language: str) -> Dict[str, Any]:
+        await asyncio.sleep(self.response_seconds)
+        return self._respond(text, language)
+
+    async def _ocr(self, upload: UploadBuffer, language: str, header: Optional[ImageHeader] = None) -> Dict[str, Any]:
+        extra: Dict[str, Any] = {}
+        if self.images is not None and header is not None:
+            with self.tracer.span("ocr.preprocess"):
+                try:
+                    processed = await self.images.process_async(upload.view(), header)
+                except ImageRejected as error:
+                    raise HttpError(400, {"error": error.message})
+            extra["preprocessing"] = processed.as_dict()
+        await asyncio.sleep(self.ocr_seconds)
+        return {**MOCK_OCR[language], "confidence": 0.89, "documentType": "hospital_bill", **extra}
+
+    def _record_turn(self, session_id: str, language: str, text: str, response: Dict[str, Any]) -> None:
+        session = self.sessions.get(session_id) or {
+            "sessionId": session_id, "language": language, "conversationHistory": [], "createdAt": iso_timestamp(),
+        }
+        session["conversationHistory"].append({
+            "timestamp": iso_timestamp(), "userInput": text, "systemResponse": response["response"], "intent": response["intent"],
+        })
+        # Put again so the store re-measures the grown history
+        self.sessions.put(session_id, session)
+
+
+def _language(fields: Dict[str, Any]) -> str:
+    language = fields.get("language") or Language.ENGLISH.value
+    if language not in (Language.HINDI.value, Language.ENGLISH.value):
+        raise HttpError(400, {"error": f"Unsupported language: {language}"})
+    return language
+
+
+def create_app(**kwargs: Any) -> BackendApp:
+    """Application factory for ASGI servers"""
+    return BackendApp(**kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Minimal HTTP/1.1 server
+# ---------------------------------------------------------------------------
+
+class _BodyReader:
+    """ASGI ``receive`` that reads at most one chunk from the socket per call"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: Dict[str, str]):
+        self._reader = reader
+        self._writer = writer
+        self._chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        self._remaining = 0 if self._chunked else int(headers.get("content-length") or 0)
+        self._expect_continue = headers.get("expect", "").lower() == "100-continue"
+        self.complete = False
+
+    async def receive(self) -> Dict[str, Any]:
+        if self.complete:
+            return {"type": "http.disconnect"}
+        if self._expect_continue:
+            # Only now does the client start sending, so refused uploads never travel
+            self._expect_continue = False
+            self._writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        try:
+            data = await self._read()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            return {"type": "http.disconnect"}
+        return {"type": "http.request", "body": data, "more_body": not self.complete}
+
+    async def _read(self) -> bytes:
+        if self._chunked and self._remaining == 0:
+            size = int((await self._reader.readline()).split(b";")[0].strip(), 16)
+            if size == 0:
+                while (await self._reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self.complete = True
+                return b""
+            self._remaining = size
+        if self._remaining == 0:
+            self.complete = True
+            return b""
+        data = await self._reader.read(min(self._remaining, READ_CHUNK_BYTES))
+        if not data:
+            raise ConnectionResetError("Connection closed mid-body")
+        self._remaining -= len(data)
+        if self._remaining == 0:
+            if self._chunked:
+                await self._reader.readexactly(2)
+            else:
+                self.complete = True
+        return data
+
+
+class _ResponseWriter:
+    """ASGI ``send`` writing an HTTP/1.1 response to the stream"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self._writer = writer
+        self.started = False
+        self.finished = False
+        self.close = False
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in message.get("headers", [])]
+            names = {name.lower() for name, _ in headers}
+            self.close = "content-length" not in names or any(
+                name.lower() == "connection" and value.lower() == "close" for name, value in headers)
+            if self.close and "connection" not in names:
+                headers.append(("connection", "close"))
+            self._writer.write(
+                f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}\r\n".encode()
+                + "".join(f"{name}: {value}\r\n" for name, value in headers).encode("latin-1")
+                + b"\r\n"
+            )
+            self.started = True
+        elif message["type"] == "http.response.body":
+            self._writer.write(message.get("body", b""))
+            if not message.get("more_body", False):
+                self.finished = True
+            await self._writer.drain()
+
+
+async def _linger(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Discard what the client is still sending so it reads the response before the close"""
+    # Closing with unread data sends a reset, which can destroy the response in flight
+    try:
+        writer.write_eof()
+
+        async def drain():
+            while await reader.read(READ_CHUNK_BYTES):
+                pass
+
+        await asyncio.wait_for(drain(), LINGER_SECONDS)
+    except (ConnectionError, OSError, asyncio.TimeoutError):
+        pass
+
+
+class HttpServer:
+    """
+    Serve an ASGI application over keep-alive HTTP/1.1 on asyncio streams
+
+    Bodies are read only when the application calls ``receive``, one chunk
+    at a time, and the stream reader is capped at one chunk, so an upload
+    nobody is reading stays in the client's socket buffers.
+    """
+
+    def __init__(self, app: Callable[[Scope, Receive, Send], Awaitable[None]]):
+        self.app = app
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._connections: set = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Listen on ``host:port`` (any free port by default) and return the base URL"""
+        self._server = await asyncio.start_server(self._serve, host, port, limit=STREAM_LIMIT_BYTES)
+        bound_host, bound_port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{bound_host}:{bound_port}"
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for handler in self._connections:
+            handler.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        handler = asyncio.current_task()
+        self._connections.add(handler)
+        client = writer.get_extra_info("peername")
+        # Selector transports otherwise recv up to 256 KiB past the reader's limit
+        writer.transport.max_size = STREAM_LIMIT_BYTES
+        try:
+            while True:
+                try:
+                    request_line, headers = await read_head(reader)
+                    method, target, version = request_line.split(" ", 2)
+                except (ConnectionError, ValueError):
+                    return
+                path, _, query = target.partition("?")
+                scope = {
+                    "type": "http", "asgi": {"version": "3.0"}, "http_version": version.partition("/")[2] or "1.1",
+                    "method": method.upper(), "scheme": "http", "path": urllib.parse.unquote(path),
+                    "raw_path": path.encode("latin-1"), "query_string": query.encode("latin-1"), "root_path": "",
+                    "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()],
+                    "client": client, "server": writer.get_extra_info("sockname"),
+                }
+                body = _BodyReader(reader, writer, headers)
+                response = _ResponseWriter(writer)
+                try:
+                    await self.app(scope, body.receive, response.send)
+                except Exception:
+                    if not response.started:
+                        await response.send({"type": "http.response.start", "status": 500, "headers": [(b"content-length", b"0")]})
+                        await response.send({"type": "http.response.body", "body": b""})
+                    return
+                if response.finished and not body.complete:
+                    await _linger(reader, writer)
+                if not (response.finished and body.complete) or response.close or headers.get("connection", "").lower() == "close":
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(handler)
+            writer.close()
+
+
+# ---------------------------------------------------------------------------
+# Concurrent upload benchmark
+# ---------------------------------------------------------------------------
+
+async def _slow_upload(url: str, body: bytes, content_type: str, pieces: int, pause: float) -> Tuple[int, float]:
+    """Send one voice upload in ``pieces`` with ``pause`` seconds between them"""
+    parsed = urllib.parse.urlsplit(url)
+    started = time.perf_counter()
+    reader, writer = await asyncio.open_connection(parsed.hostname, parsed.port)
+    try:
+        writer.write(
+            f"POST {ENDPOINTS['voice']} HTTP/1.1\r\nHost: {parsed.netloc}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        )
+        step = -(-len(body) // pieces)
+        try:
+            for offset in range(0, len(body), step):
+                writer.write(body[offset:offset + step])
+                await writer.drain()
+                await asyncio.sleep(pause)
+        except ConnectionError:
+            # Refused early; the response is still waiting to be read
+            pass
+        status_line, _ = await read_head(reader)
+        await reader.read()
+        return int(status_line.split(" ", 2)[1]), time.perf_counter() - started
+    finally:
+        writer.close()
+
+
+def _anonymous_rss_mb() -> Optional[float]:
+    """Resident heap and stack, leaving out mapped files such as spilled uploads (Linux only)"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _bench_server(connection: Any, options: Dict[str, Any]) -> None:
+    """Serve in a process of its own, so its memory is not mixed with the clients'"""
+    async def run():
+        app = create_app(**options)
+        server = HttpServer(app)
+        start, peak = _anonymous_rss_mb(), [0.0]
+
+        async def sample():
+            while True:
+                peak[0] = max(peak[0], _anonymous_rss_mb() or 0.0)
+                await asyncio.sleep(0.05)
+
+        sampler = asyncio.ensure_future(sample())
+        connection.send(await server.start())
+        await asyncio.get_running_loop().run_in_executor(None, connection.recv)
+        sampler.cancel()
+        await server.close()
+        await app.close()
+        connection.send({
+            "budget": app.budget.as_dict(), "speech": app.queues["speech"].stats(),
+            "anonymousGrowthMb": None if start is None else peak[0] - start,
+        })
+
+    asyncio.run(run())
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Serve the backend, or measure memory under many concurrent slow uploads"""
+    import argparse
+    import multiprocessing
+
+    from .loadgen import encode_multipart
+    from .stage_bench import percentile
+    from .synthetic_audio import default_corpus
+
+    parser = argparse.ArgumentParser(description="Async reference backend with streaming uploads")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--bench", action="store_true", help="run the concurrent upload benchmark instead of serving")
+    parser.add_argument("--uploads", type=int, default=300, help="bench: concurrent voice uploads")
+    parser.add_argument("--upload-kb", type=int, default=1024, help="bench: size of each upload")
+    parser.add_argument("--pieces", type=int, default=32, help="bench: writes per upload")
+    parser.add_argument("--pause", type=float, default=0.02, help="bench: seconds between writes")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--memory-budget-mb", type=float, default=DEFAULT_MEMORY_BUDGET / 1024 / 1024)
+    parser.add_argument("--admission-timeout", type=float, default=DEFAULT_ADMISSION_TIMEOUT)
+    parser.add_argument("--preprocess-images", action="store_true", help="check and shrink images before OCR")
+    args = parser.parse_args(argv)
+
+    options = {
+        "workers": args.workers, "queue_size": args.queue_size,
+        "memory_budget": int(args.memory_budget_mb * 1024 * 1024), "admission_timeout": args.admission_timeout,
+    }
+
+    if not args.bench:
+        app = create_app(**options, images=ImagePreprocessor() if args.preprocess_images else None)
+
+        async def run_server():
+            server = HttpServer(app)
+            print(f"{SERVICE_NAME} on {await server.start(args.host, args.port)}")
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await server.close()
+                await app.close()
+
+        try:
+            asyncio.run(run_server())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    corpus = default_corpus()
+    clip = corpus.payload(corpus.find("speech", 16000, 1)[0], args.upload_kb * 1024)
+    content_type, body = encode_multipart({"language": "en"}, {"audio": ("clip.wav", "audio/wav", bytes(clip.data))})
+
+    context = multiprocessing.get_context("spawn")
+    connection, child_connection = context.Pipe()
+    process = context.Process(target=_bench_server, args=(child_connection, options))
+    process.start()
+    try:
+        url = connection.recv()
+
+        async def uploads():
+            return await asyncio.gather(*(
+                _slow_upload(url, body, content_type, args.pieces, args.pause) for _ in range(args.uploads)))
+
+        started = time.perf_counter()
+        results = asyncio.run(uploads())
+        elapsed = time.perf_counter() - started
+        connection.send("stop")
+        stats = connection.recv()
+    finally:
+        process.join(10)
+
+    latencies = sorted(latency for status, latency in results if status == 200)
+    print(f"{args.uploads} concurrent uploads of {len(body) / 1024:.0f} KB in {elapsed:.1f} s")
+    for status in sorted({status for status, _ in results}):
+        print(f"  HTTP {status}: {sum(1 for code, _ in results if code == status)}")
+    if latencies:
+        print(f"  latency p50 {percentile(latencies, 50):.2f} s, p99 {percentile(latencies, 99):.2f} s")
+    budget = stats["budget"]
+    print(f"  upload memory peak {budget['peak'] / 1024 / 1024:.1f} MB of a {budget['limit'] / 1024 / 1024:.1f} MB budget, {budget['spills']} spilled to disk")
+    if stats["anonymousGrowthMb"] is not None:
+        print(f"  server heap grew {stats['anonymousGrowthMb']:.1f} MB at peak; buffering every upload would hold {args.uploads * len(body) / 1024 / 1024:.0f} MB")
+    print(f"  speech queue: {stats['speech']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,383 @@
+"""
+Audio container inspector
+
+Reads just enough of a WAV, MP3 or M4A file to know its real sample rate,
+channel layout and duration. The speech processor used to assume 16kHz, 16-bit
+mono (32KB/s) for every clip, so a 48kHz stereo recording looked six times
+shorter than it was and the 2-minute limit was enforced on the wrong numbers.
+
+WebM and Ogg, the containers browsers record to, are recognised so uploads
+from the frontend are accepted, but their headers carry no duration and are
+not inspected.
+
+Only headers are touched: ``inspect_audio`` works on ``bytes``, ``memoryview``
+and ``mmap`` objects alike, so multi-megabyte files can be inspected through
+``inspect_file`` without reading their bodies.
+"""
+
+import mmap
+import struct
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple, Union
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+# Number of header bytes needed by ``detect_audio_format``
+FORMAT_HEADER_SIZE = 12
+
+# Size of the canonical PCM header written by ``wav_header``
+WAV_HEADER_SIZE = 44
+
+# Guard against pathological files with thousands of tiny chunks or boxes
+MAX_CONTAINER_ENTRIES = 1024
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_ALAW = 0x0006
+WAVE_FORMAT_MULAW = 0x0007
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+WAVE_CODECS = {
+    WAVE_FORMAT_PCM: "pcm",
+    WAVE_FORMAT_IEEE_FLOAT: "float",
+    WAVE_FORMAT_ALAW: "alaw",
+    WAVE_FORMAT_MULAW: "mulaw",
+}
+
+# MPEG audio lookup tables, indexed by the header bit fields
+MPEG_VERSIONS = {0b00: 2.5, 0b10: 2, 0b11: 1}
+MPEG_LAYERS = {0b01: 3, 0b10: 2, 0b11: 1}
+MPEG_SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    2.5: (11025, 12000, 8000),
+}
+MPEG_BITRATES_KBPS = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# MP4 boxes that only contain other boxes on the path to the audio sample entry
+MP4_CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+
+class AudioFormatError(ValueError):
+    """Raised when audio headers are missing, truncated or inconsistent"""
+
+
+@dataclass(frozen=True)
+class AudioInfo:
+    """Stream parameters recovered from a container header"""
+
+    format: str
+    codec: str
+    sample_rate: int
+    channels: int
+    duration: float
+    data_offset: int
+    data_size: int
+    bytes_per_second: float
+    bits_per_sample: Optional[int] = None
+    block_align: int = 0
+
+    def byte_limit_for(self, max_seconds: float) -> int:
+        """Buffer length that keeps at most ``max_seconds`` of audio"""
+        if max_seconds >= self.duration:
+            return self.data_offset + self.data_size
+        if self.block_align:
+            frames = int(max_seconds * self.sample_rate)
+            return self.data_offset + frames * self.block_align
+        return self.data_offset + int(max_seconds * self.bytes_per_second)
+
+
+def detect_audio_format(header: Buffer) -> Optional[str]:
+    """Identify the container from its magic bytes: validateAudioQuality's formats plus WebM and Ogg"""
+    if len(header) < FORMAT_HEADER_SIZE:
+        return None
+
+    header = bytes(header[:FORMAT_HEADER_SIZE])
+
+    if header[0:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[0:3] == b"ID3" or (header[0] == 0xFF and (header[1] & 0xE0) == 0xE0):
+        return "mp3"
+    if header[4:8] == b"ftyp":
+        return "m4a"
+    if header[0:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if header[0:4] == b"OggS":
+        return "ogg"
+    return None
+
+
+def inspect_audio(buffer: Buffer) -> AudioInfo:
+    """Parse the container header of ``buffer`` without touching the audio body"""
+    audio_format = detect_audio_format(buffer)
+    if audio_format == "wav":
+        return _inspect_wav(buffer)
+    if audio_format == "mp3":
+        return _inspect_mp3(buffer)
+    if audio_format == "m4a":
+        return _inspect_m4a(buffer)
+    if audio_format is not None:
+        raise AudioFormatError(f"{audio_format} headers are recognised but not inspected")
+    raise AudioFormatError("Invalid or unsupported audio format")
+
+
+def inspect_file(path: str) -> AudioInfo:
+    """Inspect an audio file through a read-only memory map"""
+    with open(path, "rb") as handle:
+        try:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            raise AudioFormatError("Audio data is empty") from None
+        with mapped:
+            return inspect_audio(mapped)
+
+
+def wav_header(sample_rate: int, channels: int, bits_per_sample: int, data_size: int) -> bytes:
+    """Canonical 44-byte PCM WAV header for ``data_size`` bytes of samples"""
+    block_align = channels * bits_per_sample // 8
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, WAVE_FORMAT_PCM, channels, sample_rate,
+        sample_rate * block_align, block_align, bits_per_sample,
+        b"data", data_size,
+    )
+
+
+def _read(buffer: Buffer, offset: int, size: int) -> bytes:
+    """Copy out a small header slice, failing if the buffer is too short"""
+    if offset < 0 or offset + size > len(buffer):
+        raise AudioFormatError("Audio header is truncated")
+    return bytes(buffer[offset:offset + size])
+
+
+# ---------------------------------------------------------------------------
+# WAV / RIFF
+# ---------------------------------------------------------------------------
+
+def _riff_chunks(buffer: Buffer) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield ``(chunk_id, body_offset, declared_size)`` for each RIFF chunk"""
+    offset = 12
+    for _ in range(MAX_CONTAINER_ENTRIES):
+        if offset + 8 > len(buffer):
+            return
+        chunk_id, size = struct.unpack("<4sI", _read(buffer, offset, 8))
+        if not all(0x20 <= byte <= 0x7E for byte in chunk_id):
+            raise AudioFormatError(f"Malformed RIFF chunk at offset {offset}")
+        yield chunk_id, offset + 8, size
+        # Chunk bodies are padded to an even length
+        offset += 8 + size + (size & 1)
+    raise AudioFormatError("Too many RIFF chunks")
+
+
+def _inspect_wav(buffer: Buffer) -> AudioInfo:
+    fmt = None
+    for chunk_id, body, size in _riff_chunks(buffer):
+        if chunk_id == b"fmt ":
+            if size < 16:
+                raise AudioFormatError("WAV fmt chunk is too short")
+            fmt = _read(buffer, body, min(size, 40))
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise AudioFormatError("WAV data chunk precedes fmt chunk")
+            available = len(buffer) - body
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF; truncated files overstate it
+            if size in (0, 0xFFFFFFFF) or size > available:
+                size = max(0, available)
+            return _wav_info(fmt, body, size)
+    raise AudioFormatError("WAV file has no data chunk")
+
+
+def _wav_info(fmt: bytes, data_offset: int, data_size: int) -> AudioInfo:
+    format_tag, channels, sample_rate, _, block_align, bits = struct.unpack_from("<HHIIHH", fmt)
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        # The first two bytes of the sub-format GUID carry the real format tag
+        format_tag = struct.unpack_from("<H", fmt, 24)[0]
+
+    if channels == 0 or sample_rate == 0 or block_align == 0:
+        raise AudioFormatError("WAV fmt chunk declares an empty stream")
+
+    bytes_per_second = float(sample_rate * block_align)
+    return AudioInfo(
+        format="wav",
+        codec=WAVE_CODECS.get(format_tag, f"0x{format_tag:04x}"),
+        sample_rate=sample_rate,
+        channels=channels,
+        duration=(data_size // block_align) / sample_rate,
+        data_offset=data_offset,
+        data_size=data_size,
+        bytes_per_second=bytes_per_second,
+        bits_per_sample=bits,
+        block_align=block_align,
+    )
+
+
+# ---------------------------------------------------------------------------
+# MP3
+# ---------------------------------------------------------------------------
+
+def _id3v2_size(buffer: Buffer) -> int:
+    """Bytes taken by a leading ID3v2 tag: 10-byte header, syncsafe body size, optional footer"""
+    if _read(buffer, 0, 3) != b"ID3":
+        return 0
+    flags = _read(buffer, 5, 1)[0]
+    size_bytes = _read(buffer, 6, 4)
+    if any(byte & 0x80 for byte in size_bytes):
+        raise AudioFormatError("Invalid ID3v2 tag size")
+    size = (size_bytes[0] << 21) | (size_bytes[1] << 14) | (size_bytes[2] << 7) | size_bytes[3]
+    return 10 + size + (10 if flags & 0x10 else 0)
+
+
+def _inspect_mp3(buffer: Buffer) -> AudioInfo:
+    # Tagged files carry their metadata, often cover art, ahead of the first frame
+    offset = _id3v2_size(buffer)
+    b0, b1, b2, b3 = _read(buffer, offset, 4)
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        raise AudioFormatError("Invalid MPEG audio frame header")
+    version = MPEG_VERSIONS.get((b1 >> 3) & 0b11)
+    layer = MPEG_LAYERS.get((b1 >> 1) & 0b11)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0b11
+    if version is None or layer is None or rate_index == 0b11 or bitrate_index in (0, 15):
+        raise AudioFormatError("Invalid MPEG audio frame header")
+
+    sample_rate = MPEG_SAMPLE_RATES[version][rate_index]
+    bitrate = MPEG_BITRATES_KBPS[(1 if version == 1 else 2, layer)][bitrate_index] * 1000
+    channels = 1 if (b3 >> 6) == 0b11 else 2
+    if layer == 1:
+        samples_per_frame = 384
+    elif layer == 3 and version != 1:
+        samples_per_frame = 576
+    else:
+        samples_per_frame = 1152
+
+    data_size = len(buffer) - offset
+    duration = data_size * 8 / bitrate
+
+    # A Xing/Info header in the first frame gives the exact frame count for VBR files
+    if layer == 3:
+        if version == 1:
+            side_info = 17 if channels == 1 else 32
+        else:
+            side_info = 9 if channels == 1 else 17
+        xing_offset = offset + 4 + side_info
+        if xing_offset + 12 <= len(buffer) and _read(buffer, xing_offset, 4) in (b"Xing", b"Info"):
+            flags, frames = struct.unpack(">II", _read(buffer, xing_offset + 4, 8))
+            if flags & 0x1 and frames:
+                duration = frames * samples_per_frame / sample_rate
+
+    return AudioInfo(
+        format="mp3",
+        codec=f"mpeg{version}-layer{layer}",
+        sample_rate=sample_rate,
+        channels=channels,
+        duration=duration,
+        data_offset=offset,
+        data_size=data_size,
+        bytes_per_second=data_size / duration if duration else bitrate / 8,
+    )
+
+
+# ---------------------------------------------------------------------------
+# M4A / MP4
+# ---------------------------------------------------------------------------
+
+def _mp4_boxes(buffer: Buffer, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield ``(box_type, body_offset, body_end)`` for the boxes in ``[start, end)``"""
+    offset = start
+    for _ in range(MAX_CONTAINER_ENTRIES):
+        if offset + 8 > end:
+            return
+        size, box_type = struct.unpack(">I4s", _read(buffer, offset, 8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", _read(buffer, offset + 8, 8))[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            raise AudioFormatError(f"Malformed MP4 box at offset {offset}")
+        yield box_type, offset + header, min(offset + size, end)
+        offset += size
+    raise AudioFormatError("Too many MP4 boxes")
+
+
+def _inspect_m4a(buffer: Buffer) -> AudioInfo:
+    timescale = duration_units = None
+    sample_rate = channels = bits = None
+    data_offset, data_size = 0, 0
+
+    stack = [(0, len(buffer))]
+    while stack:
+        start, end = stack.pop()
+        for box_type, body, body_end in _mp4_boxes(buffer, start, end):
+            if box_type in MP4_CONTAINER_BOXES:
+                stack.append((body, body_end))
+            elif box_type == b"mvhd":
+                version = _read(buffer, body, 1)[0]
+                if version == 1:
+                    timescale, duration_units = struct.unpack(">IQ", _read(buffer, body + 20, 12))
+                else:
+                    timescale, duration_units = struct.unpack(">II", _read(buffer, body + 12, 8))
+            elif box_type == b"stsd" and sample_rate is None:
+                # Skip version/flags and entry count to reach the first sample entry header
+                entry = body + 8 + 8
+                channels, bits = struct.unpack(">HH", _read(buffer, entry + 16, 4))
+                sample_rate = struct.unpack(">I", _read(buffer, entry + 24, 4))[0] >> 16
+            elif box_type == b"mdat":
+                data_offset, data_size = body, body_end - body
+
+    if not timescale or duration_units is None:
+        raise AudioFormatError("M4A file has no movie header")
+
+    duration = duration_units / timescale
+    return AudioInfo(
+        format="m4a",
+        codec="aac",
+        sample_rate=sample_rate or timescale,
+        channels=channels or 1,
+        duration=duration,
+        data_offset=data_offset,
+        data_size=data_size,
+        bytes_per_second=data_size / duration if duration else 0.0,
+        bits_per_sample=bits,
+    )
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Print the header of each file as JSON; exit non-zero if any is invalid or too long"""
+    import argparse
+    import json
+    from dataclasses import asdict
+
+    parser = argparse.ArgumentParser(description="Inspect audio container headers")
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--max-duration", type=float, default=120.0, help="limit in seconds (default: 120)")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for path in args.paths:
+        try:
+            info = inspect_file(path)
+        except (AudioFormatError, OSError) as error:
+            print(json.dumps({"path": path, "error": str(error)}))
+            status = 1
+            continue
+        report = dict(asdict(info), path=path, withinLimit=info.duration <= args.max_duration)
+        if not report["withinLimit"]:
+            report["truncateAt"] = info.byte_limit_for(args.max_duration)
+            status = 1
+        print(json.dumps(report))
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
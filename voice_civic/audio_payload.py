@@ -0,0 +1,226 @@
+"""
+Decode-once audio payload
+
+The speech processor receives audio as a base64 string (``audioData``). Every
+consumer used to call ``base64.b64decode`` on it independently, which for a
+multi-megabyte clip dominates CPU time and peak memory. ``AudioPayload``
+decodes once, keeps the bytes behind a read-only ``memoryview`` and caches the
+metadata derived from them.
+
+``decoded_size`` and ``peek_base64`` answer "how big is it and what format
+is it" from the string's length, its final quantum and its first few
+quanta, so requests can be checked without decoding them at all.
+"""
+
+import base64
+import binascii
+import mmap
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Optional, Tuple, Union
+
+from .audio_inspector import (
+    FORMAT_HEADER_SIZE,
+    AudioFormatError,
+    AudioInfo,
+    detect_audio_format,
+    inspect_audio,
+)
+
+if TYPE_CHECKING:
+    from .audio_quality import QualityAssessment
+
+# Assumed PCM layout when the container cannot be parsed: 16kHz, 16-bit mono
+DEFAULT_BYTES_PER_SECOND = 16000 * 2
+
+
+# strict_mode (3.11+) validates while decoding instead of in a separate pass
+try:
+    binascii.a2b_base64("", strict_mode=True)
+    _STRICT = True
+except TypeError:
+    _STRICT = False
+
+
+def decoded_size(encoded: str) -> int:
+    """
+    Byte length ``encoded`` decodes to, from its length and padding alone
+
+    Raises ValueError when the string cannot be strict base64 whatever its
+    body holds: non-ASCII text, a length that is not a multiple of four or
+    a malformed final quantum. Every check is constant time (``isascii`` is
+    a flag on ``str``); characters before the final quantum are left to the
+    decoder.
+    """
+    if not isinstance(encoded, str) or not encoded.isascii():
+        raise ValueError("Base64 data must be an ASCII string")
+    length = len(encoded)
+    if length % 4:
+        raise ValueError(f"Base64 length {length} is not a multiple of 4")
+    if not length:
+        return 0
+    try:
+        tail = binascii.a2b_base64(encoded[-4:], strict_mode=True) if _STRICT else base64.b64decode(encoded[-4:], validate=True)
+    except binascii.Error as error:
+        raise ValueError(f"Invalid final base64 quantum: {error}") from error
+    return (length - 4) // 4 * 3 + len(tail)
+
+
+def peek_base64(encoded: str, size: int) -> bytes:
+    """Decode only the quanta covering the first ``size`` bytes of ``encoded``"""
+    head = encoded[:-(-size // 3) * 4]
+    try:
+        return base64.b64decode(head, validate=True)[:size]
+    except binascii.Error as error:
+        raise ValueError(f"Invalid base64 header: {error}") from error
+
+
+# Bytes Buffer.from(..., "base64") decodes; every other byte is skipped
+_BASE64_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/-_"
+_NOT_BASE64 = bytes(sorted(set(range(256)) - set(_BASE64_ALPHABET)))
+_URL_SAFE = bytes.maketrans(b"-_", b"+/")
+
+
+# Characters filtered at each end of a long string; the rest are assumed legal
+LENIENT_WINDOW = 256
+
+
+def _node_base64_chars(text: str) -> Tuple[bytes, bool]:
+    """The characters of ``text`` that ``Buffer.from`` decodes, and whether an "=" ended them"""
+    body, stop, _ = text.encode("utf-16-le", "surrogatepass")[::2].partition(b"=")
+    return body.translate(_URL_SAFE, _NOT_BASE64), bool(stop)
+
+
+def lenient_base64_head(encoded: str, size: int) -> Tuple[int, bytes]:
+    """
+    Length and first ``size`` bytes of ``Buffer.from(encoded, "base64")``
+
+    Node never rejects base64: it reads the low byte of each UTF-16 code
+    unit, skips anything outside the standard and URL-safe alphabets and
+    stops at the first "=". Only the first and last ``LENIENT_WINDOW``
+    characters are filtered that way, so the cost does not depend on the
+    length of the string. As in ``decoded_size``, characters in between are
+    assumed to be legal: a line-wrapped or "="-joined string is sized as if
+    its middle were plain base64.
+    """
+    if len(encoded) <= 2 * LENIENT_WINDOW:
+        head, _ = _node_base64_chars(encoded)
+        legal = len(head)
+    else:
+        head, stopped = _node_base64_chars(encoded[:LENIENT_WINDOW])
+        legal = len(head)
+        if not stopped:
+            tail, _ = _node_base64_chars(encoded[-LENIENT_WINDOW:])
+            legal += len(encoded) - 2 * LENIENT_WINDOW + len(tail)
+    head = head[:-(-size // 3) * 4]
+    # A single character left over at the end holds too few bits for a byte
+    head = head[:len(head) - (len(head) % 4 == 1)]
+    decoded = binascii.a2b_base64(head + b"=" * (-len(head) % 4))[:size]
+    return legal // 4 * 3 + (0, 0, 1, 2)[legal % 4], decoded
+
+
+class AudioPayload:
+    """
+    Audio bytes decoded exactly once and shared as a zero-copy view
+
+    Construct directly from raw bytes (no base64 round trip at all) or with
+    ``from_base64`` when starting from an ``audioData`` string. The base64 form
+    is re-encoded lazily, only if somebody asks for it.
+    """
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview], encoded: Optional[str] = None):
+        view = data if isinstance(data, memoryview) else memoryview(data)
+        self._view = view.toreadonly().cast("B")
+        self._encoded = encoded
+
+    @classmethod
+    def from_base64(cls, encoded: str) -> "AudioPayload":
+        """Decode an ``audioData`` string, raising ValueError if it is not valid base64"""
+        try:
+            # Malformed lengths and padding are refused before the full decode
+            decoded_size(encoded)
+            data = binascii.a2b_base64(encoded, strict_mode=True) if _STRICT else base64.b64decode(encoded, validate=True)
+        except (binascii.Error, TypeError, ValueError) as error:
+            raise ValueError(f"Invalid base64 audio data: {error}") from error
+        return cls(data, encoded)
+
+    @classmethod
+    def coerce(cls, value: Any) -> "AudioPayload":
+        """Return ``value`` unchanged if it is already a payload, otherwise decode it"""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return cls(value)
+        return cls.from_base64(value)
+
+    @classmethod
+    def from_file(cls, path: str) -> "AudioPayload":
+        """Memory-map an audio file read-only instead of reading it into memory"""
+        with open(path, "rb") as handle:
+            try:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                return cls(b"")
+        return cls(mapped)
+
+    @property
+    def data(self) -> memoryview:
+        """Read-only view over the decoded bytes"""
+        return self._view
+
+    @property
+    def size(self) -> int:
+        """Decoded size in bytes"""
+        return self._view.nbytes
+
+    @cached_property
+    def encoded(self) -> str:
+        """Base64 form, produced on first access when not supplied"""
+        if self._encoded is None:
+            self._encoded = base64.b64encode(self._view).decode("ascii")
+        return self._encoded
+
+    @cached_property
+    def format(self) -> Optional[str]:
+        """Container format (``wav``, ``mp3``, ``m4a``, ``webm``, ``ogg``) or None when unrecognised"""
+        return detect_audio_format(self._view[:FORMAT_HEADER_SIZE])
+
+    @cached_property
+    def info(self) -> Optional[AudioInfo]:
+        """Parsed container header, or None when the headers are not usable"""
+        try:
+            return inspect_audio(self._view)
+        except AudioFormatError:
+            return None
+
+    @cached_property
+    def estimated_duration(self) -> float:
+        """Duration in seconds from the header, else assuming 16kHz, 16-bit mono PCM"""
+        if self.info is not None:
+            return self.info.duration
+        return self.size / DEFAULT_BYTES_PER_SECOND
+
+    @cached_property
+    def quality(self) -> "QualityAssessment":
+        """Signal-based quality assessment, computed on first access"""
+        from .audio_quality import assess_audio_quality
+
+        return assess_audio_quality(self)
+
+    def truncated(self, max_bytes: int) -> "AudioPayload":
+        """Payload limited to ``max_bytes``, sharing memory with this one"""
+        if self.size <= max_bytes:
+            return self
+        return AudioPayload(self._view[:max_bytes])
+
+    def truncated_to_duration(self, max_seconds: float) -> "AudioPayload":
+        """Payload holding at most ``max_seconds`` of audio, sharing memory with this one"""
+        if self.info is not None:
+            return self.truncated(self.info.byte_limit_for(max_seconds))
+        return self.truncated(int(max_seconds * DEFAULT_BYTES_PER_SECOND))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __repr__(self) -> str:
+        return f"AudioPayload(size={self.size}, format={self.format!r})"
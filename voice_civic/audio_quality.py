@@ -0,0 +1,216 @@
+"""
+Signal-based audio quality analysis
+
+``validateAudioQuality`` in the speech processor judges quality by byte length
+alone, so silent or clipped recordings are sent to a Transcribe job and paid
+for. This analyzer looks at the samples instead: it computes RMS level,
+clipping ratio, silence ratio and an SNR estimate over 20ms frames with NumPy,
+one chunk at a time, and maps them onto ``AudioQuality`` with the same
+issue/recommendation structure the lambda returns.
+
+Compressed formats (MP3, M4A) cannot be decoded here, so they keep the
+size-based rules from the lambda.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from .audio_payload import AudioPayload
+from .pcm import downmix, is_decodable, iter_pcm_chunks
+from .types import AudioQuality
+
+FRAME_SECONDS = 0.02
+
+# Frame RMS below this level counts as silence
+SILENCE_DBFS = -50.0
+# Sample magnitude at or above this level counts as clipped
+CLIP_LEVEL = 0.99
+# Returned when the noise floor is digital silence
+MAX_SNR_DB = 60.0
+
+# Byte-length rules kept from validateAudioQuality for undecodable formats
+MIN_AUDIO_BYTES = 32000
+MAX_AUDIO_BYTES = 10 * 1024 * 1024
+MIN_DURATION_SECONDS = 1.0
+
+QUALITY_ORDER = [AudioQuality.EXCELLENT, AudioQuality.GOOD, AudioQuality.FAIR, AudioQuality.POOR]
+
+
+@dataclass(frozen=True)
+class SignalFeatures:
+    """Level and noise statistics for a decoded recording"""
+
+    duration: float
+    rms_dbfs: float
+    peak: float
+    clipping_ratio: float
+    silence_ratio: float
+    snr_db: float
+
+
+@dataclass
+class QualityAssessment:
+    """Result shape of ``validateAudioQuality``, plus the features behind it"""
+
+    quality: AudioQuality
+    issues: List[str] = field(default_factory=list)
+    recommendations: List[str] = field(default_factory=list)
+    acceptable: bool = True
+    features: Optional[SignalFeatures] = None
+
+
+def _dbfs(power: float) -> float:
+    return 10.0 * math.log10(power) if power > 0 else -math.inf
+
+
+def analyze_signal(payload: AudioPayload, frame_seconds: float = FRAME_SECONDS) -> SignalFeatures:
+    """Compute level, clipping, silence and SNR for a PCM WAV payload"""
+    info = payload.info
+    frame_length = max(1, int(info.sample_rate * frame_seconds))
+    # Whole frames per chunk keep the frame grid aligned across chunk boundaries
+    chunk_frames = frame_length * 256
+
+    total_power = 0.0
+    total_samples = 0
+    clipped = 0
+    peak = 0.0
+    frame_powers = []
+
+    for chunk in iter_pcm_chunks(payload, chunk_frames):
+        if chunk.size:
+            high, low = float(chunk.max()), float(chunk.min())
+            peak = max(peak, high, -low)
+            if high >= CLIP_LEVEL or low <= -CLIP_LEVEL:
+                clipped += int(np.count_nonzero(chunk >= CLIP_LEVEL) + np.count_nonzero(chunk <= -CLIP_LEVEL))
+
+        mono = downmix(chunk)
+        squares = np.square(mono)
+        total_power += float(squares.sum())
+        total_samples += len(mono)
+
+        whole = (len(squares) // frame_length) * frame_length
+        if whole:
+            frame_powers.append(squares[:whole].reshape(-1, frame_length).mean(axis=1))
+
+    powers = np.concatenate(frame_powers) if frame_powers else np.zeros(0, dtype=np.float32)
+    if powers.size:
+        silence_threshold = 10.0 ** (SILENCE_DBFS / 10.0)
+        silence_ratio = float(np.count_nonzero(powers < silence_threshold)) / powers.size
+        noise_floor, signal_level = np.percentile(powers, [10, 90])
+        if signal_level <= 0:
+            snr_db = 0.0
+        elif noise_floor <= 0:
+            snr_db = MAX_SNR_DB
+        else:
+            snr_db = min(MAX_SNR_DB, _dbfs(signal_level / noise_floor))
+    else:
+        silence_ratio, snr_db = 1.0, 0.0
+
+    channel_samples = total_samples * info.channels
+    return SignalFeatures(
+        duration=total_samples / info.sample_rate,
+        rms_dbfs=_dbfs(total_power / total_samples) if total_samples else -math.inf,
+        peak=peak,
+        clipping_ratio=clipped / channel_samples if channel_samples else 0.0,
+        silence_ratio=silence_ratio,
+        snr_db=snr_db,
+    )
+
+
+def _signal_findings(features: SignalFeatures):
+    """Yield ``(severity, issue, recommendation)`` for each problem in the signal"""
+    if features.duration < MIN_DURATION_SECONDS:
+        yield AudioQuality.POOR, "Audio file too small - may be incomplete", "Record at least 2-3 seconds of clear speech"
+
+    mostly_silent = features.silence_ratio >= 0.95 or features.rms_dbfs < -60.0
+    if mostly_silent:
+        yield AudioQuality.POOR, "Audio is mostly silent", "Check that the microphone is not muted and speak clearly"
+    elif features.silence_ratio > 0.8:
+        yield AudioQuality.FAIR, "Long silences in recording", "Start speaking soon after pressing record"
+    elif features.silence_ratio > 0.5:
+        yield AudioQuality.GOOD, "Long silences in recording", "Start speaking soon after pressing record"
+
+    if features.clipping_ratio >= 0.05:
+        yield AudioQuality.POOR, "Audio is clipped or distorted", "Move slightly away from the microphone or speak more softly"
+    elif features.clipping_ratio > 0.01:
+        yield AudioQuality.FAIR, "Audio is clipped or distorted", "Move slightly away from the microphone or speak more softly"
+    elif features.clipping_ratio > 0.001:
+        yield AudioQuality.GOOD, "Audio is slightly clipped", "Move slightly away from the microphone"
+
+    # A noise estimate is meaningless when there is nothing but noise floor
+    if mostly_silent:
+        return
+    if features.snr_db < 10.0:
+        yield AudioQuality.FAIR, "High background noise", "Record in a quieter place"
+    elif features.snr_db < 20.0:
+        yield AudioQuality.GOOD, "Some background noise", "Record in a quieter place"
+
+
+def _size_findings(payload: AudioPayload):
+    """The byte-length and header checks from validateAudioQuality"""
+    if payload.size < MIN_AUDIO_BYTES:
+        yield AudioQuality.POOR, "Audio file too small - may be incomplete", "Record at least 2-3 seconds of clear speech"
+    if payload.size > MAX_AUDIO_BYTES:
+        yield AudioQuality.FAIR, "Audio file too large", "Keep recordings under 2 minutes for best results"
+    if payload.format is None:
+        yield AudioQuality.POOR, "Invalid or unsupported audio format", "Use WAV, MP3, or M4A format"
+
+
+def assess_audio_quality(payload: AudioPayload) -> QualityAssessment:
+    """Rate a recording, using signal features whenever the samples can be decoded"""
+    if payload.size == 0:
+        return QualityAssessment(
+            quality=AudioQuality.POOR,
+            issues=["Audio data is empty"],
+            recommendations=["Please record audio and try again"],
+            acceptable=False,
+        )
+
+    features = None
+    if is_decodable(payload.info):
+        features = analyze_signal(payload)
+        findings = list(_signal_findings(features))
+        if payload.size > MAX_AUDIO_BYTES:
+            findings.append((AudioQuality.FAIR, "Audio file too large", "Keep recordings under 2 minutes for best results"))
+    else:
+        findings = list(_size_findings(payload))
+
+    if not findings:
+        quality = AudioQuality.EXCELLENT
+    else:
+        quality = max((severity for severity, _, _ in findings), key=QUALITY_ORDER.index)
+        # Several minor problems add up, as in validateAudioQuality
+        if len(findings) > 2 and quality != AudioQuality.POOR:
+            quality = AudioQuality.FAIR
+
+    return QualityAssessment(
+        quality=quality,
+        issues=[issue for _, issue, _ in findings],
+        recommendations=[recommendation for _, _, recommendation in findings],
+        acceptable=quality != AudioQuality.POOR,
+        features=features,
+    )
+
+
+def calculate_confidence(assessment: QualityAssessment, transcript_text: str) -> float:
+    """Port of ``calculateConfidence`` from the speech processor lambda"""
+    base_confidence = {
+        AudioQuality.EXCELLENT: 0.95,
+        AudioQuality.GOOD: 0.85,
+        AudioQuality.FAIR: 0.7,
+        AudioQuality.POOR: 0.5,
+    }.get(assessment.quality, 0.8)
+
+    if len(transcript_text) == 0:
+        return 0.1
+
+    if len(transcript_text) < 10:
+        base_confidence *= 0.8
+
+    issue_penalty = len(assessment.issues) * 0.05
+    base_confidence = max(0.1, base_confidence - issue_penalty)
+
+    return min(1.0, base_confidence)
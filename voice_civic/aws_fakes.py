@@ -0,0 +1,244 @@
+"""
+In-process stand-ins for Amazon S3 and Amazon Transcribe
+
+Models the calls ``AWSTranscribeSpeechProcessor`` makes (PutObject,
+GetObject, StartTranscriptionJob, GetTranscriptionJob) with configurable
+latency distributions and failure rates. Every call waits on the running
+event loop's clock, so the fakes run in real time on a normal loop and in
+simulated time on a ``VirtualTimeEventLoop``. Responses use the same field
+names as the AWS SDK so client code reads like the lambda.
+"""
+
+import asyncio
+import json
+import math
+import random
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from .audio_payload import AudioPayload
+from .fixtures import SAMPLE_TRANSCRIPTS
+from .types import Language
+
+
+# ---------------------------------------------------------------------------
+# Latency distributions
+# ---------------------------------------------------------------------------
+
+class Distribution(ABC):
+    """A non-negative random duration in seconds"""
+
+    @abstractmethod
+    def sample(self, rng: random.Random) -> float:
+        """One duration drawn with ``rng``"""
+
+
+@dataclass(frozen=True)
+class Fixed(Distribution):
+    seconds: float
+
+    def sample(self, rng: random.Random) -> float:
+        return self.seconds
+
+
+@dataclass(frozen=True)
+class Uniform(Distribution):
+    low: float
+    high: float
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.uniform(self.low, self.high)
+
+
+@dataclass(frozen=True)
+class LogNormal(Distribution):
+    """Right-skewed latency described by its median and log-space spread"""
+
+    median: float
+    sigma: float
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.lognormvariate(math.log(self.median), self.sigma)
+
+
+class ServiceError(Exception):
+    """A fake AWS call failed, mirroring an SDK service exception"""
+
+    def __init__(self, operation: str, message: str):
+        super().__init__(f"{operation} failed: {message}")
+        self.operation = operation
+
+
+# ---------------------------------------------------------------------------
+# S3
+# ---------------------------------------------------------------------------
+
+class FakeS3:
+    """Bucket/key object store with per-call latency and transient failures"""
+
+    def __init__(
+        self,
+        request_latency: Distribution = LogNormal(0.03, 0.3),
+        bandwidth_bytes_per_second: float = 50e6,
+        failure_rate: float = 0.0,
+        rng: Optional[random.Random] = None,
+    ):
+        self.request_latency = request_latency
+        self.bandwidth_bytes_per_second = bandwidth_bytes_per_second
+        self.failure_rate = failure_rate
+        self._rng = rng or random.Random()
+        self._objects: Dict[str, memoryview] = {}
+        self.calls: Counter = Counter()
+
+    async def _call(self, operation: str, size: int) -> None:
+        self.calls[operation] += 1
+        delay = self.request_latency.sample(self._rng) + size / self.bandwidth_bytes_per_second
+        await asyncio.sleep(delay)
+        if self._rng.random() < self.failure_rate:
+            raise ServiceError(operation, "ServiceUnavailable")
+
+    async def put_object(self, Bucket: str, Key: str, Body=b"", **_: object) -> dict:
+        # Keep a read-only view rather than copying multi-megabyte uploads
+        body = AudioPayload.coerce(Body).data if not isinstance(Body, str) else Body.encode("utf-8")
+        await self._call("PutObject", len(body))
+        self._objects[f"{Bucket}/{Key}"] = body
+        return {"ETag": f'"{zlib.crc32(body[:4096]):08x}"'}
+
+    async def get_object(self, Bucket: str, Key: str) -> dict:
+        body = self._objects.get(f"{Bucket}/{Key}")
+        await self._call("GetObject", len(body or b""))
+        if body is None:
+            raise ServiceError("GetObject", "NoSuchKey")
+        return {"Body": bytes(body), "ContentLength": len(body)}
+
+    def peek(self, bucket: str, key: str) -> Optional[memoryview]:
+        """Read an object without a modelled call, for the fake Transcribe service"""
+        return self._objects.get(f"{bucket}/{key}")
+
+    def store(self, bucket: str, key: str, body: bytes) -> None:
+        """Write an object without a modelled call, as a service writing its output"""
+        self._objects[f"{bucket}/{key}"] = memoryview(body)
+
+
+# ---------------------------------------------------------------------------
+# Transcribe
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _Job:
+    name: str
+    language_code: str
+    output_bucket: str
+    output_key: str
+    ready_at: float
+    text: str
+    failure_reason: Optional[str] = None
+    written: bool = False
+
+
+class FakeTranscribe:
+    """
+    Batch transcription job lifecycle: IN_PROGRESS until a sampled completion time
+
+    Completion takes ``completion_time`` plus ``realtime_factor`` seconds per
+    second of audio. Jobs fail with probability ``job_failure_rate``;
+    individual API calls fail with ``api_failure_rate``. The transcript JSON
+    is written to the output bucket when the job completes.
+    """
+
+    def __init__(
+        self,
+        s3: FakeS3,
+        completion_time: Distribution = LogNormal(2.5, 0.4),
+        realtime_factor: float = 0.05,
+        api_latency: Distribution = LogNormal(0.05, 0.3),
+        job_failure_rate: float = 0.0,
+        api_failure_rate: float = 0.0,
+        rng: Optional[random.Random] = None,
+        job_rng: Optional[random.Random] = None,
+    ):
+        self.s3 = s3
+        self.completion_time = completion_time
+        self.realtime_factor = realtime_factor
+        self.api_latency = api_latency
+        self.job_failure_rate = job_failure_rate
+        self.api_failure_rate = api_failure_rate
+        self._rng = rng or random.Random()
+        # Job outcomes draw from their own stream so they do not depend on how often clients poll
+        self._job_rng = job_rng or random.Random(self._rng.random())
+        self._jobs: Dict[str, _Job] = {}
+        self.calls: Counter = Counter()
+
+    async def _call(self, operation: str) -> None:
+        self.calls[operation] += 1
+        await asyncio.sleep(self.api_latency.sample(self._rng))
+        if self._rng.random() < self.api_failure_rate:
+            raise ServiceError(operation, "ThrottlingException")
+
+    async def start_transcription_job(
+        self,
+        TranscriptionJobName: str,
+        LanguageCode: str,
+        Media: dict,
+        OutputBucketName: str,
+        OutputKey: str,
+        **_: object,
+    ) -> dict:
+        await self._call("StartTranscriptionJob")
+        if TranscriptionJobName in self._jobs:
+            raise ServiceError("StartTranscriptionJob", "ConflictException")
+
+        bucket, _, key = Media["MediaFileUri"][len("s3://"):].partition("/")
+        audio = self.s3.peek(bucket, key)
+        if audio is None:
+            raise ServiceError("StartTranscriptionJob", "BadRequestException: media not found")
+
+        audio_seconds = AudioPayload(audio).estimated_duration
+        duration = self.completion_time.sample(self._job_rng) + audio_seconds * self.realtime_factor
+        failed = self._job_rng.random() < self.job_failure_rate
+        language = Language.HINDI if LanguageCode.startswith("hi") else Language.ENGLISH
+
+        job = _Job(
+            name=TranscriptionJobName,
+            language_code=LanguageCode,
+            output_bucket=OutputBucketName,
+            output_key=OutputKey,
+            ready_at=asyncio.get_running_loop().time() + duration,
+            text=self._job_rng.choice(SAMPLE_TRANSCRIPTS[language]),
+            failure_reason="Internal failure" if failed else None,
+        )
+        self._jobs[job.name] = job
+        return {"TranscriptionJob": self._describe(job)}
+
+    async def get_transcription_job(self, TranscriptionJobName: str) -> dict:
+        await self._call("GetTranscriptionJob")
+        job = self._jobs.get(TranscriptionJobName)
+        if job is None:
+            raise ServiceError("GetTranscriptionJob", "BadRequestException: job not found")
+        return {"TranscriptionJob": self._describe(job)}
+
+    def completion_time_of(self, job_name: str) -> float:
+        """Loop time at which a job finished (or will finish), for measuring polling overshoot"""
+        return self._jobs[job_name].ready_at
+
+    def _describe(self, job: _Job) -> dict:
+        now = asyncio.get_running_loop().time()
+        description = {"TranscriptionJobName": job.name, "LanguageCode": job.language_code}
+        if now < job.ready_at:
+            description["TranscriptionJobStatus"] = "IN_PROGRESS"
+        elif job.failure_reason:
+            description["TranscriptionJobStatus"] = "FAILED"
+            description["FailureReason"] = job.failure_reason
+        else:
+            if not job.written:
+                transcript = {"results": {"transcripts": [{"transcript": job.text}]}}
+                self.s3.store(job.output_bucket, job.output_key, json.dumps(transcript).encode("utf-8"))
+                job.written = True
+            description["TranscriptionJobStatus"] = "COMPLETED"
+            description["Transcript"] = {
+                "TranscriptFileUri": f"https://s3.amazonaws.com/{job.output_bucket}/{job.output_key}",
+            }
+        return description
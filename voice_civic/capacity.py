@@ -0,0 +1,887 @@
+"""
+Discrete-event capacity model of the deployed Lambda and Transcribe path
+
+The load generator and the ASGI backend answer questions about one machine.
+Before a scheme-enrolment drive the question is about the deployment: how
+many citizens can talk to it at once before p99 passes the 5 second target?
+In production that is decided by things a local run never sees. Lambda
+concurrency is shared by every function in the account, a new execution
+environment pays a cold start, StartTranscriptionJob and GetTranscriptionJob
+are rate limited, batch jobs are capped per account, and every throttle turns
+into retries that hold the caller's environment while they back off.
+
+``simulate`` replays an ``ArrivalCurve`` of turns through a model of that path:
+
+- API Gateway invokes the orchestrator, which invokes the speech processor
+  (voice turns), the intent classifier and the eligibility engine in turn.
+  Each invocation takes an execution environment of its function. Lambda
+  reuses the most recently idle warm one, starts a new one with a cold start
+  otherwise, and throttles once the account's unreserved concurrency (or the
+  function's reserved concurrency) is in use. Timeouts and memory sizes are
+  those of ``infrastructure/voice-civic-assistant-stack.ts``;
+- the speech processor uploads the audio to S3, starts a job within the
+  StartTranscriptionJob rate and concurrent-job quotas, polls with a
+  ``PollingStrategy`` within the GetTranscriptionJob rate and reads the
+  transcript back. Latencies are the ``FakeS3``/``FakeTranscribe``
+  distributions the polling tests use, or with ``transcription="mock"`` the
+  ``SpeechLatencyModel`` of the speech property tests;
+- throttled calls are retried by ``RetryPolicy``: the SDK's standard policy
+  inside lambdas, and the app's own for 429s that reach the client.
+
+Requests are plain generators that yield how long they wait, driven from a
+heap of resumption times with no event loop in between, so an hour of
+traffic at 50 turns per second runs in seconds. Latencies and queueing
+delays go into ``LatencyHistogram``s, which keeps memory flat however long
+the simulation runs. ``find_ceiling`` bisects constant arrival rates for
+the highest one that meets the p99 target with under 1% errors, the load
+generator's definition of sustained load.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import random
+import re
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .aws_fakes import Distribution, LogNormal, Uniform
+from .polling import MAX_WAIT_SECONDS, AdaptivePolling, ExponentialBackoff, FixedInterval, PollingStrategy
+from .timing import SpeechLatencyModel
+from .tracing import LatencyHistogram
+
+# Requirement 1.4 and 9.1: a voice turn is answered within 5 seconds
+TARGET_SECONDS = 5.0
+# Sustained load allows at most this share of failed turns, as in the load generator
+MAX_ERROR_RATE = 0.01
+# API Gateway's integration timeout
+API_GATEWAY_TIMEOUT = 29.0
+
+# Default concurrent executions per account and region, and what Lambda keeps unreserved
+ACCOUNT_CONCURRENCY = 1000
+MIN_UNRESERVED_CONCURRENCY = 100
+# Idle environments are reclaimed after an unpublished delay; 10 minutes is typical
+KEEP_WARM_SECONDS = 600.0
+# Node.js 18 init at 1024 MB; smaller functions get proportionally less CPU
+COLD_START_SECONDS = 0.3
+COLD_START_SIGMA = 0.35
+
+# Stand-ins for the account's Service Quotas values; pass the real ones in
+START_JOB_TPS = 25.0
+GET_JOB_TPS = 25.0
+CONCURRENT_JOBS = 250
+
+# 16 kHz mono 16-bit, as the clips the load generator sends
+AUDIO_BYTES_PER_SECOND = 32000
+
+STACK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "infrastructure", "voice-civic-assistant-stack.ts")
+FUNCTION_PREFIX = "voice-civic-assistant-"
+
+
+@dataclass(frozen=True)
+class FunctionSpec:
+    """One Lambda function's limits as the CDK stack sets them"""
+
+    name: str
+    timeout: float
+    memory_mb: int
+    reserved: Optional[int] = None
+
+
+# infrastructure/voice-civic-assistant-stack.ts; none sets reserved concurrency
+STACK_FUNCTIONS = {
+    spec.name: spec
+    for spec in (
+        FunctionSpec("orchestrator", 30.0, 1024),
+        FunctionSpec("speech-processor", 30.0, 512),
+        FunctionSpec("intent-classifier", 15.0, 512),
+        FunctionSpec("eligibility-engine", 30.0, 1024),
+        FunctionSpec("grievance-generator", 30.0, 1024),
+        FunctionSpec("image-analyzer", 30.0, 1024),
+        FunctionSpec("document-generator", 30.0, 512),
+        FunctionSpec("confirmation-handler", 15.0, 512),
+    )
+}
+
+# Time spent in each handler itself, downstream calls excluded
+HANDLER_SECONDS: Dict[str, Distribution] = {
+    "orchestrator": LogNormal(0.02, 0.3),
+    "speech-processor": LogNormal(0.01, 0.3),
+    "intent-classifier": LogNormal(0.03, 0.3),
+    "eligibility-engine": LogNormal(0.06, 0.3),
+}
+# A synchronous Invoke call and API Gateway's own overhead
+INVOKE_SECONDS = LogNormal(0.015, 0.3)
+GATEWAY_SECONDS = LogNormal(0.03, 0.3)
+
+
+def read_stack_functions(path: str = STACK_PATH) -> Dict[str, FunctionSpec]:
+    """Timeouts, memory sizes and reserved concurrency of every ``lambda.Function`` in a CDK stack"""
+    with open(path, encoding="utf-8") as source:
+        blocks = source.read().split("new lambda.Function(")[1:]
+    functions = {}
+    for block in blocks:
+        name = re.search(r'functionName:\s*"([^"]+)"', block)
+        timeout = re.search(r"timeout:\s*cdk\.Duration\.(seconds|minutes)\((\d+)\)", block)
+        memory = re.search(r"memorySize:\s*(\d+)", block)
+        reserved = re.search(r"reservedConcurrentExecutions:\s*(\d+)", block)
+        if name is None:
+            continue
+        short = name.group(1)[len(FUNCTION_PREFIX):] if name.group(1).startswith(FUNCTION_PREFIX) else name.group(1)
+        # Lambda's defaults when the stack leaves them out
+        seconds = 3.0 if timeout is None else float(timeout.group(2)) * (60 if timeout.group(1) == "minutes" else 1)
+        functions[short] = FunctionSpec(
+            short, seconds, int(memory.group(1)) if memory else 128, int(reserved.group(1)) if reserved else None,
+        )
+    return functions
+
+
+# ---------------------------------------------------------------------------
+# Model parameters
+# ---------------------------------------------------------------------------
+
+class ArrivalCurve:
+    """
+    Turns per second over time, linear between ``(seconds, rate)`` points
+
+    Arrivals are a non-homogeneous Poisson process, drawn by thinning a
+    process at the curve's peak rate.
+    """
+
+    def __init__(self, points: Sequence[Tuple[float, float]]):
+        if not points:
+            raise ValueError("An arrival curve needs at least one point")
+        self.points = sorted((float(at), float(rate)) for at, rate in points)
+        if any(rate < 0 for _, rate in self.points):
+            raise ValueError("Arrival rates must not be negative")
+        self.duration = self.points[-1][0]
+        self.peak = max(rate for _, rate in self.points)
+
+    @classmethod
+    def constant(cls, rate: float, duration: float) -> "ArrivalCurve":
+        return cls([(0.0, rate), (duration, rate)])
+
+    @classmethod
+    def parse(cls, text: str) -> "ArrivalCurve":
+        """``"0:5,1800:40,3600:40"``: seconds and turns per second, comma separated"""
+        try:
+            return cls([tuple(float(value) for value in point.split(":")) for point in text.split(",")])
+        except ValueError as error:
+            raise ValueError(f"Invalid arrival curve {text!r}: {error}") from error
+
+    @classmethod
+    def enrolment_drive(cls, peak: float, hours: float = 8.0) -> "ArrivalCurve":
+        """A camp day: a queue at opening, a lunch dip, a second peak and a quiet close"""
+        shape = ((0.0, 0.1), (0.05, 1.0), (0.35, 0.8), (0.45, 0.4), (0.55, 0.9), (0.85, 0.6), (1.0, 0.1))
+        return cls([(fraction * hours * 3600, share * peak) for fraction, share in shape])
+
+    def rate(self, at: float) -> float:
+        points = self.points
+        if at <= points[0][0]:
+            return points[0][1]
+        for (left, low), (right, high) in zip(points, points[1:]):
+            if at <= right:
+                return low + (high - low) * (at - left) / (right - left) if right > left else high
+        return points[-1][1]
+
+    def arrivals(self, rng: random.Random) -> Iterator[float]:
+        peak, at = self.peak, 0.0
+        if peak <= 0:
+            return
+        while True:
+            at += rng.expovariate(peak)
+            if at >= self.duration:
+                return
+            if rng.random() * peak < self.rate(at):
+                yield at
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Attempts and capped exponential backoff with full jitter"""
+
+    max_attempts: int = 3
+    base_seconds: float = 0.1
+    max_seconds: float = 20.0
+
+    def delay(self, attempt: int, rng: random.Random) -> float:
+        """Backoff after the ``attempt``-th failed try"""
+        return rng.uniform(0.0, min(self.max_seconds, self.base_seconds * 2 ** attempt))
+
+
+# The AWS SDK's standard retry mode
+SDK_RETRY = RetryPolicy()
+# The web app retrying a 429 from API Gateway
+CLIENT_RETRY = RetryPolicy(max_attempts=3, base_seconds=1.0, max_seconds=8.0)
+
+
+@dataclass(frozen=True)
+class TranscribeQuotas:
+    """Account limits on batch transcription; ``deferred`` queues jobs over the cap instead of refusing them"""
+
+    start_tps: float = START_JOB_TPS
+    get_tps: float = GET_JOB_TPS
+    concurrent_jobs: int = CONCURRENT_JOBS
+    deferred: bool = False
+
+
+@dataclass
+class CapacityModel:
+    """Everything about the deployment the simulation takes as given"""
+
+    functions: Dict[str, FunctionSpec] = field(default_factory=lambda: dict(STACK_FUNCTIONS))
+    account_concurrency: int = ACCOUNT_CONCURRENCY
+    keep_warm_seconds: float = KEEP_WARM_SECONDS
+    cold_start_seconds: float = COLD_START_SECONDS
+    quotas: TranscribeQuotas = TranscribeQuotas()
+    # "batch": S3 upload, Transcribe job and polling; "mock": the speech property tests' latency model
+    transcription: str = "batch"
+    polling: Callable[[], PollingStrategy] = lambda: FixedInterval(2.0)
+    voice_share: float = 0.7
+    eligibility_share: float = 0.5
+    audio_seconds: Distribution = Uniform(2.0, 8.0)
+    sdk_retry: RetryPolicy = SDK_RETRY
+    client_retry: RetryPolicy = CLIENT_RETRY
+    target_seconds: float = TARGET_SECONDS
+    s3_latency: Distribution = LogNormal(0.03, 0.3)
+    s3_bandwidth_bytes_per_second: float = 50e6
+    api_latency: Distribution = LogNormal(0.05, 0.3)
+    completion_time: Distribution = LogNormal(2.5, 0.4)
+    realtime_factor: float = 0.05
+
+    def __post_init__(self):
+        if self.transcription not in ("batch", "mock"):
+            raise ValueError(f"Unknown transcription model {self.transcription!r}; use 'batch' or 'mock'")
+
+
+# ---------------------------------------------------------------------------
+# Resources
+# ---------------------------------------------------------------------------
+
+class _TokenBucket:
+    """A per-second API quota; the burst is one second's worth"""
+
+    __slots__ = ("rate", "tokens", "updated", "refused")
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = max(1.0, rate)
+        self.updated = 0.0
+        self.refused = 0
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.refused += 1
+        return False
+
+
+class _Account:
+    __slots__ = ("unreserved_limit", "unreserved_running")
+
+    def __init__(self, limit: int, functions: Dict[str, FunctionSpec]):
+        reserved = sum(spec.reserved or 0 for spec in functions.values())
+        if limit - reserved < min(MIN_UNRESERVED_CONCURRENCY, limit):
+            raise ValueError(f"Reserved concurrency {reserved} leaves less than {MIN_UNRESERVED_CONCURRENCY} of {limit} unreserved")
+        self.unreserved_limit = limit - reserved
+        self.unreserved_running = 0
+
+
+class _FunctionPool:
+    """Execution environments of one function: busy, idle and warm, or gone"""
+
+    def __init__(self, spec: FunctionSpec, account: _Account, model: CapacityModel):
+        self.spec = spec
+        self.account = account
+        self.keep_warm = model.keep_warm_seconds
+        self.cold_start = LogNormal(model.cold_start_seconds * math.sqrt(1024 / spec.memory_mb), COLD_START_SIGMA)
+        # Release times of idle environments, oldest first; the newest is reused first
+        self.idle: deque = deque()
+        self.running = 0
+        self.peak = 0
+        self.invocations = 0
+        self.cold_starts = 0
+        self.throttles = 0
+
+    def acquire(self, now: float, rng: random.Random) -> Optional[float]:
+        """Cold-start seconds (0 when warm) for a new invocation, or ``None`` when throttled"""
+        account = self.account
+        if self.spec.reserved is not None:
+            if self.running >= self.spec.reserved:
+                self.throttles += 1
+                return None
+        elif account.unreserved_running >= account.unreserved_limit:
+            self.throttles += 1
+            return None
+        else:
+            account.unreserved_running += 1
+        self.running += 1
+        self.invocations += 1
+        if self.running > self.peak:
+            self.peak = self.running
+        idle = self.idle
+        while idle and now - idle[0] > self.keep_warm:
+            idle.popleft()
+        if idle:
+            idle.pop()
+            return 0.0
+        self.cold_starts += 1
+        return self.cold_start.sample(rng)
+
+    def release(self, now: float) -> None:
+        self.running -= 1
+        if self.spec.reserved is None:
+            self.account.unreserved_running -= 1
+        self.idle.append(now)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "invocations": self.invocations, "coldStarts": self.cold_starts,
+            "throttles": self.throttles, "peakConcurrency": self.peak,
+        }
+
+
+class _JobSlots:
+    """Concurrent transcription jobs, with a FIFO of deferred jobs when allowed"""
+
+    def __init__(self, limit: int, simulation: "_Simulation"):
+        self.limit = limit
+        self.running = 0
+        self.peak = 0
+        self.refused = 0
+        self.deferred = 0
+        self._waiting: deque = deque()
+        self._simulation = simulation
+
+    def try_acquire(self) -> bool:
+        if self.running >= self.limit:
+            self.refused += 1
+            return False
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        return True
+
+    def wait(self, process: Any) -> None:
+        """Park ``process`` until a job finishes and hands it the slot"""
+        self.deferred += 1
+        self._waiting.append(process)
+
+    def release(self) -> None:
+        if self._waiting:
+            self._simulation.resume(self._waiting.popleft())
+        else:
+            self.running -= 1
+
+
+class _Failed(Exception):
+    """A turn that cannot complete; ``reason`` is what the report counts"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class _Throttled(Exception):
+    """The orchestrator itself was throttled: API Gateway answers 429"""
+
+
+class _Trace:
+    __slots__ = ("queued", "cold_starts", "throttles")
+
+    def __init__(self):
+        self.queued = 0.0
+        self.cold_starts = 0
+        self.throttles = 0
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+@dataclass
+class CapacityReport:
+    """Outcome of one simulated run"""
+
+    simulated_seconds: float
+    arrivals: int = 0
+    outcomes: Counter = field(default_factory=Counter)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    voice_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    queueing: LatencyHistogram = field(default_factory=LatencyHistogram)
+    within_target: int = 0
+    cold_start_turns: int = 0
+    window_seconds: float = 60.0
+    windows: List[Dict[str, Any]] = field(default_factory=list)
+    functions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    transcribe: Dict[str, int] = field(default_factory=dict)
+    target_seconds: float = TARGET_SECONDS
+    events: int = 0
+    wall_seconds: float = 0.0
+
+    @property
+    def completed(self) -> int:
+        return self.outcomes["ok"]
+
+    @property
+    def finished(self) -> int:
+        return sum(self.outcomes.values())
+
+    @property
+    def error_rate(self) -> float:
+        return 1 - self.completed / self.finished if self.finished else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Completed turns per simulated second"""
+        return self.completed / self.simulated_seconds if self.simulated_seconds else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        return self.latency.percentile(percentile)
+
+    def sustains(self, max_p99: Optional[float]) -> bool:
+        """Under 1% errors and, unless ``max_p99`` is ``None``, p99 no higher than it"""
+        if self.completed == 0 or self.error_rate >= MAX_ERROR_RATE:
+            return False
+        return max_p99 is None or self.percentile(99) <= max_p99
+
+    @property
+    def meets_target(self) -> bool:
+        return self.sustains(self.target_seconds)
+
+    def worst_window(self) -> Optional[Dict[str, Any]]:
+        """The window with the highest p99, where a drive hurts most"""
+        measured = [window for window in self.windows if window["p99"] is not None]
+        return max(measured, key=lambda window: window["p99"]) if measured else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "simulatedSeconds": self.simulated_seconds, "arrivals": self.arrivals, "completed": self.completed,
+            "outcomes": dict(self.outcomes), "errorRate": self.error_rate, "throughput": self.throughput,
+            "latency": self.latency.as_dict(), "voiceLatency": self.voice_latency.as_dict(),
+            "queueing": self.queueing.as_dict(),
+            "withinTarget": self.within_target / self.completed if self.completed else 0.0,
+            "targetSeconds": self.target_seconds, "meetsTarget": self.meets_target,
+            "coldStartTurns": self.cold_start_turns, "functions": self.functions, "transcribe": self.transcribe,
+            "windows": self.windows, "events": self.events, "wallSeconds": self.wall_seconds,
+        }
+
+
+class _Window:
+    __slots__ = ("arrivals", "completed", "failed", "latency")
+
+    def __init__(self):
+        self.arrivals = 0
+        self.completed = 0
+        self.failed = 0
+        self.latency = LatencyHistogram(bits=5)
+
+
+# ---------------------------------------------------------------------------
+# Simulation
+# ---------------------------------------------------------------------------
+
+class _Simulation:
+    """
+    A heap of (time, sequence, process) resumptions
+
+    A process is a generator. Yielding a float waits that many seconds;
+    yielding a callable hands the process to it, to be resumed later through
+    ``resume``. Waits are floats from the models, so the check is on type.
+    """
+
+    def __init__(self, model: CapacityModel, curve: ArrivalCurve, seed: int, window_seconds: float):
+        self.model = model
+        self.curve = curve
+        self.rng = random.Random(seed)
+        self.now = 0.0
+        self.events = 0
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._sequence = itertools.count()
+        account = _Account(model.account_concurrency, model.functions)
+        self.pools = {name: _FunctionPool(spec, account, model) for name, spec in model.functions.items()}
+        self.jobs = _JobSlots(model.quotas.concurrent_jobs, self)
+        self.start_rate = _TokenBucket(model.quotas.start_tps)
+        self.get_rate = _TokenBucket(model.quotas.get_tps)
+        self.polling = model.polling()
+        self.speech_model = SpeechLatencyModel(rng=self.rng)
+        self.report = CapacityReport(curve.duration, window_seconds=window_seconds, target_seconds=model.target_seconds)
+        self._windows: Dict[int, _Window] = {}
+
+    def resume(self, process: Any, delay: float = 0.0) -> None:
+        heapq.heappush(self._heap, (self.now + delay, next(self._sequence), process))
+
+    def run(self) -> CapacityReport:
+        started = time.perf_counter()
+        heap = self._heap
+        heapq.heappush(heap, (0.0, next(self._sequence), self._arrivals()))
+        events = 0
+        while heap:
+            self.now, _, process = heapq.heappop(heap)
+            events += 1
+            if process.__class__ is _JobRelease:
+                process.jobs.release()
+                continue
+            try:
+                command = process.send(None)
+            except StopIteration:
+                continue
+            if command.__class__ is float:
+                heapq.heappush(heap, (self.now + command, next(self._sequence), process))
+            else:
+                command(process)
+        self.events = events
+        return self._finish(time.perf_counter() - started)
+
+    # -- request path -------------------------------------------------------
+
+    def _wait(self, seconds: float, deadline: float) -> Iterator[float]:
+        if self.now + seconds > deadline:
+            yield max(0.0, deadline - self.now)
+            raise _Failed("timeout")
+        yield seconds
+
+    def _arrivals(self) -> Iterator[float]:
+        """Start each turn when it arrives, so only turns in flight exist at any time"""
+        rng, voice_share = self.rng, self.model.voice_share
+        for at in self.curve.arrivals(random.Random(rng.random())):
+            yield at - self.now
+            kind = "voice" if rng.random() < voice_share else "text"
+            self.resume(self._turn(kind, at))
+
+    def _turn(self, kind: str, arrival: float) -> Iterator[Any]:
+        model, rng, trace = self.model, self.rng, _Trace()
+        window = self._window(arrival)
+        window.arrivals += 1
+        outcome = "ok"
+        for attempt in itertools.count(1):
+            yield GATEWAY_SECONDS.sample(rng)
+            attempt_started = self.now
+            try:
+                yield from self._invoke("orchestrator", self._orchestrate(kind, trace), trace, math.inf, None)
+            except _Throttled:
+                if attempt >= model.client_retry.max_attempts:
+                    outcome = "throttled"
+                    break
+                delay = model.client_retry.delay(attempt, rng)
+                trace.queued += delay
+                yield delay
+                continue
+            except _Failed as failure:
+                outcome = failure.reason
+            if self.now - attempt_started > API_GATEWAY_TIMEOUT:
+                outcome = "gateway_timeout"
+            break
+        self._record(kind, arrival, outcome, trace, window)
+
+    def _invoke(self, name: str, handler: Callable[[float], Iterator[Any]], trace: _Trace, deadline: float,
+                retry: Optional[RetryPolicy]) -> Iterator[Any]:
+        pool, rng = self.pools[name], self.rng
+        for attempt in itertools.count(1):
+            cold = pool.acquire(self.now, rng)
+            if cold is not None:
+                break
+            trace.throttles += 1
+            if retry is None:
+                raise _Throttled(name)
+            if attempt >= retry.max_attempts:
+                raise _Failed(f"throttled:{name}")
+            delay = retry.delay(attempt, rng)
+            trace.queued += delay
+            yield from self._wait(delay, deadline)
+        try:
+            if cold:
+                trace.cold_starts += 1
+                yield from self._wait(cold, deadline)
+            yield from handler(min(deadline, self.now + pool.spec.timeout))
+        finally:
+            pool.release(self.now)
+
+    def _orchestrate(self, kind: str, trace: _Trace) -> Callable[[float], Iterator[Any]]:
+        def handler(deadline: float) -> Iterator[Any]:
+            yield from self._wait(HANDLER_SECONDS["orchestrator"].sample(self.rng), deadline)
+            if kind == "voice":
+                yield from self._call("speech-processor", self._speech(trace), trace, deadline)
+            yield from self._call("intent-classifier", self._work("intent-classifier"), trace, deadline)
+            if self.rng.random() < self.model.eligibility_share:
+                yield from self._call("eligibility-engine", self._work("eligibility-engine"), trace, deadline)
+        return handler
+
+    def _call(self, name: str, handler: Callable[[float], Iterator[Any]], trace: _Trace, deadline: float) -> Iterator[Any]:
+        yield from self._wait(INVOKE_SECONDS.sample(self.rng), deadline)
+        yield from self._invoke(name, handler, trace, deadline, self.model.sdk_retry)
+
+    def _work(self, name: str) -> Callable[[float], Iterator[Any]]:
+        def handler(deadline: float) -> Iterator[Any]:
+            yield from self._wait(HANDLER_SECONDS[name].sample(self.rng), deadline)
+        return handler
+
+    def _speech(self, trace: _Trace) -> Callable[[float], Iterator[Any]]:
+        def handler(deadline: float) -> Iterator[Any]:
+            model, rng = self.model, self.rng
+            audio_seconds = model.audio_seconds.sample(rng)
+            size = int(audio_seconds * AUDIO_BYTES_PER_SECOND)
+            yield from self._wait(HANDLER_SECONDS["speech-processor"].sample(rng), deadline)
+            batch = model.transcription == "batch"
+            if batch:
+                yield from self._wait(model.s3_latency.sample(rng) + size / model.s3_bandwidth_bytes_per_second, deadline)
+            yield from self._start_job(trace, deadline)
+            if batch:
+                duration = model.completion_time.sample(rng) + audio_seconds * model.realtime_factor
+            else:
+                duration = self.speech_model.sample_ms(size) / 1000
+            started = self.now
+            # The job runs, and holds its slot, whether or not anyone is still polling
+            heapq.heappush(self._heap, (started + duration, next(self._sequence), _JobRelease(self.jobs)))
+            if not batch:
+                yield from self._wait(duration, deadline)
+                return
+            ready = started + duration
+            poll_deadline = min(deadline, started + MAX_WAIT_SECONDS)
+            for interval in self.polling.intervals(audio_seconds):
+                yield from self._wait(interval + model.api_latency.sample(rng), poll_deadline)
+                if not self.get_rate.take(self.now):
+                    # A throttled poll only delays the next look
+                    trace.throttles += 1
+                    continue
+                if self.now >= ready:
+                    break
+            self.polling.record(audio_seconds, self.now - started)
+            yield from self._wait(model.s3_latency.sample(rng), deadline)
+        return handler
+
+    def _start_job(self, trace: _Trace, deadline: float) -> Iterator[Any]:
+        model, rng = self.model, self.rng
+        for attempt in itertools.count(1):
+            yield from self._wait(model.api_latency.sample(rng), deadline)
+            if not self.start_rate.take(self.now):
+                reason = "transcribe_start_rate"
+            elif self.jobs.try_acquire():
+                return
+            elif model.quotas.deferred:
+                queued = self.now
+                yield self.jobs.wait
+                trace.queued += self.now - queued
+                return
+            else:
+                reason = "transcribe_jobs"
+            trace.throttles += 1
+            if attempt >= model.sdk_retry.max_attempts:
+                raise _Failed(reason)
+            delay = model.sdk_retry.delay(attempt, rng)
+            trace.queued += delay
+            yield from self._wait(delay, deadline)
+
+    # -- bookkeeping --------------------------------------------------------
+
+    def _window(self, at: float) -> _Window:
+        index = int(at // self.report.window_seconds)
+        window = self._windows.get(index)
+        if window is None:
+            window = self._windows[index] = _Window()
+        return window
+
+    def _record(self, kind: str, arrival: float, outcome: str, trace: _Trace, window: _Window) -> None:
+        report = self.report
+        report.arrivals += 1
+        report.outcomes[outcome] += 1
+        report.queueing.record(trace.queued)
+        report.cold_start_turns += trace.cold_starts > 0
+        if outcome != "ok":
+            window.failed += 1
+            return
+        latency = self.now - arrival
+        report.latency.record(latency)
+        if kind == "voice":
+            report.voice_latency.record(latency)
+        report.within_target += latency <= report.target_seconds
+        window.completed += 1
+        window.latency.record(latency)
+
+    def _finish(self, wall_seconds: float) -> CapacityReport:
+        report = self.report
+        report.events = self.events
+        report.wall_seconds = wall_seconds
+        report.functions = {name: pool.as_dict() for name, pool in self.pools.items() if pool.invocations or pool.throttles}
+        report.transcribe = {
+            "peakJobs": self.jobs.peak, "refusedJobs": self.jobs.refused, "deferredJobs": self.jobs.deferred,
+            "startThrottles": self.start_rate.refused, "pollThrottles": self.get_rate.refused,
+        }
+        report.windows = [
+            {
+                "start": index * report.window_seconds, "arrivals": window.arrivals, "completed": window.completed,
+                "failed": window.failed, "p99": window.latency.percentile(99) if window.completed else None,
+            }
+            for index, window in sorted(self._windows.items())
+        ]
+        return report
+
+
+class _JobRelease:
+    """Heap entry that frees a transcription job slot when the job finishes"""
+
+    __slots__ = ("jobs",)
+
+    def __init__(self, jobs: _JobSlots):
+        self.jobs = jobs
+
+
+def simulate(
+    curve: ArrivalCurve,
+    model: Optional[CapacityModel] = None,
+    seed: int = 0,
+    window_seconds: float = 60.0,
+) -> CapacityReport:
+    """Run ``curve`` through ``model`` and report latency, queueing, throttles and cold starts"""
+    return _Simulation(model or CapacityModel(), curve, seed, window_seconds).run()
+
+
+def find_ceiling(
+    model: Optional[CapacityModel] = None,
+    max_p99: Optional[float] = TARGET_SECONDS,
+    duration: float = 900.0,
+    high: float = 100.0,
+    resolution: float = 0.5,
+    seed: int = 0,
+) -> Tuple[float, Optional[CapacityReport]]:
+    """
+    The highest constant rate (turns per second) sustained with p99 at most ``max_p99``, and its report
+
+    With ``max_p99=None`` only the error rate counts, which gives the
+    throughput ceiling: beyond it throttles and timeouts fail turns however
+    long the others take. Bisection assumes sustaining a rate is monotone in
+    the rate; returns ``(0.0, None)`` when even the lowest rate tried fails.
+    """
+    model = model or CapacityModel()
+    upper = simulate(ArrivalCurve.constant(high, duration), model, seed)
+    if upper.sustains(max_p99):
+        return high, upper
+    low, best = 0.0, None
+    while high - low > resolution:
+        middle = (low + high) / 2
+        report = simulate(ArrivalCurve.constant(middle, duration), model, seed)
+        if report.sustains(max_p99):
+            low, best = middle, report
+        else:
+            high = middle
+    return low, best
+
+
+def concurrent_citizens(rate: float, think_seconds: float, latency_seconds: float) -> float:
+    """Citizens in conversation at once for ``rate`` turns per second, by Little's law"""
+    return rate * (think_seconds + latency_seconds)
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+
+POLLING = {
+    "fixed": lambda: FixedInterval(2.0),
+    "backoff": lambda: ExponentialBackoff(rng=random.Random(0)),
+    "adaptive": AdaptivePolling,
+}
+
+
+def _print_report(report: CapacityReport) -> None:
+    percentiles = "  ".join(f"p{p:g} {report.percentile(p):6.2f}s" for p in (50, 95, 99))
+    print(f"simulated {report.simulated_seconds / 3600:.2f} h, {report.arrivals} turns, {report.events} events "
+          f"in {report.wall_seconds:.2f} s")
+    print(f"latency   {percentiles}   voice p99 {report.voice_latency.percentile(99):6.2f}s   "
+          f"within {report.target_seconds:g}s {report.within_target / max(1, report.completed):.1%}")
+    print(f"queueing  p50 {report.queueing.percentile(50):6.2f}s  p99 {report.queueing.percentile(99):6.2f}s   "
+          f"turns with a cold start {report.cold_start_turns}")
+    print(f"outcomes  {dict(report.outcomes)}  error rate {report.error_rate:.2%}  throughput {report.throughput:.2f}/s")
+    for name, stats in report.functions.items():
+        print(f"  {name:<20} peak {stats['peakConcurrency']:>5}  cold {stats['coldStarts']:>6}  throttled {stats['throttles']:>6}")
+    print(f"  transcribe           {report.transcribe}")
+    worst = report.worst_window()
+    if worst is not None:
+        print(f"worst window at {worst['start'] / 60:.0f} min: {worst['arrivals']} arrivals, p99 {worst['p99']:.2f}s, "
+              f"{worst['failed']} failed")
+    verdict = "meets" if report.meets_target else "misses"
+    print(f"{verdict} the target: p99 <= {report.target_seconds:g}s with under {MAX_ERROR_RATE:.0%} errors")
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Simulate an arrival curve against the deployment, or search for its throughput ceiling"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Discrete-event capacity model of the Lambda/Transcribe path")
+    parser.add_argument("--rate", type=float, default=20.0, help="constant turns per second")
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--curve", help='piecewise-linear arrivals, e.g. "0:5,1800:40,3600:40"')
+    parser.add_argument("--drive", type=float, metavar="PEAK", help="an enrolment-drive day peaking at PEAK turns/s")
+    parser.add_argument("--transcription", choices=("batch", "mock"), default="batch")
+    parser.add_argument("--polling", choices=sorted(POLLING), default="fixed")
+    parser.add_argument("--stack", default=STACK_PATH, help="CDK stack to read function limits from")
+    parser.add_argument("--account-concurrency", type=int, default=ACCOUNT_CONCURRENCY)
+    parser.add_argument("--cold-start", type=float, default=COLD_START_SECONDS, help="median init seconds at 1024 MB")
+    parser.add_argument("--keep-warm", type=float, default=KEEP_WARM_SECONDS)
+    parser.add_argument("--start-tps", type=float, default=START_JOB_TPS)
+    parser.add_argument("--get-tps", type=float, default=GET_JOB_TPS)
+    parser.add_argument("--concurrent-jobs", type=int, default=CONCURRENT_JOBS)
+    parser.add_argument("--deferred", action="store_true", help="queue jobs over the concurrent-job quota")
+    parser.add_argument("--voice-share", type=float, default=0.7)
+    parser.add_argument("--sdk-attempts", type=int, default=SDK_RETRY.max_attempts)
+    parser.add_argument("--client-attempts", type=int, default=CLIENT_RETRY.max_attempts)
+    parser.add_argument("--think-time", type=float, default=20.0, help="seconds a citizen takes between turns")
+    parser.add_argument("--ceiling", action="store_true", help="bisect for the highest constant rate that meets the target")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    model = CapacityModel(
+        functions=read_stack_functions(args.stack) if os.path.exists(args.stack) else dict(STACK_FUNCTIONS),
+        account_concurrency=args.account_concurrency,
+        keep_warm_seconds=args.keep_warm,
+        cold_start_seconds=args.cold_start,
+        quotas=TranscribeQuotas(args.start_tps, args.get_tps, args.concurrent_jobs, args.deferred),
+        transcription=args.transcription,
+        polling=POLLING[args.polling],
+        voice_share=args.voice_share,
+        sdk_retry=RetryPolicy(args.sdk_attempts, SDK_RETRY.base_seconds, SDK_RETRY.max_seconds),
+        client_retry=RetryPolicy(args.client_attempts, CLIENT_RETRY.base_seconds, CLIENT_RETRY.max_seconds),
+    )
+
+    if args.ceiling:
+        started = time.perf_counter()
+        throughput, saturated = find_ceiling(model, max_p99=None, duration=args.hours * 3600, seed=args.seed)
+        rate, report = find_ceiling(model, duration=args.hours * 3600, seed=args.seed)
+        print(f"throughput ceiling: {throughput:.1f} turns/s with under {MAX_ERROR_RATE:.0%} errors")
+        if report is None:
+            floor = simulate(ArrivalCurve.constant(1.0, args.hours * 3600), model, args.seed)
+            print(f"target ceiling: none - p99 is {floor.percentile(99):.2f}s even at 1 turn/s, above "
+                  f"{model.target_seconds:g}s before any load")
+            report = saturated
+        else:
+            citizens = concurrent_citizens(rate, args.think_time, report.latency.mean)
+            print(f"target ceiling: {rate:.1f} turns/s with p99 <= {model.target_seconds:g}s, about {citizens:.0f} "
+                  f"citizens in conversation at {args.think_time:g}s between turns")
+        print(f"(searched in {time.perf_counter() - started:.1f} s)")
+        if report is not None:
+            _print_report(report)
+        return 0
+
+    if args.drive:
+        curve = ArrivalCurve.enrolment_drive(args.drive, args.hours)
+    elif args.curve:
+        curve = ArrivalCurve.parse(args.curve)
+    else:
+        curve = ArrivalCurve.constant(args.rate, args.hours * 3600)
+    report = simulate(curve, model, args.seed)
+    if args.json:
+        print(json.dumps(report.as_dict(), indent=2))
+    else:
+        _print_report(report)
+    return 0 if report.meets_target else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,387 @@
+"""
+Streaming truncation, downmix and resampling before upload
+
+Audio longer than two minutes was only flagged with a warning, and
+``uploadAudioToS3`` sent whatever the browser recorded: usually 44.1 or
+48 kHz stereo, of which Transcribe uses a 16 kHz mono signal. Half to
+five-sixths of every upload was bandwidth spent on nothing.
+
+``iter_conditioned`` turns a PCM WAV payload into the WAV Transcribe needs,
+a chunk at a time:
+
+- the output length is fixed from the header before any sample is read, so
+  the 44-byte header goes out first and always matches the data that
+  follows, and the duration limit holds to the frame;
+- each chunk is decoded by ``pcm.iter_pcm_chunks``, downmixed to mono and
+  passed through a polyphase ``Resampler``. Its Kaiser-windowed sinc filter
+  is flat to 6 kHz, 3 dB down at 7 kHz and at least 80 dB down from 8.5 kHz,
+  so what would alias into the speech band is removed rather than folded
+  back, as dropping or interpolating samples would;
+- only one chunk and the filter's history are held at once, however long
+  the recording.
+
+At 16-bit output a 48 kHz stereo upload shrinks six-fold, 44.1 kHz stereo
+5.5-fold. Audio already at or below 16 kHz keeps its rate. Compressed
+formats cannot be decoded here and go through ``truncated_to_duration``
+unchanged.
+"""
+
+import functools
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .audio_inspector import AudioInfo, wav_header
+from .audio_payload import AudioPayload
+from .pcm import DEFAULT_CHUNK_FRAMES, downmix, is_decodable, iter_pcm_chunks
+
+# Transcribe's recommended rate for speech; higher rates add bytes and no accuracy
+TARGET_SAMPLE_RATE = 16000
+# Requirement 1.4: voice input up to 2 minutes
+MAX_DURATION_SECONDS = 120.0
+
+# Filter zero crossings on each side of the centre tap, and where the cutoff
+# (-6 dB) sits as a share of the lower Nyquist frequency
+ZERO_CROSSINGS = 16
+ROLLOFF = 0.9
+# Kaiser window shape: about 80 dB of stopband attenuation
+KAISER_BETA = 8.0
+
+
+# ---------------------------------------------------------------------------
+# Resampling
+# ---------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=16)
+def polyphase_filter(up: int, down: int, zero_crossings: int = ZERO_CROSSINGS, rolloff: float = ROLLOFF,
+                     beta: float = KAISER_BETA) -> Tuple[np.ndarray, int]:
+    """
+    Kaiser-windowed sinc low-pass for resampling by ``up / down``, split into ``up`` phases
+
+    Returns the ``(up, taps)`` float32 coefficient table and the centre tap's
+    offset ``half`` on the upsampled grid. Row ``p`` holds the taps an
+    output sample uses when its position on that grid is ``p + half - up + 1``
+    past its first input; ``Resampler`` relies on exactly this layout.
+    """
+    stretch = max(up, down)
+    cutoff = rolloff * 0.5 / stretch
+    half = math.ceil(zero_crossings * stretch / rolloff)
+    offsets = np.arange(-half, half + 1, dtype=np.float64)
+    prototype = 2 * cutoff * np.sinc(2 * cutoff * offsets) * np.kaiser(2 * half + 1, beta)
+    # Every phase passes DC at unit gain
+    prototype *= up / prototype.sum()
+
+    taps = 2 * half // up + 2
+    table = np.zeros((up, taps), dtype=np.float64)
+    for phase in range(up):
+        start = phase + 2 * half - up + 1
+        indices = start - up * np.arange(taps)
+        valid = (indices >= 0) & (indices < len(prototype))
+        table[phase, valid] = prototype[indices[valid]]
+    return table.astype(np.float32), half
+
+
+class Resampler:
+    """
+    Streaming rational resampler for one channel of float32 samples
+
+    Output sample ``n`` sits at input position ``n * down / up``. ``process``
+    returns every output whose filter window is complete; ``flush`` pads the
+    end with silence to finish the rest. Outputs sharing a phase read input
+    windows ``down`` apart, so each phase is one strided view times one row of
+    taps, with no gather of windows or coefficients.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int, frames: Optional[int] = None):
+        divisor = math.gcd(source_rate, target_rate)
+        self.up = target_rate // divisor
+        self.down = source_rate // divisor
+        self.table, self.half = polyphase_filter(self.up, self.down)
+        self.taps = self.table.shape[1]
+        # Total outputs to produce; None for an open-ended stream
+        self.frames = frames
+        self.produced = 0
+        self.consumed = 0
+        # The filter reaches back before the first sample: start with silence there
+        self._history = np.zeros(self.taps, dtype=np.float32)
+        self._history_start = -self.taps
+
+    def output_frames(self, input_frames: int) -> int:
+        """Outputs covering ``input_frames`` inputs"""
+        return input_frames * self.up // self.down
+
+    def first_input(self, n: int) -> int:
+        """Index of the first input sample output ``n`` reads"""
+        return -((self.half - n * self.down) // self.up)
+
+    def inputs_needed(self, frames: int) -> int:
+        """Inputs that must be seen before the first ``frames`` outputs are complete"""
+        return self.first_input(frames - 1) + self.taps if frames > 0 else 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Feed mono ``samples``; returns the outputs they complete"""
+        self.consumed += len(samples)
+        return self._emit(np.concatenate((self._history, samples.astype(np.float32, copy=False))), self.frames)
+
+    def flush(self) -> np.ndarray:
+        """Outputs still owed for the inputs fed so far, with silence past the end"""
+        owed = self.output_frames(self.consumed)
+        if self.frames is not None:
+            owed = min(owed, self.frames)
+        if self.produced >= owed:
+            return np.zeros(0, dtype=np.float32)
+        padding = np.zeros(max(0, self.inputs_needed(owed) - self._history_start - len(self._history)), dtype=np.float32)
+        return self._emit(np.concatenate((self._history, padding)), owed)
+
+    def _emit(self, buffer: np.ndarray, limit: Optional[int]) -> np.ndarray:
+        up, down, taps, start = self.up, self.down, self.taps, self._history_start
+        end = start + len(buffer)
+        # Last output whose window ends inside the buffer: first_input(n) <= end - taps
+        count = ((end - taps) * up + self.half) // down + 1 - self.produced
+        if limit is not None:
+            count = min(count, limit - self.produced)
+        count = max(0, count)
+
+        output = np.empty(count, dtype=np.float32)
+        if count:
+            windows = sliding_window_view(buffer, taps)
+            first = self.produced
+            for offset in range(min(up, count)):
+                n = first + offset
+                row = self.first_input(n) - start
+                phase = n * down - (row + start) * up - self.half + up - 1
+                outputs = output[offset::up]
+                # Outputs ``up`` apart share a phase and start ``down`` inputs apart
+                outputs[:] = windows[row:row + len(outputs) * down:down] @ self.table[phase]
+            self.produced += count
+
+        keep_from = self.first_input(self.produced) - start
+        self._history = buffer[max(0, min(keep_from, len(buffer))):].copy()
+        self._history_start = start + max(0, min(keep_from, len(buffer)))
+        return output
+
+
+# ---------------------------------------------------------------------------
+# Conditioning
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class ConditioningPlan:
+    """What conditioning a payload will do, decided from its header alone"""
+
+    source: Optional[AudioInfo]
+    sample_rate: int
+    frames: int
+    truncated: bool
+    passthrough: bool
+
+    @property
+    def data_size(self) -> int:
+        return self.frames * 2
+
+    @property
+    def duration(self) -> float:
+        if self.passthrough:
+            return self.source.duration if self.source is not None else 0.0
+        return self.frames / self.sample_rate
+
+
+def plan_conditioning(payload: AudioPayload, max_seconds: float = MAX_DURATION_SECONDS,
+                      sample_rate: int = TARGET_SAMPLE_RATE) -> ConditioningPlan:
+    """Output rate and exact frame count for ``payload``, or pass-through when it is already as small"""
+    info = payload.info
+    if not is_decodable(info):
+        return ConditioningPlan(info, info.sample_rate if info else 0, 0, False, True)
+
+    rate = min(info.sample_rate, sample_rate)
+    source_frames = info.data_size // info.block_align
+    frames = source_frames * rate // info.sample_rate
+    limit = int(max_seconds * rate)
+    truncated = frames > limit
+    already = (rate == info.sample_rate and info.channels == 1 and info.codec == "pcm" and info.bits_per_sample == 16
+               and info.data_offset + info.data_size == payload.size)
+    return ConditioningPlan(info, rate, min(frames, limit), truncated, already and not truncated)
+
+
+def _to_pcm16(samples: np.ndarray) -> bytes:
+    """Round float32 samples to little-endian int16, clipping at full scale"""
+    samples = np.clip(samples, -1.0, 32767 / 32768)
+    samples *= 32768
+    np.rint(samples, out=samples)
+    return samples.astype("<i2").tobytes()
+
+
+def iter_conditioned(payload: AudioPayload, max_seconds: float = MAX_DURATION_SECONDS,
+                     sample_rate: int = TARGET_SAMPLE_RATE, chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+                     plan: Optional[ConditioningPlan] = None) -> Iterator[bytes]:
+    """
+    The conditioned WAV file as a header followed by PCM chunks
+
+    Pass-through payloads are yielded whole (compressed ones cut with
+    ``truncated_to_duration``). Otherwise exactly ``plan.frames`` mono 16-bit
+    frames follow the header.
+    """
+    plan = plan or plan_conditioning(payload, max_seconds, sample_rate)
+    if plan.passthrough:
+        yield bytes(payload.truncated_to_duration(max_seconds).data)
+        return
+
+    info = plan.source
+    yield wav_header(plan.sample_rate, 1, 16, plan.data_size)
+    if plan.frames == 0:
+        return
+
+    if plan.sample_rate == info.sample_rate:
+        for chunk in iter_pcm_chunks(payload, chunk_frames, max_frames=plan.frames):
+            yield _to_pcm16(downmix(chunk))
+        return
+
+    resampler = Resampler(info.sample_rate, plan.sample_rate, plan.frames)
+    written = 0
+    for chunk in iter_pcm_chunks(payload, chunk_frames, max_frames=resampler.inputs_needed(plan.frames)):
+        samples = resampler.process(downmix(chunk))
+        written += len(samples)
+        if len(samples):
+            yield _to_pcm16(samples)
+    tail = resampler.flush()
+    written += len(tail)
+    if len(tail):
+        yield _to_pcm16(tail)
+    if written != plan.frames:
+        raise RuntimeError(f"Resampler produced {written} frames, header promised {plan.frames}")
+
+
+@dataclass
+class ConditionedAudio:
+    """A conditioned payload and what conditioning did to it"""
+
+    payload: AudioPayload
+    original_bytes: int
+    original_duration: float
+    duration: float
+    sample_rate: int
+    truncated: bool
+    passthrough: bool
+
+    @property
+    def ratio(self) -> float:
+        """Original size over conditioned size"""
+        return self.original_bytes / self.payload.size if self.payload.size else math.inf
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "originalBytes": self.original_bytes,
+            "bytes": self.payload.size,
+            "ratio": self.ratio,
+            "originalDuration": self.original_duration,
+            "duration": self.duration,
+            "sampleRate": self.sample_rate,
+            "truncated": self.truncated,
+            "passthrough": self.passthrough,
+        }
+
+
+def condition_audio(payload: AudioPayload, max_seconds: float = MAX_DURATION_SECONDS,
+                    sample_rate: int = TARGET_SAMPLE_RATE, chunk_frames: int = DEFAULT_CHUNK_FRAMES) -> ConditionedAudio:
+    """Condition ``payload`` into memory and describe the result; stream with ``iter_conditioned`` instead"""
+    plan = plan_conditioning(payload, max_seconds, sample_rate)
+    if plan.passthrough:
+        kept = payload.truncated_to_duration(max_seconds)
+        return ConditionedAudio(kept, payload.size, payload.estimated_duration, kept.estimated_duration,
+                                plan.sample_rate, kept.size < payload.size, True)
+
+    buffer = bytearray()
+    for block in iter_conditioned(payload, max_seconds, sample_rate, chunk_frames, plan):
+        buffer += block
+    return ConditionedAudio(AudioPayload(buffer), payload.size, payload.estimated_duration, plan.duration,
+                            plan.sample_rate, plan.truncated, False)
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _tone_wav(frequency: float, sample_rate: int, seconds: float, amplitude: float = 0.5) -> AudioPayload:
+    frames = int(seconds * sample_rate)
+    samples = amplitude * np.sin(2 * np.pi * frequency * np.arange(frames) / sample_rate)
+    pcm = np.round(samples * 32767).astype("<i2")
+    return AudioPayload(wav_header(sample_rate, 1, 16, pcm.nbytes) + pcm.tobytes())
+
+
+def tone_fidelity(conditioned: AudioPayload, frequency: float, amplitude: float = 0.5, edge: int = 2000) -> Tuple[float, float]:
+    """Level in dB relative to ``amplitude`` and SNR in dB against the ideal tone, ignoring ``edge`` frames at each end"""
+    info = conditioned.info
+    samples = np.frombuffer(conditioned.data[info.data_offset:info.data_offset + info.data_size], dtype="<i2") / 32768
+    ideal = amplitude * np.sin(2 * np.pi * frequency * np.arange(len(samples)) / info.sample_rate)
+    samples, ideal = samples[edge:-edge], ideal[edge:-edge]
+    level = 10 * np.log10(max(2 * np.mean(samples ** 2), 1e-30) / amplitude ** 2)
+    snr = 10 * np.log10(np.mean(ideal ** 2) / max(np.mean((samples - ideal) ** 2), 1e-30))
+    return float(level), float(snr)
+
+
+def _interpolated(payload: AudioPayload, sample_rate: int) -> AudioPayload:
+    """Linear interpolation with no filter, for comparison"""
+    info = payload.info
+    source = downmix(next(iter_pcm_chunks(payload, chunk_frames=1 << 30)))
+    frames = len(source) * sample_rate // info.sample_rate
+    resampled = np.interp(np.arange(frames) * info.sample_rate / sample_rate, np.arange(len(source)), source)
+    return AudioPayload(wav_header(sample_rate, 1, 16, frames * 2) + _to_pcm16(resampled.astype(np.float32)))
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Conditioning throughput, memory and size per source format, then tone fidelity against interpolation"""
+    import argparse
+    import time
+    import tracemalloc
+
+    from .synthetic_audio import ClipSpec, render_wav
+
+    parser = argparse.ArgumentParser(description="Streaming truncate/downmix/resample benchmark")
+    parser.add_argument("--seconds", type=float, nargs="+", default=[30.0, 150.0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-frames", type=int, default=DEFAULT_CHUNK_FRAMES)
+    args = parser.parse_args(argv)
+
+    print(f"{'source':<16} {'in s':>6} {'out s':>6} {'in MB':>7} {'out MB':>7} {'ratio':>6} {'x realtime':>11} "
+          f"{'MB/s':>7} {'peak MB':>8}")
+    for rate, channels in ((48000, 2), (44100, 2), (44100, 1), (22050, 1), (16000, 2), (8000, 1)):
+        for seconds in args.seconds:
+            payload = AudioPayload(render_wav(ClipSpec("speech", rate, channels, seconds, seed=1)))
+            plan = plan_conditioning(payload)
+            best = math.inf
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                written = sum(len(block) for block in iter_conditioned(payload, chunk_frames=args.chunk_frames))
+                best = min(best, time.perf_counter() - started)
+            tracemalloc.start()
+            for _ in iter_conditioned(payload, chunk_frames=args.chunk_frames):
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{f'{rate} Hz x{channels}':<16} {seconds:>6.0f} {plan.duration:>6.1f} {payload.size / 1e6:>7.2f} "
+                  f"{written / 1e6:>7.2f} {payload.size / written:>6.2f} {plan.duration / best:>11.0f} "
+                  f"{payload.size / 1e6 / best:>7.1f} {peak / 1e6:>8.2f}")
+
+    print(f"\n{'tone':<22} {'polyphase dB':>13} {'snr':>6} {'interpolated dB':>16} {'snr':>6}")
+    for rate in (48000, 44100):
+        for frequency in (300.0, 1000.0, 3000.0, 6000.0, 7000.0, 9000.0, 12000.0, 15000.0):
+            payload = _tone_wav(frequency, rate, 2.0)
+            filtered = tone_fidelity(condition_audio(payload).payload, frequency)
+            naive = tone_fidelity(_interpolated(payload, TARGET_SAMPLE_RATE), frequency)
+            if frequency < TARGET_SAMPLE_RATE / 2:
+                print(f"{f'{frequency:g} Hz from {rate}':<22} {filtered[0]:>13.2f} {filtered[1]:>6.1f} "
+                      f"{naive[0]:>16.2f} {naive[1]:>6.1f}")
+            else:
+                # Above the new Nyquist frequency: whatever comes out is an alias
+                alias = TARGET_SAMPLE_RATE - frequency % TARGET_SAMPLE_RATE if frequency % TARGET_SAMPLE_RATE > TARGET_SAMPLE_RATE / 2 \
+                    else frequency % TARGET_SAMPLE_RATE
+                print(f"{f'{frequency:g} Hz from {rate}':<22} {filtered[0]:>13.1f} {'-':>6} {naive[0]:>16.1f} "
+                      f"{'-':>6}   (alias at {alias:g} Hz)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,253 @@
+"""
+Incremental conversation context with rolling aggregates
+
+``SessionManager.getConversationContext`` re-reads the whole history and
+rebuilds ``accumulatedInfo`` on every request, and the timing mock rebuilt
+``previousInteractions`` turn by turn, so an n-turn session cost O(n²).
+``ConversationContext`` instead folds each turn into running sums when it is
+appended (confidence, processing time, language consistency, intent and
+entity tallies) and keeps only a bounded window of recent turns, so producing
+the context payload costs the same on turn 500 as on turn 2.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from .types import Intent, Language, utc_now
+
+# Recent turns kept verbatim; older turns survive only in the aggregates
+DEFAULT_WINDOW = 10
+
+
+@dataclass(frozen=True)
+class ExtractedEntity:
+    type: str
+    value: str
+    confidence: float
+
+
+@dataclass(frozen=True)
+class ConversationTurn:
+    """One exchange, mirroring ``ConversationTurn`` in ``src/types/index.ts``"""
+
+    turn_number: int
+    user_input: str
+    system_response: str
+    intent: Intent = Intent.GENERAL_INQUIRY
+    entities: Tuple[ExtractedEntity, ...] = ()
+    language: Language = Language.ENGLISH
+    confidence: float = 0.0
+    processing_time: float = 0.0
+    timestamp: datetime = field(default_factory=utc_now)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "turnNumber": self.turn_number,
+            "timestamp": self.timestamp.isoformat(),
+            "userInput": self.user_input,
+            "systemResponse": self.system_response,
+            "intent": self.intent.value,
+            "language": self.language.value,
+            "confidence": self.confidence,
+            "processingTime": self.processing_time,
+        }
+
+
+class ConversationContext:
+    """
+    Append-only session history with O(1) updates and a bounded recent window
+
+    Averages are kept as running sums, entity values as the latest sighting
+    per type plus a count, and each turn's serialised form is built once on
+    append so ``payload`` only copies at most ``window`` flat dicts.
+    """
+
+    def __init__(self, session_id: str, language: Language = Language.ENGLISH, window: int = DEFAULT_WINDOW):
+        if window < 1:
+            raise ValueError(f"Window must hold at least one turn, got {window}")
+        self.session_id = session_id
+        self.language = Language(language)
+        self.current_intent = Intent.GENERAL_INQUIRY
+        self._recent: Deque[Tuple[ConversationTurn, Dict[str, Any]]] = deque(maxlen=window)
+        self._turns = 0
+        self._confidence_total = 0.0
+        self._processing_time_total = 0.0
+        self._consistent_turns = 0
+        self._intents: Dict[Intent, int] = {intent: 0 for intent in Intent}
+        self._entities: Dict[str, Dict[str, Any]] = {}
+
+    def add_turn(
+        self,
+        user_input: str,
+        system_response: str,
+        intent: Intent = Intent.GENERAL_INQUIRY,
+        entities: Iterable[ExtractedEntity] = (),
+        language: Optional[Language] = None,
+        confidence: float = 0.0,
+        processing_time: float = 0.0,
+        timestamp: Optional[datetime] = None,
+    ) -> ConversationTurn:
+        """Record a turn and fold it into the aggregates; cost is independent of history length"""
+        turn = ConversationTurn(
+            turn_number=self._turns + 1,
+            user_input=user_input,
+            system_response=system_response,
+            intent=Intent(intent),
+            entities=tuple(entities),
+            language=Language(language or self.language),
+            confidence=confidence,
+            processing_time=processing_time,
+            timestamp=timestamp or utc_now(),
+        )
+
+        self._turns += 1
+        self._confidence_total += turn.confidence
+        self._processing_time_total += turn.processing_time
+        self._consistent_turns += turn.language == self.language
+        self._intents[turn.intent] += 1
+        self.current_intent = turn.intent
+        for entity in turn.entities:
+            seen = self._entities.get(entity.type)
+            self._entities[entity.type] = {
+                "value": entity.value,
+                "confidence": entity.confidence,
+                "timestamp": turn.timestamp.isoformat(),
+                "count": (seen["count"] if seen else 0) + 1,
+            }
+
+        self._recent.append((turn, turn.as_dict()))
+        return turn
+
+    @property
+    def turn_count(self) -> int:
+        return self._turns
+
+    @property
+    def average_confidence(self) -> float:
+        return self._confidence_total / self._turns if self._turns else 0.0
+
+    @property
+    def average_processing_time(self) -> float:
+        return self._processing_time_total / self._turns if self._turns else 0.0
+
+    @property
+    def language_consistency(self) -> float:
+        """Share of turns spoken in the session language (1.0 for an empty session)"""
+        return self._consistent_turns / self._turns if self._turns else 1.0
+
+    @property
+    def intents(self) -> Dict[Intent, int]:
+        return dict(self._intents)
+
+    @property
+    def last_turn(self) -> Optional[ConversationTurn]:
+        return self._recent[-1][0] if self._recent else None
+
+    def recent_turns(self) -> List[ConversationTurn]:
+        """Up to ``window`` most recent turns, oldest first"""
+        return [turn for turn, _ in self._recent]
+
+    def accumulated_info(self) -> Dict[str, Any]:
+        return {
+            "detectedLanguage": self.language.value,
+            "averageConfidence": self.average_confidence,
+            "totalInteractions": self._turns,
+            "averageProcessingTime": self.average_processing_time,
+            "languageConsistency": self.language_consistency,
+            "entities": {entity_type: dict(info) for entity_type, info in self._entities.items()},
+        }
+
+    def payload(self) -> Dict[str, Any]:
+        """
+        The ``conversationContext`` block for the latest turn
+
+        ``previousInteractions`` holds the windowed turns before the latest
+        one. Their dicts are built once on append and copied here, so a
+        caller changing the payload cannot alter later ones.
+        """
+        previous = [dict(serialised) for _, serialised in self._recent]
+        current = previous.pop() if previous else None
+        return {
+            "sessionId": self.session_id,
+            "currentIntent": self.current_intent.value,
+            "language": self.language.value,
+            "previousInteractions": previous,
+            "currentTurn": current,
+            "accumulatedInfo": self.accumulated_info(),
+        }
+
+
+class ConversationStore:
+    """Conversation contexts keyed by session ID"""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self._contexts: Dict[str, ConversationContext] = {}
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._contexts
+
+    def get(self, session_id: str) -> Optional[ConversationContext]:
+        return self._contexts.get(session_id)
+
+    def start(self, session_id: str, language: Language = Language.ENGLISH) -> ConversationContext:
+        """Begin a fresh conversation, replacing any existing one for the session"""
+        context = ConversationContext(session_id, language, self.window)
+        self._contexts[session_id] = context
+        return context
+
+    def context_for(self, session_id: str, language: Language = Language.ENGLISH) -> ConversationContext:
+        context = self._contexts.get(session_id)
+        return context if context is not None else self.start(session_id, language)
+
+    def end(self, session_id: str) -> None:
+        self._contexts.pop(session_id, None)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Compare per-turn cost of rebuilding the history against the incremental context"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Per-turn conversation context cost versus session length")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    args = parser.parse_args(argv)
+
+    def rebuild(turns: List[ConversationTurn]) -> Dict[str, Any]:
+        # The read-whole-history pattern of getConversationContext
+        confidences = [turn.confidence for turn in turns]
+        return {
+            "previousInteractions": [turn.as_dict() for turn in turns[:-1]],
+            "accumulatedInfo": {
+                "averageConfidence": sum(confidences) / len(confidences),
+                "totalInteractions": len(turns),
+            },
+        }
+
+    print(f"{'turns':>7} {'rebuild us/turn':>16} {'incremental us/turn':>20}")
+    for length in args.lengths:
+        history: List[ConversationTurn] = []
+        started = time.perf_counter()
+        for number in range(1, length + 1):
+            history.append(ConversationTurn(number, "user", "system", confidence=0.9))
+            rebuild(history)
+        naive = (time.perf_counter() - started) / length * 1e6
+
+        context = ConversationContext("benchmark")
+        started = time.perf_counter()
+        for _ in range(length):
+            context.add_turn("user", "system", confidence=0.9)
+            context.payload()
+        incremental = (time.perf_counter() - started) / length * 1e6
+
+        print(f"{length:>7} {naive:>16.1f} {incremental:>20.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,672 @@
+"""
+Precompiled bilingual grievance and eligibility documents
+
+``generateMockResponse`` in ``local-backend/server.js`` builds ``grievanceDoc``
+from scratch for every request, choosing each Hindi or English string with
+its own conditional, and the document and grievance generator lambdas are
+still stubs. Nearly all of a grievance is fixed once the language and
+complaint category are known: headings, labels, legal references, the
+requested action and the declaration. Only the complainant's details vary.
+At a registration camp thousands of drafts are printed in one go, and
+rebuilding the fixed text for each of them is most of the work.
+
+``DocumentEngine`` compiles one template per document kind, language,
+category and output format on first use, with the fixed text already in
+place. A ``CompiledTemplate`` is a %-format string with a slot for each
+variable field, so rendering a document is one tuple build and one string
+format:
+
+- plain text templates are compiled from ``{field}`` sources;
+- JSON templates are compiled from the document structure itself, with
+  ``slot(name)`` where a field goes. The fixed parts are serialised once;
+  field values are JSON-escaped as they are filled in;
+- an eligibility verdict's reasons are translated and laid out once per
+  distinct verdict and reused, as ``decode_verdict`` does for the reasons
+  themselves.
+
+``write_grievances`` and ``write_eligibility`` render any number of records
+to a text stream in batches, one JSON document per line or plain-text
+documents separated by form feeds for printing.
+"""
+
+import functools
+import io
+import json
+import re
+import string
+from datetime import date, datetime
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, TextIO, Tuple, Union
+
+from .eligibility import (
+    COMPLETENESS_ERRORS,
+    EXCLUDED_REASON,
+    INCOMPLETE,
+    NOT_DEPRIVED,
+    NOT_LOW_INCOME,
+    QUALIFYING_FACTORS,
+    EligibilityVerdict,
+)
+from .types import ComplaintCategory, DocumentStatus, DocumentType, Language, OutputFormat
+
+# Documents rendered before each write to the output stream
+FLUSH_DOCUMENTS = 512
+
+# Between plain-text documents, so each prints on its own page
+PAGE_BREAK = "\f\n"
+
+_encode_json_string = json.encoder.encode_basestring
+
+_SLOT_PATTERN = re.compile(r'"\\u0000(\w+)\\u0000"')
+
+
+class CompiledTemplate:
+    """
+    Fixed text with named slots, split once at compile time
+
+    ``render`` takes a mapping holding every slot's value already in the
+    output encoding (JSON-escaped for JSON templates) and substitutes them
+    with a single %-format.
+    """
+
+    __slots__ = ("fields", "_format", "_getter")
+
+    def __init__(self, format_string: str, fields: Tuple[str, ...]):
+        self.fields = fields
+        self._format = format_string
+        if len(fields) == 1:
+            name = fields[0]
+            self._getter = lambda values: (values[name],)
+        else:
+            self._getter = itemgetter(*fields) if fields else (lambda values: ())
+
+    @classmethod
+    def from_text(cls, source: str) -> "CompiledTemplate":
+        """Compile ``str.format``-style source; ``{{`` and ``}}`` are literal braces"""
+        parts, fields = [], []
+        for literal, name, spec, conversion in string.Formatter().parse(source):
+            parts.append(literal.replace("%", "%%"))
+            if name is not None:
+                if not name.isidentifier() or spec or conversion:
+                    raise ValueError(f"Template slots must be plain names, got {{{name}}}")
+                parts.append("%s")
+                fields.append(name)
+        return cls("".join(parts), tuple(fields))
+
+    @classmethod
+    def from_json(cls, structure: Any) -> "CompiledTemplate":
+        """Compile a JSON document whose variable values are ``slot(name)`` strings"""
+        text = json.dumps(structure, ensure_ascii=False).replace("%", "%%")
+        fields = tuple(_SLOT_PATTERN.findall(text))
+        return cls(_SLOT_PATTERN.sub("%s", text), fields)
+
+    def render(self, values: Mapping[str, str]) -> str:
+        try:
+            return self._format % self._getter(values)
+        except KeyError as error:
+            raise ValueError(f"No value for template field {error.args[0]!r}") from None
+
+
+def slot(name: str) -> str:
+    """Placeholder for a variable field in a JSON template structure"""
+    return f"\x00{name}\x00"
+
+
+def _literal(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+# ---------------------------------------------------------------------------
+# Bilingual text
+# ---------------------------------------------------------------------------
+
+GRIEVANCE_TEXT = {
+    Language.HINDI: {
+        "title": "स्वास्थ्य शिकायत - मसौदा",
+        "heading": "स्वास्थ्य सेवा संबंधी शिकायत",
+        "grievanceId": "शिकायत संख्या",
+        "date": "दिनांक",
+        "addressee": "सेवा में,\nजिला शिकायत निवारण अधिकारी, PM-JAY",
+        "subject": "विषय",
+        "complainantName": "शिकायतकर्ता का नाम",
+        "contactNumber": "संपर्क नंबर",
+        "incidentDate": "घटना की तारीख",
+        "hospitalName": "अस्पताल का नाम",
+        "complaint": "शिकायत का विवरण",
+        "legalReferences": "कानूनी संदर्भ",
+        "requestedAction": "अनुरोधित कार्रवाई",
+        "declaration": "मैं घोषणा करता/करती हूं कि ऊपर दी गई जानकारी मेरी जानकारी के अनुसार सत्य है।",
+        "signature": "हस्ताक्षर",
+    },
+    Language.ENGLISH: {
+        "title": "Health Grievance - Draft",
+        "heading": "Health Service Related Complaint",
+        "grievanceId": "Grievance ID",
+        "date": "Date",
+        "addressee": "To,\nThe District Grievance Redressal Officer, PM-JAY",
+        "subject": "Subject",
+        "complainantName": "Complainant Name",
+        "contactNumber": "Contact Number",
+        "incidentDate": "Incident Date",
+        "hospitalName": "Hospital Name",
+        "complaint": "Complaint Details",
+        "legalReferences": "Legal References",
+        "requestedAction": "Requested Action",
+        "declaration": "I declare that the information given above is true to the best of my knowledge.",
+        "signature": "Signature",
+    },
+}
+
+# The placeholders server.js fills a draft with, used for fields a record leaves out
+GRIEVANCE_DEFAULTS = {
+    Language.HINDI: {
+        "complainantName": "आपका नाम",
+        "contactNumber": "आपका मोबाइल नंबर",
+        "location": "अस्पताल/स्वास्थ्य केंद्र का नाम",
+        "description": "शिकायत का विस्तृत विवरण यहां होगा...",
+        "district": "जिला",
+        "state": "राज्य",
+    },
+    Language.ENGLISH: {
+        "complainantName": "Your Name",
+        "contactNumber": "Your Mobile Number",
+        "location": "Hospital/Health Center Name",
+        "description": "Detailed complaint description will be here...",
+        "district": "District",
+        "state": "State",
+    },
+}
+
+CATEGORY_TEXT = {
+    ComplaintCategory.HOSPITAL_OVERCHARGING: {
+        Language.HINDI: (
+            "अस्पताल द्वारा अधिक शुल्क वसूली",
+            "PM-JAY के अंतर्गत कैशलेस इलाज के बदले वसूली गई राशि की वापसी और अस्पताल के विरुद्ध कार्रवाई।",
+            ("PM-JAY दिशानिर्देश धारा 4.2", "उपभोक्ता संरक्षण अधिनियम 2019"),
+        ),
+        Language.ENGLISH: (
+            "Hospital overcharging",
+            "Refund of the amount charged for treatment that is cashless under PM-JAY, and action against the hospital.",
+            ("PM-JAY Guidelines Section 4.2", "Consumer Protection Act 2019"),
+        ),
+    },
+    ComplaintCategory.BENEFIT_DENIAL: {
+        Language.HINDI: (
+            "योजना लाभ से इनकार",
+            "पात्र लाभार्थी को PM-JAY के अंतर्गत तुरंत इलाज उपलब्ध कराया जाए।",
+            ("PM-JAY दिशानिर्देश धारा 4.2", "राष्ट्रीय स्वास्थ्य नीति 2017"),
+        ),
+        Language.ENGLISH: (
+            "Denial of scheme benefits",
+            "Immediate treatment under PM-JAY for the eligible beneficiary.",
+            ("PM-JAY Guidelines Section 4.2", "National Health Policy 2017"),
+        ),
+    },
+    ComplaintCategory.SERVICE_QUALITY: {
+        Language.HINDI: (
+            "सेवा की खराब गुणवत्ता",
+            "सेवा में कमी की जांच और सुधारात्मक कार्रवाई।",
+            ("राष्ट्रीय स्वास्थ्य नीति 2017", "उपभोक्ता संरक्षण अधिनियम 2019"),
+        ),
+        Language.ENGLISH: (
+            "Poor quality of service",
+            "Inquiry into the deficiency in service and corrective action.",
+            ("National Health Policy 2017", "Consumer Protection Act 2019"),
+        ),
+    },
+    ComplaintCategory.DISCRIMINATION: {
+        Language.HINDI: (
+            "इलाज में भेदभाव",
+            "भेदभाव की जांच और बिना भेदभाव के इलाज सुनिश्चित किया जाए।",
+            ("भारत का संविधान, अनुच्छेद 15", "राष्ट्रीय स्वास्थ्य नीति 2017"),
+        ),
+        Language.ENGLISH: (
+            "Discrimination in treatment",
+            "Inquiry into the discrimination and assurance of equal treatment.",
+            ("Constitution of India, Article 15", "National Health Policy 2017"),
+        ),
+    },
+}
+
+ELIGIBILITY_TEXT = {
+    Language.HINDI: {
+        "title": "PM-JAY पात्रता आकलन",
+        "householdId": "परिवार संख्या",
+        "date": "दिनांक",
+        "eligible": "परिणाम: PM-JAY के लिए संभवतः पात्र",
+        "ineligible": "परिणाम: PM-JAY के लिए पात्र नहीं",
+        "incomplete": "परिणाम: अधिक जानकारी की आवश्यकता है",
+        "reasons": "कारण",
+        "missing": "आवश्यक जानकारी",
+        "note": "यह प्रारंभिक जांच है। अंतिम पात्रता की पुष्टि राशन कार्ड और आधार के साथ PM-JAY सहायता केंद्र (आरोग्य मित्र) पर होगी।",
+    },
+    Language.ENGLISH: {
+        "title": "PM-JAY Eligibility Assessment",
+        "householdId": "Household ID",
+        "date": "Date",
+        "eligible": "Result: Likely eligible for PM-JAY",
+        "ineligible": "Result: Not eligible for PM-JAY",
+        "incomplete": "Result: More information needed",
+        "reasons": "Reasons",
+        "missing": "Missing information",
+        "note": "This is a preliminary screening. Final eligibility is confirmed at the PM-JAY help desk (Arogya Mitra) with your ration card and Aadhaar.",
+    },
+}
+
+# Hindi for every reason the screening can give; schema errors are shown as they are
+_HINDI_QUALIFYING = [
+    "पहले से PM-JAY में नामांकित",
+    "परिवार बेघर है (स्वतः शामिल)",
+    "SECC 2011 में पात्र के रूप में सूचीबद्ध (स्वतः शामिल)",
+    "आय श्रेणी गरीबी रेखा से नीचे है",
+    "अंत्योदय (AAY) राशन कार्ड धारक",
+    "BPL राशन कार्ड धारक",
+    "कच्चे मकान में निवास",
+    "16 से 59 वर्ष की आयु का कोई वयस्क सदस्य नहीं",
+    "महिला मुखिया वाला परिवार, 16 से 59 वर्ष का कोई वयस्क पुरुष नहीं",
+    "विकलांग सदस्य और कोई सक्षम वयस्क नहीं",
+]
+_HINDI_COMPLETENESS = ["कम से कम एक परिवार सदस्य बताना आवश्यक है", "परिवार के मुखिया की जानकारी आवश्यक है"]
+
+REASON_TRANSLATIONS = {
+    Language.HINDI: {
+        **{message: hindi for (_, message), hindi in zip(QUALIFYING_FACTORS, _HINDI_QUALIFYING)},
+        **{message: hindi for (_, message), hindi in zip(COMPLETENESS_ERRORS, _HINDI_COMPLETENESS)},
+        INCOMPLETE: "परिवार की जानकारी अधूरी है",
+        EXCLUDED_REASON: "पहले से CGHS या ESIC के अंतर्गत",
+        NOT_LOW_INCOME: "आय गरीबी रेखा से ऊपर है और BPL या AAY राशन कार्ड नहीं है",
+        NOT_DEPRIVED: "आवास या परिवार संरचना का कोई मापदंड पूरा नहीं होता",
+    },
+    Language.ENGLISH: {},
+}
+
+
+def format_date(value: Union[str, date], language: Language) -> str:
+    """``toLocaleDateString`` as server.js shows it: D/M/YYYY for hi-IN, M/D/YYYY for en-US"""
+    if isinstance(value, str):
+        return _format_iso_date(value, language)
+    if isinstance(value, datetime):
+        value = value.date()
+    return f"{value.day}/{value.month}/{value.year}" if language == Language.HINDI else f"{value.month}/{value.day}/{value.year}"
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_iso_date(value: str, language: Language) -> str:
+    # Camp batches share a handful of dates, so each is parsed once
+    return format_date(date.fromisoformat(value[:10]), language)
+
+
+# ---------------------------------------------------------------------------
+# Template sources
+# ---------------------------------------------------------------------------
+
+def _grievance_text_source(language: Language, category: ComplaintCategory) -> str:
+    text = {key: _literal(value) for key, value in GRIEVANCE_TEXT[language].items()}
+    subject, action, references = CATEGORY_TEXT[category][language]
+    reference_lines = "\n".join(f"- {_literal(reference)}" for reference in references)
+    return (
+        f"{text['heading']}\n"
+        f"{text['grievanceId']}: {{grievanceId}}\n"
+        f"{text['date']}: {{filedDate}}\n\n"
+        f"{text['addressee']}\n"
+        "{district}, {state}\n\n"
+        f"{text['subject']}: {_literal(subject)}\n\n"
+        f"{text['complainantName']}: {{complainantName}}\n"
+        f"{text['contactNumber']}: {{contactNumber}}\n"
+        f"{text['incidentDate']}: {{incidentDate}}\n"
+        f"{text['hospitalName']}: {{location}}\n\n"
+        f"{text['complaint']}:\n{{description}}\n\n"
+        f"{text['legalReferences']}:\n{reference_lines}\n\n"
+        f"{text['requestedAction']}:\n{_literal(action)}\n\n"
+        f"{text['declaration']}\n\n"
+        f"{text['signature']}: ____________________\n"
+    )
+
+
+def _grievance_json_structure(language: Language, category: ComplaintCategory) -> Dict[str, Any]:
+    text = GRIEVANCE_TEXT[language]
+    subject, action, references = CATEGORY_TEXT[category][language]
+    return {
+        "id": slot("grievanceId"),
+        "type": DocumentType.HEALTH_GRIEVANCE.value,
+        "title": text["title"],
+        "language": language.value,
+        "content": {
+            "title": text["heading"],
+            "description": slot("description"),
+            "category": subject,
+            "incidentDate": slot("incidentDateIso"),
+            "location": slot("location"),
+            "address": {"district": slot("district"), "state": slot("state")},
+            "legalReferences": list(references),
+            "recommendedAction": action,
+            "formFields": {
+                text["complainantName"]: slot("complainantName"),
+                text["contactNumber"]: slot("contactNumber"),
+                text["incidentDate"]: slot("incidentDate"),
+                text["hospitalName"]: slot("location"),
+            },
+        },
+        "createdAt": slot("filedDateIso"),
+        "status": DocumentStatus.DRAFT.value,
+    }
+
+
+def _eligibility_text_source(language: Language) -> str:
+    text = {key: _literal(value) for key, value in ELIGIBILITY_TEXT[language].items()}
+    return (
+        f"{text['title']}\n"
+        f"{text['householdId']}: {{householdId}}\n"
+        f"{text['date']}: {{filedDate}}\n\n"
+        "{verdict}\n"
+        f"{text['note']}\n"
+    )
+
+
+def _eligibility_json_structure(language: Language) -> Dict[str, Any]:
+    return {
+        "id": slot("householdId"),
+        "type": DocumentType.PM_JAY_APPLICATION.value,
+        "title": ELIGIBILITY_TEXT[language]["title"],
+        "language": language.value,
+        # Filled with a JSON object, not a string
+        "result": slot("verdict"),
+        "note": ELIGIBILITY_TEXT[language]["note"],
+        "createdAt": slot("filedDateIso"),
+        "status": DocumentStatus.DRAFT.value,
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _verdict_section(
+    language: Language, output: OutputFormat, eligible: bool, reasons: Tuple[str, ...], missing: Tuple[str, ...]
+) -> str:
+    """The translated result block for one distinct verdict, rendered once"""
+    text = ELIGIBILITY_TEXT[language]
+    translate = REASON_TRANSLATIONS[language]
+    summary = text["eligible"] if eligible else text["incomplete"] if missing else text["ineligible"]
+    reasons = tuple(translate.get(reason, reason) for reason in reasons)
+    missing = tuple(translate.get(item, item) for item in missing)
+    if output is OutputFormat.JSON:
+        return json.dumps(
+            {"eligible": eligible, "summary": summary, "reasoning": list(reasons), "missingCriteria": list(missing)},
+            ensure_ascii=False,
+        )
+    lines = [summary, f"{text['reasons']}:", *(f"- {reason}" for reason in reasons)]
+    if missing:
+        lines += [f"{text['missing']}:", *(f"- {item}" for item in missing)]
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+
+GrievanceRecord = Mapping[str, Any]
+
+_SUPPORTED_FORMATS = (OutputFormat.PLAIN_TEXT, OutputFormat.JSON)
+
+# Record keys that pick the template or need formatting rather than filling a slot as they are
+_CONTROL_FIELDS = frozenset({"language", "category", "incidentDate"})
+
+
+class DocumentEngine:
+    """
+    Renders grievance drafts and eligibility letters from compiled templates
+
+    Templates are compiled on first use and kept for the life of the engine,
+    one per (document kind, language, category, output format). ``filed``
+    is the date printed on every document; a batch fixes it once.
+
+    A grievance record is a mapping with ``grievanceId``, ``category`` (a
+    ``ComplaintCategory`` value), ``complainantName``, ``contactNumber``,
+    ``incidentDate`` (ISO string or ``date``), ``location``,
+    ``description``, ``district``, ``state`` and optionally ``language``.
+    Missing fields get the placeholders server.js puts in a draft.
+    """
+
+    def __init__(self, language: Language = Language.HINDI):
+        self.language = Language(language)
+        self._templates: Dict[Tuple[str, Language, Optional[ComplaintCategory], OutputFormat], CompiledTemplate] = {}
+
+    def template(
+        self, kind: str, language: Language, output: OutputFormat, category: Optional[ComplaintCategory] = None
+    ) -> CompiledTemplate:
+        """The compiled template for ``kind`` (``grievance`` or ``eligibility``), compiling it on first use"""
+        key = (kind, language, category, output)
+        compiled = self._templates.get(key)
+        if compiled is None:
+            if output not in _SUPPORTED_FORMATS:
+                raise ValueError(f"Unsupported output format: {output.value}")
+            if kind == "grievance":
+                compiled = (
+                    CompiledTemplate.from_json(_grievance_json_structure(language, category))
+                    if output is OutputFormat.JSON
+                    else CompiledTemplate.from_text(_grievance_text_source(language, category))
+                )
+            elif kind == "eligibility":
+                compiled = (
+                    CompiledTemplate.from_json(_eligibility_json_structure(language))
+                    if output is OutputFormat.JSON
+                    else CompiledTemplate.from_text(_eligibility_text_source(language))
+                )
+            else:
+                raise ValueError(f"Unknown document kind: {kind}")
+            self._templates[key] = compiled
+        return compiled
+
+    def render_grievance(
+        self, record: GrievanceRecord, output: OutputFormat = OutputFormat.PLAIN_TEXT, filed: Optional[date] = None
+    ) -> str:
+        """One grievance draft"""
+        return self._grievance_renderer(OutputFormat(output), filed or date.today())(record)
+
+    def render_eligibility(
+        self,
+        verdict: EligibilityVerdict,
+        language: Optional[Language] = None,
+        output: OutputFormat = OutputFormat.PLAIN_TEXT,
+        filed: Optional[date] = None,
+    ) -> str:
+        """One eligibility letter for a screening verdict"""
+        return self._eligibility_renderer(Language(language or self.language), OutputFormat(output), filed or date.today())(verdict)
+
+    def write_grievances(
+        self,
+        records: Iterable[GrievanceRecord],
+        stream: TextIO,
+        output: OutputFormat = OutputFormat.PLAIN_TEXT,
+        filed: Optional[date] = None,
+    ) -> int:
+        """Render every record to ``stream``; returns the number of documents written"""
+        output = OutputFormat(output)
+        return _write(map(self._grievance_renderer(output, filed or date.today()), records), stream, output)
+
+    def write_eligibility(
+        self,
+        verdicts: Iterable[EligibilityVerdict],
+        stream: TextIO,
+        language: Optional[Language] = None,
+        output: OutputFormat = OutputFormat.PLAIN_TEXT,
+        filed: Optional[date] = None,
+    ) -> int:
+        """Render a letter for every verdict to ``stream``; returns the number written"""
+        output = OutputFormat(output)
+        renderer = self._eligibility_renderer(Language(language or self.language), output, filed or date.today())
+        return _write(map(renderer, verdicts), stream, output)
+
+    def _grievance_renderer(self, output: OutputFormat, filed: date):
+        as_json = output is OutputFormat.JSON
+        # Per-language values shared by every document in the batch, encoded once
+        shared = {}
+        for language in Language:
+            values = {**GRIEVANCE_DEFAULTS[language], "filedDate": format_date(filed, language), "filedDateIso": filed.isoformat()}
+            shared[language] = {key: _encode_json_string(value) for key, value in values.items()} if as_json else values
+        default_language = self.language
+        templates = self._templates
+
+        def render(record: GrievanceRecord) -> str:
+            # str enums hash and compare as their values, so raw "hi" finds the Language.HINDI entry
+            language = record.get("language") or default_language
+            category = record.get("category") or ComplaintCategory.SERVICE_QUALITY
+            template = templates.get(("grievance", language, category, output))
+            if template is None:
+                language, category = Language(language), ComplaintCategory(category)
+                template = self.template("grievance", language, output, category)
+
+            values = dict(shared[language])
+            incident = record.get("incidentDate") or filed
+            for key, value in record.items():
+                if value is not None and key not in _CONTROL_FIELDS:
+                    values[key] = _encode_json_string(str(value)) if as_json else str(value)
+            incident_text = format_date(incident, language)
+            if as_json:
+                values["incidentDate"] = _encode_json_string(incident_text)
+                values["incidentDateIso"] = _encode_json_string(incident if isinstance(incident, str) else incident.isoformat())
+            else:
+                values["incidentDate"] = incident_text
+            return template.render(values)
+
+        return render
+
+    def _eligibility_renderer(self, language: Language, output: OutputFormat, filed: date):
+        template = self.template("eligibility", language, output)
+        as_json = output is OutputFormat.JSON
+        encode = _encode_json_string if as_json else str
+        filed_date, filed_iso = encode(format_date(filed, language)), encode(filed.isoformat())
+
+        def render(verdict: EligibilityVerdict) -> str:
+            return template.render({
+                "householdId": encode(verdict.household_id),
+                "filedDate": filed_date,
+                "filedDateIso": filed_iso,
+                "verdict": _verdict_section(language, output, verdict.eligible, verdict.reasons, verdict.missing),
+            })
+
+        return render
+
+
+def _write(documents: Iterable[str], stream: TextIO, output: OutputFormat) -> int:
+    separator = "\n" if output is OutputFormat.JSON else PAGE_BREAK
+    pending: List[str] = []
+    written = 0
+    for document in documents:
+        if output is OutputFormat.JSON:
+            pending.append(document)
+            pending.append(separator)
+        else:
+            if written:
+                pending.append(separator)
+            pending.append(document)
+        written += 1
+        if len(pending) >= 2 * FLUSH_DOCUMENTS:
+            stream.write("".join(pending))
+            pending = []
+    if pending:
+        stream.write("".join(pending))
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+_NAMES = ["Ramesh Kumar", "Sunita Devi", "Anil Yadav", "Priya Sharma", "Mohan Lal", "Geeta Bai"]
+_HOSPITALS = ["District Hospital, Sitapur", "City Care Hospital, Lucknow", "CHC Bari", "Apollo Clinic, Patna"]
+
+
+def sample_grievances(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic camp intake records"""
+    import random
+
+    rng = random.Random(seed)
+    categories = list(ComplaintCategory)
+    return [
+        {
+            "grievanceId": f"GRV-{index:07d}",
+            "language": rng.choice(["hi", "en"]),
+            "category": rng.choice(categories).value,
+            "complainantName": rng.choice(_NAMES),
+            "contactNumber": f"9{rng.randrange(10 ** 9):09d}",
+            "incidentDate": date(2024, rng.randint(1, 12), rng.randint(1, 28)).isoformat(),
+            "location": rng.choice(_HOSPITALS),
+            "description": "Asked to pay Rs %d for surgery covered under PM-JAY." % rng.randrange(5000, 90000),
+            "district": "Sitapur",
+            "state": "Uttar Pradesh",
+        }
+        for index in range(count)
+    ]
+
+
+def build_grievance(record: GrievanceRecord, filed: date) -> Dict[str, Any]:
+    """The document built from scratch the way grievanceDoc is, for comparison with the compiled path"""
+    language = Language(record.get("language", Language.HINDI))
+    hi = language is Language.HINDI
+    category = ComplaintCategory(record.get("category", ComplaintCategory.SERVICE_QUALITY))
+    subject, action, references = CATEGORY_TEXT[category][language]
+    defaults = GRIEVANCE_DEFAULTS[language]
+    incident = record.get("incidentDate") or filed
+    incident_iso = incident if isinstance(incident, str) else incident.isoformat()
+    value = lambda key: str(record[key]) if record.get(key) is not None else defaults[key]
+    return {
+        "id": str(record["grievanceId"]),
+        "type": "health_grievance",
+        "title": "स्वास्थ्य शिकायत - मसौदा" if hi else "Health Grievance - Draft",
+        "language": language.value,
+        "content": {
+            "title": "स्वास्थ्य सेवा संबंधी शिकायत" if hi else "Health Service Related Complaint",
+            "description": value("description"),
+            "category": subject,
+            "incidentDate": incident_iso,
+            "location": value("location"),
+            "address": {"district": value("district"), "state": value("state")},
+            "legalReferences": list(references),
+            "recommendedAction": action,
+            "formFields": {
+                "शिकायतकर्ता का नाम" if hi else "Complainant Name": value("complainantName"),
+                "संपर्क नंबर" if hi else "Contact Number": value("contactNumber"),
+                "घटना की तारीख" if hi else "Incident Date": format_date(date.fromisoformat(incident_iso), language),
+                "अस्पताल का नाम" if hi else "Hospital Name": value("location"),
+            },
+        },
+        "createdAt": filed.isoformat(),
+        "status": "draft",
+    }
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Compare rendering grievances from scratch with the compiled templates"""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Bulk grievance rendering throughput")
+    parser.add_argument("--documents", type=int, default=20_000)
+    parser.add_argument("--output", type=OutputFormat, choices=list(_SUPPORTED_FORMATS), default=OutputFormat.JSON)
+    args = parser.parse_args(argv)
+
+    records = sample_grievances(args.documents)
+    filed = date.today()
+
+    def report(label: str, started: float, stream: io.StringIO) -> None:
+        elapsed = time.perf_counter() - started
+        print(f"{label:<24} {args.documents / elapsed:>10,.0f} docs/s  {elapsed / args.documents * 1e6:>6.1f} us/doc  "
+              f"{len(stream.getvalue()) / 1e6:.1f} MB")
+
+    if args.output is OutputFormat.JSON:
+        stream = io.StringIO()
+        started = time.perf_counter()
+        for record in records:
+            stream.write(json.dumps(build_grievance(record, filed), ensure_ascii=False))
+            stream.write("\n")
+        report("built per request", started, stream)
+
+    engine = DocumentEngine()
+    stream = io.StringIO()
+    started = time.perf_counter()
+    engine.write_grievances(records, stream, args.output, filed)
+    report("compiled templates", started, stream)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
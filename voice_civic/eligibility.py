@@ -0,0 +1,669 @@
+"""
+Columnar PM-JAY eligibility screening
+
+``validatePMJAYEligibility`` checks one household object at a time and the
+eligibility lambda is still a stub, so pre-screening a district list means
+hundreds of thousands of separate calls. ``HouseholdColumns`` loads records
+into NumPy arrays, one entry per household plus one per person, and
+``evaluate`` computes every criterion as a vectorised mask. The masks pack
+into one integer per household; ``decode_verdict`` turns that integer into a
+verdict and its reasons, and is cached, so a district needs only a few
+dozen distinct reason lists however many households it has.
+
+Rows the columns cannot represent exactly (anything that would fail the
+household schema) go through the single-record path instead, so every
+verdict, including every error message, matches ``assess_household``.
+
+Criteria follow the SECC 2011 rules PM-JAY uses:
+    - existing schemes: households enrolled in PM-JAY qualify; CGHS or
+      ESIC coverage excludes
+    - automatic inclusion: homeless households, and households listed as
+      eligible in SECC 2011
+    - income: below poverty line, or an Antyodaya or BPL ration card
+    - household composition and housing: a kutcha house, no adult aged
+      16-59, a female head with no adult male aged 16-59, or a disabled
+      member and no able-bodied adult
+A household qualifies when it is not excluded and is enrolled, is
+automatically included, or meets both an income and a composition
+criterion.
+"""
+
+import csv
+import functools
+import io
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .types import FamilyRelation, Gender, HousingType, IncomeCategory, RationCardType
+from .validation import _js_length, validate_pmjay_eligibility
+
+ADULT_AGE_RANGE = (16, 59)
+
+ENROLLED_SCHEMES = frozenset({"pmjay", "abpmjay", "ayushmanbharat", "ayushmanbharatpmjay"})
+EXCLUDING_SCHEMES = frozenset({"cghs", "esic"})
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Condition bits, in the order their reasons are listed
+ENROLLED = 1 << 0
+HOMELESS = 1 << 1
+SECC_LISTED = 1 << 2
+BPL_INCOME = 1 << 3
+AAY_CARD = 1 << 4
+BPL_CARD = 1 << 5
+KUTCHA_HOUSE = 1 << 6
+NO_ADULT = 1 << 7
+FEMALE_HEADED = 1 << 8
+DISABLED_DEPENDENT = 1 << 9
+EXCLUDED = 1 << 10
+NO_MEMBERS = 1 << 11
+NO_HEAD = 1 << 12
+
+QUALIFYING_FACTORS = [
+    (ENROLLED, "Already enrolled in PM-JAY"),
+    (HOMELESS, "Household is homeless (automatic inclusion)"),
+    (SECC_LISTED, "Listed as eligible in SECC 2011 (automatic inclusion)"),
+    (BPL_INCOME, "Income category is below poverty line"),
+    (AAY_CARD, "Holds an Antyodaya (AAY) ration card"),
+    (BPL_CARD, "Holds a BPL ration card"),
+    (KUTCHA_HOUSE, "Lives in a kutcha house"),
+    (NO_ADULT, "No adult member aged 16 to 59"),
+    (FEMALE_HEADED, "Female-headed household with no adult male aged 16 to 59"),
+    (DISABLED_DEPENDENT, "Disabled member and no able-bodied adult"),
+]
+
+# validatePMJAYEligibility's own checks, for households that pass the schema
+COMPLETENESS_ERRORS = [
+    (NO_MEMBERS, "At least one family member must be specified"),
+    (NO_HEAD, "Head of household must be specified"),
+]
+
+INCOMPLETE = "Household information is incomplete"
+EXCLUDED_REASON = "Already covered by CGHS or ESIC"
+NOT_LOW_INCOME = "Income above poverty line with no BPL or AAY ration card"
+NOT_DEPRIVED = "No housing or household composition criterion met"
+
+_AUTOMATIC = ENROLLED | HOMELESS | SECC_LISTED
+_LOW_INCOME = BPL_INCOME | AAY_CARD | BPL_CARD
+_DEPRIVED = KUTCHA_HOUSE | NO_ADULT | FEMALE_HEADED | DISABLED_DEPENDENT
+_INCOMPLETE = NO_MEMBERS | NO_HEAD
+
+
+@dataclass(frozen=True)
+class EligibilityVerdict:
+    """One household's decision; ``missing`` holds validator errors when it could not be assessed"""
+
+    household_id: str
+    eligible: bool
+    reasons: Tuple[str, ...]
+    missing: Tuple[str, ...] = ()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "householdId": self.household_id,
+            "eligible": self.eligible,
+            "reasoning": list(self.reasons),
+            "missingCriteria": list(self.missing),
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def decode_verdict(code: int) -> Tuple[bool, Tuple[str, ...], Tuple[str, ...]]:
+    """``(eligible, reasons, missing)`` for a packed set of condition bits"""
+    if code & _INCOMPLETE:
+        return False, (INCOMPLETE,), tuple(message for bit, message in COMPLETENESS_ERRORS if code & bit)
+    if code & EXCLUDED:
+        return False, (EXCLUDED_REASON,), ()
+    if code & _AUTOMATIC or (code & _LOW_INCOME and code & _DEPRIVED):
+        return True, tuple(message for bit, message in QUALIFYING_FACTORS if code & bit), ()
+    reasons = []
+    if not code & _LOW_INCOME:
+        reasons.append(NOT_LOW_INCOME)
+    if not code & _DEPRIVED:
+        reasons.append(NOT_DEPRIVED)
+    return False, tuple(reasons), ()
+
+
+def scheme_key(name: str) -> str:
+    """"Ayushman Bharat", "ayushman-bharat" and "AYUSHMAN_BHARAT" are the same scheme"""
+    return re.sub(r"[^a-z]", "", name.lower())
+
+
+def _is_adult(age: int) -> bool:
+    return ADULT_AGE_RANGE[0] <= age <= ADULT_AGE_RANGE[1]
+
+
+def household_conditions(household: Dict[str, Any]) -> int:
+    """Condition bits for one household that has already passed the schema"""
+    head = household["headOfHousehold"]
+    people = [head, *household["members"]]
+    economic = household["economicStatus"]
+    schemes = {scheme_key(name) for name in household["existingSchemes"]}
+
+    def disabled(person):
+        return bool(person.get("disabilities"))
+
+    adults = [person for person in people if _is_adult(person["age"])]
+    code = 0
+    if schemes & ENROLLED_SCHEMES:
+        code |= ENROLLED
+    if schemes & EXCLUDING_SCHEMES:
+        code |= EXCLUDED
+    if economic["housingType"] == HousingType.HOMELESS.value:
+        code |= HOMELESS
+    if economic["housingType"] == HousingType.KUTCHA.value:
+        code |= KUTCHA_HOUSE
+    if economic["incomeCategory"] == IncomeCategory.SECC_ELIGIBLE.value:
+        code |= SECC_LISTED
+    if economic["incomeCategory"] == IncomeCategory.BPL.value:
+        code |= BPL_INCOME
+    if economic.get("rationCardType") == RationCardType.AAY.value:
+        code |= AAY_CARD
+    if economic.get("rationCardType") == RationCardType.BPL.value:
+        code |= BPL_CARD
+    if not adults:
+        code |= NO_ADULT
+    if head["gender"] == Gender.FEMALE.value and not any(p["gender"] == Gender.MALE.value for p in adults):
+        code |= FEMALE_HEADED
+    if any(disabled(person) for person in people) and not any(not disabled(person) for person in adults):
+        code |= DISABLED_DEPENDENT
+    if not household["members"]:
+        code |= NO_MEMBERS
+    if not any(person["relation"] == FamilyRelation.HEAD.value for person in people):
+        code |= NO_HEAD
+    return code
+
+
+def assess_household(household: Any, household_id: str = "") -> EligibilityVerdict:
+    """The single-record path: ``validatePMJAYEligibility``, then the criteria"""
+    errors = validate_pmjay_eligibility(household)
+    if errors:
+        return EligibilityVerdict(household_id, False, (INCOMPLETE,), tuple(errors))
+    return EligibilityVerdict(household_id, *decode_verdict(household_conditions(household)))
+
+
+# ---------------------------------------------------------------------------
+# Columnar representation
+# ---------------------------------------------------------------------------
+
+_GENDERS = {member.value: code for code, member in enumerate(Gender)}
+_RELATIONS = {member.value: code for code, member in enumerate(FamilyRelation)}
+_INCOMES = {member.value: code for code, member in enumerate(IncomeCategory)}
+_RATIONS = {member.value: code for code, member in enumerate(RationCardType)}
+_HOUSING = {member.value: code for code, member in enumerate(HousingType)}
+_PINCODE = re.compile(r"[0-9]{6}\Z")
+
+
+class _Unrepresentable(Exception):
+    """The record needs the single-record path to report exactly what is wrong with it"""
+
+
+def _require(condition: bool) -> None:
+    if not condition:
+        raise _Unrepresentable
+
+
+def _text(value: Any, min_length: int = 0, max_length: Optional[int] = None) -> None:
+    _require(type(value) is str and len(value) >= min_length)
+    if max_length is not None and len(value) * 2 > max_length:
+        _require(_js_length(value) <= max_length)
+
+
+def _number(value: Any) -> None:
+    _require(type(value) in (int, float) and value == value and value >= 0)
+
+
+def _optional_text(record: Dict[str, Any], key: str, max_length: Optional[int] = None) -> None:
+    if key in record:
+        _text(record[key], max_length=max_length)
+
+
+def _strict_entries(value: Any, fields: Sequence[Tuple[str, str]]) -> None:
+    """A list of objects whose fields are non-empty strings ("text") or booleans ("bool")"""
+    _require(type(value) is list)
+    for entry in value:
+        _require(type(entry) is dict)
+        for key, kind in fields:
+            if kind == "text":
+                _text(entry.get(key), min_length=1)
+            else:
+                _require(type(entry.get(key)) is bool)
+
+
+class HouseholdColumns:
+    """
+    Households as parallel arrays
+
+    Household arrays have one entry per record; person arrays have one per
+    person, head first, and ``offsets[i]:offsets[i + 1]`` selects household
+    ``i``'s people. Records that would fail the schema are kept aside in
+    ``fallback`` and have no people.
+    """
+
+    def __init__(self, ids: List[str], fallback: Dict[int, Any], household: Dict[str, np.ndarray], person: Dict[str, np.ndarray]):
+        self.ids = ids
+        self.fallback = fallback
+        self.income = household["income"]
+        self.ration = household["ration"]
+        self.housing = household["housing"]
+        self.enrolled = household["enrolled"]
+        self.excluded = household["excluded"]
+        self.offsets = household["offsets"]
+        self.age = person["age"]
+        self.gender = person["gender"]
+        self.relation = person["relation"]
+        self.disabled = person["disabled"]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, Any]]) -> "HouseholdColumns":
+        """Build from ``(household_id, household)`` pairs of decoded JSON"""
+        ids: List[str] = []
+        fallback: Dict[int, Any] = {}
+        income: List[int] = []
+        ration: List[int] = []
+        housing: List[int] = []
+        enrolled: List[bool] = []
+        excluded: List[bool] = []
+        offsets = [0]
+        ages: List[int] = []
+        genders: List[int] = []
+        relations: List[int] = []
+        disabled: List[bool] = []
+
+        for index, (household_id, record) in enumerate(records):
+            ids.append(household_id)
+            people_before = len(ages)
+            try:
+                encoded = cls._encode(record, ages, genders, relations, disabled)
+            except (_Unrepresentable, KeyError, TypeError, AttributeError):
+                del ages[people_before:], genders[people_before:], relations[people_before:], disabled[people_before:]
+                fallback[index] = record
+                encoded = (0, -1, 0, False, False)
+            income.append(encoded[0])
+            ration.append(encoded[1])
+            housing.append(encoded[2])
+            enrolled.append(encoded[3])
+            excluded.append(encoded[4])
+            offsets.append(len(ages))
+
+        return cls(
+            ids,
+            fallback,
+            {
+                "income": np.array(income, dtype=np.int8),
+                "ration": np.array(ration, dtype=np.int8),
+                "housing": np.array(housing, dtype=np.int8),
+                "enrolled": np.array(enrolled, dtype=bool),
+                "excluded": np.array(excluded, dtype=bool),
+                "offsets": np.array(offsets, dtype=np.int64),
+            },
+            {
+                "age": np.array(ages, dtype=np.int16),
+                "gender": np.array(genders, dtype=np.int8),
+                "relation": np.array(relations, dtype=np.int8),
+                "disabled": np.array(disabled, dtype=bool),
+            },
+        )
+
+    @staticmethod
+    def _encode(record, ages, genders, relations, disabled) -> Tuple[int, int, int, bool, bool]:
+        """Append one household's people and return its household fields, or raise if it is not clean"""
+        _require(type(record) is dict)
+        members = record["members"]
+        _require(type(members) is list)
+        for person in (record["headOfHousehold"], *members):
+            _require(type(person) is dict)
+            _text(person.get("name"), min_length=1, max_length=100)
+            age = person.get("age")
+            _require(type(age) is int and 0 <= age <= 150)
+            _optional_text(person, "occupation", max_length=100)
+            has_disability = False
+            if "disabilities" in person:
+                _strict_entries(person["disabilities"], (("type", "text"), ("severity", "text"), ("certified", "bool")))
+                has_disability = bool(person["disabilities"])
+            if "chronicConditions" in person:
+                _strict_entries(person["chronicConditions"], (("condition", "text"), ("chronic", "bool"), ("treatmentRequired", "bool")))
+            genders.append(_GENDERS[person["gender"]])
+            relations.append(_RELATIONS[person["relation"]])
+            ages.append(age)
+            disabled.append(has_disability)
+
+        address = record["address"]
+        _require(type(address) is dict)
+        _optional_text(address, "street")
+        _optional_text(address, "village")
+        _optional_text(address, "landmark")
+        _text(address.get("district"), min_length=1)
+        _text(address.get("state"), min_length=1)
+        pincode = address.get("pincode")
+        _require(type(pincode) is str and _PINCODE.match(pincode) is not None)
+
+        economic = record["economicStatus"]
+        _require(type(economic) is dict)
+        ration = _RATIONS[economic["rationCardType"]] if "rationCardType" in economic else -1
+        if "landOwnership" in economic:
+            land = economic["landOwnership"]
+            _require(type(land) is dict and type(land.get("hasLand")) is bool)
+            if "acreage" in land:
+                _number(land["acreage"])
+            if "irrigated" in land:
+                _require(type(land["irrigated"]) is bool)
+        assets = economic["assets"]
+        _require(type(assets) is list)
+        for asset in assets:
+            _require(type(asset) is dict)
+            _text(asset.get("type"), min_length=1)
+            _text(asset.get("description"), min_length=1)
+            if "value" in asset:
+                _number(asset["value"])
+
+        schemes = record["existingSchemes"]
+        _require(type(schemes) is list and all(type(name) is str for name in schemes))
+        keys = {scheme_key(name) for name in schemes} if schemes else ()
+        return (
+            _INCOMES[economic["incomeCategory"]],
+            ration,
+            _HOUSING[economic["housingType"]],
+            bool(ENROLLED_SCHEMES.intersection(keys)),
+            bool(EXCLUDING_SCHEMES.intersection(keys)),
+        )
+
+
+def evaluate(columns: HouseholdColumns) -> np.ndarray:
+    """Packed condition bits per household; entries for ``fallback`` rows are meaningless"""
+    households = len(columns)
+    sizes = np.diff(columns.offsets)
+    owner = np.repeat(np.arange(households), sizes)
+
+    def any_per_household(mask: np.ndarray) -> np.ndarray:
+        return np.bincount(owner[mask], minlength=households) > 0
+
+    adult = (columns.age >= ADULT_AGE_RANGE[0]) & (columns.age <= ADULT_AGE_RANGE[1])
+    has_adult = any_per_household(adult)
+    has_adult_male = any_per_household(adult & (columns.gender == _GENDERS[Gender.MALE.value]))
+    has_able_adult = any_per_household(adult & ~columns.disabled)
+    has_disabled = any_per_household(columns.disabled)
+    has_head = any_per_household(columns.relation == _RELATIONS[FamilyRelation.HEAD.value])
+    # Fallback rows have no people, so only look up heads that exist
+    head_female = np.zeros(households, dtype=bool)
+    present = sizes > 0
+    head_female[present] = columns.gender[columns.offsets[:-1][present]] == _GENDERS[Gender.FEMALE.value]
+
+    conditions = [
+        (ENROLLED, columns.enrolled),
+        (HOMELESS, columns.housing == _HOUSING[HousingType.HOMELESS.value]),
+        (SECC_LISTED, columns.income == _INCOMES[IncomeCategory.SECC_ELIGIBLE.value]),
+        (BPL_INCOME, columns.income == _INCOMES[IncomeCategory.BPL.value]),
+        (AAY_CARD, columns.ration == _RATIONS[RationCardType.AAY.value]),
+        (BPL_CARD, columns.ration == _RATIONS[RationCardType.BPL.value]),
+        (KUTCHA_HOUSE, columns.housing == _HOUSING[HousingType.KUTCHA.value]),
+        (NO_ADULT, ~has_adult),
+        (FEMALE_HEADED, head_female & ~has_adult_male),
+        (DISABLED_DEPENDENT, has_disabled & ~has_able_adult),
+        (EXCLUDED, columns.excluded),
+        (NO_MEMBERS, sizes == 1),
+        (NO_HEAD, ~has_head),
+    ]
+    codes = np.zeros(households, dtype=np.int32)
+    for bit, mask in conditions:
+        codes |= np.where(mask, bit, 0).astype(np.int32)
+    return codes
+
+
+def iter_verdicts(columns: HouseholdColumns) -> Iterator[EligibilityVerdict]:
+    """Verdicts in input order; fallback rows go through ``assess_household``"""
+    codes = evaluate(columns).tolist()
+    fallback = columns.fallback
+    for index, (household_id, code) in enumerate(zip(columns.ids, codes)):
+        if index in fallback:
+            yield assess_household(fallback[index], household_id)
+        else:
+            yield EligibilityVerdict(household_id, *decode_verdict(code))
+
+
+# ---------------------------------------------------------------------------
+# Input files
+# ---------------------------------------------------------------------------
+
+# One row per person, rows of a household contiguous and the head's row first;
+# household fields are read from that first row
+CSV_COLUMNS = [
+    "household_id", "name", "age", "gender", "relation", "disabled",
+    "district", "state", "pincode", "income_category", "ration_card_type", "housing_type", "existing_schemes",
+]
+
+# A CSV "disabled" flag becomes one disability entry with these placeholder fields
+CSV_DISABILITY = {"type": "unspecified", "severity": "unspecified", "certified": False}
+
+_CSV_NUMBER = re.compile(r"-?[0-9]+(\.[0-9]+)?\Z")
+_TRUE = frozenset({"true", "yes", "1"})
+
+
+def _csv_person(row: Dict[str, str]) -> Dict[str, Any]:
+    person: Dict[str, Any] = {"name": row["name"], "gender": row["gender"], "relation": row["relation"]}
+    age = row["age"]
+    if age:
+        # Numbers become numbers; anything else stays a string so the schema rejects it
+        person["age"] = (float(age) if "." in age else int(age)) if _CSV_NUMBER.match(age) else age
+    if row["disabled"].strip().lower() in _TRUE:
+        person["disabilities"] = [dict(CSV_DISABILITY)]
+    return person
+
+
+def household_from_csv_rows(rows: Sequence[Dict[str, str]]) -> Dict[str, Any]:
+    """The ``HouseholdInfo`` object a group of CSV rows describes"""
+    first = rows[0]
+    economic: Dict[str, Any] = {"housingType": first["housing_type"], "assets": []}
+    if first["income_category"]:
+        economic["incomeCategory"] = first["income_category"]
+    if first["ration_card_type"]:
+        economic["rationCardType"] = first["ration_card_type"]
+    return {
+        "headOfHousehold": _csv_person(first),
+        "members": [_csv_person(row) for row in rows[1:]],
+        "address": {"district": first["district"], "state": first["state"], "pincode": first["pincode"]},
+        "economicStatus": economic,
+        "existingSchemes": [name for name in first["existing_schemes"].split(";") if name],
+    }
+
+
+def read_households(path: str) -> Iterator[Tuple[str, Any]]:
+    """``(household_id, household)`` from a CSV, JSON array or JSON Lines file"""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as source:
+            yield from households_from_csv(source)
+    elif path.endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as source:
+            for index, line in enumerate(source):
+                if line.strip():
+                    yield _json_household(json.loads(line), index)
+    else:
+        with open(path, encoding="utf-8") as source:
+            for index, record in enumerate(json.load(source)):
+                yield _json_household(record, index)
+
+
+def _json_household(record: Any, index: int) -> Tuple[str, Any]:
+    household_id = record.get("householdId") if isinstance(record, dict) else None
+    return str(household_id if household_id is not None else index), record
+
+
+def households_from_csv(source: Iterable[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """``(household_id, household)`` from CSV text in the ``CSV_COLUMNS`` layout"""
+    group: List[Dict[str, str]] = []
+    for row in csv.DictReader(source):
+        if group and row["household_id"] != group[0]["household_id"]:
+            yield group[0]["household_id"], household_from_csv_rows(group)
+            group = []
+        group.append(row)
+    if group:
+        yield group[0]["household_id"], household_from_csv_rows(group)
+
+
+def write_households_csv(households: Iterable[Tuple[str, Dict[str, Any]]], target: io.TextIOBase) -> None:
+    """Write clean households in the CSV layout ``read_households`` expects"""
+    writer = csv.DictWriter(target, CSV_COLUMNS)
+    writer.writeheader()
+    for household_id, household in households:
+        economic = household["economicStatus"]
+        address = household["address"]
+        for position, person in enumerate([household["headOfHousehold"], *household["members"]]):
+            row = {
+                "household_id": household_id,
+                "name": person["name"],
+                "age": person["age"],
+                "gender": person["gender"],
+                "relation": person["relation"],
+                "disabled": "true" if person.get("disabilities") else "",
+            }
+            if position == 0:
+                row.update(
+                    district=address["district"],
+                    state=address["state"],
+                    pincode=address["pincode"],
+                    income_category=economic["incomeCategory"],
+                    ration_card_type=economic.get("rationCardType", ""),
+                    housing_type=economic["housingType"],
+                    existing_schemes=";".join(household["existingSchemes"]),
+                )
+            writer.writerow(row)
+
+
+def _chunks(records: Iterable[Tuple[str, Any]], size: int) -> Iterator[List[Tuple[str, Any]]]:
+    chunk: List[Tuple[str, Any]] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _screen_chunk(chunk: List[Tuple[str, Any]]) -> List[EligibilityVerdict]:
+    return list(iter_verdicts(HouseholdColumns.from_records(chunk)))
+
+
+def screen_households(
+    records: Iterable[Tuple[str, Any]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+) -> Iterator[EligibilityVerdict]:
+    """
+    Stream verdicts for ``(household_id, household)`` pairs, ``chunk_size`` at a time
+
+    With ``workers`` above one, chunks are screened in a process pool; verdicts
+    still come out in input order.
+    """
+    chunks = _chunks(records, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from iter_verdicts(HouseholdColumns.from_records(chunk))
+        return
+
+    import multiprocessing
+
+    with multiprocessing.Pool(workers) as pool:
+        for verdicts in pool.imap(_screen_chunk, chunks):
+            yield from verdicts
+
+
+# ---------------------------------------------------------------------------
+# Synthetic district lists
+# ---------------------------------------------------------------------------
+
+_NAMES = ["Ramesh", "Sunita", "Anil", "Priya", "Mohan", "Geeta", "Suresh", "Kavita", "Rahul", "Pooja"]
+_SCHEME_CHOICES = [[], [], [], [], ["PM-JAY"], ["Ayushman Bharat"], ["ESIC"], ["CGHS"], ["MGNREGA"], ["PM Kisan", "MGNREGA"]]
+
+
+def generate_household(rng: np.random.Generator) -> Dict[str, Any]:
+    """A plausible clean household record"""
+    def person(relation: str, age: int) -> Dict[str, Any]:
+        record = {
+            "name": str(rng.choice(_NAMES)),
+            "age": age,
+            "gender": str(rng.choice(list(_GENDERS))),
+            "relation": relation,
+        }
+        if rng.random() < 0.08:
+            record["disabilities"] = [{"type": "locomotor", "severity": "moderate", "certified": bool(rng.random() < 0.5)}]
+        return record
+
+    head_relation = "head" if rng.random() < 0.97 else "spouse"
+    members = []
+    for _ in range(int(rng.integers(0, 7)) if rng.random() > 0.05 else 0):
+        relation = str(rng.choice(["spouse", "child", "child", "parent", "sibling", "other"]))
+        members.append(person(relation, int(rng.integers(0, 18) if relation == "child" else rng.integers(18, 95))))
+    economic: Dict[str, Any] = {
+        "incomeCategory": str(rng.choice(list(_INCOMES), p=[0.45, 0.45, 0.1])),
+        "housingType": str(rng.choice(list(_HOUSING), p=[0.3, 0.3, 0.38, 0.02])),
+        "assets": [],
+    }
+    if rng.random() < 0.8:
+        economic["rationCardType"] = str(rng.choice(list(_RATIONS)))
+    return {
+        "headOfHousehold": person(head_relation, int(rng.integers(18, 95))),
+        "members": members,
+        "address": {"district": "Sitapur", "state": "Uttar Pradesh", "pincode": f"{int(rng.integers(100000, 999999))}"},
+        "economicStatus": economic,
+        "existingSchemes": list(_SCHEME_CHOICES[int(rng.integers(len(_SCHEME_CHOICES)))]),
+    }
+
+
+def generate_households(count: int, seed: int = 0) -> List[Tuple[str, Dict[str, Any]]]:
+    rng = np.random.default_rng(seed)
+    return [(f"HH{index:07d}", generate_household(rng)) for index in range(count)]
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Screen a synthetic district list and report households per minute"""
+    import argparse
+    import tempfile
+    import time
+
+    parser = argparse.ArgumentParser(description="Columnar PM-JAY eligibility screening throughput")
+    parser.add_argument("--households", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    records = generate_households(args.households)
+
+    def rate(started: float) -> str:
+        return f"{args.households / (time.perf_counter() - started) * 60 / 1e6:>6.2f}M households/min"
+
+    started = time.perf_counter()
+    reference = [assess_household(household, household_id) for household_id, household in records]
+    print(f"single-record validator        {rate(started)}")
+
+    started = time.perf_counter()
+    columns = HouseholdColumns.from_records(records)
+    loaded = time.perf_counter()
+    codes = evaluate(columns)
+    evaluated = time.perf_counter()
+    verdicts = list(iter_verdicts(columns))
+    print(f"columnar, in memory            {rate(started)}  "
+          f"(load {loaded - started:.2f}s, masks {evaluated - loaded:.3f}s, {len(codes)} households)")
+    assert verdicts == reference, "columnar verdicts differ from the single-record path"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "district.csv")
+        with open(path, "w", newline="", encoding="utf-8") as target:
+            write_households_csv(records, target)
+        for workers in sorted({1, args.workers}):
+            started = time.perf_counter()
+            eligible = sum(v.eligible for v in screen_households(read_households(path), args.chunk_size, workers))
+            print(f"CSV end to end, {workers:>2} worker(s)    {rate(started)}  ({eligible} eligible)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
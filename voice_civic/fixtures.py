@@ -0,0 +1,14 @@
+"""
+Canned data shared by the simulated services
+
+The transcripts the simulated speech processor and the Transcribe fake
+return. They live here, with no imports beyond ``types``, so low-level fakes
+can use them without depending on the pipeline built on top of them.
+"""
+
+from .types import Language
+
+SAMPLE_TRANSCRIPTS = {
+    Language.HINDI: ["मुझे योजना की जांच करनी है", "शिकायत दर्ज करना चाहता हूं", "सहायता चाहिए"],
+    Language.ENGLISH: ["I want to check scheme eligibility", "I need to file a complaint", "Help me please"],
+}
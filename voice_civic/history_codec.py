@@ -0,0 +1,468 @@
+"""
+Compact binary encoding of conversation history
+
+``SessionManager.addConversationTurn`` appends every turn to the session's
+DynamoDB item as a map: the key names ``timestamp``, ``userInput``,
+``systemResponse``, ``intent`` and ``entities`` (and ``type``, ``value``,
+``confidence`` per entity) are stored again in every turn, timestamps as
+24-character ISO strings. Every read and write of the session moves all of
+it, and a long session heads for DynamoDB's 400 KB item limit.
+
+This module is the reference for a binary form of the same history:
+
+- a 4-byte header (``VCH`` and the format version) and the base time of the
+  session in milliseconds, then one length-prefixed record per turn;
+- field names are implied by the schema; intents and languages are small
+  codes, and common entity types are indices into a fixed table;
+- timestamps are varint offsets from the base, in milliseconds unless the
+  turn has sub-millisecond precision; numbers with at most four decimals
+  are scaled varints, anything else a float64, so every value round-trips
+  exactly;
+- the two texts of a turn are deflated together once they are long enough
+  for zlib to win, as the multi-line system responses are.
+
+Records depend only on the header, never on earlier turns, so
+``append_turn`` encodes just the new turn and ``turn_count`` skips records
+by their lengths without decoding them. The tables are part of the format:
+changing one means a new ``FORMAT_VERSION``.
+"""
+
+import math
+import struct
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+from .conversation import ConversationTurn, ExtractedEntity
+from .types import Intent, Language, utc_now
+
+MAGIC = b"VCH"
+FORMAT_VERSION = 1
+
+# Version 1 tables; codes are positions, so entries are only ever added in a new version
+INTENT_CODES: Tuple[str, ...] = ("eligibility", "grievance", "inquiry")
+LANGUAGE_CODES: Tuple[str, ...] = ("hi", "en")
+ENTITY_TYPES: Tuple[str, ...] = (
+    "family_size", "monthly_income", "ration_card", "state", "district", "disability", "age", "name",
+    "phone", "hospital", "amount", "date", "complaint", "scheme", "location", "document",
+)
+
+# Texts shorter than this are stored as they are: zlib's own overhead would outweigh the saving
+COMPRESS_MIN_BYTES = 128
+COMPRESS_LEVEL = 6
+# DynamoDB's item limit; no single turn can legitimately decompress to more
+MAX_TEXT_BYTES = 400 * 1024
+
+# Numbers with at most this many decimals are stored as scaled integers
+DECIMAL_SCALE = 10_000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_FLOAT64 = struct.Struct("<d")
+_FLAG_COMPRESSED = 0x80
+_INTENT_INDEX = {value: index for index, value in enumerate(INTENT_CODES)}
+_LANGUAGE_INDEX = {value: index for index, value in enumerate(LANGUAGE_CODES)}
+_ENTITY_INDEX = {value: index + 1 for index, value in enumerate(ENTITY_TYPES)}
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class HistoryFormatError(ValueError):
+    """Raised when encoded history is truncated, corrupt or from an unknown version"""
+
+
+# ---------------------------------------------------------------------------
+# Primitives
+# ---------------------------------------------------------------------------
+
+def _varint(value: int, out: bytearray) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+def _number(value: float, out: bytearray) -> None:
+    """An even varint for a scaled decimal, or 1 and a float64"""
+    scaled = round(value * DECIMAL_SCALE) if value == value and abs(value) < 2 ** 50 else None
+    # -0.0 would come back as 0.0
+    if scaled is not None and scaled / DECIMAL_SCALE == value and (value or math.copysign(1.0, value) > 0):
+        _varint(_zigzag(scaled) * 2, out)
+    else:
+        out.append(1)
+        out += _FLOAT64.pack(value)
+
+
+def _text(value: str, out: bytearray) -> None:
+    encoded = value.encode("utf-8")
+    _varint(len(encoded), out)
+    out += encoded
+
+
+class _Reader:
+    __slots__ = ("data", "position", "end")
+
+    def __init__(self, data: Buffer, position: int = 0, end: Optional[int] = None):
+        self.data = data
+        self.position = position
+        self.end = len(data) if end is None else end
+
+    def varint(self) -> int:
+        data, position, end = self.data, self.position, self.end
+        value = shift = 0
+        while True:
+            if position >= end:
+                raise HistoryFormatError("Encoded history ends inside a number")
+            byte = data[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                self.position = position
+                return value
+            shift += 7
+            if shift > 70:
+                raise HistoryFormatError("Number in encoded history is too long")
+
+    def take(self, size: int) -> bytes:
+        if size > self.end - self.position:
+            raise HistoryFormatError("Encoded history ends inside a field")
+        start = self.position
+        self.position += size
+        return bytes(self.data[start:self.position])
+
+    def byte(self) -> int:
+        return self.take(1)[0]
+
+    def number(self) -> float:
+        marker = self.varint()
+        if marker == 1:
+            return _FLOAT64.unpack(self.take(8))[0]
+        if marker & 1:
+            raise HistoryFormatError(f"Unknown number encoding {marker}")
+        return _unzigzag(marker >> 1) / DECIMAL_SCALE
+
+    def text(self) -> str:
+        try:
+            return self.take(self.varint()).decode("utf-8")
+        except UnicodeDecodeError as error:
+            raise HistoryFormatError(f"Text in encoded history is not UTF-8: {error}") from None
+
+
+# ---------------------------------------------------------------------------
+# Turns
+# ---------------------------------------------------------------------------
+
+def _milliseconds(moment: datetime) -> int:
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+
+def _base(data: Buffer) -> Tuple[datetime, int]:
+    """The session base time and the offset of the first record"""
+    if len(data) < 4 or bytes(data[:3]) != MAGIC:
+        raise HistoryFormatError("Not an encoded conversation history")
+    if data[3] != FORMAT_VERSION:
+        raise HistoryFormatError(f"Unsupported history format version {data[3]}; this reader knows {FORMAT_VERSION}")
+    reader = _Reader(data, 4)
+    base_ms = _unzigzag(reader.varint())
+    try:
+        return _EPOCH + timedelta(milliseconds=base_ms), reader.position
+    except OverflowError:
+        raise HistoryFormatError(f"History base time {base_ms} ms is out of range") from None
+
+
+def new_history(base: Optional[datetime] = None) -> bytes:
+    """An empty history whose turns are timed from ``base`` (now by default)"""
+    base = base or utc_now()
+    if base.tzinfo is None:
+        raise ValueError("History base time must be timezone-aware")
+    out = bytearray(MAGIC)
+    out.append(FORMAT_VERSION)
+    _varint(_zigzag(_milliseconds(base)), out)
+    return bytes(out)
+
+
+def encode_turn(turn: ConversationTurn, base: datetime, compress: bool = True) -> bytes:
+    """One length-prefixed record for ``turn``, timed from ``base``"""
+    if turn.timestamp.tzinfo is None:
+        raise ValueError("Turn timestamps must be timezone-aware")
+    body = bytearray()
+    _varint(turn.turn_number, body)
+
+    delta = turn.timestamp - base
+    microseconds = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    if microseconds % 1000:
+        _varint(_zigzag(microseconds) * 2 + 1, body)
+    else:
+        _varint(_zigzag(microseconds // 1000) * 2, body)
+
+    texts = bytearray()
+    _text(turn.user_input, texts)
+    _text(turn.system_response, texts)
+    packed = zlib.compress(bytes(texts), COMPRESS_LEVEL) if compress and len(texts) >= COMPRESS_MIN_BYTES else None
+    compressed = packed is not None and len(packed) < len(texts)
+
+    body.append(_INTENT_INDEX[Intent(turn.intent).value] | _LANGUAGE_INDEX[Language(turn.language).value] << 2
+                | (_FLAG_COMPRESSED if compressed else 0))
+    _number(turn.confidence, body)
+    _number(turn.processing_time, body)
+    if compressed:
+        _varint(len(packed), body)
+        body += packed
+    else:
+        body += texts
+
+    _varint(len(turn.entities), body)
+    for entity in turn.entities:
+        code = _ENTITY_INDEX.get(entity.type, 0)
+        _varint(code, body)
+        if not code:
+            _text(entity.type, body)
+        _text(entity.value, body)
+        _number(entity.confidence, body)
+
+    record = bytearray()
+    _varint(len(body), record)
+    record += body
+    return bytes(record)
+
+
+def _decode_turn(reader: _Reader, base: datetime) -> ConversationTurn:
+    turn_number = reader.varint()
+    stamp = reader.varint()
+    offset = _unzigzag(stamp >> 1)
+    try:
+        timestamp = base + timedelta(microseconds=offset if stamp & 1 else offset * 1000)
+    except OverflowError:
+        raise HistoryFormatError("Turn timestamp is out of range") from None
+
+    codes = reader.byte()
+    intent, language = codes & 0x03, (codes >> 2) & 0x03
+    if intent >= len(INTENT_CODES) or language >= len(LANGUAGE_CODES) or codes & 0x70:
+        raise HistoryFormatError(f"Unknown intent or language code in byte 0x{codes:02x}")
+    confidence = reader.number()
+    processing_time = reader.number()
+
+    if codes & _FLAG_COMPRESSED:
+        inflater = zlib.decompressobj()
+        try:
+            texts = inflater.decompress(reader.take(reader.varint()), MAX_TEXT_BYTES)
+        except zlib.error as error:
+            raise HistoryFormatError(f"Compressed text is corrupt: {error}") from None
+        if inflater.unconsumed_tail or not inflater.eof:
+            raise HistoryFormatError("Compressed text is incomplete or larger than any turn can be")
+        text_reader = _Reader(texts)
+        user_input, system_response = text_reader.text(), text_reader.text()
+        if text_reader.position != len(texts):
+            raise HistoryFormatError("Compressed text block has trailing bytes")
+    else:
+        user_input, system_response = reader.text(), reader.text()
+
+    entities = []
+    for _ in range(reader.varint()):
+        code = reader.varint()
+        if code > len(ENTITY_TYPES):
+            raise HistoryFormatError(f"Unknown entity type code {code}")
+        entity_type = ENTITY_TYPES[code - 1] if code else reader.text()
+        entities.append(ExtractedEntity(entity_type, reader.text(), reader.number()))
+
+    return ConversationTurn(
+        turn_number=turn_number,
+        user_input=user_input,
+        system_response=system_response,
+        intent=Intent(INTENT_CODES[intent]),
+        entities=tuple(entities),
+        language=Language(LANGUAGE_CODES[language]),
+        confidence=confidence,
+        processing_time=processing_time,
+        timestamp=timestamp,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Histories
+# ---------------------------------------------------------------------------
+
+def encode_history(turns: Sequence[ConversationTurn], base: Optional[datetime] = None, compress: bool = True) -> bytes:
+    """A whole history; the base defaults to the first turn's time"""
+    if base is None:
+        base = turns[0].timestamp if turns else utc_now()
+    out = bytearray(new_history(base))
+    base, _ = _base(out)
+    for turn in turns:
+        out += encode_turn(turn, base, compress)
+    return bytes(out)
+
+
+def append_turn(history: Buffer, turn: ConversationTurn, compress: bool = True) -> bytes:
+    """``history`` with ``turn`` added; earlier turns are copied, never re-encoded"""
+    base, _ = _base(history)
+    return bytes(history) + encode_turn(turn, base, compress)
+
+
+def _records(data: Buffer) -> Iterator[Tuple[int, int]]:
+    """Start and end of each record body"""
+    _, position = _base(data)
+    reader = _Reader(data, position)
+    while reader.position < reader.end:
+        size = reader.varint()
+        start = reader.position
+        if size > reader.end - start:
+            raise HistoryFormatError("Encoded history ends inside a turn")
+        reader.position = start + size
+        yield start, start + size
+
+
+def _decode_record(data: Buffer, start: int, end: int, base: datetime) -> ConversationTurn:
+    reader = _Reader(data, start, end)
+    turn = _decode_turn(reader, base)
+    if reader.position != end:
+        raise HistoryFormatError("Turn record has trailing bytes")
+    return turn
+
+
+def iter_turns(data: Buffer) -> Iterator[ConversationTurn]:
+    """Decode turns one at a time, oldest first"""
+    base, _ = _base(data)
+    for start, end in _records(data):
+        yield _decode_record(data, start, end, base)
+
+
+def decode_history(data: Buffer) -> List[ConversationTurn]:
+    return list(iter_turns(data))
+
+
+def turn_count(data: Buffer) -> int:
+    """Number of turns, found from the record lengths alone"""
+    return sum(1 for _ in _records(data))
+
+
+def last_turns(data: Buffer, count: int) -> List[ConversationTurn]:
+    """The ``count`` most recent turns, decoding only those"""
+    base, _ = _base(data)
+    records = list(_records(data))[-count:] if count > 0 else []
+    return [_decode_record(data, start, end, base) for start, end in records]
+
+
+def history_base(data: Buffer) -> datetime:
+    return _base(data)[0]
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+# DynamoDB's maximum item size
+DYNAMODB_ITEM_BYTES = 400 * 1024
+
+
+def json_history(turns: Sequence[ConversationTurn]) -> bytes:
+    """The history as the JSON list ``addConversationTurn`` builds, entities included"""
+    import json
+
+    return json.dumps(
+        [{**turn.as_dict(), "entities": [{"type": entity.type, "value": entity.value, "confidence": entity.confidence}
+                                         for entity in turn.entities]} for turn in turns],
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def sample_session(turns: int, seed: int = 0) -> List[ConversationTurn]:
+    """A session of backend-style turns: a voice opening, then text follow-ups with extracted entities"""
+    import random
+
+    from .asgi_backend import ELIGIBILITY_RESPONSES, GRIEVANCE_RESPONSES, INQUIRY_RESPONSES, MOCK_TRANSCRIPTIONS
+
+    rng = random.Random(seed)
+    language = rng.choice(LANGUAGE_CODES)
+    follow_ups = {
+        "hi": ["मेरे परिवार में {} सदस्य हैं", "हमारी मासिक आय {} रुपये है", "अस्पताल ने {} रुपये ज़्यादा लिए"],
+        "en": ["There are {} members in my family", "Our monthly income is {} rupees", "The hospital overcharged {} rupees"],
+    }[language]
+    entity_types = ("family_size", "monthly_income", "amount")
+    responses = {
+        "eligibility": ELIGIBILITY_RESPONSES[language]["response"],
+        "grievance": GRIEVANCE_RESPONSES[language],
+        "inquiry": INQUIRY_RESPONSES[language],
+    }
+    moment = datetime(2024, 1, 15, 9, 30, tzinfo=timezone.utc) + timedelta(seconds=rng.uniform(0, 86400))
+    session = []
+    for number in range(1, turns + 1):
+        moment += timedelta(milliseconds=rng.randint(8000, 60000))
+        intent = rng.choice(INTENT_CODES)
+        if number == 1:
+            text, entities = MOCK_TRANSCRIPTIONS[language], ()
+        else:
+            kind = rng.randrange(len(follow_ups))
+            value = str(rng.choice([rng.randint(1, 12), rng.randint(1000, 50000)]))
+            text = follow_ups[kind].format(value)
+            entities = (ExtractedEntity(entity_types[kind], value, round(rng.uniform(0.6, 0.99), 2)),)
+        session.append(ConversationTurn(
+            turn_number=number, user_input=text, system_response=responses[intent], intent=Intent(intent),
+            entities=entities, language=Language(language), confidence=round(rng.uniform(0.7, 0.99), 2),
+            processing_time=float(rng.randint(300, 4000)), timestamp=moment,
+        ))
+    return session
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Compare the binary history with JSON on size, encode/decode time and the cost of one more turn"""
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description="Conversation history codec versus JSON")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    def best(function) -> float:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    print(f"{'turns':>6} {'JSON KB':>8} {'binary KB':>10} {'no zlib KB':>11} {'ratio':>6} "
+          f"{'JSON enc/dec us/turn':>21} {'binary enc/dec us/turn':>23} {'append JSON us':>15} {'append binary us':>17}")
+    for length in args.lengths:
+        session = sample_session(length + 1, args.seed)
+        turns, extra = session[:-1], session[-1]
+        as_json, binary, plain = json_history(turns), encode_history(turns), encode_history(turns, compress=False)
+        assert decode_history(binary) == turns
+
+        json_encode = best(lambda: json_history(turns)) / length * 1e6
+        json_decode = best(lambda: json.loads(as_json)) / length * 1e6
+        binary_encode = best(lambda: encode_history(turns)) / length * 1e6
+        binary_decode = best(lambda: decode_history(binary)) / length * 1e6
+        # One more turn: read-modify-write of the JSON list against encoding only the new record
+        json_append = best(lambda: json.loads(as_json).append(json.loads(json_history([extra]))[0]) or json_history(session)) * 1e6
+        binary_append = best(lambda: append_turn(binary, extra)) * 1e6
+        print(f"{length:>6} {len(as_json) / 1024:>8.1f} {len(binary) / 1024:>10.1f} {len(plain) / 1024:>11.1f} "
+              f"{len(as_json) / len(binary):>6.2f} {json_encode:>10.1f}/{json_decode:<10.1f} "
+              f"{binary_encode:>11.1f}/{binary_decode:<11.1f} {json_append:>15.1f} {binary_append:>17.1f}")
+
+    session = sample_session(2000, args.seed)
+    json_sizes = [len(json_history([turn])) - 1 for turn in session]
+    binary_sizes = [len(encode_turn(turn, session[0].timestamp)) for turn in session]
+    for name, sizes in (("JSON", json_sizes), ("binary", binary_sizes)):
+        total, fitted = 2, 0
+        for size in sizes:
+            if total + size > DYNAMODB_ITEM_BYTES:
+                break
+            total, fitted = total + size, fitted + 1
+        print(f"{name}: {sum(sizes) / len(sizes):.0f} bytes per turn, {fitted} turns fit in a {DYNAMODB_ITEM_BYTES // 1024} KB item")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,671 @@
+"""
+Header-first image pre-processing for bill and ID card photos
+
+``/api/image/process`` in ``local-backend/server.js`` and the
+``image-analyzer`` lambda take phone photos of hospital bills and ID cards
+as they come off the camera: 12 to 50 megapixels of colour JPEG, up to
+10 MB, buffered whole. The only check is ``validateImageBuffer``, which
+tests the byte length, so a GIF renamed to ``.jpg``, a 64 pixel thumbnail or
+a PNG whose header claims 30000 x 30000 pixels is only found out once the
+analyzer has paid to decode it, and every good photo reaches the analyzer
+at full resolution although text stays legible at a fraction of it.
+
+``ImagePreprocessor`` works in two steps:
+
+- ``inspect`` reads only the container headers: the PNG ``IHDR`` chunk, or
+  the JPEG marker segments up to the frame header, skipping EXIF and other
+  segments by their lengths without touching their contents. Files of the
+  wrong size or format, with corrupt headers, too few pixels to read or too
+  many to decode safely are rejected here, in microseconds;
+- ``process`` passes small files on untouched and decodes the rest,
+  downscaled to ``long_side`` pixels on the longer side, converted to
+  grayscale, turned upright by the EXIF orientation and re-encoded as a
+  JPEG. JPEGs are decoded with libjpeg's draft mode,
+  which scales by 1/2, 1/4 or 1/8 while decoding and yields luma only, so
+  the full-resolution colour bitmap never exists. If the result is no
+  smaller than the upload, the upload is passed on instead.
+
+Decoding and encoding release the GIL, so ``run`` and ``process_async``
+spread images over a thread pool. Every image first reserves its working
+set (compressed input plus decoded bitmaps, estimated from the header) from
+a ``WorkingSetBudget``; when the budget is spent, submission waits instead
+of piling more bitmaps into memory. PDFs pass through unchanged.
+
+``python -m voice_civic.image_preprocess`` renders a synthetic corpus of
+document photos, screenshots and malformed files and compares what the
+analyzer receives today with what it would receive after pre-processing.
+"""
+
+import asyncio
+import io
+import os
+import struct
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+# validateImageBuffer in src/utils/validation.ts
+MIN_IMAGE_BYTES = 1024
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+# Below this on the shorter side a bill's small print cannot be read at all
+MIN_SIDE_PIXELS = 300
+# Larger than any phone camera's output; anything above is refused before decoding
+MAX_PIXELS = 50_000_000
+# Longer side handed to the analyzer: about 135 DPI across an A4 page, so 10 pt
+# capitals are 13 pixels tall. Every common camera size is at least twice this,
+# which lets libjpeg decode at 1/2 scale or less.
+ANALYSIS_LONG_SIDE = 1600
+JPEG_QUALITY = 80
+# Uploads this small already cost the analyzer little; they are passed on undecoded
+PASSTHROUGH_BYTES = 256 * 1024
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+# Compressed and decoded image bytes all in-flight images may hold together
+DEFAULT_WORKING_SET_BUDGET = 128 * 1024 * 1024
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SOI = b"\xff\xd8"
+PDF_MAGIC = b"%PDF-"
+
+# Channels per PNG colour type: gray, RGB, palette, gray + alpha, RGBA
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+PNG_BIT_DEPTHS = {0: (1, 2, 4, 8, 16), 2: (8, 16), 3: (1, 2, 4, 8), 4: (8, 16), 6: (8, 16)}
+# Baseline, extended sequential and progressive Huffman frames: what libjpeg decodes here
+JPEG_FRAMES = {0xC0: False, 0xC1: False, 0xC2: True}
+# Every other SOFn marker; DHT (C4), JPG (C8) and DAC (CC) share the range but are not frames
+JPEG_OTHER_FRAMES = frozenset(range(0xC3, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field: TEM and RST0-RST7
+JPEG_STANDALONE = frozenset([0x01, *range(0xD0, 0xD8)])
+JPEG_SOS, JPEG_EOI = 0xDA, 0xD9
+
+EXIF_ORIENTATION = 0x0112
+
+
+class ImageRejected(ValueError):
+    """An image refused before or during decoding; ``code`` names the reason"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    """What the container headers say about an image, read without decoding it"""
+
+    format: str
+    width: int = 0
+    height: int = 0
+    channels: int = 0
+    bits: int = 8
+    progressive: bool = False
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "format": self.format, "width": self.width, "height": self.height,
+            "channels": self.channels, "bits": self.bits, "progressive": self.progressive,
+        }
+
+
+@dataclass
+class ProcessedImage:
+    """An analysis-ready image and how it compares with the upload"""
+
+    data: bytes
+    format: str
+    width: int
+    height: int
+    original: ImageHeader
+    original_bytes: int
+    seconds: float
+    passthrough: bool = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "format": self.format, "width": self.width, "height": self.height, "bytes": len(self.data),
+            "originalFormat": self.original.format, "originalWidth": self.original.width,
+            "originalHeight": self.original.height, "originalBytes": self.original_bytes,
+            "passthrough": self.passthrough, "processingMs": round(self.seconds * 1000, 3),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Header parsing
+# ---------------------------------------------------------------------------
+
+def _corrupt(detail: str) -> ImageRejected:
+    return ImageRejected("corrupt_header", f"Corrupted image header - {detail}")
+
+
+def _png_header(data: memoryview) -> ImageHeader:
+    if len(data) < 33:
+        raise _corrupt("PNG ends before its IHDR chunk")
+    length, chunk = struct.unpack_from(">I4s", data, 8)
+    if chunk != b"IHDR" or length != 13:
+        raise _corrupt("PNG does not start with IHDR")
+    width, height, bits, color_type, compression, filtering, interlace = struct.unpack_from(">IIBBBBB", data, 16)
+    if width == 0 or height == 0 or width > 2 ** 31 - 1 or height > 2 ** 31 - 1:
+        raise _corrupt(f"PNG claims {width} x {height} pixels")
+    if bits not in PNG_BIT_DEPTHS.get(color_type, ()) or compression or filtering or interlace > 1:
+        raise _corrupt(f"PNG colour type {color_type} with bit depth {bits} is not valid")
+    return ImageHeader("png", width, height, PNG_CHANNELS[color_type], bits, bool(interlace))
+
+
+def _jpeg_header(data: memoryview) -> ImageHeader:
+    size = len(data)
+    position = 2
+    while True:
+        # Markers may be preceded by any number of 0xFF fill bytes
+        if position >= size or data[position] != 0xFF:
+            raise _corrupt("JPEG marker expected" if position < size else "JPEG ends before its frame header")
+        while position < size and data[position] == 0xFF:
+            position += 1
+        if position >= size:
+            raise _corrupt("JPEG ends before its frame header")
+        marker = data[position]
+        position += 1
+        if marker in JPEG_STANDALONE:
+            continue
+        if marker in (JPEG_SOS, JPEG_EOI):
+            raise _corrupt("JPEG has no frame header before its image data")
+        if position + 2 > size:
+            raise _corrupt("JPEG ends inside a segment")
+        (length,) = struct.unpack_from(">H", data, position)
+        if length < 2 or position + length > size:
+            raise _corrupt("JPEG segment length runs past the end of the file")
+        if marker in JPEG_FRAMES or marker in JPEG_OTHER_FRAMES:
+            if length < 8:
+                raise _corrupt("JPEG frame header is too short")
+            bits, height, width, channels = struct.unpack_from(">BHHB", data, position + 2)
+            if marker not in JPEG_FRAMES:
+                raise ImageRejected("unsupported_format", "Unsupported JPEG encoding - please use a standard camera photo")
+            if width == 0 or height == 0 or channels not in (1, 3, 4) or length != 8 + 3 * channels:
+                raise _corrupt(f"JPEG frame claims {width} x {height} pixels in {channels} channels")
+            if bits != 8:
+                raise ImageRejected("unsupported_format", f"Unsupported JPEG encoding - {bits}-bit samples")
+            return ImageHeader("jpeg", width, height, channels, bits, JPEG_FRAMES[marker])
+        position += length
+
+
+def read_image_header(data: Union[bytes, bytearray, memoryview]) -> ImageHeader:
+    """Format and dimensions from the container headers, touching nothing past the JPEG frame header"""
+    view = memoryview(data)
+    if view[:8] == PNG_SIGNATURE:
+        return _png_header(view)
+    if view[:2] == JPEG_SOI:
+        return _jpeg_header(view)
+    if view[:5] == PDF_MAGIC:
+        return ImageHeader("pdf")
+    raise ImageRejected("unsupported_format", "Unsupported image format - please use JPEG, PNG or PDF")
+
+
+def analysis_size(width: int, height: int, long_side: int = ANALYSIS_LONG_SIDE) -> Tuple[int, int]:
+    """``width`` x ``height`` scaled down to fit ``long_side``; smaller images keep their size"""
+    longest = max(width, height)
+    if longest <= long_side:
+        return width, height
+    scale = long_side / longest
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def draft_scale(width: int, height: int, target: Tuple[int, int]) -> int:
+    """The 1/1, 1/2, 1/4 or 1/8 scale libjpeg decodes at when asked for at least ``target``"""
+    scale = min(width // target[0], height // target[1])
+    return next(step for step in (8, 4, 2, 1) if scale >= step)
+
+
+# ---------------------------------------------------------------------------
+# Working-set budget
+# ---------------------------------------------------------------------------
+
+class WorkingSetBudget:
+    """
+    Bytes that in-flight images may hold at once, waited on rather than refused
+
+    ``acquire`` blocks until the reservation fits. A single image larger than
+    the whole budget is let through once nothing else is in flight, so the
+    budget bounds memory without ever deadlocking on one big file.
+    """
+
+    def __init__(self, limit: int = DEFAULT_WORKING_SET_BUDGET):
+        if limit <= 0:
+            raise ValueError(f"Working-set budget must be positive, got {limit}")
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+        self.waits = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, size: int) -> None:
+        with self._condition:
+            if self.used and self.used + size > self.limit:
+                self.waits += 1
+                self._condition.wait_for(lambda: not self.used or self.used + size <= self.limit)
+            self.used += size
+            self.peak = max(self.peak, self.used)
+
+    def release(self, size: int) -> None:
+        with self._condition:
+            self.used -= size
+            self._condition.notify_all()
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"limit": self.limit, "used": self.used, "peak": self.peak, "waits": self.waits}
+
+
+# ---------------------------------------------------------------------------
+# Pre-processing
+# ---------------------------------------------------------------------------
+
+def _apply_orientation(image: Any, orientation: int) -> Any:
+    """Turn ``image`` upright for an EXIF orientation, as ``ImageOps.exif_transpose`` does"""
+    from PIL import Image
+
+    method = {
+        2: Image.Transpose.FLIP_LEFT_RIGHT, 3: Image.Transpose.ROTATE_180, 4: Image.Transpose.FLIP_TOP_BOTTOM,
+        5: Image.Transpose.TRANSPOSE, 6: Image.Transpose.ROTATE_270, 7: Image.Transpose.TRANSVERSE,
+        8: Image.Transpose.ROTATE_90,
+    }.get(orientation)
+    return image if method is None else image.transpose(method)
+
+
+def _grayscale(image: Any) -> Any:
+    """Luma of ``image``, with transparent areas turned white as on paper"""
+    from PIL import Image
+
+    if image.mode == "L":
+        return image
+    if "A" in image.getbands() or "transparency" in image.info:
+        with_alpha = image.convert("LA")
+        paper = Image.new("L", image.size, 255)
+        paper.paste(with_alpha.getchannel("L"), mask=with_alpha.getchannel("A"))
+        return paper
+    return image.convert("L")
+
+
+class ImagePreprocessor:
+    """
+    Rejects bad images from their headers and shrinks good ones for analysis
+
+    ``inspect`` is cheap enough to run on the event loop as soon as an upload
+    has arrived. ``process`` does the decoding and runs on any thread;
+    ``run`` and ``process_async`` use the preprocessor's own pool of
+    ``workers`` threads, all sharing one ``WorkingSetBudget``.
+    """
+
+    def __init__(
+        self,
+        long_side: int = ANALYSIS_LONG_SIDE,
+        quality: int = JPEG_QUALITY,
+        workers: int = DEFAULT_WORKERS,
+        working_set_budget: int = DEFAULT_WORKING_SET_BUDGET,
+        min_side: int = MIN_SIDE_PIXELS,
+        max_pixels: int = MAX_PIXELS,
+        max_bytes: int = MAX_IMAGE_BYTES,
+        passthrough_bytes: int = PASSTHROUGH_BYTES,
+    ):
+        if long_side < min_side:
+            raise ValueError(f"long_side {long_side} is below min_side {min_side}")
+        self.long_side = long_side
+        self.quality = quality
+        self.workers = workers
+        self.min_side = min_side
+        self.max_pixels = max_pixels
+        self.max_bytes = max_bytes
+        self.passthrough_bytes = passthrough_bytes
+        self.budget = WorkingSetBudget(working_set_budget)
+        self.processed = 0
+        self.passed_through = 0
+        self.rejected: Counter = Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def inspect(self, data: Union[bytes, bytearray, memoryview]) -> ImageHeader:
+        """The image's header if it is worth decoding; raises ``ImageRejected`` otherwise"""
+        try:
+            size = len(data)
+            if size < MIN_IMAGE_BYTES:
+                raise ImageRejected("file_too_small", "Image file too small - may be corrupted or empty")
+            if size > self.max_bytes:
+                raise ImageRejected("file_too_large", "Image file too large - maximum size is 10MB")
+            header = read_image_header(data)
+            if header.format != "pdf":
+                if min(header.width, header.height) < self.min_side:
+                    raise ImageRejected(
+                        "resolution_too_low",
+                        f"Image resolution too low to read ({header.width} x {header.height}) - please retake the photo closer",
+                    )
+                if header.pixels > self.max_pixels:
+                    raise ImageRejected(
+                        "too_many_pixels",
+                        f"Image dimensions too large ({header.width} x {header.height}) - please send a smaller photo",
+                    )
+            return header
+        except ImageRejected as error:
+            with self._lock:
+                self.rejected[error.code] += 1
+            raise
+
+    def working_set(self, header: ImageHeader, size: int) -> int:
+        """Bytes an image holds while it is processed: the upload, its decoded bitmap and the grayscale copy"""
+        if header.format == "pdf" or size <= self.passthrough_bytes:
+            return size
+        width, height, channels = header.width, header.height, header.channels
+        if header.format == "jpeg":
+            target = analysis_size(width, height, self.long_side)
+            scale = draft_scale(width, height, target)
+            width, height = -(-width // scale), -(-height // scale)
+            # Draft mode decodes colour JPEGs straight to luma
+            channels = 1 if channels == 3 else channels
+        decoded = width * height * channels * max(1, header.bits // 8)
+        return size + decoded + width * height
+
+    def process(self, data: Union[bytes, bytearray, memoryview]) -> ProcessedImage:
+        """Inspect, then decode and shrink ``data`` in the calling thread"""
+        header = self.inspect(data)
+        reserved = self.working_set(header, len(data))
+        self.budget.acquire(reserved)
+        return self._transform(data, header, reserved)
+
+    def run(self, images: Iterable[Union[bytes, bytearray, memoryview]]) -> Iterator[Union[ProcessedImage, ImageRejected]]:
+        """
+        Process ``images`` on the pool, yielding results (or rejections) in input order
+
+        The next image is only taken from ``images`` once its working set fits
+        the budget, so a lazy iterable of files is read no faster than memory
+        frees up.
+        """
+        pool = self._executor()
+        pending: deque = deque()
+        for data in images:
+            try:
+                header = self.inspect(data)
+            except ImageRejected as error:
+                pending.append(error)
+            else:
+                reserved = self.working_set(header, len(data))
+                self.budget.acquire(reserved)
+                pending.append(pool.submit(self._transform, data, header, reserved))
+            while pending and (len(pending) > 2 * self.workers or _settled(pending[0])):
+                yield _result(pending.popleft())
+        while pending:
+            yield _result(pending.popleft())
+
+    async def process_async(
+        self, data: Union[bytes, bytearray, memoryview], header: Optional[ImageHeader] = None,
+    ) -> ProcessedImage:
+        """Inspect on the event loop (unless ``header`` is already known) and decode on the pool"""
+        header = header or self.inspect(data)
+        return await asyncio.get_running_loop().run_in_executor(self._executor(), self._reserve_and_transform, data, header)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "processed": self.processed, "passedThrough": self.passed_through, "rejected": dict(self.rejected),
+            "bytesIn": self.bytes_in, "bytesOut": self.bytes_out, "workingSet": self.budget.as_dict(),
+        }
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def __enter__(self) -> "ImagePreprocessor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="image-preprocess")
+        return self._pool
+
+    def _reserve_and_transform(self, data: Union[bytes, bytearray, memoryview], header: ImageHeader) -> ProcessedImage:
+        reserved = self.working_set(header, len(data))
+        self.budget.acquire(reserved)
+        return self._transform(data, header, reserved)
+
+    def _transform(self, data: Union[bytes, bytearray, memoryview], header: ImageHeader, reserved: int) -> ProcessedImage:
+        started = time.perf_counter()
+        try:
+            skip = header.format == "pdf" or len(data) <= self.passthrough_bytes
+            output, size = (None, (0, 0)) if skip else self._shrink(data, header)
+        finally:
+            self.budget.release(reserved)
+        passthrough = output is None or len(output) >= len(data)
+        if passthrough:
+            output, size = bytes(data), (header.width, header.height)
+        result = ProcessedImage(
+            output, header.format if passthrough else "jpeg", size[0], size[1], header, len(data),
+            time.perf_counter() - started, passthrough,
+        )
+        with self._lock:
+            self.processed += 1
+            self.passed_through += passthrough
+            self.bytes_in += len(data)
+            self.bytes_out += len(output)
+        return result
+
+    def _shrink(self, data: Union[bytes, bytearray, memoryview], header: ImageHeader) -> Tuple[bytes, Tuple[int, int]]:
+        from PIL import Image
+
+        target = analysis_size(header.width, header.height, self.long_side)
+        try:
+            with Image.open(io.BytesIO(data), formats=[header.format.upper()]) as image:
+                if header.format == "jpeg":
+                    image.draft("L", target)
+                orientation = image.getexif().get(EXIF_ORIENTATION, 1)
+                gray = _grayscale(image)
+                # Area averaging: sharp enough for print at these ratios, at a third of bicubic's cost
+                gray.thumbnail(target, Image.Resampling.BOX)
+                gray = _apply_orientation(gray, orientation)
+                out = io.BytesIO()
+                gray.save(out, "JPEG", quality=self.quality)
+        except (OSError, SyntaxError, ValueError, struct.error) as error:
+            with self._lock:
+                self.rejected["undecodable"] += 1
+            raise ImageRejected("undecodable", "Image could not be decoded - the file may be damaged") from error
+        return out.getvalue(), gray.size
+
+
+def _settled(item: Any) -> bool:
+    return isinstance(item, ImageRejected) or item.done()
+
+
+def _result(item: Any) -> Union[ProcessedImage, ImageRejected]:
+    if isinstance(item, ImageRejected):
+        return item
+    try:
+        return item.result()
+    except ImageRejected as error:
+        return error
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus
+# ---------------------------------------------------------------------------
+
+IMAGE_KINDS = ("photo", "screenshot", "scan", "truncated", "gif", "thumbnail", "bomb")
+
+
+@dataclass(frozen=True)
+class ImageSpec:
+    """What to render: the kind of upload, its pixel size and seed"""
+
+    kind: str
+    width: int
+    height: int
+    seed: int
+    # EXIF orientation for photos taken with the phone on its side
+    orientation: int = 1
+
+
+def _page(width: int, height: int, rng: np.random.Generator, noise: float) -> np.ndarray:
+    """Luma of a printed page: paper, lines of word-shaped ink, a table rule and uneven light"""
+    page = np.full((height, width), 236.0, dtype=np.float32)
+    line_height = max(8, height // 60)
+    margin = width // 12
+    for top in range(height // 10, height - height // 10, int(line_height * 1.8)):
+        left = margin
+        while left < width - margin:
+            word = int(rng.integers(line_height, line_height * 6))
+            page[top:top + line_height, left:min(left + word, width - margin)] = rng.uniform(25, 70)
+            left += word + line_height // 2
+        if rng.random() < 0.1:
+            page[top + line_height + line_height // 3, margin:width - margin] = 40
+    # Light falls off towards one corner, as under a desk lamp
+    ys = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+    xs = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :]
+    page *= 1.0 - 0.25 * (ys * 0.6 + xs * 0.4)
+    if noise:
+        page += rng.normal(0.0, noise, size=page.shape).astype(np.float32)
+    return np.clip(page, 0, 255).astype(np.uint8)
+
+
+def render_image(spec: ImageSpec) -> bytes:
+    """One upload as its file bytes"""
+    from PIL import Image
+
+    rng = np.random.default_rng(spec.seed)
+    if spec.kind == "gif":
+        return b"GIF89a" + rng.bytes(4096)
+    if spec.kind == "bomb":
+        # A valid IHDR for an enormous image, followed by a token of data
+        ihdr = struct.pack(">IIBBBBB", spec.width, spec.height, 8, 2, 0, 0, 0)
+        return PNG_SIGNATURE + struct.pack(">I", 13) + b"IHDR" + ihdr + b"\x00" * 4 + rng.bytes(2048)
+
+    luma = _page(spec.width, spec.height, rng, noise=0.0 if spec.kind == "screenshot" else 4.0)
+    # Paper photographed under warm light, a screen with a faint blue cast
+    tint = np.array((1.0, 0.97, 0.9) if spec.kind != "screenshot" else (0.96, 0.98, 1.0), dtype=np.float32)
+    image = Image.fromarray((luma[:, :, None] * tint).astype(np.uint8), "RGB")
+    out = io.BytesIO()
+    if spec.kind in ("screenshot", "scan"):
+        image.save(out, "PNG", compress_level=1 if spec.kind == "scan" else 6)
+    else:
+        exif = Image.Exif()
+        exif[EXIF_ORIENTATION] = spec.orientation
+        image.save(out, "JPEG", quality=90, exif=exif.tobytes())
+    data = out.getvalue()
+    if spec.kind == "truncated":
+        # An upload cut short: the headers are intact, most of the picture is missing
+        return data[:len(data) // 8]
+    return data
+
+
+def default_image_specs(count: int = 24, seed: int = 0) -> List[ImageSpec]:
+    """Mostly phone photos of documents, some screenshots and scans, and one in six malformed"""
+    rng = np.random.default_rng(seed)
+    cameras = ((4032, 3024), (3264, 2448), (4000, 3000), (8160, 6120))
+    specs = []
+    for index in range(count):
+        kind = str(rng.choice(IMAGE_KINDS, p=(0.55, 0.15, 0.13, 0.04, 0.04, 0.05, 0.04)))
+        if kind == "photo":
+            width, height = cameras[int(rng.integers(len(cameras) - 1)) if rng.random() < 0.9 else -1]
+            orientation = int(rng.choice((1, 6)))
+        elif kind == "screenshot":
+            width, height, orientation = 1170, 2532, 1
+        elif kind == "scan":
+            width, height, orientation = 1654, 2339, 1
+        elif kind == "thumbnail":
+            width, height, orientation = 240, 180, 1
+        elif kind == "bomb":
+            width, height, orientation = 30000, 30000, 1
+        else:
+            width, height, orientation = 1600, 1200, 1
+        specs.append(ImageSpec(kind, width, height, seed * 1000 + index, orientation))
+    return specs
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _full_decode(data: bytes) -> Optional[Tuple[int, int]]:
+    """What the analyzer does with an upload today: decode all of it at full resolution"""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.load()
+            return image.size
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Compare analyzer input and per-image latency with and without pre-processing"""
+    import argparse
+
+    from .stage_bench import percentile
+
+    parser = argparse.ArgumentParser(description="Header-first image pre-processing benchmark")
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--long-side", type=int, default=ANALYSIS_LONG_SIDE)
+    parser.add_argument("--budget-mb", type=float, default=DEFAULT_WORKING_SET_BUDGET / 1024 / 1024)
+    args = parser.parse_args(argv)
+
+    specs = default_image_specs(args.images, args.seed)
+    corpus = [render_image(spec) for spec in specs]
+    budget = int(args.budget_mb * 1024 * 1024)
+    print(f"corpus: {len(corpus)} files, {sum(map(len, corpus)) / 1024 / 1024:.1f} MB "
+          f"({', '.join(f'{count} {kind}' for kind, count in Counter(spec.kind for spec in specs).items())})")
+
+    # Per file: today's full decode, against pre-processing plus the analyzer decoding what it is handed
+    today: List[float] = []
+    after: List[float] = []
+    bad_today: List[float] = []
+    bad_after: List[float] = []
+    sent_today = sent_after = 0
+    with ImagePreprocessor(args.long_side, workers=1, working_set_budget=budget) as serial:
+        for data in corpus:
+            started = time.perf_counter()
+            _full_decode(data)
+            baseline = time.perf_counter() - started
+            started = time.perf_counter()
+            try:
+                processed = serial.process(data)
+                _full_decode(processed.data)
+            except ImageRejected:
+                bad_today.append(baseline)
+                bad_after.append(time.perf_counter() - started)
+                continue
+            after.append(time.perf_counter() - started)
+            today.append(baseline)
+            sent_today += len(data)
+            sent_after += len(processed.data)
+        rejected = dict(serial.rejected)
+
+    for label, sent, latencies in (("today", sent_today, today), ("shrunk", sent_after, after)):
+        latencies = sorted(latencies)
+        print(f"{label:>8}: {sent / 1024 / 1024:6.1f} MB to the analyzer, per image "
+              f"p50 {percentile(latencies, 50) * 1000:6.1f} ms  p95 {percentile(latencies, 95) * 1000:6.1f} ms  "
+              f"total {sum(latencies):5.2f} s")
+    print(f"rejected: {len(bad_after)} files {rejected}, today found by decoding in "
+          f"{sum(bad_today) * 1000:.1f} ms, from headers in {sum(bad_after) * 1000:.2f} ms")
+
+    with ImagePreprocessor(args.long_side, workers=args.workers, working_set_budget=budget) as pooled:
+        started = time.perf_counter()
+        done = sum(isinstance(result, ProcessedImage) for result in pooled.run(corpus))
+        elapsed = time.perf_counter() - started
+        working_set = pooled.budget.as_dict()
+    print(f"pool x{args.workers}: {done / elapsed:6.1f} images/s, working set peak "
+          f"{working_set['peak'] / 1024 / 1024:.0f} of {budget / 1024 / 1024:.0f} MB ({working_set['waits']} waits)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,425 @@
+"""
+Keyword intent classification with one compiled automaton
+
+``generateMockResponse`` in the local backend decides intent with a chain of
+``lowerInput.includes(...)`` calls, so the work grows with the number of
+keywords times the length of the text, and every new scheme adds another
+pass. ``IntentClassifier`` compiles every keyword of every intent into a
+single Aho-Corasick automaton and finds all of them in one scan of the
+text, whatever the number of intents.
+
+The automaton walks the text one character at a time in Python, while each
+``in`` test of the chain runs in C, so small catalogues skip it: below
+``AUTOMATON_MIN_KEYWORDS`` the classifier searches each keyword in turn,
+in priority order when the first matching intent wins, and plain ASCII or
+Devanagari text is normalised by ``str.lower`` alone. On the catalogue the
+backend ships today that keeps it slightly ahead of the chain. Scoring
+every keyword switches to the automaton at about sixty keywords, a first
+match at about four hundred; ``python -m voice_civic.intent`` prints the
+crossover on the current machine and fails if the chain wins.
+
+Keywords and text go through the same normalisation first: case folding,
+and folding of Devanagari spelling variants (nukta letters, chandrabindu,
+candra vowel signs, zero-width joiners) so "ज़रूरत" matches "जरूरत".
+"""
+
+import re
+import unicodedata
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .types import Intent
+
+Keyword = Union[str, Tuple[str, float]]
+IntentRules = Sequence[Tuple[str, Sequence[Keyword]]]
+
+# The keyword chain in generateMockResponse, in the order it is checked
+MOCK_BACKEND_RULES: IntentRules = [
+    (Intent.ELIGIBILITY_CHECK, ["eligible", "pmjay", "scheme", "पात्र", "योजना", "योग्य"]),
+    (Intent.GRIEVANCE_FILING, ["complaint", "grievance", "problem", "hospital", "overcharge", "शिकायत", "समस्या", "अस्पताल"]),
+]
+
+# Weighted rules: words that only appear in one kind of request count more than
+# words like "hospital" that turn up in eligibility questions too
+DEFAULT_RULES: IntentRules = [
+    (Intent.ELIGIBILITY_CHECK, [
+        ("eligib", 2.0), ("pmjay", 2.0), ("pm-jay", 2.0), ("ayushman", 1.5), ("qualify", 1.5),
+        ("scheme", 1.0), ("golden card", 1.0), ("पात्र", 2.0), ("योग्य", 2.0), ("योजना", 1.0),
+        ("आयुष्मान", 1.5), ("जांच", 0.5),
+    ]),
+    (Intent.GRIEVANCE_FILING, [
+        ("complaint", 2.0), ("grievance", 2.0), ("overcharg", 2.0), ("refused", 1.5), ("bribe", 1.5),
+        ("denied", 1.0), ("problem", 1.0), ("hospital", 0.5), ("शिकायत", 2.0), ("समस्या", 1.0),
+        ("मना कर", 1.5), ("पैसे मांगे", 1.5), ("अस्पताल", 0.5),
+    ]),
+]
+
+_DEVANAGARI_FOLDS = {
+    "ँ": "ं",  # chandrabindu -> anusvara
+    "ॅ": "े",  # candra e -> e
+    "ॉ": "ो",  # candra o -> o
+    "़": "",  # nukta
+    "‌": "",  # zero-width non-joiner
+    "‍": "",  # zero-width joiner
+}
+_DEVANAGARI_VARIANTS = re.compile("[" + "".join(_DEVANAGARI_FOLDS) + "]")
+
+# ASCII and the Devanagari that NFD, case folding, the folds above and NFC
+# all leave alone; chandrabindu, the nukta, the candra vowel signs, the
+# stress signs NFD reorders and the precomposed nukta letters are left out
+_PLAIN_TEXT = re.compile(
+    "[\x00-\x7f\u0900\u0902-\u0928\u092a-\u0930\u0932\u0933\u0935-\u093b"
+    "\u093d-\u0944\u0946-\u0948\u094a-\u0950\u0955-\u0957\u0960-\u097f]*"
+)
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold and fold Devanagari spelling variants so equivalent spellings compare equal"""
+    # One C-level match decides; for plain text lower() gives the same result
+    if text.isascii() or _PLAIN_TEXT.fullmatch(text):
+        return text.lower()
+    # NFD splits precomposed nukta letters (U+0958-U+095F) into base + nukta
+    decomposed = unicodedata.normalize("NFD", text).casefold()
+    decomposed = _DEVANAGARI_VARIANTS.sub(lambda variant: _DEVANAGARI_FOLDS[variant.group()], decomposed)
+    return unicodedata.normalize("NFC", decomposed)
+
+
+# ---------------------------------------------------------------------------
+# Aho-Corasick automaton
+# ---------------------------------------------------------------------------
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed list of patterns
+
+    States are trie nodes; ``_fail`` points at the longest proper suffix that
+    is also a trie path, and each state's outputs include those of its
+    failure chain, so a single pass reports every occurrence.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[Tuple[int, ...]] = [()]
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError("Keywords must not be empty")
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._outputs.append(())
+                state = next_state
+            self._outputs[state] += (index,)
+
+        # Breadth-first, so a state's failure target is complete before the state
+        # itself; copying that target's transitions turns the trie into a DFA
+        # and scanning never has to walk failure links
+        self._fail = [0] * len(self._goto)
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [{} for _ in self._goto[1:]]
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            if state:
+                self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                self._fail[child] = self._delta[self._fail[state]].get(char, 0) if state else 0
+                self._outputs[child] += self._outputs[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """``(end, pattern_index)`` for every occurrence, ``end`` exclusive"""
+        delta, outputs = self._delta, self._outputs
+        state = 0
+        for position, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            for index in outputs[state]:
+                yield position + 1, index
+
+    def matched(self, text: str) -> set:
+        """Indices of the patterns that occur anywhere in ``text``"""
+        delta, outputs = self._delta, self._outputs
+        found = set()
+        state = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+
+# ---------------------------------------------------------------------------
+# Classifier
+# ---------------------------------------------------------------------------
+
+@dataclass
+class IntentMatch:
+    """The chosen intent, each intent's score and the keywords that produced them"""
+
+    intent: str
+    score: float = 0.0
+    scores: Dict[str, float] = field(default_factory=dict)
+    keywords: Tuple[str, ...] = ()
+
+
+# Below this many keywords one C substring search per keyword beats the
+# automaton's per-character Python loop (``python -m voice_civic.intent``);
+# a first match stops at the first hit, so the searches last far longer
+AUTOMATON_MIN_KEYWORDS = 64
+FIRST_MATCH_AUTOMATON_MIN_KEYWORDS = 400
+
+
+class IntentClassifier:
+    """
+    Scores every intent from one scan of the normalised text
+
+    ``rules`` lists intents in priority order with their keywords, either
+    bare (weight 1.0) or as ``(keyword, weight)``. Each distinct keyword
+    found adds its weight to its intent; the highest score wins and ties go
+    to the earlier intent. With ``first_match`` the earliest intent with any
+    keyword wins outright, which is how the mock backend's ``if`` chain
+    behaves. Text with no keyword gets ``default``.
+
+    Catalogues of ``AUTOMATON_MIN_KEYWORDS`` or more keywords
+    (``FIRST_MATCH_AUTOMATON_MIN_KEYWORDS`` with ``first_match``) are
+    scanned with the automaton, smaller ones with a substring search per
+    keyword; pass ``automaton`` to force either. Both find the same
+    keywords.
+    """
+
+    def __init__(
+        self,
+        rules: IntentRules = DEFAULT_RULES,
+        default: str = Intent.GENERAL_INQUIRY,
+        first_match: bool = False,
+        automaton: Optional[bool] = None,
+    ):
+        self.default = default
+        self.first_match = first_match
+        self.intents: List[str] = []
+        keywords: List[str] = []
+        self._owners: List[int] = []
+        self._weights: List[float] = []
+        positions: Dict[str, int] = {}
+        for intent, intent_keywords in rules:
+            if intent not in positions:
+                positions[intent] = len(self.intents)
+                self.intents.append(intent)
+            for keyword in intent_keywords:
+                phrase, weight = (keyword, 1.0) if isinstance(keyword, str) else keyword
+                keywords.append(normalize_text(phrase))
+                self._owners.append(positions[intent])
+                self._weights.append(float(weight))
+        self._automaton = KeywordAutomaton(keywords)
+        threshold = FIRST_MATCH_AUTOMATON_MIN_KEYWORDS if first_match else AUTOMATON_MIN_KEYWORDS
+        self.uses_automaton = len(keywords) >= threshold if automaton is None else automaton
+        # Keywords by intent priority, so the first one present decides a first match
+        self._by_priority = [
+            (keyword, self.intents[owner]) for keyword, owner in sorted(zip(keywords, self._owners), key=lambda pair: pair[1])
+        ]
+        self._searched_in_order = first_match and not self.uses_automaton
+
+    @property
+    def keywords(self) -> List[str]:
+        return self._automaton.patterns
+
+    def _matched(self, normalized: str) -> set:
+        if self.uses_automaton:
+            return self._automaton.matched(normalized)
+        return {index for index, keyword in enumerate(self._automaton.patterns) if keyword in normalized}
+
+    def classify(self, text: str) -> IntentMatch:
+        return self._decide(self._matched(normalize_text(text)))
+
+    def intent_of(self, text: str) -> str:
+        """The intent ``classify`` would choose, without scoring the others when ``first_match`` allows it"""
+        normalized = normalize_text(text)
+        if self._searched_in_order:
+            for keyword, intent in self._by_priority:
+                if keyword in normalized:
+                    return intent
+            return self.default
+        if not self.first_match:
+            return self._decide(self._matched(normalized)).intent
+        found = self._automaton.matched(normalized)
+        return self.intents[min(self._owners[index] for index in found)] if found else self.default
+
+    def classify_many(self, texts: Iterable[str]) -> List[IntentMatch]:
+        """Classify a batch, scanning each distinct normalised text once"""
+        matched = self._matched
+        decided: Dict[str, IntentMatch] = {}
+        results = []
+        for text in texts:
+            normalized = normalize_text(text)
+            result = decided.get(normalized)
+            if result is None:
+                result = decided[normalized] = self._decide(matched(normalized))
+            results.append(result)
+        return results
+
+    def _decide(self, found: set) -> IntentMatch:
+        if not found:
+            return IntentMatch(self.default)
+
+        scores = [0.0] * len(self.intents)
+        for index in found:
+            scores[self._owners[index]] += self._weights[index]
+        if self.first_match:
+            best = min(self._owners[index] for index in found)
+        else:
+            # max() keeps the first of equal scores, i.e. the higher-priority intent
+            best = max(range(len(scores)), key=scores.__getitem__)
+        patterns = self._automaton.patterns
+        return IntentMatch(
+            intent=self.intents[best],
+            score=scores[best],
+            scores={intent: score for intent, score in zip(self.intents, scores) if score},
+            keywords=tuple(sorted(patterns[index] for index in found if self._owners[index] == best)),
+        )
+
+
+def naive_classify(
+    text: str,
+    rules: IntentRules = MOCK_BACKEND_RULES,
+    default: str = Intent.GENERAL_INQUIRY,
+    first_match: bool = True,
+) -> str:
+    """
+    One substring search per keyword, as the mock backend does
+
+    With ``first_match`` the first intent with a hit wins, exactly like the
+    ``if`` chain; otherwise every keyword is searched and weighted the way
+    ``IntentClassifier`` weighs them.
+    """
+    lowered = text.lower()
+    best, best_score = default, 0.0
+    for intent, keywords in rules:
+        score = 0.0
+        for keyword in keywords:
+            phrase, weight = (keyword, 1.0) if isinstance(keyword, str) else keyword
+            if phrase in lowered:
+                if first_match:
+                    return intent
+                score += weight
+        if score > best_score:
+            best, best_score = intent, score
+    return best
+
+
+def synthetic_rules(intents: int, keywords_per_intent: int = 12, seed: int = 0) -> List[Tuple[str, List[str]]]:
+    """Made-up intents with made-up keywords, for measuring how cost scales with rule count"""
+    import random
+
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return [
+        (f"intent-{number}", ["".join(rng.choice(letters) for _ in range(rng.randint(4, 10))) for _ in range(keywords_per_intent)])
+        for number in range(intents)
+    ]
+
+
+def benchmark_texts(rules: IntentRules, count: int, seed: int = 0) -> List[str]:
+    """``count`` distinct requests in one language each, half of them naming a keyword of a random intent in ``rules``"""
+    import random
+
+    from .fixtures import SAMPLE_TRANSCRIPTS
+
+    rng = random.Random(seed)
+    vocabularies = [
+        [word for sentence in sentences for word in sentence.split()] for sentences in SAMPLE_TRANSCRIPTS.values()
+    ]
+    texts = []
+    for number in range(count):
+        words = vocabularies[number % len(vocabularies)]
+        request = [rng.choice(words) for _ in range(rng.randint(4, 16))]
+        if rng.random() < 0.5:
+            keyword = rng.choice(rng.choice(rules)[1])
+            request.insert(rng.randrange(len(request) + 1), keyword if isinstance(keyword, str) else keyword[0])
+        # A reference number keeps every text distinct, so nothing is answered from a cache
+        texts.append(" ".join(request) + f" ref {number}")
+    return texts
+
+
+def main(argv: Optional[list] = None) -> int:
+    """
+    Time the if chain and the full substring scan against the classifier on distinct texts
+
+    Exits with status 1 if the classifier is slower than the if chain on the
+    shipped catalogue. The substring and automaton columns force each scan,
+    to show where the automaton thresholds should sit.
+    """
+    import argparse
+    import gc
+    import time
+
+    parser = argparse.ArgumentParser(description="Intent classification: substring scans versus automaton")
+    parser.add_argument("--intents", type=int, nargs="+", default=[3, 6, 12, 24, 48, 96])
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    def timed(runs, texts):
+        # Passes alternate between the runs and the best of each counts, so
+        # one descheduled pass or a slow stretch of the machine decides nothing
+        best = [float("inf")] * len(runs)
+        results = [None] * len(runs)
+        gc.disable()  # as timeit does: a collection mid-pass is charged to whichever run it lands in
+        try:
+            for _ in range(args.repeat):
+                for position, run in enumerate(runs):
+                    started = time.perf_counter()
+                    results[position] = [run(text) for text in texts]
+                    best[position] = min(best[position], time.perf_counter() - started)
+        finally:
+            gc.enable()
+        return results, [elapsed / len(texts) * 1e6 for elapsed in best]
+
+    shipped = len(MOCK_BACKEND_RULES) + 1
+    gate = None
+    print(f"{'intents':>8} {'keywords':>9} {'chain us':>9} {'classifier us':>14} {'vs chain':>9} {'substring us':>13} "
+          f"{'automaton us':>13} {'scan all us':>12} {'weighted us':>12} {'vs scan':>8}")
+    for count in sorted(set(args.intents) | {shipped}):
+        rules = list(MOCK_BACKEND_RULES) + synthetic_rules(count - shipped)
+        texts = benchmark_texts(rules, args.texts)
+        assert len(set(texts)) == len(texts)
+        first = IntentClassifier(rules, first_match=True)
+        substring = IntentClassifier(rules, first_match=True, automaton=False)
+        automaton = IntentClassifier(rules, first_match=True, automaton=True)
+        weighted = IntentClassifier(rules)
+
+        (chain, ordered, searched, scanned, scan, scored), (
+            chain_us, ordered_us, searched_us, automaton_us, scan_us, scored_us
+        ) = timed(
+            [
+                lambda text: naive_classify(text, rules),
+                first.intent_of,
+                substring.intent_of,
+                automaton.intent_of,
+                lambda text: naive_classify(text, rules, first_match=False),
+                weighted.intent_of,
+            ],
+            texts,
+        )
+
+        assert ordered == searched == scanned == chain, "classifier disagrees with the if chain"
+        assert scored == scan, "classifier disagrees with the full substring scan"
+        if count == shipped:
+            gate = chain_us / ordered_us
+        print(f"{count:>8} {len(weighted.keywords):>9} {chain_us:>9.2f} {ordered_us:>14.2f} {chain_us / ordered_us:>8.2f}x "
+              f"{searched_us:>13.2f} {automaton_us:>13.2f} {scan_us:>12.2f} {scored_us:>12.2f} {scan_us / scored_us:>7.2f}x")
+
+    if gate < 1.0:
+        print(f"classifier is {1 / gate:.2f}x slower than the if chain on the shipped catalogue")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
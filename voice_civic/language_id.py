@@ -0,0 +1,489 @@
+"""
+Single-pass language identification
+
+``detectLanguage`` transcribes every clip twice, once as hi-IN and once as
+en-IN, then picks Hindi when the Hindi transcript contains Devanagari or is
+more than 0.1 more confident. Every detection pays for two uploads and two
+full Transcribe jobs and waits for the slower one.
+
+``LanguageIdentifier`` decides from one partial transcript instead. An en-IN
+recogniser writes Hindi speech as romanised Hindi ("mujhe yojana ki jaanch
+karni hai"), so words are scored with character trigram models of romanised
+Hindi and English. Devanagari or any clearly Hindi word settles the decision
+immediately; a run of clearly English words with a confident recogniser
+settles it the other way. ``SinglePassDetector`` streams an en-IN pass over
+a prefix of the clip, stops as soon as the identifier decides, and only
+falls back to a hi-IN pass, applying the lambda's exact rule, when the
+prefix stays ambiguous.
+"""
+
+import functools
+import math
+import random
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .aws_fakes import Distribution, LogNormal
+from .types import Language
+
+DEVANAGARI = re.compile("[ऀ-ॿ]")
+_WORD = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+# detectLanguage prefers Hindi when its transcript is this much more confident
+CONFIDENCE_MARGIN = 0.1
+
+NGRAM_ORDER = 3
+
+# Batch Transcribe time per second of audio on top of the job's fixed overhead
+JOB_REALTIME_FACTOR = 0.05
+
+# Training text for the character models: civic requests in English and in the
+# romanised Hindi an English recogniser produces for Hindi speech
+ENGLISH_CORPUS = """
+i want to check my eligibility for the health scheme
+i need to file a complaint about the hospital
+the hospital refused treatment even though i have the card
+help me please with my application
+how do i apply for ayushman bharat
+what documents are required for the application
+my family income is below the limit
+when will my application status be updated
+where is the nearest empanelled hospital
+the doctor asked for money for the operation
+please tell me the status of my complaint
+my name is missing from the beneficiary list
+we are a family of five living in a village
+my father needs surgery and we cannot afford it
+is my mother eligible for free treatment
+the card was rejected at the reception
+i submitted the form last month but nothing happened
+can you help me register my grievance
+the medicines were not provided free of cost
+we have a ration card and a labour card
+which hospitals accept this insurance
+how long does the verification take
+i would like to speak to an officer
+thank you for your help
+the scheme covers five lakh rupees per family every year
+they charged us for tests that should be free
+our household has no adult earning member
+please explain why my claim was denied
+""".split("\n")
+
+ROMANISED_HINDI_CORPUS = """
+mujhe yojana ki jaanch karni hai
+shikayat darj karna chahta hoon
+sahayata chahiye
+mera parivar gaon mein rehta hai
+aspataal ne ilaaj karne se mana kar diya
+unhone paise maange aur card nahi maana
+mujhe aavedan kaise karna hai bataiye
+kya meri patrata hai is yojana ke liye
+hamari aay bahut kam hai
+mere pita ji ko operation ki zarurat hai
+kripya meri madad kijiye
+mera naam suchi mein nahi hai
+dawai muft nahi mili
+sarkari aspataal mein bhi paise liye gaye
+mujhe apni shikayat ki sthiti janni hai
+hum paanch log hain parivar mein
+ghar mein koi kamane wala nahi hai
+majdoor hoon aur rozana kaam karta hoon
+meri maa bimar hai unka ilaaj chahiye
+yeh yojana kab tak chalegi
+kahan jaana hoga aavedan ke liye
+doctor ne kaha ki paise dene honge
+mujhe samajh nahi aaya kya karna hai
+humne form bhara tha lekin kuch nahi hua
+kripya bataiye ki meri arzi ka kya hua
+gaon ke paas koi aspataal nahi hai
+mera beta bahut bimar hai
+aapka bahut dhanyavaad
+""".split("\n")
+
+
+# ---------------------------------------------------------------------------
+# Character n-gram models
+# ---------------------------------------------------------------------------
+
+class CharNgramModel:
+    """Add-one smoothed character n-gram model over lower-cased words"""
+
+    def __init__(self, corpus: Iterable[str], order: int = NGRAM_ORDER):
+        self.order = order
+        self._counts: Counter = Counter()
+        self._contexts: Counter = Counter()
+        alphabet = set()
+        for line in corpus:
+            for word in _WORD.findall(line.lower()):
+                padded = self._pad(word)
+                alphabet.update(padded)
+                for index in range(order - 1, len(padded)):
+                    gram = padded[index - order + 1:index + 1]
+                    self._counts[gram] += 1
+                    self._contexts[gram[:-1]] += 1
+        # One extra symbol for characters never seen in training
+        self._vocabulary = len(alphabet) + 1
+
+    def _pad(self, word: str) -> str:
+        return "^" * (self.order - 1) + word + "$"
+
+    def log_prob(self, word: str) -> float:
+        """Mean per-character log probability, so long and short words compare fairly"""
+        padded = self._pad(word.lower())
+        total = 0.0
+        steps = len(padded) - self.order + 1
+        for index in range(self.order - 1, len(padded)):
+            gram = padded[index - self.order + 1:index + 1]
+            total += math.log((self._counts[gram] + 1) / (self._contexts[gram[:-1]] + self._vocabulary))
+        return total / steps
+
+
+@functools.lru_cache(maxsize=None)
+def default_models() -> Tuple[CharNgramModel, CharNgramModel]:
+    """Trigram models for (romanised Hindi, English), built once per process"""
+    return CharNgramModel(ROMANISED_HINDI_CORPUS), CharNgramModel(ENGLISH_CORPUS)
+
+
+# ---------------------------------------------------------------------------
+# Identifier
+# ---------------------------------------------------------------------------
+
+class LanguageIdentifier:
+    """
+    Incremental decision over the words of a growing transcript
+
+    ``observe`` takes the stable text of each partial and scores only the
+    words it has not seen yet, so the whole transcript is read once. A word's
+    score is the per-character log-likelihood ratio of the Hindi and English
+    models. Any word can prove Hindi, but only words of at least
+    ``min_word_length`` letters count towards English, since "a", "i" and
+    "me" say little either way. A word leaning Hindi without clearing the
+    threshold keeps English from being decided early; the caller then has to
+    fall back to a second opinion.
+    """
+
+    def __init__(
+        self,
+        hindi_threshold: float = 0.5,
+        english_threshold: float = -0.5,
+        min_english_words: int = 4,
+        min_english_confidence: float = 0.75,
+        min_word_length: int = 3,
+        models: Optional[Tuple[CharNgramModel, CharNgramModel]] = None,
+    ):
+        self.hindi_threshold = hindi_threshold
+        self.english_threshold = english_threshold
+        self.min_english_words = min_english_words
+        self.min_english_confidence = min_english_confidence
+        self.min_word_length = min_word_length
+        self._hindi_model, self._english_model = models or default_models()
+        self._consumed = 0
+        self.words_scored = 0
+        self.english_words = 0
+        self.hindi_leaning = 0
+        self.decision: Optional[Language] = None
+
+    def score_word(self, word: str) -> float:
+        """Positive for romanised Hindi, negative for English"""
+        return self._hindi_model.log_prob(word) - self._english_model.log_prob(word)
+
+    def observe(self, stable_text: str, confidence: float = 1.0) -> Optional[Language]:
+        """Feed the committed text so far; returns the decision once there is one"""
+        if self.decision is not None:
+            return self.decision
+
+        new_text = stable_text[self._consumed:]
+        self._consumed = len(stable_text)
+        if DEVANAGARI.search(new_text):
+            self.decision = Language.HINDI
+            return self.decision
+
+        for word in _WORD.findall(new_text):
+            self.words_scored += 1
+            score = self.score_word(word)
+            if score >= self.hindi_threshold:
+                self.decision = Language.HINDI
+                return self.decision
+            if score > 0:
+                self.hindi_leaning += 1
+            elif score <= self.english_threshold and len(word) >= self.min_word_length:
+                self.english_words += 1
+
+        if (self.english_words >= self.min_english_words and not self.hindi_leaning
+                and confidence >= self.min_english_confidence):
+            self.decision = Language.ENGLISH
+        return self.decision
+
+
+def two_pass_decision(
+    hindi: Optional[Tuple[str, float]],
+    english: Optional[Tuple[str, float]],
+) -> Language:
+    """The rule in ``detectLanguage``; a ``None`` pass is one that failed"""
+    if hindi is not None and english is not None:
+        hindi_text, hindi_confidence = hindi
+        _, english_confidence = english
+        if DEVANAGARI.search(hindi_text) or hindi_confidence > english_confidence + CONFIDENCE_MARGIN:
+            return Language.HINDI
+        return Language.ENGLISH
+    if hindi is not None and DEVANAGARI.search(hindi[0]):
+        return Language.HINDI
+    return Language.ENGLISH
+
+
+# ---------------------------------------------------------------------------
+# Simulated recognisers
+# ---------------------------------------------------------------------------
+
+# (Devanagari, romanisation an en-IN model produces) for Hindi words in civic requests
+HINDI_LEXICON = [
+    ("मुझे", "mujhe"), ("योजना", "yojana"), ("की", "ki"), ("जांच", "jaanch"), ("करनी", "karni"),
+    ("है", "hai"), ("शिकायत", "shikayat"), ("दर्ज", "darj"), ("करना", "karna"), ("चाहता", "chahta"),
+    ("हूं", "hoon"), ("सहायता", "sahayata"), ("चाहिए", "chahiye"), ("मेरा", "mera"), ("मेरी", "meri"),
+    ("परिवार", "parivar"), ("अस्पताल", "aspataal"), ("इलाज", "ilaaj"), ("पैसे", "paise"), ("नहीं", "nahi"),
+    ("मिला", "mila"), ("कैसे", "kaise"), ("आवेदन", "aavedan"), ("पात्रता", "patrata"), ("गांव", "gaon"),
+    ("आय", "aay"), ("सरकारी", "sarkari"), ("बीमारी", "bimari"), ("दवाई", "dawai"), ("क्या", "kya"),
+    ("कब", "kab"), ("कहां", "kahan"), ("और", "aur"), ("लिए", "liye"), ("बहुत", "bahut"),
+    ("बताइए", "bataiye"), ("कृपया", "kripya"), ("सदस्य", "sadasya"), ("घर", "ghar"), ("काम", "kaam"),
+    ("मजदूर", "majdoor"), ("हमारी", "hamari"), ("उन्होंने", "unhone"), ("मांगे", "maange"), ("मदद", "madad"),
+]
+
+ENGLISH_LEXICON = [
+    "i", "want", "to", "check", "my", "eligibility", "for", "the", "scheme", "need", "file", "a",
+    "complaint", "hospital", "card", "help", "me", "please", "how", "apply", "family", "income",
+    "treatment", "doctor", "refused", "money", "when", "where", "status", "application", "surgery",
+    "documents", "father", "mother", "village", "free", "medicines", "insurance", "officer", "claim",
+]
+
+# English nouns Hindi speakers use as-is; a hi-IN model keeps them in Latin script
+LOANWORDS = ["hospital", "card", "scheme", "doctor", "form", "status", "application", "operation"]
+
+_ENGLISH_WORDS = ENGLISH_LEXICON + [word for word in LOANWORDS if word not in ENGLISH_LEXICON]
+
+
+@dataclass(frozen=True)
+class SpokenClip:
+    """What was actually said: ``(language, word)`` pairs at a steady speaking rate"""
+
+    words: Tuple[Tuple[Language, int], ...]
+    acceptable: bool = True
+    words_per_second: float = 2.5
+
+    @property
+    def duration(self) -> float:
+        return max(1.0, len(self.words) / self.words_per_second)
+
+
+def hindi_clip(length: int, rng: random.Random) -> SpokenClip:
+    return SpokenClip(tuple((Language.HINDI, rng.randrange(len(HINDI_LEXICON))) for _ in range(length)))
+
+
+def english_clip(length: int, rng: random.Random) -> SpokenClip:
+    return SpokenClip(tuple((Language.ENGLISH, rng.randrange(len(ENGLISH_LEXICON))) for _ in range(length)))
+
+
+def code_mixed_clip(length: int, rng: random.Random, max_english_run: int = 2) -> SpokenClip:
+    """Hindi sentence with English loanwords, never more than ``max_english_run`` in a row"""
+    words: List[Tuple[Language, int]] = []
+    run = 0
+    for _ in range(length):
+        if run < max_english_run and rng.random() < 0.3:
+            words.append((Language.ENGLISH, _ENGLISH_WORDS.index(rng.choice(LOANWORDS))))
+            run += 1
+        else:
+            words.append((Language.HINDI, rng.randrange(len(HINDI_LEXICON))))
+            run = 0
+    return SpokenClip(tuple(words))
+
+
+def _render(spoken: Language, index: int, model: Language) -> str:
+    if spoken == Language.HINDI:
+        devanagari, romanised = HINDI_LEXICON[index]
+        return devanagari if model == Language.HINDI else romanised
+    return _ENGLISH_WORDS[index]
+
+
+class SimulatedRecognizer:
+    """
+    Deterministic stand-in for Transcribe forced into one language
+
+    A hi-IN model writes Hindi words in Devanagari and English words in
+    Latin script; an en-IN model romanises Hindi. Confidence rises with the
+    share of words spoken in the model's language.
+    """
+
+    def __init__(self, failure_rate: float = 0.0, rng: Optional[random.Random] = None):
+        self.failure_rate = failure_rate
+        self._rng = rng or random.Random()
+
+    def transcribe(self, clip: SpokenClip, language: Language, seconds: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """``(text, confidence)`` for the first ``seconds`` of audio, or ``None`` if the job failed"""
+        if self._rng.random() < self.failure_rate:
+            return None
+        heard = clip.words if seconds is None else clip.words[:int(seconds * clip.words_per_second)]
+        return " ".join(_render(spoken, index, language) for spoken, index in heard), self._confidence(heard, language)
+
+    def stream(self, clip: SpokenClip, language: Language, window_seconds: float) -> Iterator[Tuple[float, str, float]]:
+        """``(audio_end, stable_text, confidence)`` after each window of a streaming pass"""
+        end = 0.0
+        while end < clip.duration:
+            end = min(clip.duration, end + window_seconds)
+            heard = clip.words[:int(end * clip.words_per_second)]
+            yield end, " ".join(_render(spoken, index, language) for spoken, index in heard), self._confidence(heard, language)
+
+    @staticmethod
+    def _confidence(heard: Sequence[Tuple[Language, int]], language: Language) -> float:
+        if not heard:
+            return 0.0
+        matching = sum(spoken == language for spoken, _ in heard) / len(heard)
+        return 0.55 + 0.4 * matching
+
+
+# ---------------------------------------------------------------------------
+# Detectors and cost
+# ---------------------------------------------------------------------------
+
+@dataclass
+class DetectionCost:
+    """Recogniser work spent on one detection"""
+
+    language: Language
+    jobs: int = 0
+    audio_seconds: float = 0.0
+    latency: float = 0.0
+    early_exit: bool = False
+    fell_back: bool = False
+
+
+class TwoPassDetector:
+    """``detectLanguage`` as it is: full hi-IN and en-IN jobs in parallel"""
+
+    def __init__(self, recognizer: SimulatedRecognizer, job_time: Distribution = LogNormal(2.5, 0.4),
+                 realtime_factor: float = JOB_REALTIME_FACTOR, rng: Optional[random.Random] = None):
+        self.recognizer = recognizer
+        self.job_time = job_time
+        self.realtime_factor = realtime_factor
+        self._rng = rng or random.Random()
+
+    def detect(self, clip: SpokenClip) -> DetectionCost:
+        if not clip.acceptable:
+            return DetectionCost(Language.ENGLISH)
+        hindi = self.recognizer.transcribe(clip, Language.HINDI)
+        english = self.recognizer.transcribe(clip, Language.ENGLISH)
+        latency = max(self.job_time.sample(self._rng), self.job_time.sample(self._rng)) + clip.duration * self.realtime_factor
+        return DetectionCost(two_pass_decision(hindi, english), jobs=2, audio_seconds=2 * clip.duration, latency=latency)
+
+
+class SinglePassDetector:
+    """
+    One streaming en-IN pass over a prefix, stopping once the identifier decides
+
+    Windows cost ``window_latency`` plus a realtime share of their length, as
+    in ``StreamingSpeechProcessor``. If the prefix ends undecided a hi-IN job
+    over the same prefix settles it with the lambda's rule.
+    """
+
+    def __init__(
+        self,
+        recognizer: SimulatedRecognizer,
+        window_seconds: float = 1.0,
+        max_prefix_seconds: float = 8.0,
+        window_latency: float = 0.1,
+        realtime_factor: float = 0.1,
+        job_time: Distribution = LogNormal(2.5, 0.4),
+        identifier_options: Optional[Dict[str, float]] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.recognizer = recognizer
+        self.window_seconds = window_seconds
+        self.max_prefix_seconds = max_prefix_seconds
+        self.window_latency = window_latency
+        self.realtime_factor = realtime_factor
+        self.job_time = job_time
+        self.identifier_options = identifier_options or {}
+        self._rng = rng or random.Random()
+
+    def detect(self, clip: SpokenClip) -> DetectionCost:
+        if not clip.acceptable:
+            return DetectionCost(Language.ENGLISH)
+
+        identifier = LanguageIdentifier(**self.identifier_options)
+        cost = DetectionCost(Language.ENGLISH, jobs=1)
+        heard_until = 0.0
+        english = None
+        for audio_end, stable_text, confidence in self.recognizer.stream(clip, Language.ENGLISH, self.window_seconds):
+            cost.latency += self.window_latency + (audio_end - heard_until) * self.realtime_factor
+            heard_until = audio_end
+            english = (stable_text, confidence)
+            decision = identifier.observe(stable_text, confidence)
+            if decision is not None:
+                cost.language = decision
+                cost.early_exit = audio_end < clip.duration
+                cost.audio_seconds = heard_until
+                return cost
+            if audio_end >= self.max_prefix_seconds:
+                break
+
+        # Undecided: settle it the way detectLanguage does, on the prefix only
+        cost.fell_back = True
+        cost.jobs += 1
+        cost.audio_seconds = 2 * heard_until
+        cost.latency += self.job_time.sample(self._rng) + heard_until * JOB_REALTIME_FACTOR
+        hindi = self.recognizer.transcribe(clip, Language.HINDI, heard_until if heard_until < clip.duration else None)
+        cost.language = two_pass_decision(hindi, english)
+        return cost
+
+
+@dataclass
+class DetectionReport:
+    name: str
+    costs: List[DetectionCost] = field(default_factory=list)
+
+    @property
+    def mean_audio_seconds(self) -> float:
+        return sum(cost.audio_seconds for cost in self.costs) / len(self.costs)
+
+    @property
+    def mean_latency(self) -> float:
+        return sum(cost.latency for cost in self.costs) / len(self.costs)
+
+    @property
+    def mean_jobs(self) -> float:
+        return sum(cost.jobs for cost in self.costs) / len(self.costs)
+
+
+def generate_clips(count: int, seed: int = 0) -> List[SpokenClip]:
+    """A traffic mix of Hindi, English and code-mixed requests of 3-40 words"""
+    rng = random.Random(seed)
+    makers = [hindi_clip, english_clip, code_mixed_clip]
+    return [rng.choice(makers)(rng.randint(3, 40), rng) for _ in range(count)]
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Compare recogniser work and latency of two-pass and single-pass detection"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Language identification cost: two-pass versus single-pass")
+    parser.add_argument("--clips", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    clips = generate_clips(args.clips, args.seed)
+    two_pass = DetectionReport("two-pass", [TwoPassDetector(SimulatedRecognizer(rng=random.Random(args.seed)), rng=random.Random(args.seed)).detect(c) for c in clips])
+    single = DetectionReport("single-pass", [SinglePassDetector(SimulatedRecognizer(rng=random.Random(args.seed)), rng=random.Random(args.seed)).detect(c) for c in clips])
+
+    agreement = sum(a.language == b.language for a, b in zip(two_pass.costs, single.costs)) / len(clips)
+    print(f"{'detector':<12} {'jobs':>6} {'audio s':>8} {'latency s':>10}")
+    for report in (two_pass, single):
+        print(f"{report.name:<12} {report.mean_jobs:>6.2f} {report.mean_audio_seconds:>8.2f} {report.mean_latency:>10.2f}")
+    print(f"agreement {agreement:.4f}, fallbacks {sum(c.fell_back for c in single.costs) / len(clips):.3f}, "
+          f"audio cut {two_pass.mean_audio_seconds / single.mean_audio_seconds:.1f}x, "
+          f"latency cut {two_pass.mean_latency / single.mean_latency:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,814 @@
+"""
+Asyncio load generator for the backend API
+
+``test-api.sh`` and the property tests send one request at a time, so
+nothing tells us how many citizens the backend can serve at once. This
+module replays conversations (a voice upload, then text follow-ups on the
+``sessionId`` it returned, sometimes a photographed bill) against
+``/api/voice/process``, ``/api/text/process`` and ``/api/image/process``
+over a pool of keep-alive HTTP/1.1 connections.
+
+``closed_loop`` keeps a fixed number of simulated users busy, each starting
+a new conversation when the last one ends. ``open_loop`` starts
+conversations as a Poisson process at a fixed rate whether or not earlier
+ones have finished, and times each request from when it was due, so a
+backlog shows up as latency instead of silently lowering the offered load.
+``sweep`` steps the open-loop rate up and reports where throughput stops
+keeping up, p99 crosses the 5 second target or errors appear.
+
+Only the standard library is used. ``StandInBackend`` serves the same routes
+with the same simulated delays as ``local-backend/server.js``, for machines
+without the Node dependencies and for the tests.
+"""
+
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import time
+import urllib.parse
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .fixtures import SAMPLE_TRANSCRIPTS
+from .intent import MOCK_BACKEND_RULES, IntentClassifier
+from .stage_bench import percentile
+from .types import Intent, Language
+
+DEFAULT_BASE_URL = "http://localhost:3001"
+
+ENDPOINTS = {"voice": "/api/voice/process", "text": "/api/text/process", "image": "/api/image/process"}
+
+# Simulated processing time per endpoint in server.js, in seconds
+BACKEND_DELAYS = {"voice": 2.0, "text": 1.0, "image": 1.5}
+
+LATENCY_SLO_SECONDS = 5.0
+MAX_ERROR_RATE = 0.01
+# A rate is sustained while throughput stays within this fraction of the offered load
+MIN_THROUGHPUT_RATIO = 0.9
+# Share of an open-loop run left out of steady-state throughput while queues fill
+WARMUP_FRACTION = 0.25
+
+DEFAULT_POOL_SIZE = 64
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+FOLLOW_UPS = {
+    Language.HINDI: [
+        "हमारे परिवार में पांच सदस्य हैं", "मासिक आय आठ हज़ार रुपये है", "हमारे पास BPL राशन कार्ड है",
+        "अस्पताल ने ज़्यादा पैसे लिए", "मैं उत्तर प्रदेश के सीतापुर जिले में रहता हूं",
+    ],
+    Language.ENGLISH: [
+        "We are five members in the family", "Our monthly income is eight thousand rupees",
+        "We have a BPL ration card", "The hospital overcharged me", "I live in Sitapur district, Uttar Pradesh",
+    ],
+}
+
+
+# ---------------------------------------------------------------------------
+# HTTP/1.1 over asyncio streams
+# ---------------------------------------------------------------------------
+
+@dataclass
+class HttpResponse:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+async def read_head(reader: asyncio.StreamReader) -> Tuple[str, Dict[str, str]]:
+    """Read a request or status line and its headers, with header names lower-cased"""
+    start_line = await reader.readline()
+    if not start_line:
+        raise ConnectionResetError("Connection closed before a message arrived")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return start_line.decode("latin-1").rstrip("\r\n"), headers
+
+
+async def read_body(reader: asyncio.StreamReader, headers: Dict[str, str], until_eof: bool = False) -> bytes:
+    """Read a message body framed by Content-Length or chunked encoding"""
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip(), 16)
+            if size == 0:
+                # Skip any trailer fields up to the closing blank line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    if "content-length" in headers:
+        length = int(headers["content-length"])
+        return await reader.readexactly(length) if length else b""
+    return await reader.read() if until_eof else b""
+
+
+def encode_multipart(fields: Dict[str, str], files: Dict[str, Tuple[str, str, bytes]]) -> Tuple[str, bytes]:
+    """``(content_type, body)`` for a form with text ``fields`` and ``files`` of ``(filename, type, data)``"""
+    boundary = f"----voicecivic{uuid.uuid4().hex}"
+    while any(boundary.encode() in data for _, _, data in files.values()):
+        boundary = f"----voicecivic{uuid.uuid4().hex}"
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content_type, data) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode() + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return f"multipart/form-data; boundary={boundary}", b"".join(parts)
+
+
+def parse_multipart(content_type: str, body: bytes) -> Tuple[Dict[str, str], Dict[str, Tuple[str, bytes]]]:
+    """Split a multipart form into text fields and ``name -> (filename, data)`` files"""
+    boundary = content_type.partition("boundary=")[2].strip().strip('"')
+    if not boundary:
+        raise ValueError("Multipart body without a boundary")
+    fields, files = {}, {}
+    for part in body.split(b"--" + boundary.encode())[1:]:
+        if part.startswith(b"--"):
+            break
+        head, _, content = part[2:].partition(b"\r\n\r\n")
+        content = content[:-2]
+        disposition = {}
+        for line in head.decode("utf-8").split("\r\n"):
+            if line.lower().startswith("content-disposition:"):
+                for item in line.split(";")[1:]:
+                    key, _, value = item.strip().partition("=")
+                    disposition[key] = value.strip('"')
+        if "filename" in disposition:
+            files[disposition["name"]] = (disposition["filename"], content)
+        elif "name" in disposition:
+            fields[disposition["name"]] = content.decode("utf-8")
+    return fields, files
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP/1.1 connections to one server, at most ``size`` in use
+
+    Callers beyond ``size`` wait for a connection to come back. A request on
+    a reused connection that the server has meanwhile closed is retried once
+    on a fresh connection.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_BASE_URL, size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_REQUEST_TIMEOUT):
+        parsed = urllib.parse.urlsplit(base_url)
+        if parsed.scheme != "http":
+            raise ValueError(f"Only http:// URLs are supported, got {base_url!r}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 80
+        self.prefix = parsed.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+        self.opened = 0
+        self.requests = 0
+        self._idle: List[_Connection] = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def request(self, method: str, path: str, body: bytes = b"", headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        head = (
+            f"{method} {self.prefix}{path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n"
+            + "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+            + "\r\n"
+        ).encode("utf-8")
+        async with self._slots:
+            self.requests += 1
+            while True:
+                reused = bool(self._idle)
+                connection = self._idle.pop() if reused else await self._open()
+                try:
+                    response = await asyncio.wait_for(self._exchange(connection, head + body), self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    connection.close()
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    connection.close()
+                    raise
+                if response.keep_alive:
+                    self._idle.append(connection)
+                else:
+                    connection.close()
+                return response
+
+    async def _open(self) -> _Connection:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        self.opened += 1
+        return _Connection(reader, writer)
+
+    async def _exchange(self, connection: _Connection, message: bytes) -> HttpResponse:
+        connection.writer.write(message)
+        await connection.writer.drain()
+        status_line, headers = await read_head(connection.reader)
+        until_eof = headers.get("connection", "").lower() == "close"
+        body = await read_body(connection.reader, headers, until_eof)
+        return HttpResponse(int(status_line.split(" ", 2)[1]), headers, body)
+
+    async def close(self) -> None:
+        while self._idle:
+            self._idle.pop().close()
+
+
+# ---------------------------------------------------------------------------
+# Conversations
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Step:
+    """One request in a conversation"""
+
+    endpoint: str
+    language: str = Language.ENGLISH.value
+    text: str = ""
+    data: bytes = b""
+    filename: str = ""
+
+    def encode(self, session_id: Optional[str]) -> Tuple[bytes, Dict[str, str]]:
+        """Request body and headers as the frontend sends them"""
+        if self.endpoint == "text":
+            payload = {"text": self.text, "language": self.language}
+            if session_id:
+                payload["sessionId"] = session_id
+            return json.dumps(payload, ensure_ascii=False).encode("utf-8"), {"Content-Type": "application/json"}
+        field_name, content_type = ("audio", "audio/wav") if self.endpoint == "voice" else ("image", "image/jpeg")
+        files = {field_name: (self.filename or f"{field_name}.bin", content_type, self.data)} if self.data else {}
+        multipart_type, body = encode_multipart({"language": self.language}, files)
+        return body, {"Content-Type": multipart_type}
+
+
+@dataclass
+class Conversation:
+    steps: List[Step]
+    think_time: float = 0.0
+
+
+def _voice_clips(count: int, seed: int) -> List[bytes]:
+    from .synthetic_audio import ClipSpec, render_wav
+
+    rng = random.Random(seed)
+    return [render_wav(ClipSpec("speech", 16000, 1, round(rng.uniform(2.0, 8.0), 1), seed + index)) for index in range(count)]
+
+
+def _bill_photo(rng: random.Random) -> bytes:
+    """JPEG markers around random bytes, the size of a compressed phone photo"""
+    return b"\xff\xd8\xff\xe0" + rng.randbytes(rng.randint(40_000, 200_000)) + b"\xff\xd9"
+
+
+def generate_conversations(
+    count: int,
+    seed: int = 0,
+    follow_ups: Tuple[int, int] = (1, 3),
+    image_share: float = 0.2,
+    think_time: float = 0.0,
+) -> List[Conversation]:
+    """Conversations that open with a voice clip and continue in text, some with a bill photo"""
+    rng = random.Random(seed)
+    clips = _voice_clips(4, seed)
+    conversations = []
+    for index in range(count):
+        language = rng.choice([Language.HINDI, Language.ENGLISH])
+        steps = [Step("voice", language.value, data=rng.choice(clips), filename=f"recording-{index}.wav")]
+        if rng.random() < image_share:
+            steps.append(Step("image", language.value, data=_bill_photo(rng), filename=f"bill-{index}.jpg"))
+        for _ in range(rng.randint(*follow_ups)):
+            steps.append(Step("text", language.value, rng.choice(SAMPLE_TRANSCRIPTS[language] + FOLLOW_UPS[language])))
+        conversations.append(Conversation(steps, think_time))
+    return conversations
+
+
+def load_conversations(path: str) -> List[Conversation]:
+    """
+    Read recorded conversations from JSON Lines
+
+    Each line is ``{"language": "hi", "thinkTime": 2.0, "steps": [...]}`` where
+    a step is ``{"endpoint": "text", "text": "..."}`` or
+    ``{"endpoint": "voice", "file": "clip.wav"}``, with files relative to the
+    JSON Lines file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    conversations = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            steps = []
+            for step in record["steps"]:
+                data, filename = b"", ""
+                if step.get("file"):
+                    filename = step["file"]
+                    with open(os.path.join(directory, filename), "rb") as media:
+                        data = media.read()
+                steps.append(Step(step["endpoint"], step.get("language", record.get("language", "en")), step.get("text", ""), data, filename))
+            conversations.append(Conversation(steps, float(record.get("thinkTime", 0.0))))
+    return conversations
+
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    # Loop time at which each successful request completed
+    completions: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+
+    def record(self, latency: float, finished: float, status: Optional[int] = None, error: Optional[str] = None) -> None:
+        self.latencies.append(latency)
+        if status is not None:
+            self.statuses[status] += 1
+            if not 200 <= status < 300:
+                self.errors[f"HTTP {status}"] += 1
+        if error is not None:
+            self.errors[error] += 1
+        if status is not None and 200 <= status < 300:
+            self.completions.append(finished)
+
+    @property
+    def count(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def error_rate(self) -> float:
+        return self.error_count / self.count if self.count else 0.0
+
+    def percentiles(self) -> Dict[str, float]:
+        ordered = sorted(self.latencies)
+        return {f"p{p}": percentile(ordered, p) for p in (50, 90, 99)} | {"max": ordered[-1] if ordered else math.nan}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.count,
+            "errors": dict(self.errors),
+            "errorRate": self.error_rate,
+            "latencySeconds": self.percentiles(),
+        }
+
+
+def format_histogram(latencies: Sequence[float], width: int = 40, per_octave: int = 2) -> List[str]:
+    """Text histogram over logarithmic latency buckets, ``per_octave`` buckets per doubling"""
+    if not latencies:
+        return []
+    buckets = Counter(math.ceil(math.log2(max(latency, 1e-6)) * per_octave) for latency in latencies)
+    tallest = max(buckets.values())
+    lines = []
+    for bucket in range(min(buckets), max(buckets) + 1):
+        count = buckets.get(bucket, 0)
+        bound_ms = 2 ** (bucket / per_octave) * 1000
+        lines.append(f"  <= {bound_ms:>9.1f} ms |{'#' * math.ceil(count / tallest * width):<{width}}| {count}")
+    return lines
+
+
+@dataclass
+class LoadReport:
+    mode: str
+    elapsed: float
+    endpoints: Dict[str, EndpointStats]
+    conversations: int = 0
+    abandoned: int = 0
+    offered_rate: Optional[float] = None
+    users: Optional[int] = None
+    connections_opened: int = 0
+    # Loop times bounding the steady state used for ``steady_throughput``
+    window: Tuple[float, float] = (0.0, 0.0)
+    # Requests in the conversations that arrived inside ``window`` (open loop)
+    offered_requests: Optional[int] = None
+
+    @property
+    def requests(self) -> int:
+        return sum(stats.count for stats in self.endpoints.values())
+
+    @property
+    def throughput(self) -> float:
+        """Successful requests per second"""
+        good = sum(stats.count - stats.error_count for stats in self.endpoints.values())
+        return good / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def steady_throughput(self) -> float:
+        """Successful requests per second completed inside ``window``"""
+        start, end = self.window
+        if end <= start:
+            return self.throughput
+        done = sum(start <= finished < end for stats in self.endpoints.values() for finished in stats.completions)
+        return done / (end - start)
+
+    @property
+    def offered_throughput(self) -> Optional[float]:
+        """Requests per second the arrivals inside ``window`` asked for"""
+        start, end = self.window
+        if self.offered_requests is None or end <= start:
+            return None
+        return self.offered_requests / (end - start)
+
+    @property
+    def error_rate(self) -> float:
+        return sum(stats.error_count for stats in self.endpoints.values()) / self.requests if self.requests else 0.0
+
+    @property
+    def latencies(self) -> List[float]:
+        return sorted(latency for stats in self.endpoints.values() for latency in stats.latencies)
+
+    @property
+    def p99(self) -> float:
+        return percentile(self.latencies, 99)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "offeredConversationsPerSecond": self.offered_rate,
+            "users": self.users,
+            "elapsedSeconds": self.elapsed,
+            "conversations": self.conversations,
+            "abandoned": self.abandoned,
+            "requests": self.requests,
+            "throughput": self.throughput,
+            "steadyThroughput": self.steady_throughput,
+            "offeredThroughput": self.offered_throughput,
+            "errorRate": self.error_rate,
+            "p99Seconds": self.p99,
+            "connectionsOpened": self.connections_opened,
+            "endpoints": {name: stats.as_dict() for name, stats in self.endpoints.items()},
+        }
+
+    def format(self) -> str:
+        load = f"{self.offered_rate:g} conversations/s offered" if self.mode == "open" else f"{self.users} users"
+        lines = [
+            f"{self.mode}-loop, {load}: {self.requests} requests in {self.elapsed:.2f} s, "
+            f"{self.throughput:.1f} ok/s, {self.error_rate:.1%} errors, "
+            f"{self.connections_opened} connections, {self.abandoned} abandoned conversations",
+            f"{'endpoint':<8} {'requests':>9} {'errors':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}",
+        ]
+        for name, stats in self.endpoints.items():
+            p = stats.percentiles()
+            lines.append(f"{name:<8} {stats.count:>9} {stats.error_count:>7} " + " ".join(
+                f"{p[key] * 1000:>9.1f}" for key in ("p50", "p90", "p99", "max")))
+        lines.append("latency histogram, all endpoints:")
+        lines.extend(format_histogram(self.latencies))
+        return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+class LoadGenerator:
+    """
+    Replays conversations through a ``ConnectionPool``
+
+    Each conversation carries the ``sessionId`` returned by one request into
+    the next. A conversation is abandoned after its first failed request,
+    as a citizen whose upload failed would not see the follow-up questions.
+    """
+
+    def __init__(self, pool: ConnectionPool, conversations: Sequence[Conversation]):
+        if not conversations:
+            raise ValueError("At least one conversation is needed to generate load")
+        self.pool = pool
+        self.conversations = list(conversations)
+
+    async def play(self, conversation: Conversation, endpoints: Dict[str, EndpointStats], due: Optional[float] = None) -> bool:
+        """Send one conversation's requests in order; False if it was abandoned"""
+        loop = asyncio.get_running_loop()
+        session_id = None
+        for index, step in enumerate(conversation.steps):
+            if index and conversation.think_time:
+                await asyncio.sleep(conversation.think_time)
+            body, headers = step.encode(session_id)
+            started = due if index == 0 and due is not None else loop.time()
+            stats = endpoints.setdefault(step.endpoint, EndpointStats())
+            try:
+                response = await self.pool.request("POST", ENDPOINTS[step.endpoint], body, headers)
+            except asyncio.TimeoutError:
+                stats.record(loop.time() - started, loop.time(), error="timeout")
+                return False
+            except (OSError, asyncio.IncompleteReadError) as error:
+                stats.record(loop.time() - started, loop.time(), error=type(error).__name__)
+                return False
+            stats.record(loop.time() - started, loop.time(), status=response.status)
+            if not response.ok:
+                return False
+            try:
+                session_id = response.json().get("sessionId", session_id)
+            except ValueError:
+                stats.errors["invalid JSON"] += 1
+                return False
+        return True
+
+    async def closed_loop(self, users: int, duration: float) -> LoadReport:
+        """``users`` concurrent users, each starting another conversation until ``duration`` has passed"""
+        loop = asyncio.get_running_loop()
+        endpoints: Dict[str, EndpointStats] = {}
+        outcomes: List[bool] = []
+        upcoming = itertools.cycle(self.conversations)
+        opened = self.pool.opened
+        started = loop.time()
+        deadline = started + duration
+
+        async def user():
+            while loop.time() < deadline:
+                outcomes.append(await self.play(next(upcoming), endpoints))
+
+        await asyncio.gather(*(user() for _ in range(users)))
+        return LoadReport(
+            "closed", loop.time() - started, endpoints, len(outcomes), outcomes.count(False),
+            users=users, connections_opened=self.pool.opened - opened, window=(started, deadline),
+        )
+
+    async def open_loop(self, rate: float, duration: float, seed: int = 0) -> LoadReport:
+        """Start conversations as a Poisson process at ``rate`` per second for ``duration`` seconds"""
+        loop = asyncio.get_running_loop()
+        rng = random.Random(seed)
+        endpoints: Dict[str, EndpointStats] = {}
+        upcoming = itertools.cycle(self.conversations)
+        opened = self.pool.opened
+        started = loop.time()
+        window = (started + WARMUP_FRACTION * duration, started + duration)
+        tasks = []
+        offered = 0
+        due = started + rng.expovariate(rate)
+        while due < window[1]:
+            await asyncio.sleep(max(0.0, due - loop.time()))
+            conversation = next(upcoming)
+            if due >= window[0]:
+                offered += len(conversation.steps)
+            tasks.append(asyncio.ensure_future(self.play(conversation, endpoints, due)))
+            due += rng.expovariate(rate)
+        outcomes = await asyncio.gather(*tasks)
+        return LoadReport(
+            "open", loop.time() - started, endpoints, len(outcomes), outcomes.count(False),
+            offered_rate=rate, connections_opened=self.pool.opened - opened, window=window, offered_requests=offered,
+        )
+
+
+@dataclass
+class SweepReport:
+    """Open-loop runs at increasing rates and the first one the backend could not sustain"""
+
+    reports: List[LoadReport]
+    slo_seconds: float = LATENCY_SLO_SECONDS
+
+    def sustained(self, report: LoadReport) -> bool:
+        return (
+            report.steady_throughput >= MIN_THROUGHPUT_RATIO * report.offered_throughput
+            and report.p99 <= self.slo_seconds
+            and report.error_rate <= MAX_ERROR_RATE
+        )
+
+    @property
+    def saturation_rate(self) -> Optional[float]:
+        """The lowest offered rate, in conversations per second, that was not sustained"""
+        return next((report.offered_rate for report in self.reports if not self.sustained(report)), None)
+
+    @property
+    def max_sustained_rate(self) -> Optional[float]:
+        rates = [report.offered_rate for report in self.reports if self.sustained(report)]
+        return max(rates) if rates else None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "saturationConversationsPerSecond": self.saturation_rate,
+            "maxSustainedConversationsPerSecond": self.max_sustained_rate,
+            "runs": [report.as_dict() for report in self.reports],
+        }
+
+    def format(self) -> str:
+        lines = [f"{'conv/s':>8} {'req/s':>8} {'ok/s':>8} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}  sustained"]
+        for report in self.reports:
+            ordered = report.latencies
+            lines.append(
+                f"{report.offered_rate:>8g} {report.offered_throughput:>8.1f} {report.steady_throughput:>8.1f} "
+                f"{percentile(ordered, 50) * 1000:>9.1f} {percentile(ordered, 99) * 1000:>9.1f} "
+                f"{report.error_rate:>7.1%}  {'yes' if self.sustained(report) else 'NO'}"
+            )
+        if self.saturation_rate is None:
+            lines.append("no saturation within the swept rates")
+        else:
+            lines.append(f"saturation at {self.saturation_rate:g} conversations/s; "
+                         f"highest sustained rate {self.max_sustained_rate or 0:g} conversations/s")
+        return "\n".join(lines)
+
+
+async def sweep(
+    generator: LoadGenerator,
+    rates: Iterable[float],
+    duration: float,
+    seed: int = 0,
+    stop_after_saturation: bool = True,
+) -> SweepReport:
+    """Open-loop runs at each rate in turn, stopping at the first that is not sustained"""
+    result = SweepReport([])
+    for rate in rates:
+        report = await generator.open_loop(rate, duration, seed)
+        result.reports.append(report)
+        if stop_after_saturation and not result.sustained(report):
+            break
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Stand-in backend
+# ---------------------------------------------------------------------------
+
+class StandInBackend:
+    """
+    The routes of ``local-backend/server.js`` served from this process
+
+    Delays are the server's ``delay()`` calls times ``delay_scale``. With
+    ``capacity`` set, at most that many requests are processed at once and
+    the rest queue, like a backend with a fixed number of workers.
+    """
+
+    def __init__(self, delay_scale: float = 1.0, capacity: Optional[int] = None):
+        self.delay_scale = delay_scale
+        self.capacity = capacity
+        self.sessions: Dict[str, List[Dict[str, str]]] = {}
+        self.served = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._workers = asyncio.Semaphore(capacity) if capacity else None
+        self._classifier = IntentClassifier(MOCK_BACKEND_RULES, first_match=True)
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._connections: set = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Listen on ``host:port`` (any free port by default) and return the base URL"""
+        self._server = await asyncio.start_server(self._serve, host, port)
+        bound_host, bound_port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{bound_host}:{bound_port}"
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # Idle keep-alive connections would otherwise be cancelled when the loop shuts down
+        for handler in self._connections:
+            handler.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        handler = asyncio.current_task()
+        self._connections.add(handler)
+        try:
+            while True:
+                try:
+                    request_line, headers = await read_head(reader)
+                except ConnectionError:
+                    return
+                body = await read_body(reader, headers)
+                method, path = request_line.split(" ")[:2]
+                status, payload = await self._route(method, path, headers, body)
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: keep-alive\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(handler)
+            writer.close()
+
+    async def _route(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, Any]]:
+        path = urllib.parse.urlsplit(path).path
+        if method == "GET" and path == "/api/health":
+            return 200, {"status": "healthy", "service": "Voice Civic Assistant Stand-in Backend"}
+        endpoint = next((name for name, route in ENDPOINTS.items() if route == path), None)
+        if method != "POST" or endpoint is None:
+            return 404, {"error": "Endpoint not found", "path": path, "method": method}
+
+        content_type = headers.get("content-type", "")
+        if endpoint == "text":
+            fields, files = json.loads(body or b"{}"), {}
+        else:
+            fields, files = parse_multipart(content_type, body) if "multipart" in content_type else ({}, {})
+        language = fields.get("language") or "en"
+        field_name = "audio" if endpoint == "voice" else "image"
+        if endpoint == "text" and not fields.get("text"):
+            return 400, {"error": "No text provided"}
+        if endpoint != "text" and field_name not in files:
+            return 400, {"error": f"No {field_name} file provided"}
+
+        await self._process(BACKEND_DELAYS[endpoint])
+        self.served += 1
+        if endpoint == "image":
+            return 200, {"extractedText": "Hospital Bill\nTotal Amount: ₹5,000", "confidence": 0.89, "documentType": "hospital_bill"}
+
+        text = fields["text"] if endpoint == "text" else SAMPLE_TRANSCRIPTS[Language(language)][0]
+        intent = Intent(self._classifier.intent_of(text)).value
+        session_id = fields.get("sessionId") if endpoint == "text" and fields.get("sessionId") in self.sessions else str(uuid.uuid4())
+        self.sessions.setdefault(session_id, []).append({"userInput": text, "intent": intent})
+        response = {"sessionId": session_id, "intent": intent, "response": f"[{language}] {intent}"}
+        if endpoint == "voice":
+            response["transcription"] = text
+        return 200, response
+
+    async def _process(self, seconds: float) -> None:
+        if self._workers is not None:
+            await self._workers.acquire()
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            await asyncio.sleep(seconds * self.delay_scale)
+        finally:
+            self._in_flight -= 1
+            if self._workers is not None:
+                self._workers.release()
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Generate load against a running backend, or against an in-process stand-in"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay conversations against the backend API")
+    parser.add_argument("--url", default=DEFAULT_BASE_URL, help="backend base URL")
+    parser.add_argument("--stand-in", action="store_true", help="serve the local-backend routes in-process instead")
+    parser.add_argument("--delay-scale", type=float, default=1.0, help="stand-in: multiply server.js delays")
+    parser.add_argument("--capacity", type=int, default=None, help="stand-in: requests processed at once")
+    parser.add_argument("--mode", choices=["closed", "open", "sweep"], default="closed")
+    parser.add_argument("--users", type=int, default=10, help="closed loop: concurrent users")
+    parser.add_argument("--rate", type=float, default=2.0, help="open loop: conversations started per second")
+    parser.add_argument("--rates", type=float, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load per run")
+    parser.add_argument("--conversations", type=int, default=50, help="number of generated conversations")
+    parser.add_argument("--replay", help="JSON Lines file of recorded conversations")
+    parser.add_argument("--think-time", type=float, default=0.0)
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_REQUEST_TIMEOUT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    conversations = load_conversations(args.replay) if args.replay else generate_conversations(
+        args.conversations, args.seed, think_time=args.think_time)
+
+    async def run():
+        stand_in = StandInBackend(args.delay_scale, args.capacity) if args.stand_in else None
+        url = await stand_in.start() if stand_in else args.url
+        pool = ConnectionPool(url, args.pool_size, args.timeout)
+        generator = LoadGenerator(pool, conversations)
+        try:
+            if args.mode == "closed":
+                return await generator.closed_loop(args.users, args.duration)
+            if args.mode == "open":
+                return await generator.open_loop(args.rate, args.duration, args.seed)
+            return await sweep(generator, args.rates, args.duration, args.seed)
+        finally:
+            await pool.close()
+            if stand_in:
+                await stand_in.close()
+
+    started = time.perf_counter()
+    report = asyncio.run(run())
+    print(report.format())
+    print(f"wall time {time.perf_counter() - started:.1f} s")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report.as_dict(), handle, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,97 @@
+"""
+Chunked PCM decoding for WAV payloads
+
+Converts the ``data`` chunk of an inspected WAV file into float32 samples in
+``[-1, 1)`` a chunk at a time. Each chunk is read straight from the payload's
+buffer with ``numpy.frombuffer``, so only one chunk of float samples is alive
+at once no matter how long the recording is.
+"""
+
+from typing import Iterator, Optional
+
+import numpy as np
+
+from .audio_inspector import AudioFormatError, AudioInfo
+from .audio_payload import AudioPayload
+
+# Frames decoded per chunk unless the caller asks otherwise (~4s at 16kHz)
+DEFAULT_CHUNK_FRAMES = 1 << 16
+
+SUPPORTED_SAMPLE_FORMATS = {("pcm", 8), ("pcm", 16), ("pcm", 24), ("pcm", 32), ("float", 32), ("float", 64)}
+
+
+def is_decodable(info: Optional[AudioInfo]) -> bool:
+    """True when ``info`` describes a WAV stream this module can decode"""
+    return (
+        info is not None
+        and info.format == "wav"
+        and (info.codec, info.bits_per_sample) in SUPPORTED_SAMPLE_FORMATS
+    )
+
+
+def _scaled(samples: np.ndarray, scale: float) -> np.ndarray:
+    """Convert integer samples to float32 and scale in place (one allocation)"""
+    converted = samples.astype(np.float32)
+    converted *= scale
+    return converted
+
+
+def samples_to_float(raw, codec: str, bits_per_sample: int) -> np.ndarray:
+    """Interpret little-endian sample bytes as float32 in ``[-1, 1)``"""
+    if codec == "float":
+        return np.frombuffer(raw, dtype="<f4" if bits_per_sample == 32 else "<f8").astype(np.float32, copy=False)
+    if bits_per_sample == 8:
+        # 8-bit WAV is unsigned with a 128 offset
+        samples = np.frombuffer(raw, dtype=np.uint8).astype(np.float32)
+        samples -= 128.0
+        samples *= 1.0 / 128
+        return samples
+    if bits_per_sample == 16:
+        return _scaled(np.frombuffer(raw, dtype="<i2"), 1.0 / 32768)
+    if bits_per_sample == 24:
+        triplets = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        widened = np.zeros((len(triplets), 4), dtype=np.uint8)
+        widened[:, 1:] = triplets
+        # Shifting the little-endian int32 right by 8 sign-extends the 24-bit value
+        return _scaled(widened.view("<i4").ravel() >> 8, 1.0 / 8388608)
+    if bits_per_sample == 32:
+        return _scaled(np.frombuffer(raw, dtype="<i4"), 1.0 / 2147483648)
+    raise AudioFormatError(f"Unsupported {codec} sample width: {bits_per_sample} bits")
+
+
+def downmix(chunk: np.ndarray) -> np.ndarray:
+    """Average a ``(frames, channels)`` chunk down to one channel"""
+    channels = chunk.shape[1]
+    if channels == 1:
+        return chunk[:, 0]
+    # Column adds are far faster than ``sum(axis=1)`` over the interleaved layout
+    mono = chunk[:, 0].copy()
+    for channel in range(1, channels):
+        mono += chunk[:, channel]
+    mono *= 1.0 / channels
+    return mono
+
+
+def iter_pcm_chunks(
+    payload: AudioPayload,
+    chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+    max_frames: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """Yield ``(frames, channels)`` float32 arrays covering the data chunk, or its first ``max_frames``"""
+    info = payload.info
+    if not is_decodable(info):
+        raise AudioFormatError("Audio is not a decodable PCM WAV stream")
+
+    block_align = info.block_align
+    start = info.data_offset
+    # Ignore a trailing partial frame
+    frames = info.data_size // block_align
+    if max_frames is not None:
+        frames = min(frames, max(0, max_frames))
+    end = start + frames * block_align
+    step = chunk_frames * block_align
+    data = payload.data
+
+    for offset in range(start, end, step):
+        raw = data[offset:min(offset + step, end)]
+        yield samples_to_float(raw, info.codec, info.bits_per_sample).reshape(-1, info.channels)
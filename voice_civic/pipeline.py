@@ -0,0 +1,246 @@
+"""
+Asyncio batch speech pipeline
+
+Processes many citizens' sessions at once. Turns within a session stay in
+order, since each one may depend on the context built by the previous turn,
+while turns from different sessions run concurrently under a configurable
+limit. Every turn reports how long it queued for a slot and how long it took,
+so throughput can be measured against the number of concurrent citizens.
+
+Run on a ``VirtualTimeEventLoop`` (see ``run_with_clock``) the modelled
+latency is simulated exactly and a batch of thousands of turns completes in
+well under a second.
+"""
+
+import asyncio
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .audio_payload import AudioPayload
+from .audio_quality import calculate_confidence
+from .fixtures import SAMPLE_TRANSCRIPTS
+from .timing import Clock, SpeechLatencyModel, VirtualClock, run_with_clock
+from .tracing import DEFAULT_TRACER, Tracer
+from .types import Language, TranscriptionResult
+
+SpeechProcessorFn = Callable[[AudioPayload, Language], Awaitable[TranscriptionResult]]
+
+
+class AudioRejectedError(ValueError):
+    """Raised when audio fails the quality gate, as processAudio does"""
+
+
+class SimulatedSpeechProcessor:
+    """
+    Stand-in for ``processAudio``: quality gate, modelled latency, canned text
+
+    Latency is spent with ``asyncio.sleep`` so it runs on whichever clock the
+    event loop uses. Each stage is a span on ``tracer``.
+    """
+
+    def __init__(
+        self,
+        latency_model: Optional[SpeechLatencyModel] = None,
+        rng: Optional[random.Random] = None,
+        tracer: Optional[Tracer] = None,
+    ):
+        self._rng = rng or random.Random()
+        self.latency_model = latency_model or SpeechLatencyModel(rng=self._rng)
+        self.tracer = tracer or DEFAULT_TRACER
+
+    async def __call__(self, payload: AudioPayload, language: Language) -> TranscriptionResult:
+        tracer = self.tracer
+        with tracer.span("speech.quality_gate"):
+            assessment = payload.quality
+            if not assessment.acceptable:
+                raise AudioRejectedError(f"Audio quality unacceptable: {', '.join(assessment.issues)}")
+
+        with tracer.span("speech.transcribe"):
+            await asyncio.sleep(self.latency_model.sample_ms(payload.size) / 1000)
+            text = self._rng.choice(SAMPLE_TRANSCRIPTS[Language(language)])
+
+        with tracer.span("speech.confidence"):
+            confidence = calculate_confidence(assessment, text)
+        return TranscriptionResult(text=text, confidence=confidence, language=Language(language))
+
+
+@dataclass
+class SpeechTurn:
+    """One utterance submitted by a citizen"""
+
+    session_id: str
+    audio: Any
+    language: Language = Language.ENGLISH
+
+
+@dataclass
+class TurnOutcome:
+    """What happened to one turn, with timings on the event loop clock"""
+
+    session_id: str
+    turn_number: int
+    queued_at: float
+    started_at: float
+    finished_at: float
+    result: Optional[TranscriptionResult] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def latency(self) -> float:
+        """Seconds spent processing once a slot was free"""
+        return self.finished_at - self.started_at
+
+    @property
+    def queue_delay(self) -> float:
+        """Seconds spent waiting for a concurrency slot"""
+        return self.started_at - self.queued_at
+
+
+@dataclass
+class BatchReport:
+    """Per-session outcomes of a batch plus aggregate throughput"""
+
+    concurrency: int
+    elapsed: float
+    sessions: Dict[str, List[TurnOutcome]] = field(default_factory=dict)
+    max_in_flight: int = 0
+
+    @property
+    def outcomes(self) -> List[TurnOutcome]:
+        return [outcome for turns in self.sessions.values() for outcome in turns]
+
+    @property
+    def turns(self) -> int:
+        return sum(len(turns) for turns in self.sessions.values())
+
+    @property
+    def throughput(self) -> float:
+        """Completed turns per second of (loop) time"""
+        return self.turns / self.elapsed if self.elapsed > 0 else math.inf
+
+    def latency_percentile(self, percentile: float) -> float:
+        """Nearest-rank percentile of turn latency, including time queued"""
+        latencies = sorted(outcome.finished_at - outcome.queued_at for outcome in self.outcomes)
+        if not latencies:
+            return 0.0
+        rank = max(0, math.ceil(percentile / 100 * len(latencies)) - 1)
+        return latencies[rank]
+
+
+class SpeechPipeline:
+    """Runs sessions concurrently while keeping each session's turns in order"""
+
+    def __init__(self, processor: Optional[SpeechProcessorFn] = None, concurrency: int = 8, tracer: Optional[Tracer] = None):
+        if concurrency < 1:
+            raise ValueError(f"Concurrency must be at least 1, got {concurrency}")
+        self.tracer = tracer or DEFAULT_TRACER
+        self.processor = processor or SimulatedSpeechProcessor(tracer=self.tracer)
+        self.concurrency = concurrency
+        self._in_flight = 0
+        self._max_in_flight = 0
+
+    async def run(self, turns: Iterable[SpeechTurn]) -> BatchReport:
+        """Process every turn; failures are recorded per turn and do not stop the batch"""
+        sessions: Dict[str, List[SpeechTurn]] = {}
+        for turn in turns:
+            sessions.setdefault(turn.session_id, []).append(turn)
+
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+        self._in_flight = self._max_in_flight = 0
+
+        started = loop.time()
+        results = await asyncio.gather(*(self._run_session(session, slots) for session in sessions.values()))
+        elapsed = loop.time() - started
+
+        return BatchReport(
+            concurrency=self.concurrency,
+            elapsed=elapsed,
+            sessions=dict(zip(sessions, results)),
+            max_in_flight=self._max_in_flight,
+        )
+
+    def run_sync(self, turns: Iterable[SpeechTurn], clock: Optional[Clock] = None) -> BatchReport:
+        """Run a batch to completion, on simulated time unless a real clock is given"""
+        return run_with_clock(self.run(turns), clock or VirtualClock())
+
+    async def _run_session(self, turns: Sequence[SpeechTurn], slots: asyncio.Semaphore) -> List[TurnOutcome]:
+        outcomes = []
+        for turn_number, turn in enumerate(turns, 1):
+            outcomes.append(await self._run_turn(turn, turn_number, slots))
+        return outcomes
+
+    async def _run_turn(self, turn: SpeechTurn, turn_number: int, slots: asyncio.Semaphore) -> TurnOutcome:
+        loop = asyncio.get_running_loop()
+        queued_at = loop.time()
+        async with slots:
+            started_at = loop.time()
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+            result, error = None, None
+            try:
+                result = await self.processor(AudioPayload.coerce(turn.audio), turn.language)
+            except Exception as exc:
+                error = str(exc)
+            finally:
+                self._in_flight -= 1
+            finished_at = loop.time()
+        self.tracer.record("pipeline.queue", started_at - queued_at)
+        self.tracer.record("pipeline.turn", finished_at - started_at, error=error is not None)
+
+        return TurnOutcome(
+            session_id=turn.session_id,
+            turn_number=turn_number,
+            queued_at=queued_at,
+            started_at=started_at,
+            finished_at=finished_at,
+            result=result,
+            error=error,
+        )
+
+
+def throughput_curve(
+    turns: Sequence[SpeechTurn],
+    concurrency_levels: Iterable[int],
+    processor_factory: Callable[[], SpeechProcessorFn] = SimulatedSpeechProcessor,
+) -> List[BatchReport]:
+    """Replay the same batch at each concurrency level on simulated time"""
+    return [
+        SpeechPipeline(processor_factory(), concurrency).run_sync(turns)
+        for concurrency in concurrency_levels
+    ]
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Print how throughput and p95 latency scale with concurrent citizens"""
+    import argparse
+
+    from .synthetic_audio import voiced_payload
+
+    parser = argparse.ArgumentParser(description="Speech pipeline throughput versus concurrency")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=4, help="turns per session")
+    parser.add_argument("--seconds", type=float, default=8.0, help="audio length per turn")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64, 128])
+    args = parser.parse_args(argv)
+
+    audio = voiced_payload(args.seconds, noise=0.001)
+
+    turns = [SpeechTurn(f"session-{s}", audio) for s in range(args.sessions) for _ in range(args.turns)]
+    print(f"{'concurrency':>11} {'turns/s':>9} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7}")
+    for report in throughput_curve(turns, args.levels, lambda: SimulatedSpeechProcessor(rng=random.Random(0))):
+        print(
+            f"{report.concurrency:>11} {report.throughput:>9.2f} {report.latency_percentile(50):>7.2f} "
+            f"{report.latency_percentile(95):>7.2f} {report.latency_percentile(99):>7.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
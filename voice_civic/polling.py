@@ -0,0 +1,413 @@
+"""
+Transcription job polling strategies and their benchmark
+
+``waitForTranscriptionCompletion`` polls ``GetTranscriptionJob`` every 2s with
+a 30s cap, so a job that finishes just after a poll is noticed up to 2s late,
+eating into the 5-second budget. ``TranscriptionClient`` replays the lambda's
+request flow (upload, start, poll, fetch transcript, clean up) against any
+S3/Transcribe pair with a pluggable ``PollingStrategy``, and
+``benchmark_polling`` compares strategies on end-to-end latency percentiles
+and API call counts using the in-process fakes on simulated time. Each step
+of the flow is a span, so the benchmark also reports where the time went.
+"""
+
+import asyncio
+import json
+import math
+import random
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .audio_payload import AudioPayload
+from .aws_fakes import FakeS3, FakeTranscribe, ServiceError
+from .timing import VirtualClock, run_with_clock
+from .tracing import DEFAULT_TRACER, Tracer
+from .types import Language
+
+LANGUAGE_CODES = {Language.HINDI: "hi-IN", Language.ENGLISH: "en-IN"}
+
+MAX_WAIT_SECONDS = 30.0
+
+
+class TranscriptionTimeoutError(TimeoutError):
+    """Raised when a job is still running after the wait limit"""
+
+
+class TranscriptionFailedError(RuntimeError):
+    """Raised when Transcribe reports the job as FAILED"""
+
+
+# ---------------------------------------------------------------------------
+# Strategies
+# ---------------------------------------------------------------------------
+
+class PollingStrategy(ABC):
+    """Decides how long to wait before each GetTranscriptionJob call"""
+
+    name = "strategy"
+
+    @abstractmethod
+    def intervals(self, audio_seconds: float) -> Iterator[float]:
+        """Delays before successive polls of one job"""
+
+    def record(self, audio_seconds: float, completed_after: float) -> None:
+        """Learn from a job observed complete ``completed_after`` seconds after it started"""
+
+
+class FixedInterval(PollingStrategy):
+    """The lambda's behaviour: poll as soon as the job starts, then pause a constant interval"""
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self.name = f"fixed-{interval:g}s"
+
+    def intervals(self, audio_seconds: float) -> Iterator[float]:
+        # waitForTranscriptionCompletion sleeps after each poll, not before the first
+        yield 0.0
+        while True:
+            yield self.interval
+
+
+class ExponentialBackoff(PollingStrategy):
+    """Short first polls that back off geometrically up to a ceiling, with jitter"""
+
+    def __init__(
+        self,
+        initial: float = 0.25,
+        factor: float = 1.5,
+        max_interval: float = 2.0,
+        jitter: float = 0.1,
+        rng: Optional[random.Random] = None,
+    ):
+        self.initial = initial
+        self.factor = factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+        self.name = f"backoff-{initial:g}x{factor:g}"
+
+    def intervals(self, audio_seconds: float) -> Iterator[float]:
+        interval = self.initial
+        while True:
+            yield interval * (1 + self._rng.uniform(-self.jitter, self.jitter))
+            interval = min(self.max_interval, interval * self.factor)
+
+
+class AdaptivePolling(PollingStrategy):
+    """
+    Sleeps through most of the expected job time, then polls tightly
+
+    Fits job duration against audio length with exponentially weighted least
+    squares, so the prediction follows both the fixed queueing time and the
+    per-second cost as they drift. Each job waits until a fraction of its
+    prediction has elapsed and then polls at ``min_interval`` growing gently,
+    so most jobs are seen within a fraction of a second of finishing with
+    only a few calls.
+    """
+
+    name = "adaptive"
+
+    def __init__(
+        self,
+        initial_estimate: float = 2.0,
+        lead_fraction: float = 0.8,
+        min_interval: float = 0.2,
+        growth: float = 1.25,
+        max_interval: float = 1.0,
+        smoothing: float = 0.05,
+    ):
+        self.initial_estimate = initial_estimate
+        self.lead_fraction = lead_fraction
+        self.min_interval = min_interval
+        self.growth = growth
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        # Exponentially weighted sums of 1, x, y, x*x and x*y (x = audio seconds, y = job seconds)
+        self._sums = [0.0] * 5
+
+    def predicted(self, audio_seconds: float) -> float:
+        weight, sx, sy, sxx, sxy = self._sums
+        if weight == 0:
+            return self.initial_estimate
+        variance = weight * sxx - sx * sx
+        slope = max(0.0, (weight * sxy - sx * sy) / variance) if variance > 1e-9 * weight * weight else 0.0
+        return (sy - slope * sx) / weight + slope * audio_seconds
+
+    def intervals(self, audio_seconds: float) -> Iterator[float]:
+        yield max(self.min_interval, self.lead_fraction * self.predicted(audio_seconds))
+        interval = self.min_interval
+        while True:
+            yield interval
+            interval = min(self.max_interval, interval * self.growth)
+
+    def record(self, audio_seconds: float, completed_after: float) -> None:
+        keep = 1 - self.smoothing
+        x, y = audio_seconds, completed_after
+        self._sums = [
+            total * keep + value
+            for total, value in zip(self._sums, (1.0, x, y, x * x, x * y))
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+@dataclass
+class TranscriptionStats:
+    """Cost and latency of one processAudio-style request"""
+
+    latency: float = 0.0
+    polls: int = 0
+    api_calls: int = 0
+    # Seconds between the job finishing and the client noticing
+    overshoot: float = 0.0
+    error: Optional[str] = None
+
+
+class TranscriptionClient:
+    """Replays the lambda's upload/start/poll/fetch/cleanup flow with a polling strategy"""
+
+    def __init__(
+        self,
+        s3: FakeS3,
+        transcribe: FakeTranscribe,
+        strategy: PollingStrategy,
+        bucket: str = "voice-civic-temp",
+        max_wait: float = MAX_WAIT_SECONDS,
+        tracer: Optional[Tracer] = None,
+    ):
+        self.s3 = s3
+        self.transcribe = transcribe
+        self.strategy = strategy
+        self.bucket = bucket
+        self.max_wait = max_wait
+        self.tracer = tracer or DEFAULT_TRACER
+        self._jobs = 0
+
+    async def transcribe_audio(self, audio: AudioPayload, language: Language) -> Tuple[str, TranscriptionStats]:
+        """Return the transcript text and what it cost; raises on failure or timeout"""
+        loop = asyncio.get_running_loop()
+        tracer = self.tracer
+        stats = TranscriptionStats()
+        started = loop.time()
+        self._jobs += 1
+        job_name = f"transcription-{self._jobs}"
+        audio_key = f"temp-audio/{job_name}.wav"
+
+        try:
+            stats.api_calls += 1
+            with tracer.span("transcribe.upload"):
+                await self.s3.put_object(Bucket=self.bucket, Key=audio_key, Body=audio, ContentType="audio/wav")
+
+            stats.api_calls += 1
+            with tracer.span("transcribe.start_job"):
+                await self.transcribe.start_transcription_job(
+                    TranscriptionJobName=job_name,
+                    LanguageCode=LANGUAGE_CODES[Language(language)],
+                    Media={"MediaFileUri": f"s3://{self.bucket}/{audio_key}"},
+                    OutputBucketName=self.bucket,
+                    OutputKey=f"transcripts/{job_name}.json",
+                )
+            job_started = loop.time()
+
+            with tracer.span("transcribe.wait"):
+                job = await self._wait_for_completion(job_name, audio.estimated_duration, job_started, stats)
+            stats.overshoot = max(0.0, loop.time() - self.transcribe.completion_time_of(job_name))
+
+            # The transcript URI is path-style: /<bucket>/<key>
+            _, _, path = job["Transcript"]["TranscriptFileUri"].partition("amazonaws.com/")
+            bucket, _, key = path.partition("/")
+            stats.api_calls += 1
+            with tracer.span("transcribe.fetch_transcript"):
+                response = await self.s3.get_object(Bucket=bucket, Key=key)
+                transcript = json.loads(response["Body"])
+            text = transcript["results"]["transcripts"][0]["transcript"] if transcript["results"]["transcripts"] else ""
+
+            # Mark both objects for lifecycle cleanup, as cleanupS3Object intends to
+            with tracer.span("transcribe.cleanup"):
+                for cleanup_key in (key, audio_key):
+                    stats.api_calls += 1
+                    await self.s3.put_object(Bucket=self.bucket, Key=cleanup_key, Body=b"", Metadata={"delete-after": "24h"})
+            return text, stats
+        except Exception as error:
+            stats.error = str(error)
+            raise
+        finally:
+            stats.latency = loop.time() - started
+            tracer.record("transcribe.total", stats.latency, error=stats.error is not None)
+            tracer.count("transcribe.polls", stats.polls)
+
+    async def _wait_for_completion(self, job_name: str, audio_seconds: float, job_started: float, stats: TranscriptionStats) -> dict:
+        loop = asyncio.get_running_loop()
+        for delay in self.strategy.intervals(audio_seconds):
+            elapsed = loop.time() - job_started
+            if elapsed >= self.max_wait:
+                break
+            await asyncio.sleep(min(delay, self.max_wait - elapsed))
+
+            stats.polls += 1
+            stats.api_calls += 1
+            with self.tracer.span("transcribe.poll"):
+                response = await self.transcribe.get_transcription_job(TranscriptionJobName=job_name)
+            job = response["TranscriptionJob"]
+            status = job["TranscriptionJobStatus"]
+            if status == "COMPLETED":
+                self.strategy.record(audio_seconds, loop.time() - job_started)
+                return job
+            if status == "FAILED":
+                raise TranscriptionFailedError(f"Transcription failed: {job.get('FailureReason', 'Unknown error')}")
+        raise TranscriptionTimeoutError("Transcription job timed out")
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _percentile(values: Sequence[float], percentile: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return math.nan
+    return ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)]
+
+
+@dataclass
+class PollingReport:
+    """Latency distribution and call volume for one strategy"""
+
+    strategy: str
+    latencies: List[float] = field(default_factory=list)
+    polls: List[int] = field(default_factory=list)
+    api_calls: List[int] = field(default_factory=list)
+    overshoots: List[float] = field(default_factory=list)
+    errors: int = 0
+    # Per-stage latency summaries from the client's spans
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def percentile(self, percentile: float) -> float:
+        return _percentile(self.latencies, percentile)
+
+    @property
+    def mean_polls(self) -> float:
+        return sum(self.polls) / len(self.polls) if self.polls else 0.0
+
+    @property
+    def mean_api_calls(self) -> float:
+        return sum(self.api_calls) / len(self.api_calls) if self.api_calls else 0.0
+
+    @property
+    def mean_overshoot(self) -> float:
+        return sum(self.overshoots) / len(self.overshoots) if self.overshoots else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "strategy": self.strategy,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "meanPolls": self.mean_polls,
+            "meanApiCalls": self.mean_api_calls,
+            "meanOvershoot": self.mean_overshoot,
+            "errors": self.errors,
+            "stages": self.stages,
+        }
+
+
+def benchmark_polling(
+    strategies: Iterable[PollingStrategy],
+    audio: Sequence[AudioPayload],
+    seed: int = 0,
+    transcribe_options: Optional[dict] = None,
+    s3_options: Optional[dict] = None,
+    tracer: Optional[Tracer] = None,
+) -> List[PollingReport]:
+    """
+    Send the same requests through each strategy on simulated time
+
+    Every strategy sees identical job durations and failures (same seeds), so
+    differences come only from when each one polls. Each strategy is traced
+    on its own for its report's stage breakdown; ``tracer``, if given, also
+    collects every strategy's spans.
+    """
+    reports = []
+    for strategy in strategies:
+        stage_tracer = Tracer(enabled=True)
+        s3 = FakeS3(rng=random.Random(seed), **(s3_options or {}))
+        transcribe = FakeTranscribe(
+            s3, rng=random.Random(seed + 1), job_rng=random.Random(seed + 2), **(transcribe_options or {})
+        )
+        client = TranscriptionClient(s3, transcribe, strategy, tracer=stage_tracer)
+        report = PollingReport(strategy=strategy.name)
+
+        async def run_all() -> None:
+            for payload in audio:
+                try:
+                    _, stats = await client.transcribe_audio(payload, Language.ENGLISH)
+                except (TranscriptionTimeoutError, TranscriptionFailedError, ServiceError):
+                    report.errors += 1
+                    continue
+                report.latencies.append(stats.latency)
+                report.polls.append(stats.polls)
+                report.api_calls.append(stats.api_calls)
+                report.overshoots.append(stats.overshoot)
+
+        run_with_clock(run_all(), VirtualClock())
+        report.stages = stage_tracer.as_dict()["stages"]
+        if tracer is not None:
+            tracer.merge(stage_tracer)
+        reports.append(report)
+    return reports
+
+
+def default_strategies(seed: int = 0) -> List[PollingStrategy]:
+    return [
+        FixedInterval(2.0),
+        FixedInterval(0.5),
+        ExponentialBackoff(rng=random.Random(seed)),
+        AdaptivePolling(),
+    ]
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Print the polling comparison table, or JSON with --json"""
+    import argparse
+
+    from .audio_inspector import wav_header
+
+    parser = argparse.ArgumentParser(description="Compare Transcribe job polling strategies")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--job-failure-rate", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--stages", action="store_true", help="break each strategy's latency down by stage")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    # Clip lengths between 2 and 60 seconds of 16kHz mono, shared between requests
+    clips = [AudioPayload(wav_header(16000, 1, 16, seconds * 32000) + bytes(seconds * 32000)) for seconds in range(2, 61)]
+    audio = [rng.choice(clips) for _ in range(args.requests)]
+
+    reports = benchmark_polling(
+        default_strategies(args.seed), audio, args.seed, {"job_failure_rate": args.job_failure_rate}
+    )
+
+    if args.json:
+        print(json.dumps([report.as_dict() for report in reports], indent=2))
+        return 0
+
+    print(f"{'strategy':<16} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'polls':>6} {'calls':>6} {'late s':>7} {'errors':>6}")
+    for report in reports:
+        row = report.as_dict()
+        print(
+            f"{row['strategy']:<16} {row['p50']:>7.2f} {row['p95']:>7.2f} {row['p99']:>7.2f} "
+            f"{row['meanPolls']:>6.1f} {row['meanApiCalls']:>6.1f} {row['meanOvershoot']:>7.2f} {row['errors']:>6}"
+        )
+        if args.stages:
+            for stage, summary in row["stages"].items():
+                print(f"  {stage:<28} p50 {summary['p50']:>7.3f}  p99 {summary['p99']:>7.3f}  n {summary['count']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
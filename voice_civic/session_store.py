@@ -0,0 +1,304 @@
+"""
+Memory-bounded session store with LRU and TTL eviction
+
+``local-backend/server.js`` keeps sessions and documents in unbounded
+``Map``s, and ``SessionManager`` only notices expiry when a session is read,
+so memory grows for as long as traffic does. ``SessionStore`` holds entries
+in recency order under a byte budget (and optionally an entry cap), evicting
+the least recently used entry when a write would exceed it. Expiry times sit
+in a min-heap, so each operation retires exactly the entries that are due
+instead of scanning the whole store. Hit, miss, eviction and expiry counts
+are kept for monitoring.
+"""
+
+import heapq
+import sys
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .timing import Clock, RealClock
+
+# config.security.dataRetentionHours
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+# Bookkeeping per entry: OrderedDict node, heap tuple and the entry record
+ENTRY_OVERHEAD_BYTES = 200
+
+
+_CONTAINERS = (dict, list, tuple, set, frozenset)
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate bytes held by a JSON-like value (dicts, lists, strings, numbers)"""
+    size = sys.getsizeof(value)
+    if _depth > 8 or not isinstance(value, _CONTAINERS):
+        return size
+    depth = _depth + 1
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += sys.getsizeof(key) if type(key) is str else estimate_size(key, depth)
+            size += estimate_size(item, depth) if isinstance(item, _CONTAINERS) else sys.getsizeof(item)
+        return size
+    for item in value:
+        size += estimate_size(item, depth) if isinstance(item, _CONTAINERS) else sys.getsizeof(item)
+    return size
+
+
+@dataclass
+class StoreStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**asdict(self), "hitRate": self.hit_rate}
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: Any, size: int, expires_at: float):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class SessionStore:
+    """
+    Key-value store bounded by bytes, evicting LRU first and expiring on a heap
+
+    ``get`` and ``put`` are O(1) apart from popping due expiries, which is
+    O(log n) per expired entry. Overwrites leave a stale heap item behind;
+    it is skipped when popped and the heap is rebuilt once stale items
+    outnumber live ones, so the heap stays proportional to the store.
+
+    Values are held by reference and measured when they are ``put``, so a
+    value changed after ``get`` (a conversation that gained a turn) must be
+    ``put`` again before the budget sees its new size.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entries: Optional[int] = None,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Optional[Clock] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        if max_bytes <= 0:
+            raise ValueError(f"Memory budget must be positive, got {max_bytes}")
+        if max_entries is not None and max_entries < 1:
+            raise ValueError(f"Entry limit must be at least 1, got {max_entries}")
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock or RealClock()
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, int, Hashable]] = []
+        self._sequence = 0
+        self._bytes = 0
+        self._stats = StoreStats()
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Membership without touching recency or the hit/miss counters"""
+        self._expire()
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[Hashable]:
+        self._expire()
+        return iter(list(self._entries))
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        self._expire()
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return entry.value
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Insert or replace ``key``, measuring ``value`` afresh; its TTL restarts, like re-writing the DynamoDB item"""
+        now = self.clock.now()
+        self._expire(now)
+        size = self.sizeof(value) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            raise ValueError(f"Entry of {size} bytes exceeds the {self.max_bytes}-byte budget")
+
+        self._remove(key)
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        self._entries[key] = _Entry(value, size, expires_at)
+        self._bytes += size
+        self._sequence += 1
+        heapq.heappush(self._expiry_heap, (expires_at, self._sequence, key))
+
+        while self._bytes > self.max_bytes or (self.max_entries is not None and len(self._entries) > self.max_entries):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._stats.evictions += 1
+
+        if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+            self._compact_heap()
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove ``key`` for privacy compliance; returns whether it was present"""
+        self._expire()
+        return self._remove(key)
+
+    def purge_expired(self) -> int:
+        """Retire every due entry now, the work ``cleanupExpiredSessions`` leaves to DynamoDB"""
+        before = self._stats.expirations
+        self._expire()
+        return self._stats.expirations - before
+
+    def stats(self) -> StoreStats:
+        """Snapshot of the counters plus current size"""
+        self._expire()
+        snapshot = StoreStats(**asdict(self._stats))
+        snapshot.entries = len(self._entries)
+        snapshot.bytes = self._bytes
+        return snapshot
+
+    def _remove(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry.size
+        return True
+
+    def _expire(self, now: Optional[float] = None) -> None:
+        heap = self._expiry_heap
+        if not heap:
+            return
+        now = self.clock.now() if now is None else now
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # Skip items left behind by overwrites, deletes and evictions
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self._stats.expirations += 1
+
+    def _compact_heap(self) -> None:
+        live = {key: entry.expires_at for key, entry in self._entries.items()}
+        self._expiry_heap = [item for item in self._expiry_heap if live.get(item[2]) == item[0]]
+        heapq.heapify(self._expiry_heap)
+
+
+def _resident_mb() -> float:
+    """Current resident set size, falling back to the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as statm:
+            import os
+
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Churn sessions through a bounded store, printing memory and per-operation cost"""
+    import argparse
+    import json
+    import random
+    import time
+
+    from .timing import VirtualClock
+
+    parser = argparse.ArgumentParser(description="Session store churn benchmark")
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--budget-mb", type=float, default=32.0)
+    parser.add_argument("--arrivals-per-second", type=float, default=10.0, help="simulated new sessions per second")
+    parser.add_argument("--ttl-hours", type=float, default=1.0)
+    parser.add_argument("--reads-per-session", type=int, default=3)
+    parser.add_argument("--checkpoints", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    clock = VirtualClock()
+    store = SessionStore(max_bytes=int(args.budget_mb * 1e6), ttl_seconds=args.ttl_hours * 3600, clock=clock)
+    recent: List[str] = []
+    rows = []
+    step = max(1, args.sessions // args.checkpoints)
+    put_time = get_time = 0.0
+    gets = 0
+
+    for number in range(1, args.sessions + 1):
+        session_id = f"session-{number:08d}"
+        session = {
+            "sessionId": session_id,
+            "language": rng.choice(("hi", "en")),
+            "currentIntent": "inquiry",
+            "conversationHistory": [],
+            "createdAt": clock.now(),
+        }
+        started = time.perf_counter()
+        store.put(session_id, session)
+        put_time += time.perf_counter() - started
+
+        # Reads favour recent sessions, with some for sessions long gone
+        recent.append(session_id)
+        if len(recent) > 1000:
+            del recent[:500]
+        for _ in range(args.reads_per_session):
+            key = rng.choice(recent) if rng.random() < 0.9 else f"session-{rng.randint(1, number):08d}"
+            started = time.perf_counter()
+            store.get(key)
+            get_time += time.perf_counter() - started
+            gets += 1
+
+        clock.advance(rng.expovariate(args.arrivals_per_second))
+
+        if number % step == 0:
+            stats = store.stats()
+            rows.append({
+                "sessions": number,
+                "entries": stats.entries,
+                "storeMB": stats.bytes / 1e6,
+                "residentMB": _resident_mb(),
+                "putMicros": put_time / number * 1e6,
+                "getMicros": get_time / gets * 1e6,
+                "hitRate": stats.hit_rate,
+                "evictions": stats.evictions,
+                "expirations": stats.expirations,
+            })
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    print(f"{'sessions':>9} {'entries':>8} {'store MB':>9} {'RSS MB':>7} {'put us':>7} {'get us':>7} {'hit %':>6} {'evicted':>8} {'expired':>8}")
+    for row in rows:
+        print(
+            f"{row['sessions']:>9} {row['entries']:>8} {row['storeMB']:>9.1f} {row['residentMB']:>7.1f} "
+            f"{row['putMicros']:>7.2f} {row['getMicros']:>7.2f} {row['hitRate'] * 100:>6.1f} "
+            f"{row['evictions']:>8} {row['expirations']:>8}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
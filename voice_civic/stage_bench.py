@@ -0,0 +1,242 @@
+"""
+Per-stage latency benchmark for the speech request path
+
+Times each stage of handling one voice request many times over a
+deterministic corpus of WAV clips: request validation, base64 decode,
+quality assessment, the transcription stand-in (its CPU work, with modelled
+latency on a virtual clock), confidence scoring and context assembly. Each
+stage reports p50/p95/p99, throughput and peak bytes allocated per call.
+
+Reports can be compared with a stored baseline. Both carry the time of a
+fixed calibration workload, and baseline timings are scaled by the ratio of
+calibrations before comparing, so a slower machine does not read as a
+regression.
+"""
+
+import json
+import math
+import os
+import random
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .audio_payload import AudioPayload
+from .audio_quality import assess_audio_quality, calculate_confidence
+from .conversation import ConversationContext
+from .fixtures import SAMPLE_TRANSCRIPTS
+from .synthetic_audio import voiced_bursts, wav_payload
+from .timing import SimulatedLatency, VirtualClock
+from .types import Language
+from .validation import validate_audio_input
+
+# Stage timings are compared at these percentiles
+GATED_PERCENTILES = ("p50", "p95")
+
+# Allowed slowdown over the calibrated baseline before a stage counts as regressed
+DEFAULT_TOLERANCE = 0.5
+
+# Slowdowns smaller than this are timer and scheduler noise for microsecond stages
+NOISE_FLOOR_US = 5.0
+
+# Calls per stage traced for allocations; tracing is too slow to apply to every sample
+ALLOCATION_SAMPLES = 50
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[Any], Any]
+    inputs: Sequence[Any]
+
+
+def build_corpus(size: int = 24, seed: int = 0) -> List[Dict[str, Any]]:
+    """Speech-processor requests with 1-20s clips at assorted rates and layouts"""
+    rng = np.random.default_rng(seed)
+    requests = []
+    for index in range(size):
+        sample_rate = int(rng.choice([8000, 16000, 22050, 44100, 48000]))
+        channels = int(rng.choice([1, 2]))
+        frames = int(rng.uniform(1.0, 20.0) * sample_rate)
+        signal = voiced_bursts(frames, sample_rate, noise=0.002, rng=rng)
+        language = Language.HINDI if index % 2 else Language.ENGLISH
+        requests.append({
+            "audioData": wav_payload(signal, sample_rate, channels).encoded,
+            "language": language.value,
+            "sessionId": str(uuid.UUID(int=int(rng.integers(2**63)), version=4)),
+        })
+    return requests
+
+
+def build_stages(corpus: Sequence[Dict[str, Any]], seed: int = 0) -> List[Stage]:
+    """Each stage's inputs are the previous stage's outputs, computed ahead of timing"""
+    rng = random.Random(seed)
+    payloads = [AudioPayload.from_base64(request["audioData"]) for request in corpus]
+    assessments = [assess_audio_quality(payload) for payload in payloads]
+    languages = [Language(request["language"]) for request in corpus]
+    texts = [rng.choice(SAMPLE_TRANSCRIPTS[language]) for language in languages]
+    latency = SimulatedLatency(VirtualClock())
+    context = ConversationContext("benchmark-session")
+
+    def transcribe(item):
+        payload, language = item
+        processing_time_ms = latency.process(payload.size)
+        return rng.choice(SAMPLE_TRANSCRIPTS[language]), processing_time_ms
+
+    def assemble_context(item):
+        text, confidence = item
+        context.add_turn(text, "System response", confidence=confidence, processing_time=120.0)
+        return context.payload()
+
+    return [
+        Stage("validation", validate_audio_input, corpus),
+        Stage("decode", lambda request: AudioPayload.from_base64(request["audioData"]).info, corpus),
+        # A fresh payload per call so the cached assessment is never reused
+        Stage("quality", lambda payload: assess_audio_quality(AudioPayload(payload.data)), payloads),
+        Stage("transcription", transcribe, list(zip(payloads, languages))),
+        Stage("confidence", lambda item: calculate_confidence(*item), list(zip(assessments, texts))),
+        Stage("context", assemble_context, [(text, 0.85) for text in texts]),
+    ]
+
+
+def percentile(ordered: Sequence[float], percentile: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not ordered:
+        return math.nan
+    return ordered[max(0, math.ceil(percentile / 100 * len(ordered)) - 1)]
+
+
+def measure_stage(stage: Stage, samples: int, warmup: int = 5) -> Dict[str, float]:
+    """Time ``samples`` calls cycling through the stage's inputs, then trace allocations"""
+    inputs = stage.inputs
+    for index in range(min(warmup, samples)):
+        stage.run(inputs[index % len(inputs)])
+
+    durations = []
+    clock = time.perf_counter_ns
+    for index in range(samples):
+        item = inputs[index % len(inputs)]
+        started = clock()
+        stage.run(item)
+        durations.append(clock() - started)
+    durations.sort()
+
+    tracemalloc.start()
+    try:
+        peaks = []
+        for index in range(min(ALLOCATION_SAMPLES, samples)):
+            item = inputs[index % len(inputs)]
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            stage.run(item)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    total_seconds = sum(durations) / 1e9
+    return {
+        "samples": samples,
+        "p50Us": percentile(durations, 50) / 1e3,
+        "p95Us": percentile(durations, 95) / 1e3,
+        "p99Us": percentile(durations, 99) / 1e3,
+        "meanUs": total_seconds / samples * 1e6,
+        "opsPerSecond": samples / total_seconds if total_seconds > 0 else math.inf,
+        "allocBytes": sum(peaks) / len(peaks) if peaks else 0.0,
+    }
+
+
+def calibrate(repeats: int = 5) -> float:
+    """Median nanoseconds for a fixed mix of interpreter and NumPy work"""
+    values = np.random.default_rng(0).normal(size=100_000)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter_ns()
+        total = 0
+        for number in range(50_000):
+            total += number * number
+        np.sort(values)
+        timings.append(time.perf_counter_ns() - started)
+    return float(sorted(timings)[len(timings) // 2])
+
+
+def run_benchmark(samples: int, corpus_size: int = 24, seed: int = 0, profile: str = "default") -> Dict[str, Any]:
+    stages = build_stages(build_corpus(corpus_size, seed), seed)
+    return {
+        "profile": profile,
+        "samples": samples,
+        "calibrationNs": calibrate(),
+        "stages": {stage.name: measure_stage(stage, samples) for stage in stages},
+    }
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Descriptions of every gated percentile slower than the calibrated baseline allows"""
+    scale = report["calibrationNs"] / baseline["calibrationNs"] if baseline.get("calibrationNs") else 1.0
+    regressions = []
+    for name, current in report["stages"].items():
+        expected = baseline["stages"].get(name)
+        if expected is None:
+            continue
+        for key in GATED_PERCENTILES:
+            limit = expected[f"{key}Us"] * scale * (1 + tolerance) + NOISE_FLOOR_US
+            if current[f"{key}Us"] > limit:
+                regressions.append(
+                    f"{name} {key} {current[f'{key}Us']:.1f}us exceeds {limit:.1f}us "
+                    f"(baseline {expected[f'{key}Us']:.1f}us x{scale:.2f} machine speed, +{tolerance:.0%})"
+                )
+    return regressions
+
+
+def samples_for_profile(profile: str, per_example: int = 10) -> int:
+    """Sample count per stage scaled from the Hypothesis profile's ``max_examples``"""
+    from hypothesis import settings
+
+    return settings.get_profile(profile).max_examples * per_example
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as output:
+        json.dump(report, output, indent=2)
+        output.write("\n")
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Run the stage benchmark, print a table, and optionally write or check a baseline"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Per-stage latency benchmark")
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="compare against this report and exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.samples)
+    if args.output:
+        write_report(report, args.output)
+
+    print(f"{'stage':<14} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9} {'ops/s':>10} {'alloc KB':>9}")
+    for name, row in report["stages"].items():
+        print(
+            f"{name:<14} {row['p50Us']:>9.1f} {row['p95Us']:>9.1f} {row['p99Us']:>9.1f} "
+            f"{row['opsPerSecond']:>10.0f} {row['allocBytes'] / 1024:>9.1f}"
+        )
+
+    if args.baseline:
+        with open(args.baseline) as stored:
+            regressions = compare_to_baseline(report, json.load(stored), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
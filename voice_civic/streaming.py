@@ -0,0 +1,246 @@
+"""
+Streaming transcription with partial results
+
+The batch path uploads the whole clip, waits for one Transcribe job and only
+then returns text, so a citizen who speaks for two minutes hears nothing
+until the end. ``StreamingSpeechProcessor`` consumes audio as fixed windows
+and yields a ``PartialTranscription`` after each one. Every partial carries a
+stable prefix that later partials never change, followed by a short tail
+that may still be revised, so a UI can show committed words straight away.
+
+The processor also satisfies ``SpeechProcessorFn``: awaiting it returns the
+final result, so it drops into ``SpeechPipeline`` next to the batch processor.
+"""
+
+import asyncio
+import math
+import random
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+from .audio_inspector import AudioFormatError
+from .audio_payload import AudioPayload
+from .audio_quality import SILENCE_DBFS
+from .fixtures import SAMPLE_TRANSCRIPTS
+from .pcm import downmix, is_decodable, iter_pcm_chunks
+from .pipeline import AudioRejectedError
+from .timing import SpeechLatencyModel
+from .types import Language, TranscriptionResult
+
+DEFAULT_WINDOW_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class AudioWindow:
+    """A fixed-length slice of mono samples and where it sits in the recording"""
+
+    index: int
+    start: float
+    end: float
+    samples: np.ndarray
+
+    @property
+    def rms_dbfs(self) -> float:
+        if not self.samples.size:
+            return -math.inf
+        power = float(np.mean(np.square(self.samples)))
+        return 10.0 * math.log10(power) if power > 0 else -math.inf
+
+
+@dataclass
+class PartialTranscription(TranscriptionResult):
+    """A ``TranscriptionResult`` for the audio heard so far"""
+
+    # Words in ``stable_text`` are never revised by later partials
+    stable_text: str = ""
+    is_final: bool = False
+    window_index: int = -1
+    audio_end: float = 0.0
+
+
+def iter_audio_windows(payload: AudioPayload, window_seconds: float = DEFAULT_WINDOW_SECONDS) -> Iterator[AudioWindow]:
+    """Split a PCM WAV payload into mono windows, decoding one window at a time"""
+    if not is_decodable(payload.info):
+        raise AudioFormatError("Audio is not a decodable PCM WAV stream")
+    sample_rate = payload.info.sample_rate
+    window_frames = max(1, int(round(window_seconds * sample_rate)))
+    start_frame = 0
+    for index, chunk in enumerate(iter_pcm_chunks(payload, window_frames)):
+        frames = len(chunk)
+        yield AudioWindow(
+            index=index,
+            start=start_frame / sample_rate,
+            end=(start_frame + frames) / sample_rate,
+            samples=downmix(chunk),
+        )
+        start_frame += frames
+
+
+AudioSource = Union[AudioPayload, Iterable[AudioWindow], AsyncIterator[AudioWindow]]
+
+
+class StreamingSpeechProcessor:
+    """
+    Stand-in for a streaming recogniser: partial text after every window
+
+    Each window costs ``window_latency`` seconds plus a realtime share of its
+    length, spent with ``asyncio.sleep`` so it runs on the loop's clock.
+    Words are recognised at ``words_per_second`` of non-silent audio; the last
+    ``unstable_words`` of a partial may be misheard and corrected later, all
+    earlier words are committed. With ``realtime`` each window of a recorded
+    payload only becomes available once its duration has elapsed, as it
+    would when streamed from a microphone.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        window_latency: float = 0.1,
+        realtime_factor: float = 0.1,
+        jitter: float = 0.05,
+        words_per_second: float = 2.5,
+        unstable_words: int = 2,
+        revision_rate: float = 0.3,
+        realtime: bool = False,
+        rng: Optional[random.Random] = None,
+    ):
+        if window_seconds <= 0:
+            raise ValueError(f"Window length must be positive, got {window_seconds}")
+        self.window_seconds = window_seconds
+        self.window_latency = window_latency
+        self.realtime_factor = realtime_factor
+        self.jitter = jitter
+        self.words_per_second = words_per_second
+        self.unstable_words = unstable_words
+        self.revision_rate = revision_rate
+        self.realtime = realtime
+        self._rng = rng or random.Random()
+
+    def max_window_latency(self, window_seconds: Optional[float] = None) -> float:
+        """Upper bound on the time spent recognising one window"""
+        seconds = self.window_seconds if window_seconds is None else window_seconds
+        return self.window_latency + seconds * self.realtime_factor + self.jitter
+
+    async def __call__(self, payload: AudioPayload, language: Language) -> TranscriptionResult:
+        """Consume the whole stream and return the final result"""
+        result = None
+        async for result in self.stream(payload, language):
+            pass
+        return result
+
+    async def stream(self, audio: AudioSource, language: Language) -> AsyncIterator[PartialTranscription]:
+        """Yield a partial after each window, then one final result"""
+        language = Language(language)
+        script: List[str] = []
+        vocabulary = sorted({word for sentence in SAMPLE_TRANSCRIPTS[language] for word in sentence.split()})
+        speech_seconds = 0.0
+        stable = 0
+        window = None
+
+        async for window in self._windows(audio):
+            duration = window.end - window.start
+            await asyncio.sleep(
+                self.window_latency + duration * self.realtime_factor + self._rng.uniform(0, self.jitter)
+            )
+            if window.rms_dbfs >= SILENCE_DBFS:
+                speech_seconds += duration
+
+            heard = int(speech_seconds * self.words_per_second)
+            self._extend_script(script, heard, language)
+            stable = max(stable, heard - self.unstable_words)
+            tail = script[stable:heard]
+            if tail and self._rng.random() < self.revision_rate:
+                # The newest word is still ambiguous and may be replaced later
+                tail = tail[:-1] + [self._rng.choice(vocabulary)]
+
+            stable_text = " ".join(script[:stable])
+            yield PartialTranscription(
+                text=" ".join(script[:stable] + tail),
+                confidence=self._confidence(stable, len(tail)),
+                language=language,
+                stable_text=stable_text,
+                window_index=window.index,
+                audio_end=window.end,
+            )
+
+        heard = int(speech_seconds * self.words_per_second)
+        if speech_seconds > 0:
+            # Even a short utterance yields a word once the stream is complete
+            heard = max(1, heard)
+        if heard == 0:
+            raise AudioRejectedError("Audio quality unacceptable: Audio is mostly silent")
+        self._extend_script(script, heard, language)
+        final_text = " ".join(script[:heard])
+        yield PartialTranscription(
+            text=final_text,
+            confidence=self._confidence(heard, 0),
+            language=language,
+            stable_text=final_text,
+            is_final=True,
+            window_index=window.index if window is not None else -1,
+            audio_end=window.end if window is not None else 0.0,
+        )
+
+    async def _windows(self, audio: AudioSource) -> AsyncIterator[AudioWindow]:
+        if isinstance(audio, (AudioPayload, bytes, bytearray, memoryview, str)):
+            for window in iter_audio_windows(AudioPayload.coerce(audio), self.window_seconds):
+                if self.realtime:
+                    await asyncio.sleep(window.end - window.start)
+                yield window
+        elif hasattr(audio, "__aiter__"):
+            async for window in audio:
+                yield window
+        else:
+            for window in audio:
+                yield window
+
+    def _extend_script(self, script: List[str], words: int, language: Language) -> None:
+        """Grow the utterance being 'spoken' one sample sentence at a time"""
+        while len(script) < words:
+            script.extend(self._rng.choice(SAMPLE_TRANSCRIPTS[language]).split())
+
+    @staticmethod
+    def _confidence(stable_words: int, unstable_words: int) -> float:
+        """Committed words count at 0.9, words still open to revision at 0.6"""
+        total = stable_words + unstable_words
+        if total == 0:
+            return 0.0
+        return (0.9 * stable_words + 0.6 * unstable_words) / total
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Compare time to first partial with batch completion time across clip lengths"""
+    import argparse
+
+    from .synthetic_audio import voiced_payload
+    from .timing import VirtualClock, run_with_clock
+
+    parser = argparse.ArgumentParser(description="Streaming versus batch first-response latency")
+    parser.add_argument("--durations", type=float, nargs="+", default=[5, 15, 30, 60, 120])
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW_SECONDS)
+    parser.add_argument("--realtime", action="store_true", help="windows arrive as they are spoken")
+    args = parser.parse_args(argv)
+
+    batch = SpeechLatencyModel(jitter=(0.0, 0.0))
+    print(f"{'audio s':>8} {'first partial s':>16} {'stream final s':>15} {'batch s':>8} {'partials':>9}")
+    for duration in args.durations:
+        payload = voiced_payload(duration)
+        processor = StreamingSpeechProcessor(args.window, realtime=args.realtime, rng=random.Random(0))
+
+        async def timeline():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            return [(loop.time() - started, partial) async for partial in processor.stream(payload, Language.ENGLISH)]
+
+        events = run_with_clock(timeline(), VirtualClock())
+        batch_seconds = batch.sample_ms(payload.size) / 1000
+        if args.realtime:
+            batch_seconds += duration
+        print(f"{duration:>8.0f} {events[0][0]:>16.2f} {events[-1][0]:>15.2f} {batch_seconds:>8.2f} {len(events):>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
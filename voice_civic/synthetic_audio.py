@@ -0,0 +1,408 @@
+"""
+Synthetic speech-like audio and a memory-mapped clip corpus
+
+The property tests used to allocate a fresh zero-filled ``bytearray`` of up
+to several megabytes per example and patch a header onto it, so the quality
+and duration properties mostly ran on silence or a bare sine wave. This
+module synthesizes speech-like signals with NumPy: glottal pulse trains
+shaped by vowel formants into syllables, pauses between words, background
+noise mixed at a chosen SNR, and clipping from too much gain. Benchmarks
+and examples that only need something the quality gate accepts use
+``voiced_payload`` instead, a tone gated into syllable-like bursts.
+
+Clips are rendered once, as complete WAV files, into a single ``uint8``
+``.npy`` file with a structured index beside it. ``AudioCorpus`` opens both
+with ``mmap_mode="r"`` and serves each clip, or any prefix of it, as an
+``AudioPayload`` over the mapped pages. Nothing is copied, and a prefix reads
+exactly like a truncated upload because the inspector clamps an overstated
+``data`` size to the bytes present.
+"""
+
+import functools
+import math
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .audio_inspector import WAV_HEADER_SIZE, wav_header
+from .audio_payload import AudioPayload
+
+SAMPLE_RATES = (8000, 16000, 22050, 44100, 48000)
+CLIP_KINDS = ("speech", "noisy", "silence", "clipped")
+
+# Average adult (F1, F2, F3) in Hz for a, i, u, e, o
+VOWEL_FORMANTS = ((730, 1090, 2440), (270, 2290, 3010), (300, 870, 2240), (530, 1840, 2480), (570, 840, 2410))
+FORMANT_BANDWIDTH_HZ = (90.0, 110.0, 170.0)
+
+SPEECH_SNR_DB = 40.0
+NOISY_SNR_DB = 6.0
+# Microphone hiss in a "silent" recording, well under the analyzer's silence level
+SILENCE_NOISE_DBFS = -75.0
+# Gain range for clipped recordings; vowels are peaky, so it takes this much to flatten them
+CLIPPED_GAIN = (15.0, 30.0)
+# Voiced bursts: a steady tone gated on for about 60% of each 400ms cycle
+BURST_TONE_HZ = 180.0
+BURST_RATE_HZ = 2.5
+
+# Each clip in the default corpus holds at least this much PCM, in any format
+DEFAULT_CLIP_BYTES = 1024 * 1024
+# Long 16kHz mono speech for the duration-limit properties
+LONG_CLIP_SECONDS = 150.0
+CORPUS_VERSION = 1
+
+INDEX_DTYPE = np.dtype([
+    ("offset", "<i8"), ("size", "<i8"), ("kind", "U8"), ("sample_rate", "<i4"),
+    ("channels", "<i2"), ("seconds", "<f8"), ("seed", "<i8"), ("snr_db", "<f8"),
+])
+
+
+@dataclass(frozen=True)
+class ClipSpec:
+    """What to synthesize: the signal kind, PCM layout, length and seed"""
+
+    kind: str
+    sample_rate: int
+    channels: int
+    seconds: float
+    seed: int = 0
+    snr_db: float = SPEECH_SNR_DB
+
+    @property
+    def frames(self) -> int:
+        return int(self.seconds * self.sample_rate)
+
+    @property
+    def data_size(self) -> int:
+        return self.frames * self.channels * 2
+
+
+# ---------------------------------------------------------------------------
+# Signal synthesis
+# ---------------------------------------------------------------------------
+
+def tone(frames: int, sample_rate: int, frequency: float, amplitude: float = 0.3) -> np.ndarray:
+    """A steady sine wave as float32"""
+    t = np.arange(frames, dtype=np.float64) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def voiced_bursts(
+    frames: int,
+    sample_rate: int,
+    amplitude: float = 0.3,
+    noise: float = 0.0,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Syllable-like bursts of a ``BURST_TONE_HZ`` tone with pauses, plus white noise, as float32
+
+    Far cheaper to render than ``speech_like`` and the same at every length,
+    which suits benchmarks and examples that only need audio the quality
+    gate and the VAD take for speech.
+    """
+    t = np.arange(frames, dtype=np.float64) / sample_rate
+    signal = amplitude * (np.sin(2 * np.pi * BURST_RATE_HZ * t) > -0.3) * np.sin(2 * np.pi * BURST_TONE_HZ * t)
+    if noise:
+        signal += (rng if rng is not None else np.random.default_rng()).normal(0, noise, frames)
+    return signal.astype(np.float32)
+
+
+def _formant_response(size: int, sample_rate: int, formants: Sequence[float]) -> np.ndarray:
+    """Magnitude response of resonances at ``formants`` with a -6 dB/octave source tilt"""
+    frequencies = np.fft.rfftfreq(size, 1.0 / sample_rate)
+    response = np.zeros(len(frequencies))
+    for formant, bandwidth in zip(formants, FORMANT_BANDWIDTH_HZ):
+        if formant < sample_rate / 2:
+            response += 1.0 / (1.0 + ((frequencies - formant) / (bandwidth / 2)) ** 2)
+    return response / (1.0 + frequencies / 300.0)
+
+
+def _syllable(frames: int, sample_rate: int, rng: np.random.Generator, pitch: float) -> np.ndarray:
+    """One voiced syllable: a gliding pulse train through one vowel's formants, faded in and out"""
+    f0 = np.linspace(pitch * rng.uniform(0.9, 1.15), pitch * rng.uniform(0.8, 1.05), frames)
+    phase = np.cumsum(f0 / sample_rate)
+    excitation = np.zeros(frames)
+    excitation[1:][np.diff(np.floor(phase)) > 0] = 1.0
+    excitation += rng.normal(0, 0.02, frames)
+
+    size = 1 << (frames - 1).bit_length()
+    formants = VOWEL_FORMANTS[rng.integers(len(VOWEL_FORMANTS))]
+    voiced = np.fft.irfft(np.fft.rfft(excitation, size) * _formant_response(size, sample_rate, formants), size)[:frames]
+
+    fade = max(1, frames // 5)
+    envelope = np.ones(frames)
+    envelope[:fade] = np.sin(np.linspace(0, np.pi / 2, fade)) ** 2
+    envelope[-fade:] = envelope[:fade][::-1]
+    voiced *= envelope
+    peak = np.abs(voiced).max()
+    return voiced / peak if peak > 0 else voiced
+
+
+def speech_like(frames: int, sample_rate: int, rng: np.random.Generator, amplitude: float = 0.3) -> np.ndarray:
+    """Syllables of 120-300ms at one speaker's pitch, with short gaps and longer pauses between words"""
+    signal = np.zeros(frames, dtype=np.float32)
+    pitch = rng.uniform(100, 240)
+    position = int(rng.uniform(0, 0.1) * sample_rate)
+    while position < frames:
+        length = min(int(rng.uniform(0.12, 0.3) * sample_rate), frames - position)
+        if length > 8:
+            level = amplitude * rng.uniform(0.5, 1.0)
+            signal[position:position + length] = level * _syllable(length, sample_rate, rng, pitch)
+        word_pause = rng.random() < 0.3
+        position += length + int((rng.uniform(0.08, 0.4) if word_pause else rng.uniform(0.01, 0.04)) * sample_rate)
+    return signal
+
+
+def add_background_noise(signal: np.ndarray, snr_db: float, rng: np.random.Generator) -> np.ndarray:
+    """Mix in white noise ``snr_db`` below the power of the signal's voiced samples"""
+    voiced = signal[np.abs(signal) > 1e-6]
+    power = float(np.mean(np.square(voiced, dtype=np.float64))) if voiced.size else 0.0
+    if power == 0.0:
+        return signal
+    noise = rng.normal(0, math.sqrt(power / 10.0 ** (snr_db / 10.0)), len(signal))
+    return (signal + noise).astype(np.float32)
+
+
+def to_pcm16(signal: np.ndarray, channels: int = 1, gain: float = 1.0) -> np.ndarray:
+    """Scale, hard-clip to full scale and quantize to ``(frames, channels)`` little-endian int16"""
+    scaled = np.clip(signal * gain, -1.0, 1.0)
+    samples = np.round(scaled * 32767).astype("<i2")
+    if channels == 1:
+        return samples.reshape(-1, 1)
+    # The second microphone of a stereo pair hears the speaker a little quieter
+    return np.stack([samples] + [(samples * 0.85).astype("<i2")] * (channels - 1), axis=1)
+
+
+def synthesize(spec: ClipSpec) -> np.ndarray:
+    """Render ``spec`` as ``(frames, channels)`` int16 samples"""
+    rng = np.random.default_rng(spec.seed)
+    if spec.kind == "silence":
+        signal = rng.normal(0, 10.0 ** (SILENCE_NOISE_DBFS / 20.0), spec.frames).astype(np.float32)
+        return to_pcm16(signal, spec.channels)
+    if spec.kind not in CLIP_KINDS:
+        raise ValueError(f"Unknown clip kind: {spec.kind!r}")
+
+    signal = add_background_noise(speech_like(spec.frames, spec.sample_rate, rng), spec.snr_db, rng)
+    gain = rng.uniform(*CLIPPED_GAIN) if spec.kind == "clipped" else 1.0
+    return to_pcm16(signal, spec.channels, gain)
+
+
+def render_wav(spec: ClipSpec) -> bytes:
+    """A complete 16-bit PCM WAV file for ``spec``"""
+    return wav_header(spec.sample_rate, spec.channels, 16, spec.data_size) + synthesize(spec).tobytes()
+
+
+def wav_payload(signal: np.ndarray, sample_rate: int, channels: int = 1) -> AudioPayload:
+    """``signal`` hard-clipped and quantized to 16-bit PCM, the same on every channel, as a WAV payload"""
+    samples = np.round(np.clip(signal, -1.0, 1.0) * 32767).astype("<i2")
+    pcm = np.repeat(samples, channels).tobytes()
+    return AudioPayload(wav_header(sample_rate, channels, 16, len(pcm)) + pcm)
+
+
+def voiced_payload(
+    seconds: float,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    amplitude: float = 0.3,
+    noise: float = 0.0,
+    seed: int = 0,
+) -> AudioPayload:
+    """``seconds`` of ``voiced_bursts`` as a WAV payload"""
+    signal = voiced_bursts(int(seconds * sample_rate), sample_rate, amplitude, noise, np.random.default_rng(seed))
+    return wav_payload(signal, sample_rate, channels)
+
+
+# ---------------------------------------------------------------------------
+# Memory-mapped corpus
+# ---------------------------------------------------------------------------
+
+def _index_path(path: str) -> str:
+    root, _ = os.path.splitext(path)
+    return root + ".index.npy"
+
+
+class AudioCorpus:
+    """
+    WAV clips stored back to back in one memory-mapped ``.npy`` file
+
+    ``payload(i)`` returns clip ``i`` as an ``AudioPayload`` over the mapped
+    bytes; ``payload(i, max_bytes)`` returns a prefix of it, which inspects as
+    a truncated recording. Only the pages a test actually reads are loaded.
+    """
+
+    def __init__(self, data: np.ndarray, index: np.ndarray):
+        self._data = data
+        self.index = index
+
+    @classmethod
+    def build(cls, path: str, specs: Sequence[ClipSpec]) -> "AudioCorpus":
+        """Render ``specs`` into ``path`` one clip at a time, then open it read-only"""
+        index = np.zeros(len(specs), dtype=INDEX_DTYPE)
+        offset = 0
+        for clip, spec in enumerate(specs):
+            size = WAV_HEADER_SIZE + spec.data_size
+            index[clip] = (offset, size, spec.kind, spec.sample_rate, spec.channels, spec.seconds, spec.seed, spec.snr_db)
+            offset += size
+
+        # Written under temporary names and renamed, so a concurrent reader never sees half a corpus
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, scratch = tempfile.mkstemp(suffix=".npy", dir=directory)
+        os.close(fd)
+        try:
+            data = np.lib.format.open_memmap(scratch, mode="w+", dtype=np.uint8, shape=(max(offset, 1),))
+            for row, spec in zip(index, specs):
+                start = int(row["offset"])
+                data[start:start + WAV_HEADER_SIZE] = np.frombuffer(
+                    wav_header(spec.sample_rate, spec.channels, 16, spec.data_size), dtype=np.uint8)
+                data[start + WAV_HEADER_SIZE:start + int(row["size"])] = synthesize(spec).reshape(-1).view(np.uint8)
+            data.flush()
+            del data
+            index_scratch = scratch + ".index.npy"
+            np.save(index_scratch, index)
+            os.replace(scratch, path)
+            os.replace(index_scratch, _index_path(path))
+        finally:
+            for leftover in (scratch, scratch + ".index.npy"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: str) -> "AudioCorpus":
+        return cls(np.load(path, mmap_mode="r"), np.load(_index_path(path)))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._data.nbytes)
+
+    def spec(self, clip: int) -> ClipSpec:
+        row = self.index[clip]
+        return ClipSpec(str(row["kind"]), int(row["sample_rate"]), int(row["channels"]),
+                        float(row["seconds"]), int(row["seed"]), float(row["snr_db"]))
+
+    def specs(self) -> List[ClipSpec]:
+        return [self.spec(clip) for clip in range(len(self))]
+
+    def find(self, kind: Optional[str] = None, sample_rate: Optional[int] = None, channels: Optional[int] = None) -> List[int]:
+        """Indices of the clips matching every given attribute"""
+        mask = np.ones(len(self.index), dtype=bool)
+        if kind is not None:
+            mask &= self.index["kind"] == kind
+        if sample_rate is not None:
+            mask &= self.index["sample_rate"] == sample_rate
+        if channels is not None:
+            mask &= self.index["channels"] == channels
+        return np.flatnonzero(mask).tolist()
+
+    def payload(self, clip: int, max_bytes: Optional[int] = None) -> AudioPayload:
+        """Clip ``clip`` as a zero-copy payload, cut to ``max_bytes`` if given"""
+        offset, size = int(self.index["offset"][clip]), int(self.index["size"][clip])
+        if max_bytes is not None:
+            size = min(size, max_bytes)
+        return AudioPayload(memoryview(self._data[offset:offset + size]))
+
+    def samples(self, clip: int) -> np.ndarray:
+        """Clip ``clip`` as a read-only ``(frames, channels)`` int16 view"""
+        offset, size = int(self.index["offset"][clip]), int(self.index["size"][clip])
+        pcm = self._data[offset + WAV_HEADER_SIZE:offset + size].view("<i2")
+        return pcm.reshape(-1, int(self.index["channels"][clip]))
+
+
+def default_specs() -> List[ClipSpec]:
+    """Every kind at every rate and channel count, at least ``DEFAULT_CLIP_BYTES`` each, plus a long clip"""
+    specs = []
+    seed = 0
+    for sample_rate in SAMPLE_RATES:
+        for channels in (1, 2):
+            seconds = math.ceil(DEFAULT_CLIP_BYTES / (sample_rate * channels * 2) * 10) / 10
+            for kind in CLIP_KINDS:
+                snr_db = NOISY_SNR_DB if kind == "noisy" else SPEECH_SNR_DB
+                specs.append(ClipSpec(kind, sample_rate, channels, seconds, seed, snr_db))
+                seed += 1
+    specs.append(ClipSpec("speech", 16000, 1, LONG_CLIP_SECONDS, seed))
+    return specs
+
+
+def default_corpus_path() -> str:
+    """``$VOICE_CIVIC_AUDIO_CORPUS`` if set, else a versioned file in the temp directory"""
+    return os.environ.get("VOICE_CIVIC_AUDIO_CORPUS") or os.path.join(
+        tempfile.gettempdir(), f"voice-civic-audio-corpus-v{CORPUS_VERSION}.npy")
+
+
+@functools.lru_cache(maxsize=None)
+def default_corpus() -> AudioCorpus:
+    """Open the shared corpus, building it on first use or when its clips are out of date"""
+    path = default_corpus_path()
+    specs = default_specs()
+    try:
+        corpus = AudioCorpus.open(path)
+        if corpus.specs() == specs:
+            return corpus
+    except (OSError, ValueError):
+        pass
+    return AudioCorpus.build(path, specs)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Compare allocating a buffer per example with slicing the mapped corpus"""
+    import argparse
+    import time
+    import tracemalloc
+
+    from .audio_quality import assess_audio_quality
+
+    parser = argparse.ArgumentParser(description="Synthetic audio corpus: per-example cost")
+    parser.add_argument("--examples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    default_corpus.cache_clear()
+    corpus = default_corpus()
+    opened = time.perf_counter() - started
+    print(f"corpus: {len(corpus)} clips, {corpus.nbytes / 1e6:.1f} MB mapped, ready in {opened:.2f} s")
+
+    rng = np.random.default_rng(args.seed)
+    sizes = rng.integers(1024, DEFAULT_CLIP_BYTES, args.examples)
+    clips = rng.integers(0, len(corpus) - 1, args.examples)
+
+    def allocate(size: int) -> AudioPayload:
+        buffer = bytearray(int(size))
+        buffer[:WAV_HEADER_SIZE] = wav_header(16000, 1, 16, int(size) - WAV_HEADER_SIZE)
+        return AudioPayload(buffer)
+
+    def measure(make) -> tuple:
+        tracemalloc.start()
+        started = time.perf_counter()
+        for clip, size in zip(clips, sizes):
+            make(int(clip), int(size))
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed / args.examples * 1e6, peak
+
+    print(f"{'per example':<28} {'us':>8} {'peak traced KB':>15}")
+    for name, make in [("zero-filled bytearray", lambda clip, size: allocate(size)),
+                       ("corpus slice", lambda clip, size: corpus.payload(clip, size))]:
+        micros, peak = measure(make)
+        print(f"{name:<28} {micros:>8.1f} {peak / 1024:>15.1f}")
+
+    print(f"\n{'kind':<10} {'rate':>6} {'ch':>3} {'quality':>10} {'silence':>8} {'clipped':>8} {'snr dB':>7}")
+    for clip in range(len(corpus)):
+        spec = corpus.spec(clip)
+        if spec.channels == 1 and spec.sample_rate == 16000:
+            assessment = assess_audio_quality(corpus.payload(clip))
+            features, quality = assessment.features, assessment.quality.value
+            print(f"{spec.kind:<10} {spec.sample_rate:>6} {spec.channels:>3} {quality:>10} "
+                  f"{features.silence_ratio:>8.2f} {features.clipping_ratio:>8.3f} {features.snr_db:>7.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
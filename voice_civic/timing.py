@@ -0,0 +1,176 @@
+"""
+Clocks and latency models shared by the speech pipeline mocks
+
+Performance properties (Requirement 1.4) used to sleep for the simulated
+processing time and then measure wall-clock deltas, which made the ``ci``
+profile take hours and flake on loaded machines. Mocks and assertions now
+share a ``Clock``: the default ``VirtualClock`` advances instantly and
+deterministically, while ``RealClock`` keeps the old wall-clock behaviour.
+"""
+
+import asyncio
+import os
+import random
+import selectors
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Environment variable selecting the clock used by the property suite
+CLOCK_ENV_VAR = "VOICE_CIVIC_CLOCK"
+
+
+class Clock(ABC):
+    """Source of monotonic time in seconds that can also wait"""
+
+    @abstractmethod
+    def now(self) -> float:
+        """Current time in seconds"""
+
+    @abstractmethod
+    def sleep(self, seconds: float) -> None:
+        """Wait ``seconds`` on this clock"""
+
+
+class RealClock(Clock):
+    """Wall-clock time backed by ``time.perf_counter`` and ``time.sleep``"""
+
+    def now(self) -> float:
+        return time.perf_counter()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """Simulated time that only moves when somebody sleeps or advances it"""
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+
+    def now(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        if seconds < 0:
+            raise ValueError(f"Cannot move a clock backwards by {seconds}s")
+        self._now += seconds
+
+
+class _VirtualTimeSelector:
+    """Selector wrapper that advances a virtual clock instead of blocking"""
+
+    def __init__(self, selector: selectors.BaseSelector, clock: VirtualClock):
+        self._selector = selector
+        self._clock = clock
+
+    def select(self, timeout: Optional[float] = None):
+        # The loop asks to block until its next timer is due: jump straight there
+        if timeout is not None and timeout > 0:
+            self._clock.advance(timeout)
+        return self._selector.select(0)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._selector, name)
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop whose timers run on a ``VirtualClock``
+
+    ``asyncio.sleep`` and every other timer complete as soon as nothing else is
+    runnable, so concurrent simulated latency is modelled exactly while the
+    loop itself finishes in microseconds. Only suitable for code that does no
+    real I/O: a task waiting on a socket would never be woken.
+    """
+
+    def __init__(self, clock: Optional[VirtualClock] = None):
+        self.clock = clock or VirtualClock()
+        super().__init__(selector=_VirtualTimeSelector(selectors.DefaultSelector(), self.clock))
+
+    def time(self) -> float:
+        return self.clock.now()
+
+
+def run_with_clock(main: Awaitable[T], clock: Clock) -> T:
+    """Run a coroutine on a virtual-time loop for a VirtualClock, else on a normal loop"""
+    if not isinstance(clock, VirtualClock):
+        return asyncio.run(main)
+    loop = VirtualTimeEventLoop(clock)
+    try:
+        return loop.run_until_complete(main)
+    finally:
+        loop.close()
+
+
+def clock_from_env(default: str = "virtual") -> Clock:
+    """Build the clock named by ``VOICE_CIVIC_CLOCK`` (``virtual`` or ``real``)"""
+    name = os.getenv(CLOCK_ENV_VAR, default).strip().lower()
+    if name == "real":
+        return RealClock()
+    if name == "virtual":
+        return VirtualClock()
+    raise ValueError(f"Unknown clock '{name}', expected 'virtual' or 'real'")
+
+
+class SpeechLatencyModel:
+    """
+    Processing latency of the speech processor as a function of audio size
+
+    The curve is the one the timing mock has always used: 50ms plus roughly one
+    second per MB, capped at 2 seconds, with a small jitter and hard bounds of
+    50ms and 2.5s.
+    """
+
+    def __init__(
+        self,
+        base_seconds: float = 0.05,
+        seconds_per_mb: float = 1.0,
+        max_base_seconds: float = 2.0,
+        jitter: tuple = (-0.02, 0.1),
+        bounds_ms: tuple = (50.0, 2500.0),
+        rng: Optional[random.Random] = None,
+    ):
+        self.base_seconds = base_seconds
+        self.seconds_per_mb = seconds_per_mb
+        self.max_base_seconds = max_base_seconds
+        self.jitter = jitter
+        self.bounds_ms = bounds_ms
+        # Falls back to the module-level generator, which Hypothesis seeds per example
+        self._rng = rng if rng is not None else random
+
+    def base_seconds_for(self, audio_size: int) -> float:
+        """Latency before jitter for ``audio_size`` bytes"""
+        return min(self.max_base_seconds, self.base_seconds + (audio_size / 1024 / 1024) * self.seconds_per_mb)
+
+    def sample_ms(self, audio_size: int) -> float:
+        """Draw one processing time in milliseconds"""
+        processing_time_ms = (self.base_seconds_for(audio_size) + self._rng.uniform(*self.jitter)) * 1000
+        low, high = self.bounds_ms
+        return max(low, min(high, processing_time_ms))
+
+
+class SimulatedLatency:
+    """Spends modelled latency on a clock and reports how long it took"""
+
+    def __init__(self, clock: Clock, model: Optional[SpeechLatencyModel] = None):
+        self.clock = clock
+        self.model = model or SpeechLatencyModel()
+
+    def process(self, audio_size: int) -> float:
+        """Wait for one modelled processing run and return its latency in ms"""
+        processing_time_ms = self.model.sample_ms(audio_size)
+        self.clock.sleep(processing_time_ms / 1000)
+        return processing_time_ms
+
+    async def process_async(self, audio_size: int) -> float:
+        """Like ``process`` but waits on the running event loop's timers"""
+        processing_time_ms = self.model.sample_ms(audio_size)
+        await asyncio.sleep(processing_time_ms / 1000)
+        return processing_time_ms
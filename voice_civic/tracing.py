@@ -0,0 +1,454 @@
+"""
+Span tracing and latency histograms for pipeline stages
+
+``src/utils/logger.ts`` writes free-form lines and the mocks attach a single
+``processingTime`` to each result, so when a request blows the 5 second
+budget nothing says whether the time went to the upload, starting the job,
+polling, fetching the transcript or scoring confidence. ``Tracer`` times
+named spans and keeps a latency histogram per span name:
+
+- ``with tracer.span("transcribe.upload"):`` or ``@tracer.traced()`` around
+  a stage, sync or async. A disabled tracer hands out one shared no-op span,
+  so instrumented code costs an attribute lookup and a call when tracing is
+  off;
+- ``LatencyHistogram`` is HDR-style: log-linear buckets with a fixed
+  relative error (under 1% by default) from a microsecond to hours, so
+  percentiles stay accurate however many spans are recorded, and recording
+  is an index computation and an increment;
+- ``prometheus_text`` and ``as_dict`` export histograms and counters;
+  ``MetricsServer`` serves both on a local port for Prometheus to scrape.
+
+Spans read the running event loop's clock when there is one, so stages run
+under ``run_with_clock`` are timed in simulated seconds; give the tracer a
+``Clock`` to time synchronous code against it. ``VOICE_CIVIC_TRACING=1``
+turns on ``DEFAULT_TRACER``, which components use unless given their own.
+"""
+
+import asyncio
+import functools
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .timing import Clock
+
+TRACING_ENV_VAR = "VOICE_CIVIC_TRACING"
+
+# Sub-bucket resolution: recorded values are reported within 2**-(bits - 1) of themselves
+DEFAULT_PRECISION_BITS = 8
+
+# Bucket bounds for the Prometheus histogram, in seconds, around the 5 second budget
+PROMETHEUS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+EXPORT_PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+METRIC_PREFIX = "voice_civic"
+DEFAULT_METRICS_PORT = 9464
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of durations with bounded relative error
+
+    Durations are kept as whole microseconds. Values below ``2**bits`` get a
+    bucket each; above that every power of two is split into
+    ``2**(bits - 1)`` buckets, so a bucket is never wider than
+    ``2**-(bits - 1)`` of the values in it. Counts live in a list that grows
+    to the largest value seen, about 3,500 entries for an hour at 8 bits.
+    """
+
+    def __init__(self, bits: int = DEFAULT_PRECISION_BITS):
+        if bits < 2:
+            raise ValueError(f"Histogram precision needs at least 2 bits, got {bits}")
+        self.bits = bits
+        self._linear = 1 << bits
+        self._half = 1 << (bits - 1)
+        self.counts: List[int] = []
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def _index(self, micros: int) -> int:
+        if micros < self._linear:
+            return micros
+        shift = micros.bit_length() - self.bits
+        return self._linear + (shift - 1) * self._half + (micros >> shift) - self._half
+
+    def upper_bound(self, index: int) -> int:
+        """Largest value in microseconds that lands in bucket ``index``"""
+        if index < self._linear:
+            return index
+        shift, offset = divmod(index - self._linear, self._half)
+        return ((offset + self._half + 1) << (shift + 1)) - 1
+
+    def record(self, seconds: float) -> None:
+        index = self._index(int(seconds * 1_000_000) if seconds > 0 else 0)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.bits != self.bits:
+            raise ValueError("Cannot merge histograms of different precision")
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percentile: float) -> float:
+        """Upper edge of the bucket holding the given rank, in seconds (NaN when empty)"""
+        if not self.count:
+            return math.nan
+        rank = max(1, math.ceil(percentile / 100 * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.max, max(self.min, self.upper_bound(index) / 1_000_000))
+        return self.max
+
+    def cumulative(self, bounds: Sequence[float]) -> List[int]:
+        """Counts at or below each bound in seconds, as Prometheus ``le`` buckets want"""
+        counts, result, seen, index = list(self.counts), [], 0, 0
+        for bound in bounds:
+            limit = bound * 1_000_000
+            while index < len(counts) and self.upper_bound(index) <= limit:
+                seen += counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def as_dict(self) -> Dict[str, float]:
+        summary = {"count": self.count, "sum": self.total, "mean": self.mean, "min": self.min if self.count else math.nan, "max": self.max}
+        for percentile in EXPORT_PERCENTILES:
+            summary[f"p{percentile:g}"] = self.percentile(percentile)
+        return summary
+
+
+# ---------------------------------------------------------------------------
+# Spans
+# ---------------------------------------------------------------------------
+
+def _loop_time() -> float:
+    # _get_running_loop returns None outside a loop instead of raising, which
+    # keeps synchronous spans off the exception path
+    loop = asyncio._get_running_loop()
+    return loop.time() if loop is not None else time.perf_counter()
+
+
+class _Span:
+    __slots__ = ("_tracer", "name", "started", "duration")
+
+    def __init__(self, tracer: "Tracer", name: str):
+        self._tracer = tracer
+        self.name = name
+        self.started = 0.0
+        self.duration = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.started = self._tracer._now()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        self.duration = self._tracer._now() - self.started
+        self._tracer.record(self.name, self.duration, error=exc_type is not None)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    name = ""
+    started = 0.0
+    duration = 0.0
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Per-stage latency histograms, error counts and counters
+
+    ``enabled`` defaults to the ``VOICE_CIVIC_TRACING`` environment variable
+    and can be flipped at any time; spans already open finish normally.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, clock: Optional[Clock] = None, bits: int = DEFAULT_PRECISION_BITS):
+        if enabled is None:
+            enabled = os.getenv(TRACING_ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+        self.enabled = enabled
+        self.bits = bits
+        self._now: Callable[[], float] = clock.now if clock is not None else _loop_time
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.counters: Dict[str, float] = {}
+
+    def span(self, name: str):
+        """Context manager timing one run of stage ``name``"""
+        return _Span(self, name) if self.enabled else _NOOP_SPAN
+
+    def traced(self, name: Optional[str] = None):
+        """Decorator timing every call of a function or coroutine function as a span"""
+        def decorate(function):
+            stage = name or function.__qualname__
+            if asyncio.iscoroutinefunction(function):
+                @functools.wraps(function)
+                async def traced_coroutine(*args, **kwargs):
+                    if not self.enabled:
+                        return await function(*args, **kwargs)
+                    with _Span(self, stage):
+                        return await function(*args, **kwargs)
+                return traced_coroutine
+
+            @functools.wraps(function)
+            def traced_function(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with _Span(self, stage):
+                    return function(*args, **kwargs)
+            return traced_function
+        return decorate
+
+    def record(self, name: str, seconds: float, error: bool = False) -> None:
+        """Add a duration measured elsewhere to stage ``name``"""
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram(self.bits)
+            self.errors[name] = 0
+        histogram.record(seconds)
+        if error:
+            self.errors[name] += 1
+
+    def count(self, name: str, amount: float = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, other: "Tracer") -> None:
+        """Fold another tracer's histograms and counters into this one"""
+        for name, histogram in list(other.histograms.items()):
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram(self.bits)
+                self.errors[name] = 0
+            self.histograms[name].merge(histogram)
+            self.errors[name] += other.errors.get(name, 0)
+        for name, value in list(other.counters.items()):
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        self.histograms = {}
+        self.errors = {}
+        self.counters = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        stages = {}
+        for name, histogram in sorted(list(self.histograms.items())):
+            stages[name] = {**histogram.as_dict(), "errors": self.errors.get(name, 0)}
+        return {"stages": stages, "counters": dict(sorted(list(self.counters.items())))}
+
+    def prometheus_text(self, buckets: Sequence[float] = PROMETHEUS_BUCKETS) -> str:
+        """Histograms and counters in the Prometheus text exposition format"""
+        histograms = sorted(list(self.histograms.items()))
+        metric = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = [f"# HELP {metric} Time spent in each pipeline stage.", f"# TYPE {metric} histogram"]
+        for name, histogram in histograms:
+            stage = _label(name)
+            for bound, count in zip(buckets, histogram.cumulative(buckets)):
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound:g}"}} {count}')
+            lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram.total!r}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+
+        metric = f"{METRIC_PREFIX}_stage_errors_total"
+        lines += [f"# HELP {metric} Stage runs that ended in an exception.", f"# TYPE {metric} counter"]
+        lines += [f'{metric}{{stage="{_label(name)}"}} {self.errors.get(name, 0)}' for name, _ in histograms]
+
+        metric = f"{METRIC_PREFIX}_events_total"
+        lines += [f"# HELP {metric} Events counted by the pipeline.", f"# TYPE {metric} counter"]
+        lines += [f'{metric}{{event="{_label(name)}"}} {value:g}' for name, value in sorted(list(self.counters.items()))]
+        return "\n".join(lines) + "\n"
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+DEFAULT_TRACER = Tracer()
+
+
+def slowest_stages(tracer: Tracer, percentile: float = 99.0, limit: int = 5) -> List[Tuple[str, float]]:
+    """Stages ordered by their latency at ``percentile``, slowest first"""
+    ranked = [(name, histogram.percentile(percentile)) for name, histogram in list(tracer.histograms.items())]
+    return sorted(ranked, key=lambda item: item[1], reverse=True)[:limit]
+
+
+# ---------------------------------------------------------------------------
+# Local metrics endpoint
+# ---------------------------------------------------------------------------
+
+class MetricsServer:
+    """
+    ``/metrics`` (Prometheus text) and ``/metrics.json`` on a background thread
+
+    Scrapes read the tracer while the instrumented code keeps writing to it;
+    each histogram is copied before it is exported, so a scrape may miss a
+    span that finishes during it but never fails.
+    """
+
+    def __init__(self, tracer: Tracer, host: str = "127.0.0.1", port: int = DEFAULT_METRICS_PORT):
+        self.tracer = tracer
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> str:
+        """Start serving and return the base URL"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        tracer = self.tracer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = tracer.prometheus_text().encode(), "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path == "/metrics.json":
+                    body, content_type = json.dumps(tracer.as_dict()).encode(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return f"http://{self.host}:{self.port}"
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+
+# ---------------------------------------------------------------------------
+# Overhead benchmark
+# ---------------------------------------------------------------------------
+
+def measure_overhead(calls: int = 200_000) -> Dict[str, float]:
+    """Nanoseconds per call of an empty stage: bare, in a disabled span and in an enabled one"""
+    disabled, enabled = Tracer(enabled=False), Tracer(enabled=True)
+
+    def stage():
+        pass
+
+    def bare():
+        for _ in range(calls):
+            stage()
+
+    def spans(tracer):
+        def run():
+            for _ in range(calls):
+                with tracer.span("stage"):
+                    stage()
+        return run
+
+    def decorated(tracer):
+        traced_stage = tracer.traced("stage")(stage)
+
+        def run():
+            for _ in range(calls):
+                traced_stage()
+        return run
+
+    timings = {}
+    for label, run in (
+        ("bare", bare), ("span disabled", spans(disabled)), ("span enabled", spans(enabled)),
+        ("decorator disabled", decorated(disabled)), ("decorator enabled", decorated(enabled)),
+    ):
+        best = math.inf
+        for _ in range(3):
+            started = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - started)
+        timings[label] = best / calls * 1e9
+    return timings
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Measure tracing overhead, or trace a simulated batch and export its metrics"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Span tracing overhead and metrics export")
+    parser.add_argument("--calls", type=int, default=200_000, help="calls per overhead measurement")
+    parser.add_argument("--demo", type=int, default=0, metavar="REQUESTS", help="trace this many simulated transcriptions")
+    parser.add_argument("--format", choices=["prometheus", "json"], default="prometheus")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="after the demo, serve /metrics on this port until interrupted")
+    args = parser.parse_args(argv)
+
+    if not args.demo:
+        timings = measure_overhead(args.calls)
+        for label, nanoseconds in timings.items():
+            print(f"{label:<20} {nanoseconds:8.0f} ns/call  (+{nanoseconds - timings['bare']:.0f})")
+        return 0
+
+    from .audio_inspector import wav_header
+    from .audio_payload import AudioPayload
+    from .polling import AdaptivePolling, benchmark_polling
+
+    tracer = Tracer(enabled=True)
+    clips = [AudioPayload(wav_header(16000, 1, 16, seconds * 32000) + bytes(seconds * 32000)) for seconds in range(2, 31)]
+    benchmark_polling([AdaptivePolling()], [clips[index % len(clips)] for index in range(args.demo)], tracer=tracer)
+    print(tracer.prometheus_text() if args.format == "prometheus" else json.dumps(tracer.as_dict(), indent=2))
+
+    if args.serve is not None:
+        server = MetricsServer(tracer, port=args.serve)
+        print(f"serving {server.start()}/metrics")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
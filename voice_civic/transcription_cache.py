@@ -0,0 +1,296 @@
+"""
+Content-addressed transcription cache
+
+A retry from ``VoiceRecorder`` or a citizen re-submitting the same clip
+makes ``processAudio`` upload to S3 and start another Transcribe job for
+audio it has already transcribed. ``TranscriptionCache`` keys results by a
+SHA-256 of the decoded audio plus the language, so the same recording
+finds its transcript however it was base64-encoded or wrapped, while a
+different clip cannot collide with it.
+
+Results sit in a bounded in-memory LRU tier (a ``SessionStore``) and,
+optionally, in a SQLite file that survives restarts. Both tiers expire
+entries after ``config.security.dataRetentionHours``, since transcripts are
+personal data. ``CachedSpeechProcessor`` wraps any speech processor and also
+merges concurrent requests for the same audio into one transcription.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import sqlite3
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from .audio_payload import AudioPayload
+from .pipeline import SpeechProcessorFn
+from .session_store import DEFAULT_TTL_SECONDS, SessionStore
+from .timing import Clock, RealClock
+from .types import Language, TranscriptionResult
+
+DEFAULT_MEMORY_BYTES = 16 * 1024 * 1024
+
+# Bookkeeping held for each cached transcript besides its text
+RESULT_OVERHEAD_BYTES = 160
+
+
+def cache_key(payload: AudioPayload, language: Language) -> str:
+    """``"<language>:<sha256 of the decoded audio>"``; SHA-256 is hardware-accelerated on current CPUs"""
+    return f"{Language(language).value}:{hashlib.sha256(payload.data).hexdigest()}"
+
+
+def _result_size(result: TranscriptionResult) -> int:
+    return sys.getsizeof(result.text) + RESULT_OVERHEAD_BYTES
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    coalesced: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**dataclasses.asdict(self), "hitRate": self.hit_rate}
+
+
+class SqliteTier:
+    """
+    Persistent transcripts in one SQLite table
+
+    Rows carry their expiry time; reads ignore expired rows and
+    ``purge_expired`` deletes them, which also runs when the file is opened.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS, clock: Optional[Clock] = None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock or RealClock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts ("
+            " key TEXT PRIMARY KEY, text TEXT NOT NULL, confidence REAL NOT NULL,"
+            " language TEXT NOT NULL, timestamp TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS transcripts_expiry ON transcripts (expires_at)")
+        self.purge_expired()
+
+    def get(self, key: str) -> Optional[TranscriptionResult]:
+        row = self._db.execute(
+            "SELECT text, confidence, language, timestamp FROM transcripts WHERE key = ? AND expires_at > ?",
+            (key, self.clock.now()),
+        ).fetchone()
+        if row is None:
+            return None
+        text, confidence, language, timestamp = row
+        return TranscriptionResult(text, confidence, Language(language), datetime.fromisoformat(timestamp))
+
+    def put(self, key: str, result: TranscriptionResult) -> None:
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?, ?)",
+                (key, result.text, result.confidence, Language(result.language).value,
+                 result.timestamp.isoformat(), self.clock.now() + self.ttl_seconds),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM transcripts WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        with self._db:
+            return self._db.execute("DELETE FROM transcripts WHERE expires_at <= ?", (self.clock.now(),)).rowcount
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM transcripts WHERE expires_at > ?", (self.clock.now(),)).fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class TranscriptionCache:
+    """
+    Memory tier in front of an optional disk tier
+
+    A disk hit is promoted into memory. Results are copied on the way in
+    and out, so callers cannot alter what later callers receive.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MEMORY_BYTES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        path: Optional[str] = None,
+        clock: Optional[Clock] = None,
+    ):
+        self.clock = clock or RealClock()
+        self.memory = SessionStore(max_bytes=max_bytes, ttl_seconds=ttl_seconds, clock=self.clock, sizeof=_result_size)
+        self.disk = SqliteTier(path, ttl_seconds, self.clock) if path else None
+        self._stats = CacheStats()
+
+    def get(self, payload: AudioPayload, language: Language) -> Optional[TranscriptionResult]:
+        return self.get_key(cache_key(payload, language))
+
+    def put(self, payload: AudioPayload, language: Language, result: TranscriptionResult) -> None:
+        self.put_key(cache_key(payload, language), result)
+
+    def get_key(self, key: str) -> Optional[TranscriptionResult]:
+        result = self.memory.get(key)
+        if result is not None:
+            self._stats.memory_hits += 1
+            return dataclasses.replace(result)
+        if self.disk is not None:
+            result = self.disk.get(key)
+            if result is not None:
+                self._stats.disk_hits += 1
+                self.memory.put(key, result)
+                return dataclasses.replace(result)
+        self._stats.misses += 1
+        return None
+
+    def put_key(self, key: str, result: TranscriptionResult) -> None:
+        stored = dataclasses.replace(result)
+        self.memory.put(key, stored)
+        if self.disk is not None:
+            self.disk.put(key, stored)
+
+    def invalidate(self, payload: AudioPayload, language: Language) -> None:
+        key = cache_key(payload, language)
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def record_coalesced(self) -> None:
+        self._stats.coalesced += 1
+
+    def stats(self) -> CacheStats:
+        memory = self.memory.stats()
+        return dataclasses.replace(self._stats, evictions=memory.evictions, expirations=memory.expirations)
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+
+
+class CachedSpeechProcessor:
+    """
+    ``SpeechProcessorFn`` that consults the cache before transcribing
+
+    Concurrent calls for audio already being transcribed wait for that
+    transcription instead of starting their own. Failures, including audio
+    rejected by the quality gate, are not cached.
+    """
+
+    def __init__(self, processor: SpeechProcessorFn, cache: Optional[TranscriptionCache] = None):
+        self.processor = processor
+        self.cache = cache or TranscriptionCache()
+        self._in_flight: Dict[str, "asyncio.Future[TranscriptionResult]"] = {}
+        self.transcriptions = 0
+
+    async def __call__(self, payload: AudioPayload, language: Language) -> TranscriptionResult:
+        payload = AudioPayload.coerce(payload)
+        key = cache_key(payload, language)
+        cached = self.cache.get_key(key)
+        if cached is not None:
+            return cached
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.cache.record_coalesced()
+            return dataclasses.replace(await asyncio.shield(pending))
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            self.transcriptions += 1
+            result = await self.processor(payload, language)
+        except BaseException as error:
+            future.set_exception(error)
+            # Nobody may be waiting; retrieve it so the loop does not log it
+            future.exception()
+            raise
+        else:
+            self.cache.put_key(key, result)
+            future.set_result(result)
+            return dataclasses.replace(result)
+        finally:
+            del self._in_flight[key]
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Compare a first submission with repeats served from memory and, after a restart, from disk"""
+    import argparse
+    import os
+    import random
+    import tempfile
+    import time
+
+    import numpy as np
+
+    from .audio_inspector import wav_header
+    from .pipeline import SimulatedSpeechProcessor
+    from .timing import VirtualClock, run_with_clock
+
+    parser = argparse.ArgumentParser(description="Transcription cache: repeat submissions")
+    parser.add_argument("--durations", type=float, nargs="+", default=[2, 5, 10, 20])
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    def per_call_us(run) -> float:
+        started = time.perf_counter()
+        for _ in range(args.repeats):
+            run()
+        return (time.perf_counter() - started) / args.repeats * 1e6
+
+    print(f"{'audio s':>8} {'first s':>8} {'memory hit us':>14} {'disk hit us':>12} {'(decode us)':>12} {'transcriptions':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for duration in args.durations:
+            t = np.arange(int(duration * 16000)) / 16000
+            pcm = (0.3 * np.sin(2 * np.pi * 180 * t) * 32767).astype("<i2").tobytes()
+            encoded = AudioPayload(wav_header(16000, 1, 16, len(pcm)) + pcm).encoded
+            path = os.path.join(directory, f"cache-{duration}.sqlite")
+            processor = CachedSpeechProcessor(SimulatedSpeechProcessor(rng=random.Random(0)), TranscriptionCache(path=path))
+
+            async def first_then_repeats():
+                loop = asyncio.get_running_loop()
+                started = loop.time()
+                await processor(AudioPayload.from_base64(encoded), Language.HINDI)
+                first = loop.time() - started
+                # A retry arrives as a new request body: a new payload, hashed again
+                payloads = [AudioPayload(bytes(AudioPayload.from_base64(encoded).data)) for _ in range(4)]
+                started = time.perf_counter()
+                for index in range(args.repeats):
+                    await processor(payloads[index % 4], Language.HINDI)
+                return first, (time.perf_counter() - started) / args.repeats * 1e6
+
+            first, memory_hit = run_with_clock(first_then_repeats(), VirtualClock())
+            processor.cache.close()
+
+            restarted = TranscriptionCache(path=path)
+            payload = AudioPayload.from_base64(encoded)
+            key = cache_key(payload, Language.HINDI)
+
+            def disk_lookup():
+                restarted.memory.delete(key)
+                restarted.get(payload, Language.HINDI)
+
+            disk_hit = per_call_us(disk_lookup)
+            decode = per_call_us(lambda: AudioPayload.from_base64(encoded))
+            restarted.close()
+            print(f"{duration:>8.0f} {first:>8.2f} {memory_hit:>14.0f} {disk_hit:>12.0f} {decode:>12.0f} {processor.transcriptions:>15}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+"""
+Core type definitions mirrored from ``src/types/index.ts``
+
+Values match the TypeScript enums exactly so results can be serialised and
+compared with what the lambdas produce.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+
+
+class Language(str, Enum):
+    HINDI = "hi"
+    ENGLISH = "en"
+
+
+class Intent(str, Enum):
+    ELIGIBILITY_CHECK = "eligibility"
+    GRIEVANCE_FILING = "grievance"
+    GENERAL_INQUIRY = "inquiry"
+
+
+class ComplaintCategory(str, Enum):
+    HOSPITAL_OVERCHARGING = "overcharging"
+    BENEFIT_DENIAL = "benefit_denial"
+    SERVICE_QUALITY = "service_quality"
+    DISCRIMINATION = "discrimination"
+
+
+class DocumentType(str, Enum):
+    PM_JAY_APPLICATION = "pmjay_application"
+    HEALTH_GRIEVANCE = "health_grievance"
+    SUPPORTING_DOCUMENT = "supporting_doc"
+
+
+class Gender(str, Enum):
+    MALE = "male"
+    FEMALE = "female"
+    OTHER = "other"
+
+
+class FamilyRelation(str, Enum):
+    HEAD = "head"
+    SPOUSE = "spouse"
+    CHILD = "child"
+    PARENT = "parent"
+    SIBLING = "sibling"
+    OTHER = "other"
+
+
+class IncomeCategory(str, Enum):
+    BPL = "below_poverty_line"
+    APL = "above_poverty_line"
+    SECC_ELIGIBLE = "secc_eligible"
+
+
+class RationCardType(str, Enum):
+    AAY = "antyodaya"
+    BPL = "below_poverty_line"
+    APL = "above_poverty_line"
+    NONE = "none"
+
+
+class HousingType(str, Enum):
+    KUTCHA = "kutcha"
+    SEMI_PUCCA = "semi_pucca"
+    PUCCA = "pucca"
+    HOMELESS = "homeless"
+
+
+class AudioQuality(str, Enum):
+    EXCELLENT = "excellent"
+    GOOD = "good"
+    FAIR = "fair"
+    POOR = "poor"
+
+
+class DocumentStatus(str, Enum):
+    DRAFT = "draft"
+    UNDER_REVIEW = "under_review"
+    CONFIRMED = "confirmed"
+    SUBMITTED = "submitted"
+
+
+class OutputFormat(str, Enum):
+    PDF = "pdf"
+    HTML = "html"
+    JSON = "json"
+    PLAIN_TEXT = "plain_text"
+
+
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class TranscriptionResult:
+    text: str
+    confidence: float
+    language: Language
+    timestamp: datetime = field(default_factory=utc_now)
@@ -0,0 +1,402 @@
+"""
+Voice activity detection: trimming silence before transcription
+
+Recordings from ``VoiceRecorder`` usually open and close with seconds of
+silence while the user finds the button, and contain long pauses while they
+think. Transcribe bills every one of those seconds, and
+``waitForTranscriptionCompletion`` waits for them.
+
+``detect_speech`` finds the speech in a PCM WAV payload from two features of
+each 20ms frame, computed with NumPy a chunk at a time:
+
+- energy, in dB relative to full scale, after removing the frame's DC
+  offset. The noise floor is a low percentile of the frame energies;
+- the zero-crossing rate, in crossings per second. Fricatives such as "s"
+  and "sh" are quiet but cross zero several thousand times a second, where
+  hum and rumble cross a few hundred times.
+
+A frame is speech when it is clearly above the floor (or above the floor at
+all and crossing zero far faster than the background does). Runs of such
+frames are kept when they somewhere reach well above the floor, or lie close
+to runs that do, which discards bumps in the noise; they are then padded on both sides so soft
+onsets and endings stay in. Leading and trailing silence is always trimmed;
+pauses longer than ``max_pause`` are shortened to the padding when asked.
+
+Levels are relative to the recording's own noise floor, and never below
+``MIN_SPEECH_DBFS``. When the loudest frames stand less than
+``MIN_CONTRAST_DB`` above the floor, as in a noisy street or for a steady
+tone, quiet words cannot be told from the background and the recording is
+kept whole rather than guessed at. ``trim_silence`` copies the speech segments
+into a new WAV with the source's own header, so the format is untouched.
+"""
+
+import math
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .audio_inspector import wav_header
+from .audio_payload import AudioPayload
+from .pcm import downmix, is_decodable, iter_pcm_chunks
+
+FRAME_SECONDS = 0.02
+# Frames per chunk when decoding; whole frames keep the grid aligned across chunks
+CHUNK_FRAMES = 512
+
+# Nothing quieter is speech, whatever the floor: hiss in a silent room sits near -75 dBFS,
+# while a soft voice far from the microphone still peaks around -40 dBFS
+MIN_SPEECH_DBFS = -60.0
+# The noise floor and the speech level are these percentiles of frame energies
+NOISE_PERCENTILE = 10.0
+LOUD_PERCENTILE = 99.0
+# Below this contrast between the two (about 12 dB SNR) quiet syllables sink into
+# the noise, and a recording is kept whole rather than trimmed
+MIN_CONTRAST_DB = 17.0
+# Speech extends over frames this far above the floor...
+LOWER_MARGIN_DB = 3.0
+# ...and a run of them must reach this far above it somewhere
+UPPER_MARGIN_DB = 9.0
+# ...unless it lies within this many seconds of a run that does
+REACH_SECONDS = 0.5
+# Quiet frames kept for their zero crossings must still be this far above the floor
+ZCR_MARGIN_DB = 1.0
+# Fricative energy sits above 3 kHz; hum and rumble cross far less often
+MIN_ZCR_HZ = 3000.0
+# Frames count as crossing "far faster" than the background at this multiple of its median rate
+ZCR_FACTOR = 2.0
+
+# Kept on each side of every segment, so onsets and trailing consonants survive
+PAD_SECONDS = 0.2
+
+
+@dataclass(frozen=True)
+class SpeechSegment:
+    """A span of speech as sample frames of the source recording"""
+
+    start_frame: int
+    end_frame: int
+    sample_rate: int
+
+    @property
+    def start(self) -> float:
+        return self.start_frame / self.sample_rate
+
+    @property
+    def end(self) -> float:
+        return self.end_frame / self.sample_rate
+
+    @property
+    def duration(self) -> float:
+        return (self.end_frame - self.start_frame) / self.sample_rate
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"start": self.start, "end": self.end, "duration": self.duration}
+
+
+@dataclass
+class VoiceActivity:
+    """The speech segments of a recording and the levels they were found with"""
+
+    segments: List[SpeechSegment]
+    frames: int
+    sample_rate: int
+    noise_floor_dbfs: float
+    threshold_dbfs: float
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def speech_duration(self) -> float:
+        return sum(segment.duration for segment in self.segments)
+
+    @property
+    def saved_seconds(self) -> float:
+        """Seconds of the recording outside every segment"""
+        return self.duration - self.speech_duration
+
+    @property
+    def has_speech(self) -> bool:
+        return bool(self.segments)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "duration": self.duration,
+            "speechDuration": self.speech_duration,
+            "savedSeconds": self.saved_seconds,
+            "noiseFloorDbfs": self.noise_floor_dbfs,
+            "thresholdDbfs": self.threshold_dbfs,
+            "segments": [segment.as_dict() for segment in self.segments],
+        }
+
+
+# ---------------------------------------------------------------------------
+# Frame features
+# ---------------------------------------------------------------------------
+
+def _features(frames: np.ndarray, frame_seconds: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Energy in dBFS and zero crossings per second for each row of ``frames``"""
+    centred = frames - frames.mean(axis=1, keepdims=True)
+    power = np.einsum("ij,ij->i", centred, centred) / frames.shape[1]
+    negative = np.signbit(centred)
+    crossings = np.count_nonzero(negative[:, 1:] != negative[:, :-1], axis=1)
+    return 10.0 * np.log10(power + 1e-20), crossings / frame_seconds
+
+
+def frame_features(payload: AudioPayload, frame_seconds: float = FRAME_SECONDS) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Per-frame energy (dBFS) and zero-crossing rate (Hz), and the frame length in samples"""
+    info = payload.info
+    frame_length = max(2, int(round(info.sample_rate * frame_seconds)))
+    seconds = frame_length / info.sample_rate
+    energies, rates = [], []
+    for chunk in iter_pcm_chunks(payload, frame_length * CHUNK_FRAMES):
+        mono = downmix(chunk)
+        whole = len(mono) // frame_length * frame_length
+        if whole:
+            energy, rate = _features(mono[:whole].reshape(-1, frame_length), seconds)
+            energies.append(energy)
+            rates.append(rate)
+        if whole < len(mono):
+            # Only the last chunk can end in a partial frame; it is judged on what it has
+            tail = mono[whole:]
+            if len(tail) > 1:
+                energy, rate = _features(tail.reshape(1, -1), len(tail) / info.sample_rate)
+            else:
+                energy, rate = np.full(1, 10.0 * math.log10(float(tail[0]) ** 2 + 1e-20)), np.zeros(1)
+            energies.append(energy)
+            rates.append(rate)
+    if not energies:
+        return np.zeros(0), np.zeros(0), frame_length
+    return np.concatenate(energies), np.concatenate(rates), frame_length
+
+
+# ---------------------------------------------------------------------------
+# Decision
+# ---------------------------------------------------------------------------
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive) indices of each run of true values"""
+    edges = np.diff(mask.astype(np.int8), prepend=0, append=0)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def speech_thresholds(energy: np.ndarray) -> Tuple[float, float, float]:
+    """The noise floor, the level speech extends over, and the level a run must reach"""
+    floor = float(np.percentile(energy, NOISE_PERCENTILE))
+    lower = max(floor + LOWER_MARGIN_DB, MIN_SPEECH_DBFS)
+    return floor, lower, max(floor + UPPER_MARGIN_DB, lower)
+
+
+def speech_contrast(energy: np.ndarray) -> float:
+    """How far the loudest frames stand above the noise floor, in dB"""
+    return float(np.percentile(energy, LOUD_PERCENTILE) - np.percentile(energy, NOISE_PERCENTILE))
+
+
+def speech_frames(energy: np.ndarray, zcr: np.ndarray, zero_crossings: bool = True,
+                  frame_seconds: float = FRAME_SECONDS) -> np.ndarray:
+    """Boolean mask of the frames that belong to speech, before padding"""
+    if not energy.size:
+        return np.zeros(0, dtype=bool)
+    if speech_contrast(energy) < MIN_CONTRAST_DB:
+        # Speech this close to the background cannot be told from it; keep everything audible
+        return np.full(len(energy), float(energy.max()) > MIN_SPEECH_DBFS)
+    floor, lower, upper = speech_thresholds(energy)
+    candidate = energy > lower
+    if zero_crossings:
+        background = float(np.median(zcr[energy <= floor])) if np.any(energy <= floor) else 0.0
+        fricative = (zcr > max(MIN_ZCR_HZ, ZCR_FACTOR * background)) & (energy > max(floor + ZCR_MARGIN_DB, MIN_SPEECH_DBFS))
+        candidate |= fricative
+
+    starts, ends = _runs(candidate)
+    if not starts.size:
+        return candidate
+    # Loudest frame of each run, from paired reduceat bounds over a sentinel-extended array
+    bounds = np.ravel(np.column_stack([starts, ends]))
+    loudest = np.maximum.reduceat(np.append(energy, -np.inf), bounds)[::2]
+    # Number each frame by the run it belongs to; frames outside every run are masked anyway
+    run = np.cumsum(np.diff(candidate.astype(np.int8), prepend=0) == 1) - 1
+    confirmed = candidate & (loudest > upper)[run]
+    # Weaker runs count when they are close to confirmed speech: final plosives, trailing syllables
+    reach = max(1, int(round(REACH_SECONDS / frame_seconds)))
+    before = np.concatenate([[0], np.cumsum(confirmed)])
+    index = np.arange(len(energy))
+    near = before[np.minimum(index + reach + 1, len(energy))] - before[np.maximum(index - reach, 0)] > 0
+    keep = (loudest > upper) | np.maximum.reduceat(np.append(near, False), bounds)[::2]
+    return candidate & keep[run]
+
+
+def detect_speech(payload: AudioPayload, max_pause: Optional[float] = None, pad_seconds: float = PAD_SECONDS,
+                  frame_seconds: float = FRAME_SECONDS, zero_crossings: bool = True) -> VoiceActivity:
+    """
+    Speech segments of a PCM WAV payload, in order and never overlapping
+
+    With ``max_pause`` unset everything from the first speech to the last is
+    one segment. Otherwise pauses longer than ``max_pause`` seconds split it,
+    and ``pad_seconds`` of each pause stays on either side.
+    """
+    info = payload.info
+    if not is_decodable(info):
+        raise ValueError("Voice activity detection needs a decodable PCM WAV payload")
+    energy, zcr, frame_length = frame_features(payload, frame_seconds)
+    total = info.data_size // info.block_align
+    if not energy.size:
+        return VoiceActivity([], total, info.sample_rate, -math.inf, -math.inf)
+
+    floor, lower, _ = speech_thresholds(energy)
+    starts, ends = _runs(speech_frames(energy, zcr, zero_crossings, frame_seconds))
+    if starts.size:
+        pad = int(math.ceil(pad_seconds * info.sample_rate))
+        starts = np.maximum(starts * frame_length - pad, 0)
+        ends = np.minimum(ends * frame_length + pad, total)
+        if max_pause is None:
+            starts, ends = starts[:1], ends[-1:]
+        else:
+            # Padded neighbours closer than the pause left between them merge into one segment
+            allowed = max(0, int(max_pause * info.sample_rate) - 2 * pad)
+            split = starts[1:] - ends[:-1] > allowed
+            starts, ends = starts[np.r_[True, split]], ends[np.r_[split, True]]
+
+    segments = [SpeechSegment(int(start), int(end), info.sample_rate) for start, end in zip(starts, ends)]
+    return VoiceActivity(segments, total, info.sample_rate, floor, lower)
+
+
+# ---------------------------------------------------------------------------
+# Trimming
+# ---------------------------------------------------------------------------
+
+@dataclass
+class TrimmedAudio:
+    """A payload cut down to its speech, and what was cut"""
+
+    payload: AudioPayload
+    original_bytes: int
+    activity: Optional[VoiceActivity]
+    passthrough: bool
+
+    @property
+    def saved_seconds(self) -> float:
+        return self.activity.saved_seconds if self.activity is not None else 0.0
+
+    @property
+    def has_speech(self) -> bool:
+        """False only when the samples were read and held no speech; such uploads need no transcription"""
+        return self.activity is None or self.activity.has_speech
+
+    def as_dict(self) -> Dict[str, Any]:
+        result = {"originalBytes": self.original_bytes, "bytes": self.payload.size, "passthrough": self.passthrough}
+        if self.activity is not None:
+            result.update(self.activity.as_dict())
+        return result
+
+
+def trim_silence(payload: AudioPayload, max_pause: Optional[float] = None, pad_seconds: float = PAD_SECONDS,
+                 frame_seconds: float = FRAME_SECONDS, zero_crossings: bool = True) -> TrimmedAudio:
+    """
+    Copy only the speech segments of ``payload`` into a new WAV
+
+    The source header is kept with its sizes rewritten, so sample format and
+    any extra chunks before the data are unchanged. Compressed formats cannot
+    be read here and pass through whole.
+    """
+    info = payload.info
+    if not is_decodable(info):
+        return TrimmedAudio(payload, payload.size, None, True)
+
+    activity = detect_speech(payload, max_pause, pad_seconds, frame_seconds, zero_crossings)
+    data, block_align, offset = payload.data, info.block_align, info.data_offset
+    size = sum(segment.end_frame - segment.start_frame for segment in activity.segments) * block_align
+    buffer = bytearray(data[:offset])
+    struct.pack_into("<I", buffer, 4, offset - 8 + size)
+    struct.pack_into("<I", buffer, offset - 4, size)
+    for segment in activity.segments:
+        buffer += data[offset + segment.start_frame * block_align:offset + segment.end_frame * block_align]
+    return TrimmedAudio(AudioPayload(buffer), payload.size, activity, False)
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def sample_recording(sample_rate: int, seed: int, snr_db: float = 30.0,
+                     level: float = 0.3) -> Tuple[AudioPayload, np.ndarray]:
+    """
+    A recording as ``VoiceRecorder`` tends to capture one, and which samples hold audible speech
+
+    One to four seconds of room noise before the first word, two to five
+    phrases separated by thinking pauses of up to three seconds, and one to
+    five seconds after the last word. ``level`` is the speaker's peak amplitude.
+    """
+    from .synthetic_audio import add_background_noise, speech_like, to_pcm16
+
+    rng = np.random.default_rng(seed)
+    parts = [np.zeros(int(rng.uniform(1.0, 4.0) * sample_rate), dtype=np.float32)]
+    for phrase in range(int(rng.integers(2, 6))):
+        if phrase:
+            parts.append(np.zeros(int(rng.uniform(0.3, 3.0) * sample_rate), dtype=np.float32))
+        parts.append(speech_like(int(rng.uniform(2.0, 10.0) * sample_rate), sample_rate, rng, level))
+    parts.append(np.zeros(int(rng.uniform(1.0, 5.0) * sample_rate), dtype=np.float32))
+    clean = np.concatenate(parts)
+    pcm = to_pcm16(add_background_noise(clean, snr_db, rng))
+    # Speech is audible where its level over 10ms rises above the noise; fade tails below it are not
+    voiced = clean[clean != 0]
+    noise_power = float(np.mean(np.square(voiced, dtype=np.float64))) / 10.0 ** (snr_db / 10.0)
+    window = np.full(max(1, sample_rate // 100), 1.0 / max(1, sample_rate // 100))
+    audible = np.convolve(np.square(clean, dtype=np.float64), window, "same") > noise_power
+    return AudioPayload(wav_header(sample_rate, 1, 16, pcm.nbytes) + pcm.tobytes()), audible
+
+
+def missed_speech(activity: VoiceActivity, speech: np.ndarray) -> int:
+    """How many of the ``speech`` samples fall outside every segment"""
+    kept = np.zeros(len(speech), dtype=bool)
+    for segment in activity.segments:
+        kept[segment.start_frame:segment.end_frame] = True
+    return int(np.count_nonzero(speech & ~kept))
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Measure seconds saved, speech missed and detection time on synthetic recordings"""
+    import argparse
+    import time
+
+    from .synthetic_audio import ClipSpec, render_wav
+
+    parser = argparse.ArgumentParser(description="Voice activity detection: silence trimmed before transcription")
+    parser.add_argument("--recordings", type=int, default=100)
+    parser.add_argument("--max-pause", type=float, default=0.8, help="pauses longer than this are shortened")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'recordings':<24} {'audio s':>9} {'edges s':>9} {'+pauses s':>10} {'saved':>7} {'missed s':>9}")
+    for snr_db in (40.0, 20.0, 15.0, 12.0, 6.0):
+        total = edges = pauses = missed = 0.0
+        for index in range(args.recordings):
+            payload, speech = sample_recording(16000, args.seed + index, snr_db)
+            trimmed = detect_speech(payload)
+            cut = detect_speech(payload, max_pause=args.max_pause)
+            total += trimmed.duration
+            edges += trimmed.saved_seconds
+            pauses += cut.saved_seconds
+            missed += missed_speech(cut, speech) / 16000
+        print(f"{f'16 kHz, {snr_db:.0f} dB SNR':<24} {total:>9.1f} {edges:>9.1f} {pauses:>10.1f} "
+              f"{pauses / total:>7.1%} {missed:>9.2f}")
+
+    print(f"\n{'2 min clip':<24} {'detect ms':>9} {'trim ms':>9} {'x realtime':>10}")
+    for sample_rate, channels in ((16000, 1), (48000, 2)):
+        payload = AudioPayload(render_wav(ClipSpec("speech", sample_rate, channels, 120.0, seed=args.seed)))
+        detect_speech(payload)
+        timings = []
+        for run in (detect_speech, trim_silence):
+            started = time.perf_counter()
+            for _ in range(5):
+                run(payload, max_pause=args.max_pause)
+            timings.append((time.perf_counter() - started) / 5)
+        label = f"{sample_rate // 1000} kHz {'mono' if channels == 1 else 'stereo'}"
+        print(f"{label:<24} {timings[0] * 1000:>9.1f} {timings[1] * 1000:>9.1f} {120.0 / timings[0]:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
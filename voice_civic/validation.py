@@ -0,0 +1,300 @@
+"""
+Input validation mirrored from ``src/utils/validation.ts``
+
+Error messages match the TypeScript functions exactly so Python tooling and
+the lambdas report the same problems for the same request.
+
+``validateAudioInput`` decodes the whole ``audioData`` string (10 MB or more)
+to check its size and a 12-byte header, and the handler then decodes it
+again. ``validate_audio_input`` takes the size from the string's length and
+decodes only its first characters, so it costs the same for any payload,
+well-formed or not. ``Buffer.from`` never rejects base64, so neither does
+the port: the first and last few hundred characters are filtered the way
+Node filters them (``lenient_base64_head``). Characters in between are not
+looked at; Node would skip illegal ones, so the size reported for a
+string with line breaks or junk in its middle is a byte or so high per
+character.
+"""
+
+import math
+import re
+from enum import Enum
+from functools import partial
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Type
+
+from .audio_inspector import FORMAT_HEADER_SIZE
+from .audio_payload import lenient_base64_head
+from .types import FamilyRelation, Gender, HousingType, IncomeCategory, Language, RationCardType
+
+MIN_AUDIO_BYTES = 1000
+MAX_AUDIO_BYTES = 10 * 1024 * 1024
+
+_SESSION_ID_PATTERN = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[1-5][0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$", re.IGNORECASE)
+
+_SUPPORTED_LANGUAGES = [language.value for language in Language]
+
+
+def validate_audio_quality(audio_data: bytes) -> List[str]:
+    """Size and container checks from ``validateAudioQuality``"""
+    return _audio_errors(len(audio_data), bytes(audio_data[:FORMAT_HEADER_SIZE]))
+
+
+def _supported_format(header: bytes) -> bool:
+    """
+    The header test of ``validateAudioQuality``
+
+    Unlike ``detect_audio_format`` it judges buffers shorter than 12 bytes
+    on the bytes they have.
+    """
+    is_wav = header[0:4] == b"RIFF" and header[8:12] == b"WAVE"
+    is_mp3 = header[0:3] == b"ID3" or (len(header) > 1 and header[0] == 0xFF and (header[1] & 0xE0) == 0xE0)
+    is_m4a = header[4:8] == b"ftyp"
+    return is_wav or is_mp3 or is_m4a
+
+
+def _audio_errors(size: int, header: bytes) -> List[str]:
+    errors = []
+    if size < MIN_AUDIO_BYTES:
+        errors.append("Audio file too small - may be corrupted or empty")
+    if size > MAX_AUDIO_BYTES:
+        errors.append("Audio file too large - maximum size is 10MB")
+    if not _supported_format(header):
+        errors.append("Unsupported audio format - please use WAV, MP3, or M4A")
+    return errors
+
+
+def validate_session_id(session_id: str) -> bool:
+    return bool(_SESSION_ID_PATTERN.match(session_id))
+
+
+def validate_audio_input(request: Any) -> Tuple[bool, List[str]]:
+    """Port of ``validateAudioInput``: returns ``(is_valid, errors)``"""
+    if not request:
+        return False, ["Request body is required"]
+
+    errors = []
+    audio_data = request.get("audioData")
+    if not audio_data:
+        errors.append("audioData is required")
+    elif not isinstance(audio_data, str):
+        errors.append("audioData must be a base64 encoded string")
+    else:
+        errors.extend(_audio_errors(*lenient_base64_head(audio_data, FORMAT_HEADER_SIZE)))
+
+    language = request.get("language")
+    if language and language not in _SUPPORTED_LANGUAGES:
+        errors.append(f"Unsupported language: {language}. Supported languages: {', '.join(_SUPPORTED_LANGUAGES)}")
+
+    session_id = request.get("sessionId")
+    if session_id and not validate_session_id(session_id):
+        errors.append("Invalid session ID format")
+
+    return not errors, errors
+
+
+# ---------------------------------------------------------------------------
+# Household schema
+# ---------------------------------------------------------------------------
+#
+# ``HouseholdInfoSchema`` is a zod schema, and ``validatePMJAYEligibility``
+# reports zod's issues as "path: message". The checkers below walk a decoded
+# JSON value in the schema's key order and produce zod's default messages, so
+# the strings are identical.
+
+_MISSING = object()
+
+Checker = Callable[[Any, Tuple, List[str]], None]
+
+_PINCODE_PATTERN = re.compile(r"^[0-9]{6}\Z")
+
+
+def _parsed_type(value: Any) -> str:
+    """zod's name for the type of a decoded JSON value"""
+    if value is _MISSING:
+        return "undefined"
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, (int, float)):
+        return "nan" if isinstance(value, float) and math.isnan(value) else "number"
+    if isinstance(value, (list, tuple)):
+        return "array"
+    if isinstance(value, dict):
+        return "object"
+    return "unknown"
+
+
+def _js_length(text: str) -> int:
+    """``String.prototype.length``: UTF-16 code units, so astral characters count twice"""
+    return len(text) + sum(1 for char in text if ord(char) > 0xFFFF)
+
+
+def _js_number(value: Any) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _add(issues: List[str], path: Tuple, message: str) -> None:
+    issues.append(f"{'.'.join(str(part) for part in path)}: {message}")
+
+
+def _expect(value: Any, expected: str, path: Tuple, issues: List[str]) -> bool:
+    received = _parsed_type(value)
+    if received == expected:
+        return True
+    _add(issues, path, "Required" if received == "undefined" else f"Expected {expected}, received {received}")
+    return False
+
+
+def _string(
+    value: Any,
+    path: Tuple,
+    issues: List[str],
+    min_length: Optional[int] = None,
+    min_message: Optional[str] = None,
+    max_length: Optional[int] = None,
+    pattern: Optional["re.Pattern"] = None,
+    pattern_message: str = "Invalid",
+) -> None:
+    if not _expect(value, "string", path, issues):
+        return
+    length = _js_length(value)
+    if min_length is not None and length < min_length:
+        _add(issues, path, min_message or f"String must contain at least {min_length} character(s)")
+    if max_length is not None and length > max_length:
+        _add(issues, path, f"String must contain at most {max_length} character(s)")
+    if pattern is not None and not pattern.search(value):
+        _add(issues, path, pattern_message)
+
+
+def _number(
+    value: Any,
+    path: Tuple,
+    issues: List[str],
+    integer: bool = False,
+    minimum: Optional[float] = None,
+    maximum: Optional[float] = None,
+    max_message: Optional[str] = None,
+) -> None:
+    if not _expect(value, "number", path, issues):
+        return
+    if integer and not (math.isfinite(value) and float(value).is_integer()):
+        _add(issues, path, "Expected integer, received float")
+    if minimum is not None and value < minimum:
+        _add(issues, path, f"Number must be greater than or equal to {_js_number(minimum)}")
+    if maximum is not None and value > maximum:
+        _add(issues, path, max_message or f"Number must be less than or equal to {_js_number(maximum)}")
+
+
+def _boolean(value: Any, path: Tuple, issues: List[str]) -> None:
+    _expect(value, "boolean", path, issues)
+
+
+def _native_enum(enum: Type[Enum], value: Any, path: Tuple, issues: List[str]) -> None:
+    options = " | ".join(f"'{member.value}'" for member in enum)
+    received = _parsed_type(value)
+    if received not in ("string", "number"):
+        _add(issues, path, "Required" if received == "undefined" else f"Expected {options}, received {received}")
+    elif value not in {member.value for member in enum}:
+        shown = value if isinstance(value, str) else _js_number(value)
+        _add(issues, path, f"Invalid enum value. Expected {options}, received '{shown}'")
+
+
+def _optional(check: Checker, value: Any, path: Tuple, issues: List[str]) -> None:
+    if value is not _MISSING:
+        check(value, path, issues)
+
+
+def _array(item: Checker, value: Any, path: Tuple, issues: List[str]) -> None:
+    if _expect(value, "array", path, issues):
+        for index, element in enumerate(value):
+            item(element, path + (index,), issues)
+
+
+def _object(fields: Sequence[Tuple[str, Checker]], value: Any, path: Tuple, issues: List[str]) -> None:
+    if _expect(value, "object", path, issues):
+        for key, check in fields:
+            check(value.get(key, _MISSING), path + (key,), issues)
+
+
+def _enum(enum: Type[Enum]) -> Checker:
+    return partial(_native_enum, enum)
+
+
+_NON_EMPTY = partial(_string, min_length=1)
+
+_DISABILITY = partial(_object, [("type", _NON_EMPTY), ("severity", _NON_EMPTY), ("certified", _boolean)])
+
+_MEDICAL_CONDITION = partial(_object, [("condition", _NON_EMPTY), ("chronic", _boolean), ("treatmentRequired", _boolean)])
+
+_PERSON = partial(_object, [
+    ("name", partial(_string, min_length=1, min_message="Name is required", max_length=100)),
+    ("age", partial(_number, integer=True, minimum=0, maximum=150, max_message="Invalid age")),
+    ("gender", _enum(Gender)),
+    ("relation", _enum(FamilyRelation)),
+    ("occupation", partial(_optional, partial(_string, max_length=100))),
+    ("disabilities", partial(_optional, partial(_array, _DISABILITY))),
+    ("chronicConditions", partial(_optional, partial(_array, _MEDICAL_CONDITION))),
+])
+
+_ADDRESS = partial(_object, [
+    ("street", partial(_optional, _string)),
+    ("village", partial(_optional, _string)),
+    ("district", partial(_string, min_length=1, min_message="District is required")),
+    ("state", partial(_string, min_length=1, min_message="State is required")),
+    ("pincode", partial(_string, pattern=_PINCODE_PATTERN, pattern_message="Pincode must be 6 digits")),
+    ("landmark", partial(_optional, _string)),
+])
+
+_ASSET = partial(_object, [("type", _NON_EMPTY), ("description", _NON_EMPTY), ("value", partial(_optional, partial(_number, minimum=0)))])
+
+_LAND_OWNERSHIP = partial(_object, [
+    ("hasLand", _boolean),
+    ("acreage", partial(_optional, partial(_number, minimum=0))),
+    ("irrigated", partial(_optional, _boolean)),
+])
+
+_ECONOMIC_INDICATORS = partial(_object, [
+    ("incomeCategory", _enum(IncomeCategory)),
+    ("rationCardType", partial(_optional, _enum(RationCardType))),
+    ("landOwnership", partial(_optional, _LAND_OWNERSHIP)),
+    ("housingType", _enum(HousingType)),
+    ("assets", partial(_array, _ASSET)),
+])
+
+_HOUSEHOLD_INFO = partial(_object, [
+    ("headOfHousehold", _PERSON),
+    ("members", partial(_array, _PERSON)),
+    ("address", _ADDRESS),
+    ("economicStatus", _ECONOMIC_INDICATORS),
+    ("existingSchemes", partial(_array, _string)),
+])
+
+
+def household_schema_issues(household: Any) -> List[str]:
+    """``HouseholdInfoSchema.parse`` failures as "path: message", in zod's order"""
+    issues: List[str] = []
+    _HOUSEHOLD_INFO(household, (), issues)
+    return issues
+
+
+def validate_pmjay_eligibility(household: Any) -> List[str]:
+    """Port of ``validatePMJAYEligibility``: schema issues, else completeness problems"""
+    errors = household_schema_issues(household)
+    if errors:
+        return errors
+
+    if not household["address"]["district"] or not household["address"]["state"]:
+        errors.append("District and state are required for PM-JAY eligibility")
+    if not household["economicStatus"]["incomeCategory"]:
+        errors.append("Income category is required for PM-JAY eligibility")
+    if len(household["members"]) == 0:
+        errors.append("At least one family member must be specified")
+    people = [household["headOfHousehold"], *household["members"]]
+    if not any(person["relation"] == FamilyRelation.HEAD.value for person in people):
+        errors.append("Head of household must be specified")
+    return errors